@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Throughput and peak-memory benchmarks for the calculation, serialization and
+report hot paths.
+
+Each case builds synthetic inputs (benchmarks/synthetic.py) at a scale of
+1k, 100k or 1M items and times one pass over them. Every case and scale runs
+in a fresh interpreter, so peak RSS covers that case alone. The best of
+``--repeat`` passes counts:
+
+- ``items_per_second``: items divided by the best pass time
+- ``setup_rss_mb`` / ``peak_rss_mb``: peak RSS after building the inputs,
+  and after the timed passes
+
+Results are compared with baselines.json. A case fails when its throughput
+drops more than ``--tolerance``, or its peak RSS grows more than
+``--memory-tolerance``, relative to the stored baseline. Baselines are
+machine-specific: record them with ``--save`` on the machine that runs the
+check. A case whose module cannot be imported is reported as skipped.
+
+    python benchmarks/hot_paths.py                       # all cases at 1k
+    python benchmarks/hot_paths.py --scale 100k --case lookup --case calculate
+    python benchmarks/hot_paths.py --scale 1k,100k --save
+"""
+
+import argparse
+import importlib.util
+import itertools
+import json
+import math
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+BASELINE_FILE = Path(__file__).with_name("baselines.json")
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000}
+
+Run = Callable[[], Any]
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    setup: Callable[[int, Path], Run]  # (items, workdir) -> one timed pass
+    max_items: Optional[int] = None  # larger scales are skipped
+
+
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str, max_items: Optional[int] = None):
+    def register(setup: Callable[[int, Path], Run]) -> Callable[[int, Path], Run]:
+        CASES[name] = Case(name, setup, max_items)
+        return setup
+    return register
+
+
+def _load(name: str, relative: str):
+    """Import a self-contained module by path; its package __init__ pulls in the whole app"""
+    spec = importlib.util.spec_from_file_location(name, SRC / relative)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _script_modules() -> None:
+    """batch_runner and xhtml_generator import their siblings script-style"""
+    sys.path.insert(0, str(SRC / "generator"))
+
+
+# ============================================================================
+# CASES
+# ============================================================================
+
+@case("lookup")
+def _lookup(n: int, workdir: Path) -> Run:
+    import synthetic
+    loader_module = _load("factor_loader", "factortrace/factor_loader.py")
+    loader = loader_module.EmissionFactorLoader(synthetic.write_factor_csv(workdir / "factors_v2025-01-01.csv"))
+    items = synthetic.emission_items(n)
+
+    def run():
+        lookup = loader.lookup
+        for item in items:
+            lookup(item, "quantity")
+    return run
+
+
+@case("calculate")
+def _calculate(n: int, workdir: Path) -> Run:
+    import synthetic
+    loader_module = _load("factor_loader", "factortrace/factor_loader.py")
+    tracecalc = _load("tracecalc", "factortrace/tracecalc.py")
+    calculator = tracecalc.TraceCalc(
+        loader_module.EmissionFactorLoader(synthetic.write_factor_csv(workdir / "factors_v2025-01-01.csv"))
+    )
+    items = synthetic.emission_items(n)
+    return lambda: calculator.calculate(items, method="quantity")
+
+
+@case("generate_voucher")
+def _generate_voucher(n: int, workdir: Path) -> Run:
+    import synthetic
+    from generator.voucher_generator import VoucherInput, generate_voucher
+    inputs = [VoucherInput(**fields) for fields in synthetic.voucher_inputs(n)]
+
+    def run():
+        for voucher_input in inputs:
+            generate_voucher(voucher_input)
+    return run
+
+
+@case("serialize_voucher")
+def _serialize_voucher(n: int, workdir: Path) -> Run:
+    import synthetic
+    from factortrace.voucher_xml_serializer import serialize_voucher
+    vouchers = synthetic.scope3_vouchers(n)
+
+    def run():
+        for voucher in vouchers:
+            serialize_voucher(voucher)
+    return run
+
+
+@case("validate_xml")
+def _validate_xml(n: int, workdir: Path) -> Run:
+    import synthetic
+    from factortrace.voucher_xml_serializer import serialize_voucher, validate_xml
+    xsd = synthetic.scope3_xsd(workdir / "scope3.xsd")
+    documents = [serialize_voucher(voucher) for voucher in synthetic.scope3_vouchers(n)]
+    if not validate_xml(documents[0], xsd):  # also compiles and caches the schema
+        raise RuntimeError("Synthetic Scope-3 voucher does not match its schema")
+
+    def run():
+        for document in documents:
+            validate_xml(document, xsd)
+    return run
+
+
+@case("generate_ixbrl")
+def _generate_ixbrl(n: int, workdir: Path) -> Run:
+    import synthetic
+    _script_modules()
+    from xhtml_generator import generate_ixbrl
+    rows = synthetic.report_rows(n)
+    # One output file, rewritten for every report, so 1M reports do not fill the disk
+    output = str(workdir / "report.xhtml")
+
+    def run():
+        for row in rows:
+            generate_ixbrl(row, output)
+    return run
+
+
+@case("validate_voucher")
+def _validate_voucher(n: int, workdir: Path) -> Run:
+    import synthetic
+    validator = _load("voucher_validator", "factortrace/services/validator.py").VoucherValidator()
+    records = synthetic.validator_records(n)
+
+    def run():
+        validate = validator.validate_voucher
+        for record in records:
+            validate(record)
+    return run
+
+
+@case("emission_voucher")
+def _emission_voucher(n: int, workdir: Path) -> Run:
+    import synthetic
+    from factortrace.models.emissions_voucher import EmissionVoucher
+    fields = synthetic.emission_voucher_fields(n)
+
+    def run():
+        for kwargs in fields:
+            EmissionVoucher(**kwargs)
+    return run
+
+
+# A report directory per row plus a ZIP of all of them
+@case("process_csv_batch", max_items=10_000)
+def _process_csv_batch(n: int, workdir: Path) -> Run:
+    import synthetic
+    _script_modules()
+    from batch_runner import BatchReportGenerator
+    csv_path = str(synthetic.write_report_csv(workdir / "batch.csv", n))
+    runs = itertools.count()
+
+    def run():
+        output = workdir / f"output_{next(runs)}"
+        BatchReportGenerator(output_base_dir=str(output)).process_csv_batch(csv_path)
+    return run
+
+
+# ============================================================================
+# RUNNER
+# ============================================================================
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB elsewhere
+
+
+def run_case(name: str, items: int, repeat: int, workdir: Path) -> Dict[str, Any]:
+    """Set up and time one case in this process"""
+    sys.path[:0] = [str(Path(__file__).resolve().parent), str(SRC)]
+    try:
+        run = CASES[name].setup(items, workdir)
+    except ImportError as e:
+        return {"skipped": f"{type(e).__name__}: {e}"}
+    setup_rss = _peak_rss_mb()
+    best = math.inf
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return {
+        "items": items,
+        "seconds": round(best, 6),
+        "items_per_second": round(items / best, 1),
+        "setup_rss_mb": round(setup_rss, 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def measure(name: str, items: int, repeat: int) -> Dict[str, Any]:
+    """Run one case in a fresh interpreter; its log output goes to a file in the scratch directory"""
+    with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as tmp:
+        workdir = Path(tmp)
+        result_path, log_path = workdir / "result.json", workdir / "benchmark.log"
+        with open(log_path, "w") as log:
+            proc = subprocess.run(
+                [sys.executable, str(Path(__file__).resolve()), "--child", name, str(items), str(repeat), str(result_path)],
+                cwd=workdir, stdout=log, stderr=subprocess.STDOUT,
+            )
+        if proc.returncode != 0 or not result_path.exists():
+            tail = log_path.read_text(errors="replace").strip().splitlines()[-3:]
+            return {"error": " | ".join(tail) or f"exit status {proc.returncode}"}
+        return json.loads(result_path.read_text())
+
+
+def compare(result: Dict[str, Any], baseline: Optional[Dict[str, Any]], tolerance: float,
+            memory_tolerance: float) -> List[str]:
+    """Regressions of `result` against `baseline`"""
+    if not baseline or "items_per_second" not in result:
+        return []
+    problems = []
+    floor = baseline["items_per_second"] * (1 - tolerance)
+    if result["items_per_second"] < floor:
+        problems.append(
+            f"throughput {result['items_per_second']:,.0f}/s below {floor:,.0f}/s "
+            f"(baseline {baseline['items_per_second']:,.0f}/s)"
+        )
+    ceiling = baseline["peak_rss_mb"] * (1 + memory_tolerance)
+    if result["peak_rss_mb"] > ceiling:
+        problems.append(
+            f"peak RSS {result['peak_rss_mb']:.0f} MB above {ceiling:.0f} MB (baseline {baseline['peak_rss_mb']:.0f} MB)"
+        )
+    return problems
+
+
+def default_repeat(items: int) -> int:
+    return max(1, min(5, 100_000 // items))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Hot-path throughput and memory benchmarks")
+    parser.add_argument("--case", action="append", choices=sorted(CASES), help="case to run (default: all)")
+    parser.add_argument("--scale", default="1k", help=f"comma-separated scales from {', '.join(SCALES)}")
+    parser.add_argument("--repeat", type=int, help="timed passes per case; the best counts (default: by scale)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--save", action="store_true", help="store these results as the baselines")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed throughput drop (fraction)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25, help="allowed peak RSS growth (fraction)")
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    parser.add_argument("--child", nargs=4, metavar=("CASE", "ITEMS", "REPEAT", "RESULT"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        name, items, repeat, result_path = args.child
+        result = run_case(name, int(items), int(repeat), Path.cwd())
+        Path(result_path).write_text(json.dumps(result))
+        return 0
+
+    scales = [scale.strip() for scale in args.scale.split(",")]
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        parser.error(f"unknown scale(s): {', '.join(unknown)}")
+    baselines = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+
+    results: Dict[str, Dict[str, Any]] = {}
+    failed = False
+    print(f"{'case':<28} {'items':>9} {'items/s':>12} {'seconds':>9} {'peak MB':>8}  status")
+    for scale in scales:
+        items = SCALES[scale]
+        for name in args.case or list(CASES):
+            key = f"{name}@{scale}"
+            bench = CASES[name]
+            if bench.max_items is not None and items > bench.max_items:
+                print(f"{key:<28} {items:>9,}  skipped: capped at {bench.max_items:,} items")
+                continue
+            result = measure(name, items, args.repeat or default_repeat(items))
+            results[key] = result
+            if "skipped" in result or "error" in result:
+                failed |= "error" in result
+                print(f"{key:<28} {items:>9,}  {'error' if 'error' in result else 'skipped'}: "
+                      f"{result.get('error') or result.get('skipped')}")
+                continue
+            problems = [] if args.save else compare(result, baselines.get(key), args.tolerance, args.memory_tolerance)
+            failed |= bool(problems)
+            print(f"{key:<28} {items:>9,} {result['items_per_second']:>12,.0f} {result['seconds']:>9.3f} "
+                  f"{result['peak_rss_mb']:>8.0f}  {'REGRESSION' if problems else 'ok'}")
+            for problem in problems:
+                print(f"{'':<28} {problem}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+    if args.save:
+        baselines.update({
+            key: {"items_per_second": r["items_per_second"], "peak_rss_mb": r["peak_rss_mb"]}
+            for key, r in results.items() if "items_per_second" in r
+        })
+        args.baseline.write_text(json.dumps(dict(sorted(baselines.items())), indent=2) + "\n")
+        print(f"Baselines written to {args.baseline}")
+        return 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Startup budget for the API and CLI entry points.
+
+Each entry point in startup_budget.json is imported in a fresh interpreter
+under ``python -X importtime``; the cumulative import time of the module
+itself is taken as the best of ``--runs`` cold starts and compared with its
+budget. Modules listed under ``deferred`` (pandas, redis, xmlschema, ...)
+must not appear in the import graph at all: they are imported on first use.
+``eager`` names the deferred modules an entry point is still allowed to load
+(``batch_runner`` evaluates every batch with pandas, so it imports it eagerly).
+CLI scripts under src/generator import their siblings script-style, so that
+directory is on the path as well.
+
+An entry point that cannot be imported here is reported as skipped, and
+``--update`` only records budgets for entry points it actually measured.
+
+    python benchmarks/startup.py                 # check, exit 1 on a regression
+    python benchmarks/startup.py --update        # re-baseline budgets on this machine
+    python benchmarks/startup.py api.api --runs 10
+"""
+
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+BUDGET_FILE = Path(__file__).with_name("startup_budget.json")
+
+# Budgets are re-baselined with this much headroom over the measured time,
+# and never below MIN_BUDGET_MS: cold-start noise is a few ms on any module
+HEADROOM = 1.5
+MIN_BUDGET_MS = 5
+
+
+def import_profile(module: str) -> Tuple[Dict[str, int], Optional[str]]:
+    """Cumulative import time in microseconds per imported module, and the error text if the import failed"""
+    path = os.pathsep.join([str(SRC), str(ROOT), str(SRC / "generator")])
+    env = dict(os.environ, PYTHONPATH=path, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    cumulative: Dict[str, int] = {}
+    errors: List[str] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            errors.append(line)
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            cumulative.setdefault(parts[2].strip(), int(parts[1]))
+    return cumulative, ("\n".join(errors[-3:]) if proc.returncode else None)
+
+
+def measure(module: str, runs: int) -> Tuple[Optional[float], List[str], Optional[str]]:
+    """Best-of-`runs` import time in ms, every module in the import graph, and any import error"""
+    best: Optional[float] = None
+    loaded: List[str] = []
+    for _ in range(runs):
+        cumulative, error = import_profile(module)
+        if error is not None:
+            return None, [], error
+        elapsed = cumulative.get(module, 0) / 1000
+        best = elapsed if best is None else min(best, elapsed)
+        loaded = list(cumulative)
+    return best, loaded, None
+
+
+def deferred_loaded(loaded: List[str], deferred: List[str]) -> List[str]:
+    return sorted({name for name in loaded for heavy in deferred if name == heavy or name.startswith(heavy + ".")})
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check entry-point import time against startup_budget.json")
+    parser.add_argument("modules", nargs="*", help="modules to check (default: all in the budget file)")
+    parser.add_argument("--runs", type=int, default=5, help="cold starts per module; the best one counts")
+    parser.add_argument("--update", action="store_true", help="rewrite budgets from this machine's timings")
+    args = parser.parse_args(argv)
+
+    config = json.loads(BUDGET_FILE.read_text())
+    budgets: Dict[str, float] = config["budgets_ms"]
+    deferred: List[str] = config["deferred"]
+    eager: Dict[str, List[str]] = config.get("eager", {})
+
+    failed = False
+    for module in args.modules or config["entry_points"]:
+        elapsed, loaded, error = measure(module, args.runs)
+        if error is not None:
+            print(f"{module:<36} skipped: {error.splitlines()[-1]}")
+            if args.update:
+                budgets.pop(module, None)
+            continue
+        heavy = deferred_loaded(loaded, [name for name in deferred if name not in eager.get(module, [])])
+        budget = budgets.get(module)
+        if args.update:
+            budgets[module] = max(MIN_BUDGET_MS, math.ceil(elapsed * HEADROOM))
+            budget = budgets[module]
+        over = budget is not None and elapsed > budget
+        status = "FAIL" if over or heavy else "ok"
+        print(f"{module:<36} {elapsed:8.1f} ms  budget {budget if budget is not None else '-':>6} ms  {status}")
+        if heavy:
+            print(f"{'':<36} imports deferred dependencies at startup: {', '.join(heavy)}")
+        failed |= status == "FAIL"
+
+    if args.update:
+        BUDGET_FILE.write_text(json.dumps(config, indent=2) + "\n")
+        print(f"Budgets written to {BUDGET_FILE}")
+        return 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+Deterministic synthetic inputs for the hot-path benchmarks.
+
+Every generator takes a row count and a seed and returns plain Python data
+shaped like the real inputs of one entry point:
+
+- ``factor_rows`` / ``emission_items``: an emission-factor CSV and activity
+  items that hit exact, regional-fallback and global-average lookups
+- ``voucher_inputs``: VoucherInput fields for ``generate_voucher``, spread
+  over the default factor repository's factors
+- ``scope3_vouchers`` and ``scope3_xsd``: flat Scope-3 vouchers for
+  ``serialize_voucher`` and a matching schema for ``validate_xml``
+- ``validator_records``: flat voucher records for
+  ``VoucherValidator.validate_voucher``, some incomplete or CBAM-relevant
+- ``emission_voucher_fields``: keyword arguments for ``EmissionVoucher``
+- ``report_rows``: batch CSV rows for ``generate_ixbrl`` and
+  ``BatchReportGenerator.process_csv_batch``, a few with quality issues
+"""
+
+import csv
+import random
+import string
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List
+
+ACTIVITIES = [f"{material}_{form}" for material in ("steel", "aluminium", "cement", "cotton", "plastic")
+              for form in ("raw", "semi", "finished")]
+# Exact regions in the factor file, then regions that only resolve via fallback
+FACTOR_REGIONS = ["DE", "FR", "EU", "US", "EUROPE", "ASIA", "NORTH_AMERICA", "GLOBAL"]
+ITEM_REGIONS = ["DE", "FR", "EU", "US", "CN", "IN", "MX", "BR", "ZA"]
+COUNTRIES = ["DE", "FR", "IT", "PL", "CN", "IN", "TR", "US"]
+CN_CODES = ["72081000", "76011000", "25232900", "52081100", "39011010", "84713000"]
+
+
+def _rng(seed: int) -> random.Random:
+    return random.Random(seed)
+
+
+def _lei(rng: random.Random) -> str:
+    return "".join(rng.choices(string.digits + string.ascii_uppercase, k=18)) + f"{rng.randrange(100):02d}"
+
+
+def factor_rows(seed: int = 0) -> List[Dict[str, Any]]:
+    """Emission-factor CSV rows (activity_id, region, method, factor, unit, confidence)"""
+    rng = _rng(seed)
+    rows = []
+    for activity in ACTIVITIES:
+        for method, unit in (("quantity", "kgCO2e/kg"), ("spend", "kgCO2e/eur")):
+            # Not every activity has every region, so lookups exercise all three paths
+            for region in rng.sample(FACTOR_REGIONS[:-1], 4) + (["GLOBAL"] if rng.random() < 0.5 else []):
+                rows.append({
+                    "activity_id": activity, "region": region, "method": method,
+                    "factor": round(rng.uniform(0.1, 25.0), 4), "unit": unit,
+                    "confidence": round(rng.uniform(0.6, 1.0), 2),
+                })
+    return rows
+
+
+def write_factor_csv(path: Path, seed: int = 0) -> Path:
+    rows = factor_rows(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def emission_items(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Activity items for EmissionFactorLoader.lookup / TraceCalc.calculate with method='quantity'"""
+    rng = _rng(seed)
+    return [
+        {"activity": rng.choice(ACTIVITIES), "quantity": round(rng.uniform(1, 5000), 2),
+         "unit": "kg", "region": rng.choice(ITEM_REGIONS)}
+        for _ in range(n)
+    ]
+
+
+def voucher_inputs(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """generate_voucher inputs; factor ids cover direct, default and fallback lookups"""
+    rng = _rng(seed)
+    factor_ids = ["EF_CEMENT_DE_2024", "EF-001", None]
+    inputs = []
+    for i in range(n):
+        quantity = round(rng.uniform(1, 2000), 3)
+        inputs.append({
+            "reporting_undertaking_id": "529900T8BM49AURSDO55",
+            "supplier_id": f"SUP-{i % 5000:05d}",
+            "supplier_name": f"Supplier {i % 5000} GmbH",
+            "legal_entity_identifier": _lei(rng),
+            "emission_scope": "scope_3",
+            "scope3_category": "1_purchased_goods_services",
+            "product_cn_code": rng.choice(CN_CODES),
+            "product_category": "Materials",
+            "activity_description": "Purchased goods",
+            "material_type": "cement_portland",
+            "quantity": quantity,
+            "quantity_unit": "t",
+            "monetary_value": round(quantity * rng.uniform(50, 120), 2),
+            "currency": "EUR",
+            "installation_country": rng.choice(COUNTRIES),
+            "emission_factor_id": rng.choice(factor_ids),
+            "use_fallback_factor": rng.random() < 0.1,
+            "reporting_period_start": "2024-01-01",
+            "reporting_period_end": "2024-12-31",
+        })
+    return inputs
+
+
+def scope3_vouchers(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Flat Scope-3 vouchers with every SCOPE3_FIELD_ORDER field"""
+    rng = _rng(seed)
+    vouchers = []
+    for i in range(n):
+        cost = round(rng.uniform(100, 100_000), 2)
+        factor = round(rng.uniform(0.1, 3.0), 4)
+        vouchers.append({
+            "supplier_id": f"SUP-{i % 5000:05d}",
+            "supplier_name": f"Supplier {i % 5000} & Co",
+            "legal_entity_identifier": _lei(rng),
+            "tier": rng.choice(["tier_1", "tier_2", "tier_3"]),
+            "product_category": rng.choice(["steel", "aluminium", "cement", "textiles"]),
+            "cost": cost,
+            "material_type": rng.choice(["virgin", "recycled"]),
+            "origin_country": rng.choice(COUNTRIES),
+            "emission_factor": factor,
+            "fallback_factor_used": rng.random() < 0.2,
+            "total_co2e": round(cost * factor / 1000, 6),
+            "submission_date": "2024-06-01",
+            "voucher_uuid": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "hash": "%064x" % rng.getrandbits(256),
+        })
+    return vouchers
+
+
+def scope3_xsd(path: Path) -> Path:
+    """XSD for the flat Scope-3 voucher written by serialize_voucher"""
+    from export.voucher_plans import SCOPE3_FIELD_ORDER, SCOPE3_NAMESPACE
+
+    types = {"cost": "xs:decimal", "emission_factor": "xs:decimal", "total_co2e": "xs:decimal",
+             "fallback_factor_used": "xs:boolean", "submission_date": "xs:date"}
+    elements = "".join(
+        f'<xs:element name="{name}" type="{types.get(name, "xs:string")}"/>' for name in SCOPE3_FIELD_ORDER
+    )
+    path.write_text(
+        '<?xml version="1.0"?>'
+        f'<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" targetNamespace="{SCOPE3_NAMESPACE}" '
+        'elementFormDefault="qualified">'
+        f'<xs:element name="voucher"><xs:complexType><xs:sequence>{elements}</xs:sequence>'
+        '</xs:complexType></xs:element></xs:schema>',
+        encoding="utf-8",
+    )
+    return path
+
+
+def validator_records(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Flat voucher records as the import pipeline hands them to the validator"""
+    rng = _rng(seed)
+    records = []
+    for i in range(n):
+        co2, ch4 = round(rng.uniform(1, 500), 3), round(rng.uniform(0, 5), 3)
+        record = {
+            "voucher_id": f"V-{i}",
+            "reporting_undertaking_lei": _lei(rng),
+            "scope": rng.choice(["1", "2", "3"]),
+            "total_emissions_tco2e": round(co2 + ch4, 3),
+            "reporting_period_start": "2024-01-01",
+            "reporting_period_end": "2024-12-31",
+            "calculation_methodology": "GHG Protocol",
+            "data_quality_rating": rng.randint(1, 5),
+            "ghg_breakdown": {"CO2": co2, "CH4": ch4},
+            "product_cn_code": rng.choice(CN_CODES),
+            "installation_country": rng.choice(COUNTRIES),
+        }
+        # About one record in ten is missing a mandatory field
+        if rng.random() < 0.1:
+            record.pop(rng.choice(["reporting_period_end", "calculation_methodology", "scope"]))
+        records.append(record)
+    return records
+
+
+def emission_voucher_fields(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """EmissionVoucher keyword arguments"""
+    rng = _rng(seed)
+    return [
+        {
+            "supplier_lei": _lei(rng),
+            "supplier_name": f"Supplier {i % 5000}",
+            "supplier_country": rng.choice(COUNTRIES),
+            "supplier_sector": rng.choice(["Steel", "Aluminium", "Cement"]),
+            "reporting_entity_lei": "529900T8BM49AURSDO55",
+            "reporting_period_start": "2024-01-01",
+            "reporting_period_end": "2024-12-31",
+            "consolidation_method": "operational_control",
+            "emissions_records": [],
+            "total_emissions_tco2e": round(rng.uniform(1, 10_000), 3),
+        }
+        for i in range(n)
+    ]
+
+
+def report_rows(n: int, seed: int = 0) -> List[Dict[str, str]]:
+    """Batch CSV rows with every required column; about one in twenty has a quality issue"""
+    rng = _rng(seed)
+    rows = []
+    for _ in range(n):
+        scope1, scope2, scope3 = (rng.uniform(10, 5000) for _ in range(3))
+        withdrawal = rng.uniform(50, 500)
+        generated = rng.uniform(1, 100)
+        row = {
+            "lei": _lei(rng),
+            "total_emissions": f"{scope1 + scope2 + scope3:.2f}",
+            "scope1_emissions": f"{scope1:.2f}",
+            "scope2_emissions_location": f"{scope2:.2f}",
+            "scope2_emissions_market": f"{scope2 * rng.uniform(0.6, 1.0):.2f}",
+            "scope3_emissions": f"{scope3:.2f}",
+            "water_consumption": f"{withdrawal * rng.uniform(0.3, 0.9):.2f}",
+            "water_withdrawal": f"{withdrawal:.2f}",
+            "waste_generated": f"{generated:.2f}",
+            "waste_recycled": f"{generated * rng.uniform(0.1, 0.9):.2f}",
+            "narratives": "present",
+        }
+        if rng.random() < 0.05:
+            row["water_consumption"] = f"{withdrawal * 1.2:.2f}"
+        rows.append(row)
+    return rows
+
+
+def write_report_csv(path: Path, n: int, seed: int = 0) -> Path:
+    rows = report_rows(n, seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
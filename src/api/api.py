@@ -1,6 +1,7 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel, Field
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
 
 from generator.voucher_generator import generate_voucher
 from factortrace.voucher_xml_serializer import serialize_voucher, validate_xml
@@ -9,6 +10,17 @@ from factortrace.factor_loader import EmissionFactorLoader
 from fastapi import APIRouter, Response
 from src.factortrace.models.emissions_voucher import EmissionVoucher
 from src.factortrace.utils.xml_validation import validate_vsme_xml
+from api.batching import (
+    DEFAULT_CHUNK_SIZE,
+    IndexedItem,
+    WorkerPool,
+    decode_item,
+    dumps,
+    encode_ndjson,
+    error_record,
+    stream_batch,
+)
+from api.response_cache import ResponseCache, etag_for, etag_matches, request_key
 
 # ─── FastAPI app ─────────────────────────────────────────────────────────────
 app = FastAPI()
@@ -41,22 +53,61 @@ voucher_router = APIRouter(prefix="/vouchers", tags=["Vouchers"])
 emissions_router = APIRouter(prefix="/emissions", tags=["Emissions"])
 
 # ─── Shared Calculator Instance ──────────────────────────────────────────────
-factor_loader = EmissionFactorLoader("data/raw/test_factors_v2025-06-04.csv")
-calculator = TraceCalc(factor_loader)
+FACTOR_CSV = "data/raw/test_factors_v2025-06-04.csv"
+
+
+@lru_cache(maxsize=None)
+def get_calculator() -> TraceCalc:
+    """Calculator over the factor dataset, loaded on first use rather than at import"""
+    return TraceCalc(EmissionFactorLoader(FACTOR_CSV))
+
+
 router = APIRouter()
 
+# CPU-bound batch work runs here, not on the event loop
+worker_pool = WorkerPool()
+
+# Identical calculations against the same factor dataset are served from here
+response_cache = ResponseCache.from_env()
+
+VOUCHER_XSD = "src/resources/schema/voucher.xsd"
+
 # ─── Voucher Endpoint ────────────────────────────────────────────────────────
+def _voucher_xml(data: VoucherInput) -> str:
+    voucher = generate_voucher(data.model_dump())
+    xml = serialize_voucher(voucher)
+    if not validate_xml(xml, VOUCHER_XSD):
+        raise ValueError("Generated XML is invalid")
+    return xml
+
+
 @voucher_router.post("/generate")
 def generate_voucher_endpoint(data: VoucherInput):
     try:
-        voucher = generate_voucher(data.dict())
-        xml = serialize_voucher(voucher)
-        if not validate_xml(xml, "src/resources/schema/voucher.xsd"):
-            raise HTTPException(status_code=400, detail="Generated XML is invalid")
-        return {"xml": xml}
+        return {"xml": _voucher_xml(data)}
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+def generate_voucher_chunk(chunk: List[IndexedItem]) -> bytes:
+    """Worker: one NDJSON record per item, {"index", "xml"} or {"index", "error"}"""
+    records = []
+    for index, raw in chunk:
+        try:
+            data = VoucherInput.model_validate(decode_item(raw))
+            records.append({"index": index, "xml": _voucher_xml(data)})
+        except Exception as e:  # a bad item must not fail the whole batch
+            records.append(error_record(index, e))
+    return encode_ndjson(records)
+
+
+@voucher_router.post("/generate/batch")
+async def generate_vouchers_batch(request: Request, chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=5000)):
+    """Generate many vouchers from an NDJSON or JSON-array body; streams NDJSON back in input order"""
+    return await stream_batch(request, generate_voucher_chunk, worker_pool.executor, chunk_size)
+
 @router.get("/export/voucher/xml", response_class=Response)
 def export_voucher_xml():
     from tests.data.voucher_sample import SAMPLE_DATA
@@ -75,28 +126,73 @@ def export_voucher_xml():
 
 
 # ─── Emissions Endpoint ──────────────────────────────────────────────────────
+def _emission_item(req: EmissionRequest) -> Dict[str, Any]:
+    return {
+        "activity": req.activity,
+        "quantity": req.activity_data,
+        "unit": req.activity_unit,
+        "region": req.region or "",  # fallback to blank if not provided
+    }
+
+
 @emissions_router.post("/calculate")
-def calculate_emissions_endpoint(req: EmissionRequest):
-    try:
-        item = {
-            "activity": req.activity,
-            "quantity": req.activity_data,
-            "unit": req.activity_unit,
-            "region": req.region or "",  # fallback to blank if not provided
-        }
-
-        result = calculator.calculate([item], method=req.method or "quantity")
-        return result.to_dict()
-    except ValueError as ve:
-        raise HTTPException(status_code=400, detail=str(ve))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+def calculate_emissions_endpoint(req: EmissionRequest, request: Request):
+    calculator = get_calculator()
+    version = calculator.factor_loader.version
+    key = request_key(req.model_dump(mode="json"), version)
+    etag = etag_for(key)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    body = response_cache.get(key, version)
+    cache_status = "HIT"
+    if body is None:
+        cache_status = "MISS"
+        try:
+            result = calculator.calculate([_emission_item(req)], method=req.method or "quantity")
+        except ValueError as ve:
+            raise HTTPException(status_code=400, detail=str(ve))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        # Encoded directly; CalcResult.to_dict() deep-copies through asdict
+        body = dumps(result)
+        response_cache.set(key, version, body)
+
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "X-Cache": cache_status, "X-Factor-Dataset-Version": version},
+    )
+
+
+def calculate_emissions_chunk(chunk: List[IndexedItem]) -> bytes:
+    """Worker: one NDJSON record per item, {"index", "result"} or {"index", "error"}"""
+    calculator = get_calculator()
+    records = []
+    for index, raw in chunk:
+        try:
+            req = EmissionRequest.model_validate(decode_item(raw))
+            result = calculator.calculate([_emission_item(req)], method=req.method or "quantity")
+            records.append({"index": index, "result": result})
+        except Exception as e:  # a bad item must not fail the whole batch
+            records.append(error_record(index, e))
+    return encode_ndjson(records)
+
+
+@emissions_router.post("/calculate/batch")
+async def calculate_emissions_batch(request: Request, chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=5000)):
+    """Calculate many requests from an NDJSON or JSON-array body; streams NDJSON back in input order"""
+    return await stream_batch(request, calculate_emissions_chunk, worker_pool.executor, chunk_size)
 
 # ─── Root Hello ──────────────────────────────────────────────────────────────
 @app.get("/")
 def read_root():
     return {"message": "Scope 3 API ready 🚀"}
 
+@app.on_event("shutdown")
+def shutdown_worker_pool():
+    worker_pool.shutdown()
+
 # ─── Mount Routers ───────────────────────────────────────────────────────────
 app.include_router(voucher_router)
-app.include_router(emissions_router)
\ No newline at end of file
+app.include_router(emissions_router)
@@ -0,0 +1,261 @@
+"""
+Batch request plumbing for the voucher / emissions API
+───────────────────────────────────────────────────────
+- request bodies are NDJSON (one item per line) or a JSON array
+- items are processed in chunks on a process pool, off the event loop
+- each chunk is encoded to NDJSON inside the worker, so the event loop only
+  forwards bytes, in input order, as soon as the next chunk is ready
+
+Encoding uses orjson when installed (``poetry install -E api``) and falls
+back to the standard library. Dataclasses are encoded field by field
+rather than deep-copied through ``dataclasses.asdict``.
+"""
+
+import asyncio
+import json
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines")
+
+DEFAULT_CHUNK_SIZE = 500
+MAX_BATCH_ITEMS = int(os.getenv("FACTORTRACE_API_MAX_BATCH_ITEMS", "100000"))
+
+IndexedItem = Tuple[int, Any]
+
+
+class BatchRequestError(ValueError):
+    """Malformed batch body; the endpoint maps it to 400 / 413"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# ============================================================================
+# ENCODING
+# ============================================================================
+
+def _default(obj: Any) -> Any:
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if ORJSON_AVAILABLE:
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+    loads = orjson.loads
+else:
+    _encoder = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(",", ":"))
+
+    def dumps(obj: Any) -> bytes:
+        return _encoder.encode(obj).encode("utf-8")
+
+    loads = json.loads
+
+
+def encode_ndjson(records: Iterable[Any]) -> bytes:
+    return b"".join(dumps(record) + b"\n" for record in records)
+
+
+# ============================================================================
+# REQUEST PARSING
+# ============================================================================
+
+def is_ndjson(content_type: Optional[str]) -> bool:
+    return (content_type or "").split(";")[0].strip().lower() in NDJSON_CONTENT_TYPES
+
+
+def _check_size(count: int, max_items: int) -> None:
+    if count > max_items:
+        raise BatchRequestError(f"Batch exceeds {max_items} items", status_code=413)
+
+
+def parse_json_array(body: bytes, max_items: int = MAX_BATCH_ITEMS) -> List[IndexedItem]:
+    try:
+        items = loads(body)
+    except ValueError as e:
+        raise BatchRequestError(f"Invalid JSON body: {e}")
+    if not isinstance(items, list):
+        raise BatchRequestError("Expected a JSON array of items")
+    _check_size(len(items), max_items)
+    return list(enumerate(items))
+
+
+async def iter_ndjson(stream: AsyncIterator[bytes], max_items: int = MAX_BATCH_ITEMS) -> AsyncIterator[IndexedItem]:
+    """
+    Yield (index, raw line) from an NDJSON byte stream as lines arrive.
+
+    Lines are decoded by the workers (see `decode_item`), so a malformed
+    line becomes an error record instead of aborting the batch.
+    """
+    buffer = b""
+    index = 0
+    async for data in stream:
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                _check_size(index + 1, max_items)
+                yield index, line
+                index += 1
+    if buffer.strip():
+        _check_size(index + 1, max_items)
+        yield index, buffer
+
+
+async def iter_request_items(request, max_items: int = MAX_BATCH_ITEMS) -> AsyncIterator[IndexedItem]:
+    """Items of a batch request: streamed for NDJSON, parsed whole for a JSON array"""
+    if is_ndjson(request.headers.get("content-type")):
+        async for item in iter_ndjson(request.stream(), max_items):
+            yield item
+    else:
+        for item in parse_json_array(await request.body(), max_items):
+            yield item
+
+
+async def iter_chunks(items: AsyncIterator[IndexedItem], chunk_size: int) -> AsyncIterator[List[IndexedItem]]:
+    chunk: List[IndexedItem] = []
+    async for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ============================================================================
+# EXECUTION
+# ============================================================================
+
+def decode_item(raw: Any) -> Any:
+    """An item as parsed from a JSON array, or a raw NDJSON line"""
+    return loads(raw) if isinstance(raw, (bytes, bytearray)) else raw
+
+
+def error_record(index: Optional[int], error: Exception) -> Dict[str, Any]:
+    return {"index": index, "error": str(error), "error_type": type(error).__name__}
+
+
+async def stream_chunk_results(
+    chunks: AsyncIterator[List[IndexedItem]],
+    worker: Callable[[List[IndexedItem]], bytes],
+    executor: Optional[Executor] = None,
+    max_pending: Optional[int] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Run `worker` over each chunk on `executor` and yield its output in order.
+
+    At most `max_pending` chunks are in flight, so a large upload is never
+    fully buffered and the pool is kept busy while earlier chunks stream out.
+    `worker` must be a module-level function when the executor is a
+    process pool. If `chunks` raises BatchRequestError, the chunks already
+    submitted are still yielded before the error propagates.
+    """
+    loop = asyncio.get_running_loop()
+    if max_pending is None:
+        max_pending = 2 * (getattr(executor, "_max_workers", None) or os.cpu_count() or 1)
+    pending: List[asyncio.Future] = []
+    try:
+        try:
+            async for chunk in chunks:
+                pending.append(loop.run_in_executor(executor, worker, chunk))
+                if len(pending) >= max_pending:
+                    yield await pending.pop(0)
+        except BatchRequestError:
+            while pending:
+                yield await pending.pop(0)
+            raise
+        while pending:
+            yield await pending.pop(0)
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+async def stream_batch(
+    request,
+    worker: Callable[[List[IndexedItem]], bytes],
+    executor: Optional[Executor] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_items: int = MAX_BATCH_ITEMS,
+) -> StreamingResponse:
+    """
+    NDJSON response with one `worker` record per request item, in order.
+
+    The first chunk is read before the response starts, so an unparseable
+    JSON array or an oversized batch is still a plain 400 / 413. A limit
+    hit later in an NDJSON upload ends the stream with an error record.
+    """
+    chunks = iter_chunks(iter_request_items(request, max_items), chunk_size)
+    try:
+        first = [await chunks.__anext__()]
+    except StopAsyncIteration:
+        first = []
+    except BatchRequestError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    async def all_chunks() -> AsyncIterator[List[IndexedItem]]:
+        for chunk in first:
+            yield chunk
+        async for chunk in chunks:
+            yield chunk
+
+    async def body() -> AsyncIterator[bytes]:
+        try:
+            async for data in stream_chunk_results(all_chunks(), worker, executor):
+                yield data
+        except BatchRequestError as e:
+            yield dumps(error_record(None, e)) + b"\n"
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
+
+
+class WorkerPool:
+    """Lazily started process pool shared by the batch endpoints"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or int(os.getenv("FACTORTRACE_API_WORKERS", "0")) or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
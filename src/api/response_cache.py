@@ -0,0 +1,236 @@
+"""
+Response cache for idempotent calculation endpoints
+────────────────────────────────────────────────────
+Identical requests against the same factor dataset give identical results,
+so encoded responses are cached under a canonical hash of the request and
+the dataset version:
+
+- tier 1: in-process LRU
+- tier 2 (optional): shared store, Redis or a local SQLite file, selected
+  by FACTORTRACE_RESPONSE_CACHE_URL (``redis://...`` / ``sqlite:///path``)
+
+The key doubles as the response ETag. When the dataset version changes,
+the LRU is cleared and the shared store drops other versions' entries, so
+a stale result is never served.
+"""
+
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    import redis
+
+# redis is imported only when a redis:// store is configured
+REDIS_AVAILABLE = importlib.util.find_spec("redis") is not None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 86400  # seconds; entries are also keyed by version, so this only bounds storage
+
+
+def request_key(payload: Dict[str, Any], version: str) -> str:
+    """SHA-256 over the canonical JSON of the request and the dataset version"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(f"{version}\n{canonical}".encode("utf-8")).hexdigest()
+
+
+def etag_for(key: str) -> str:
+    return f'"{key}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """RFC 9110 weak comparison against an If-None-Match header"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+# ============================================================================
+# TIERS
+# ============================================================================
+
+class LRUCache:
+    """Thread-safe in-process LRU of encoded responses"""
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._data.get(key)
+            if body is not None:
+                self._data.move_to_end(key)
+            return body
+
+    def set(self, key: str, body: bytes) -> None:
+        with self._lock:
+            self._data[key] = body
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisResponseStore:
+    """Shared tier on Redis; keys are namespaced by dataset version"""
+
+    def __init__(self, client: "redis.Redis", ttl: int = DEFAULT_TTL, prefix: str = "ft:calc:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RedisResponseStore":
+        if not REDIS_AVAILABLE:
+            raise ImportError("redis is required for a redis:// response cache")
+        import redis
+
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def _key(self, version: str, key: str) -> str:
+        return f"{self.prefix}{version}:{key}"
+
+    def get(self, key: str, version: str) -> Optional[bytes]:
+        return self.client.get(self._key(version, key))
+
+    def set(self, key: str, version: str, body: bytes) -> None:
+        self.client.setex(self._key(version, key), self.ttl, body)
+
+    def retain_version(self, version: str) -> None:
+        current = self._key(version, "").encode("utf-8")
+        stale = [k for k in self.client.scan_iter(match=f"{self.prefix}*", count=1000) if not k.startswith(current)]
+        for start in range(0, len(stale), 1000):
+            self.client.delete(*stale[start:start + 1000])
+
+
+class SQLiteResponseStore:
+    """Shared tier for single-host deployments: a WAL-mode SQLite file"""
+
+    def __init__(self, path: str, ttl: int = DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "key TEXT PRIMARY KEY, version TEXT NOT NULL, body BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str, version: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM response_cache WHERE key = ? AND version = ? AND expires_at > ?",
+                (key, version, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, version: str, body: bytes) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, version, body, expires_at) VALUES (?, ?, ?, ?)",
+                (key, version, body, time.time() + self.ttl),
+            )
+
+    def retain_version(self, version: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM response_cache WHERE version != ? OR expires_at <= ?", (version, time.time())
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def shared_store_from_url(url: Optional[str]):
+    """Build the shared tier from a cache URL, or None when unset"""
+    if not url:
+        return None
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisResponseStore.from_url(url)
+    if url.startswith("sqlite:///"):
+        return SQLiteResponseStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported response cache URL: {url}")
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class ResponseCache:
+    """Two-tier cache of encoded responses, scoped to one factor dataset version"""
+
+    def __init__(self, maxsize: int = 10000, shared=None):
+        self.local = LRUCache(maxsize)
+        self.shared = shared
+        self._version: Optional[str] = None
+        self._version_lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        return cls(
+            maxsize=int(os.getenv("FACTORTRACE_RESPONSE_CACHE_SIZE", "10000")),
+            shared=shared_store_from_url(os.getenv("FACTORTRACE_RESPONSE_CACHE_URL")),
+        )
+
+    def use_version(self, version: str) -> None:
+        """Drop everything computed against another factor dataset version"""
+        if version == self._version:
+            return
+        with self._version_lock:
+            if version == self._version:
+                return
+            if self._version is not None:
+                logger.info(f"Factor dataset changed {self._version} -> {version}; response cache invalidated")
+            self.local.clear()
+            if self.shared is not None:
+                self._shared_call("retain_version", version)
+            self._version = version
+
+    def get(self, key: str, version: str) -> Optional[bytes]:
+        self.use_version(version)
+        body = self.local.get(key)
+        if body is None and self.shared is not None:
+            body = self._shared_call("get", key, version)
+            if body is not None:
+                self.local.set(key, body)
+        if body is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return body
+
+    def set(self, key: str, version: str, body: bytes) -> None:
+        self.use_version(version)
+        self.local.set(key, body)
+        if self.shared is not None:
+            self._shared_call("set", key, version, body)
+
+    def _shared_call(self, method: str, *args: Any) -> Any:
+        # The shared tier is an optimisation; an outage must not fail requests
+        try:
+            return getattr(self.shared, method)(*args)
+        except Exception as e:
+            logger.warning(f"Shared response cache {method} failed: {e}")
+            return None
@@ -1,7 +1,14 @@
 # src/app/utils/xml_utils.py
 
+from functools import lru_cache
 from pathlib import Path
-import xmlschema
 
 XSD_PATH = Path(__file__).resolve().parent.parent / "xsd" / "voucher.xsd"
-schema = xmlschema.XMLSchema11(XSD_PATH)
+
+
+@lru_cache(maxsize=None)
+def get_schema():
+    """Voucher XSD 1.1 schema, compiled on first use (xmlschema is slow to import)"""
+    import xmlschema
+
+    return xmlschema.XMLSchema11(XSD_PATH)
@@ -0,0 +1,352 @@
+"""
+Voucher XML formats as compiled plans
+─────────────────────────────────────
+- ESRS E1 v2 / CBAM (esrs.e1.002.01): generated voucher dicts, written by
+  voucher_generator.serialize_voucher and voucher_xml_stream
+- ESRS E1 v1 (esrs.e1.001.01, resources/schema/voucher.xsd): Pydantic
+  voucher models, attached as ``to_xml`` by utils.xml_export
+- flat Scope-3 voucher (scope3.dev/voucher/2025-06): one element per
+  FIELD_ORDER field, written by factortrace.voucher_xml_serializer
+
+Each format exists only here; every writer renders through the same plan,
+and services.voucher_xml_parser reads documents back through the same
+field paths, so writers and the reader cannot drift apart.
+"""
+
+from functools import lru_cache
+
+from export.xml_plan import ATTRIBUTE, XMLPlan, compile_plan, const, elem, flat_spec, leaf
+
+CBAM_NAMESPACE = "urn:eu:cbam:xsd:declaration:001.01"
+XSI_NAMESPACE = "http://www.w3.org/2001/XMLSchema-instance"
+
+
+# ============================================================================
+# ESRS E1 v2 / CBAM (generated voucher dicts)
+# ============================================================================
+
+ESRS_V2_NAMESPACE = "urn:iso:std:20022:tech:xsd:esrs.e1.002.01"
+ESRS_V2_SCHEMA_VERSION = "2.0.0"
+ESRS_V2_SCHEMA_LOCATION = f"{ESRS_V2_NAMESPACE} emission-voucher-v2.xsd"
+
+ESRS_V2_NSMAP = {None: ESRS_V2_NAMESPACE, "cbam": CBAM_NAMESPACE, "xsi": XSI_NAMESPACE}
+ESRS_V2_ONLY_NSMAP = {None: ESRS_V2_NAMESPACE, "xsi": XSI_NAMESPACE}
+
+
+def esrs_v2_spec(include_cbam_namespace: bool = True, standalone: bool = True):
+    """
+    <EmissionVoucher> for one generated voucher dict.
+
+    Inside a batch envelope (`standalone=False`) the schema location is
+    inherited from the envelope rather than repeated per voucher.
+    """
+    E, C = ESRS_V2_NAMESPACE, CBAM_NAMESPACE
+
+    root_attrs = {"schemaVersion": lambda d: d.get("schema_version", ESRS_V2_SCHEMA_VERSION)}
+    if standalone:
+        root_attrs = {f"{{{XSI_NAMESPACE}}}schemaLocation": const(ESRS_V2_SCHEMA_LOCATION), **root_attrs}
+
+    installation = elem(
+        "Installation",
+        leaf("Country", "installation_country", ns=C, required=True),
+        leaf("Id", "installation_id", ns=C, when="installation_id"),
+        elem(
+            "EmbeddedEmissions",
+            leaf("Direct", "embedded_emissions_direct", ns=C, required=True),
+            leaf("Indirect", "embedded_emissions_indirect", ns=C, when="embedded_emissions_indirect"),
+            ns=C, when="embedded_emissions_direct",
+        ),
+        leaf("CarbonPrice", "carbon_price_paid", ns=C, attrs={"currency": const("EUR")}, when="carbon_price_paid"),
+        ns=C,
+    )
+
+    return elem(
+        "EmissionVoucher",
+        elem(
+            "Header",
+            leaf("MessageId", "voucher_id", ns=E, required=True),
+            leaf("CreationDateTime", "submission_timestamp", ns=E, required=True),
+            leaf("SchemaVersion", const(ESRS_V2_SCHEMA_VERSION), ns=E),
+            ns=E,
+        ),
+        elem("ReportingEntity", leaf("LEI", "reporting_undertaking_id", ns=E, required=True), ns=E),
+        elem(
+            "Supplier",
+            leaf("Id", "supplier_id", ns=E, required=True),
+            leaf("Name", "supplier_name", ns=E, required=True),
+            leaf("LEI", "legal_entity_identifier", ns=E, when="legal_entity_identifier"),
+            ns=E,
+        ),
+        elem(
+            "EmissionScope",
+            leaf("Scope", "emission_scope", ns=E, required=True),
+            leaf("Scope3Category", "scope3_category", ns=E, when="scope3_category"),
+            ns=E,
+        ),
+        elem(
+            "Product",
+            leaf("CNCcode", "product_cn_code", ns=E, required=True),
+            leaf("Category", "product_category", ns=E, required=True),
+            leaf("Description", "activity_description", ns=E, required=True),
+            leaf("MaterialType", "material_type", ns=E, when="material_type"),
+            leaf("Quantity", "quantity", ns=E, attrs={"unit": "quantity_unit"}, required=True),
+            leaf("MonetaryValue", "monetary_value", ns=E, attrs={"currency": lambda d: d.get("currency", "EUR")},
+                 when="monetary_value"),
+            ns=E,
+        ),
+        *((installation,) if include_cbam_namespace else ()),
+        elem(
+            "EmissionCalculation",
+            leaf("GWPVersion", lambda d: d.get("gwp_version", "AR6"), ns=E, required=True),
+            elem(
+                "EmissionFactor",
+                leaf("Value", "emission_factor_value", ns=E, required=True),
+                leaf("Unit", lambda d: d.get("emission_factor_unit", "tCO2e/unit"), ns=E, required=True),
+                ns=E,
+                attrs={
+                    "id": "emission_factor_id",
+                    "source": "emission_factor_source",
+                    "fallbackUsed": lambda d: "true" if d.get("fallback_factor_used") else None,
+                },
+            ),
+            elem(
+                "DataQuality",
+                elem(
+                    "Uncertainty",
+                    leaf("LowerBound", "uncertainty_lower", ns=E, required=True),
+                    leaf("UpperBound", "uncertainty_upper", ns=E, required=True),
+                    ns=E,
+                    attrs={"confidenceLevel": lambda d: d.get("confidence_level", "95")},
+                    when=lambda d: d.get("uncertainty_lower") and d.get("uncertainty_upper"),
+                ),
+                ns=E,
+                attrs={"rating": "data_quality_rating", "tier": lambda d: d.get("data_quality_tier", "tier_1")},
+            ),
+            leaf("Methodology", "calculation_methodology", ns=E, required=True),
+            leaf("TotalEmissions", "total_emissions_tco2e", ns=E, attrs={"unit": const("tCO2e")}, required=True),
+            elem(
+                "EmissionsBreakdown",
+                elem(
+                    "GasEmission",
+                    leaf("Amount", lambda gas: gas[1]["amount"], ns=E, required=True),
+                    leaf("CO2e", lambda gas: gas[1]["co2e"], ns=E, required=True),
+                    ns=E,
+                    attrs={"gas": lambda gas: gas[0], "gwpFactor": lambda gas: gas[1]["gwp_factor"]},
+                    each=lambda d: d["emissions_breakdown"].items(),
+                ),
+                ns=E, when="emissions_breakdown",
+            ),
+            ns=E,
+        ),
+        elem(
+            "ReportingPeriod",
+            leaf("StartDate", "reporting_period_start", ns=E, required=True),
+            leaf("EndDate", "reporting_period_end", ns=E, required=True),
+            ns=E,
+        ),
+        elem(
+            "Verification",
+            leaf("CalculationHash", "calculation_hash", ns=E, required=True),
+            elem(
+                "Verifier",
+                leaf("AccreditationId", "verifier_accreditation_id", ns=E, required=True),
+                ns=E, when="verifier_accreditation_id",
+            ),
+            ns=E,
+        ),
+        ns=E,
+        attrs=root_attrs,
+    )
+
+
+@lru_cache(maxsize=None)
+def esrs_v2_plan(include_cbam_namespace: bool = True, standalone: bool = True) -> XMLPlan:
+    return compile_plan(
+        esrs_v2_spec(include_cbam_namespace, standalone),
+        ESRS_V2_NSMAP if include_cbam_namespace else ESRS_V2_ONLY_NSMAP,
+    )
+
+
+# ============================================================================
+# ESRS E1 v1 (Pydantic voucher models)
+# ============================================================================
+
+ESRS_V1_NAMESPACE = "urn:iso:std:20022:tech:xsd:esrs.e1.001.01"
+ESRS_V1_VERSION = "1.0.0"
+ESRS_V1_NSMAP = {None: ESRS_V1_NAMESPACE, "cbam": CBAM_NAMESPACE}
+
+GHG_GASES = (("CO2", "co2"), ("CH4", "ch4"), ("N2O", "n2o"), ("HFCs", "hfcs"), ("PFCs", "pfcs"),
+             ("SF6", "sf6"), ("NF3", "nf3"), ("Total", "total"))
+
+
+def esrs_v1_spec():
+    """<EmissionVoucher> for a voucher model; optional fields are omitted when None"""
+    E = ESRS_V1_NAMESPACE
+    emission_unit = lambda v: getattr(v, "emission_unit", None) or "tCO2e"
+
+    return elem(
+        "EmissionVoucher",
+        elem(
+            "Header",
+            leaf("VoucherId", "voucher_id", ns=E),
+            leaf("CreationDateTime", "creation_datetime", ns=E),
+            leaf("SubmissionDateTime", "submission_datetime", ns=E),
+            leaf("MessageType", "message_type", ns=E, default="ORIGINAL"),
+            leaf("PreviousVoucherId", "previous_voucher_id", ns=E),
+            ns=E,
+        ),
+        elem(
+            "ReportingEntity",
+            leaf("LEI", "reporting_entity_lei", ns=E),
+            leaf("Name", "reporting_entity_name", ns=E),
+            leaf("JurisdictionCountry", "reporting_entity_country", ns=E),
+            ns=E,
+        ),
+        elem(
+            "Supplier",
+            leaf("Id", "supplier_id", ns=E),
+            leaf("Name", "supplier_name", ns=E),
+            leaf("LEI", "supplier_lei", ns=E),
+            leaf("Country", "supplier_country", ns=E),
+            leaf("TaxId", "supplier_tax_id", ns=E),
+            ns=E,
+        ),
+        elem(
+            "Product",
+            leaf("CNCode", "product_cn_code", ns=E),
+            leaf("Description", "product_description", ns=E),
+            leaf("Category", "product_category", ns=E),
+            leaf("MaterialType", "material_type", ns=E),
+            ns=E,
+        ),
+        elem(
+            "Installation",
+            leaf("InstallationId", "installation.installation_id", ns=E),
+            leaf("Name", "installation.name", ns=E),
+            leaf("Country", "installation.country", ns=E),
+            leaf("Address", "installation.address", ns=E),
+            elem(
+                "Coordinates",
+                leaf("Latitude", "installation.coordinates.latitude", ns=E),
+                leaf("Longitude", "installation.coordinates.longitude", ns=E),
+                ns=E, when="installation.coordinates",
+            ),
+            ns=E, when="installation",
+        ),
+        elem(
+            "ActivityData",
+            leaf("Quantity", "activity_quantity", ns=E, attrs={"unit": "activity_quantity_unit"}, required=True),
+            leaf("MonetaryValue", "monetary_value", ns=E, attrs={"currency": "currency"}, required=True),
+            leaf("ActivityDescription", "activity_description", ns=E),
+            ns=E,
+        ),
+        elem(
+            "EmissionData",
+            leaf("Scope", "emission_scope", ns=E),
+            leaf("Scope3Category", "scope3_category", ns=E),
+            leaf("DirectEmissions", "direct_emissions", ns=E, attrs={"unit": emission_unit}, required=True),
+            leaf("IndirectEmissions", "indirect_emissions", ns=E, attrs={"unit": emission_unit}),
+            leaf("BiogenicEmissions", "biogenic_emissions", ns=E, attrs={"unit": emission_unit}),
+            elem(
+                "GHGBreakdown",
+                *(leaf(tag, f"ghg_breakdown.{name}", ns=E, attrs={"unit": const("tCO2e")}) for tag, name in GHG_GASES),
+                ns=E, when="ghg_breakdown",
+            ),
+            elem(
+                "EmissionFactor",
+                leaf("FactorId", "emission_factor_id", ns=E),
+                leaf("Value", "emission_factor_value", ns=E),
+                leaf("Unit", "emission_factor_unit", ns=E),
+                leaf("Source", "emission_factor_source", ns=E),
+                leaf("SourceReference", "emission_factor_source_ref", ns=E),
+                leaf("ValidFrom", "emission_factor_valid_from", ns=E),
+                leaf("IsDefault", "emission_factor_is_default", ns=E, required=True),
+                ns=E,
+            ),
+            elem(
+                "CalculationMethod",
+                leaf("Method", "calculation_method", ns=E),
+                leaf("Description", "calculation_description", ns=E),
+                leaf("Standard", "calculation_standard", ns=E),
+                ns=E,
+            ),
+            leaf("CarbonPricePaid", "carbon_price_paid", ns=E, attrs={"currency": "currency"}),
+            ns=E,
+        ),
+        elem(
+            "ReportingPeriod",
+            leaf("StartDate", "reporting_start_date", ns=E),
+            leaf("EndDate", "reporting_end_date", ns=E),
+            leaf("ReportingYear", "reporting_year", ns=E, required=True),
+            ns=E,
+        ),
+        elem(
+            "DataQuality",
+            leaf("QualityScore", "data_quality_score", ns=E, required=True),
+            leaf("DataSource", "data_source", ns=E),
+            elem(
+                "UncertaintyAssessment",
+                leaf("UncertaintyPercentage", "uncertainty_assessment.percentage", ns=E),
+                leaf("ConfidenceLevel", "uncertainty_assessment.confidence_level", ns=E, default=95),
+                leaf("Method", "uncertainty_assessment.method", ns=E),
+                ns=E, when="uncertainty_assessment",
+            ),
+            leaf("PrimaryDataPercentage", "primary_data_percentage", ns=E),
+            ns=E,
+        ),
+        elem(
+            "Verification",
+            leaf("CalculationHash", "calculation_hash", ns=E),
+            leaf("HashAlgorithm", "hash_algorithm", ns=E, default="SHA-256"),
+            elem(
+                "ThirdPartyVerification",
+                leaf("VerifierId", "third_party_verification.verifier_id", ns=E),
+                leaf("AccreditationNumber", "third_party_verification.accreditation_number", ns=E),
+                leaf("VerificationDate", "third_party_verification.verification_date", ns=E),
+                leaf("VerificationLevel", "third_party_verification.verification_level", ns=E),
+                ns=E, when="third_party_verification",
+            ),
+            ns=E,
+        ),
+        ns=E,
+        attrs={"version": const(ESRS_V1_VERSION)},
+    )
+
+
+@lru_cache(maxsize=None)
+def esrs_v1_plan() -> XMLPlan:
+    return compile_plan(esrs_v1_spec(), ESRS_V1_NSMAP, accessor=ATTRIBUTE)
+
+
+# ============================================================================
+# FLAT SCOPE-3 VOUCHER
+# ============================================================================
+
+SCOPE3_NAMESPACE = "https://scope3.dev/voucher/2025-06"
+SCOPE3_NSMAP = {None: SCOPE3_NAMESPACE}
+
+SCOPE3_FIELD_ORDER = (
+    "supplier_id",
+    "supplier_name",
+    "legal_entity_identifier",
+    "tier",
+    "product_category",
+    "cost",
+    "material_type",
+    "origin_country",
+    "emission_factor",
+    "fallback_factor_used",
+    "total_co2e",
+    "submission_date",
+    "voucher_uuid",
+    "hash",
+)
+
+
+def scope3_spec():
+    return flat_spec("voucher", SCOPE3_NAMESPACE, SCOPE3_FIELD_ORDER)
+
+
+@lru_cache(maxsize=None)
+def scope3_plan() -> XMLPlan:
+    return compile_plan(scope3_spec(), SCOPE3_NSMAP)
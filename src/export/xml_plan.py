@@ -0,0 +1,436 @@
+"""
+Compiled XML field plans
+────────────────────────
+One serializer engine for every voucher XML format. A format is declared
+once as a tree of `Node`s (tag, namespace, source field, attributes,
+condition, formatter) and compiled into an `XMLPlan`:
+
+- the tree is turned into the source of one straight-line Python function
+  per output variant, the way dataclasses generates ``__init__``
+- tags, namespace prefixes, indentation and constant attributes are
+  resolved at compile time and appear in that function as literals
+- field paths become ``record["key"]`` / ``record.attr`` lookups for
+  mappings (generated voucher dicts) or models (Pydantic / dataclasses)
+
+Rendering therefore does no per-field reflection and builds no DOM or
+QName objects. `render()` returns UTF-8 bytes identical to lxml's
+``tostring`` of the equivalent tree (``pretty=True`` matches
+``pretty_print=True``).
+"""
+
+import ast
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+Source = Union[str, Callable[[Any], Any], None]
+
+MAPPING = "mapping"
+ATTRIBUTE = "attribute"
+
+
+# ============================================================================
+# SPEC
+# ============================================================================
+
+@dataclass(frozen=True)
+class Node:
+    """
+    One element of a format.
+
+    A node with `source` is a leaf whose text comes from that field path
+    ("a.b") or callable; otherwise it is a container for `children`.
+    `when` (a field path or callable) must be truthy for the element to
+    be written. Leaves are skipped when their value is None unless
+    `required`, in which case a missing mapping key raises KeyError and
+    None renders an empty element. With `each`, the node is written once
+    per item of that iterable, with the item as the field context.
+    """
+    tag: str
+    ns: Optional[str] = None
+    source: Source = None
+    children: Tuple["Node", ...] = ()
+    attrs: Tuple[Tuple[str, Source], ...] = ()
+    when: Source = None
+    required: bool = False
+    default: Any = None
+    fmt: Optional[Callable[[Any], str]] = None
+    each: Source = None
+
+
+class const:
+    """A source with a fixed value; inlined into the plan at compile time"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __call__(self, _ctx: Any) -> Any:
+        return self.value
+
+
+def leaf(tag: str, source: Source, ns: Optional[str] = None, attrs: Optional[Dict[str, Source]] = None,
+         **options: Any) -> Node:
+    return Node(tag, ns, source, attrs=tuple((attrs or {}).items()), **options)
+
+
+def elem(tag: str, *children: Node, ns: Optional[str] = None, attrs: Optional[Dict[str, Source]] = None,
+         **options: Any) -> Node:
+    return Node(tag, ns, children=children, attrs=tuple((attrs or {}).items()), **options)
+
+
+def flat_spec(tag: str, ns: Optional[str], fields: Sequence[str], required: bool = True) -> Node:
+    """Root element with one child per field, named after the field (FIELD_ORDER style formats)"""
+    return elem(tag, *(leaf(name, name, ns=ns, required=required) for name in fields), ns=ns)
+
+
+def qualified_name(tag: str, ns: Optional[str] = None) -> str:
+    """Clark notation, "{namespace}local", for a node's tag"""
+    if tag.startswith("{") or ns is None:
+        return tag
+    return f"{{{ns}}}{tag}"
+
+
+def field_paths(spec: Node) -> Iterator[Tuple[Tuple[str, ...], Optional[str], str]]:
+    """
+    (element path below the root, attribute or None, field) for every field
+    the spec reads by name, so a parser can map a document back to fields.
+    Path elements are Clark-notation tags. Callable sources and repeated
+    (`each`) subtrees have no inverse and are skipped.
+    """
+    def walk(node: Node, path: Tuple[str, ...]) -> Iterator[Tuple[Tuple[str, ...], Optional[str], str]]:
+        if node.each is not None:
+            return
+        for name, source in node.attrs:
+            if isinstance(source, str):
+                yield path, name, source
+        if isinstance(node.source, str):
+            yield path, None, node.source
+        for child in node.children:
+            yield from walk(child, path + (qualified_name(child.tag, child.ns),))
+
+    return walk(spec, ())
+
+
+# ============================================================================
+# FORMATTING AND ESCAPING
+# ============================================================================
+
+def format_value(value: Any) -> str:
+    kind = type(value)
+    if kind is str:
+        return value
+    if kind is bool:
+        return "true" if value else "false"
+    if isinstance(value, Enum):
+        return format_value(value.value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+_INVALID_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_TEXT_SPECIAL = re.compile("[&<>\r\x00-\x08\x0b\x0c\x0e-\x1f]")
+_ATTR_SPECIAL = re.compile('[&<>"\t\n\r\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _check_chars(value: str) -> None:
+    if _INVALID_CHARS.search(value):
+        raise ValueError("All strings must be XML compatible: Unicode or ASCII, no NULL bytes or control characters")
+
+
+def escape_text(value: str) -> str:
+    if _TEXT_SPECIAL.search(value) is None:
+        return value
+    _check_chars(value)
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace("\r", "&#13;")
+
+
+def escape_attr(value: str) -> str:
+    if _ATTR_SPECIAL.search(value) is None:
+        return value
+    _check_chars(value)
+    return (
+        value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+        .replace("\t", "&#9;").replace("\n", "&#10;").replace("\r", "&#13;")
+    )
+
+
+# Types whose text form never needs escaping, with their formatter
+_PLAIN_FORMATS: Dict[type, Callable[[Any], str]] = {
+    int: int.__repr__,
+    float: float.__repr__,
+    Decimal: Decimal.__str__,
+    bool: lambda value: "true" if value else "false",
+    date: date.isoformat,
+    datetime: datetime.isoformat,
+}
+
+
+def _text(value: Any) -> str:
+    kind = type(value)
+    if kind is str:
+        return value if _TEXT_SPECIAL.search(value) is None else escape_text(value)
+    plain = _PLAIN_FORMATS.get(kind)
+    if plain is not None:
+        return plain(value)
+    return escape_text(format_value(value))
+
+
+def _attr(value: Any) -> str:
+    kind = type(value)
+    if kind is str:
+        return value if _ATTR_SPECIAL.search(value) is None else escape_attr(value)
+    plain = _PLAIN_FORMATS.get(kind)
+    if plain is not None:
+        return plain(value)
+    return escape_attr(format_value(value))
+
+
+def _mapping_path(ctx: Any, keys: Tuple[str, ...]) -> Any:
+    for key in keys:
+        if ctx is None:
+            return None
+        ctx = ctx.get(key)
+    return ctx
+
+
+def _attribute_path(ctx: Any, names: Tuple[str, ...]) -> Any:
+    for name in names:
+        if ctx is None:
+            return None
+        ctx = getattr(ctx, name, None)
+    return ctx
+
+
+# ============================================================================
+# COMPILATION
+# ============================================================================
+
+class _CodeGen:
+    """Emits the body of one render function for a spec"""
+
+    def __init__(self, nsmap: Dict[Optional[str], str], accessor: str, pretty: bool, indent: str):
+        self.prefixes = {uri: prefix for prefix, uri in nsmap.items()}
+        self.accessor = accessor
+        self.pretty = pretty
+        self.indent = indent
+        self.lines: List[str] = []
+        self.env: Dict[str, Any] = {
+            "_text": _text, "_attr": _attr, "_mapping_path": _mapping_path, "_attribute_path": _attribute_path,
+        }
+        self._counter = 0
+
+    def fresh(self, stem: str) -> str:
+        self._counter += 1
+        return f"{stem}{self._counter}"
+
+    def bind(self, obj: Any) -> str:
+        name = self.fresh("_k")
+        self.env[name] = obj
+        return name
+
+    def line(self, level: int, code: str) -> None:
+        self.lines.append("    " * level + code)
+
+    def name(self, local: str, ns: Optional[str]) -> str:
+        if local.startswith("{"):
+            ns, local = local[1:].split("}", 1)
+        if ns is None:
+            return local
+        if ns not in self.prefixes:
+            raise ValueError(f"Namespace {ns!r} is not in the plan's nsmap")
+        prefix = self.prefixes[ns]
+        return f"{prefix}:{local}" if prefix else local
+
+    def value(self, source: Source, ctx: str, required: bool = False) -> str:
+        """Expression reading `source` from the context variable `ctx`"""
+        if isinstance(source, const):
+            return repr(source.value) if type(source.value) in (str, int, bool, type(None)) else self.bind(source.value)
+        if callable(source):
+            return f"{self.bind(source)}({ctx})"
+        parts = tuple(source.split("."))
+        if self.accessor == MAPPING:
+            if len(parts) > 1:
+                return f"_mapping_path({ctx}, {parts!r})"
+            return f"{ctx}[{source!r}]" if required else f"{ctx}.get({source!r})"
+        if len(parts) > 1:
+            return f"_attribute_path({ctx}, {parts!r})"
+        return f"getattr({ctx}, {source!r}, None)"
+
+    def lead(self, depth: int) -> str:
+        return "\n" + self.indent * depth if self.pretty and depth else ""
+
+    def open_tag(self, node: Node, tag: str, depth: int, ctx: str, level: int) -> str:
+        """
+        Expression for `<tag attrs` (no closing bracket): a string literal
+        when every attribute is constant, else a variable built here.
+        """
+        static = self.lead(depth) + "<" + tag
+        attrs = list(node.attrs)
+        while attrs and isinstance(attrs[0][1], const):
+            name, source = attrs.pop(0)
+            if source.value is not None:
+                static += " " + self.name(name, None) + '="' + _attr(source.value) + '"'
+        if not attrs:
+            return repr(static)
+        head = self.fresh("h")
+        self.line(level, f"{head} = {static!r}")
+        for name, source in attrs:
+            if isinstance(source, const):
+                if source.value is not None:
+                    literal = " " + self.name(name, None) + '="' + _attr(source.value) + '"'
+                    self.line(level, f"{head} += {literal!r}")
+                continue
+            self.line(level, f"x = {self.value(source, ctx)}")
+            self.line(level, "if x is not None:")
+            self.line(level + 1, f"{head} += ' {self.name(name, None)}=\"' + _attr(x) + '\"'")
+        return head
+
+    def node(self, node: Node, depth: int, ctx: str, level: int) -> None:
+        if node.each is not None:
+            item = self.fresh("c")
+            self.line(level, f"for {item} in ({self.value(node.each, ctx)} or ()):")
+            ctx, level = item, level + 1
+        if node.when is not None:
+            self.line(level, f"if {self.value(node.when, ctx)}:")
+            level += 1
+        if node.source is not None:
+            self.leaf(node, depth, ctx, level)
+        else:
+            self.container(node, depth, ctx, level)
+
+    def leaf(self, node: Node, depth: int, ctx: str, level: int) -> None:
+        tag = self.name(node.tag, node.ns)
+        self.line(level, f"v = {self.value(node.source, ctx, node.required)}")
+        if node.default is not None:
+            self.line(level, "if v is None:")
+            self.line(level + 1, f"v = {self.bind(node.default)}")
+        text = f"_text({self.bind(node.fmt)}(v))" if node.fmt else "_text(v)"
+        self.line(level, "if v is not None:")
+        head = self.open_tag(node, tag, depth, ctx, level + 1)
+        self.line(level + 1, f"a({_concat(head, '>')} + {text} + {f'</{tag}>'!r})")
+        if node.required:
+            self.line(level, "else:")
+            head = self.open_tag(node, tag, depth, ctx, level + 1)
+            self.line(level + 1, f"a({_concat(head, '/>')})")
+
+    def container(self, node: Node, depth: int, ctx: str, level: int) -> None:
+        tag = self.name(node.tag, node.ns)
+        close = ("\n" + self.indent * depth if self.pretty else "") + f"</{tag}>"
+        head = self.open_tag(node, tag, depth, ctx, level)
+        if any(_always_emits(child) for child in node.children):
+            self.line(level, f"a({_concat(head, '>')})")
+            for child in node.children:
+                self.node(child, depth + 1, ctx, level)
+            self.line(level, f"a({close!r})")
+            return
+        # Children may all be skipped; collapse to a self-closing tag then
+        mark = self.fresh("n")
+        self.line(level, f"{mark} = len(o)")
+        self.line(level, "a(None)")
+        for child in node.children:
+            self.node(child, depth + 1, ctx, level)
+        self.line(level, f"if len(o) == {mark} + 1:")
+        self.line(level + 1, f"o[{mark}] = {_concat(head, '/>')}")
+        self.line(level, "else:")
+        self.line(level + 1, f"o[{mark}] = {_concat(head, '>')}")
+        self.line(level + 1, f"a({close!r})")
+
+
+def _concat(expr: str, suffix: str) -> str:
+    """`expr + suffix` in generated code, folded when `expr` is a string literal"""
+    if expr[0] in "'\"":
+        return repr(ast.literal_eval(expr) + suffix)
+    return f"{expr} + {suffix!r}"
+
+
+def _always_emits(node: Node) -> bool:
+    return node.when is None and node.each is None and (node.source is None or node.required)
+
+
+def _compile(spec: Node, nsmap: Dict[Optional[str], str], accessor: str, pretty: bool,
+             indent: str) -> Tuple[Callable[[Any, List[str]], None], str]:
+    gen = _CodeGen(nsmap, accessor, pretty, indent)
+    gen.node(spec, 0, "c", 2)
+    source = "\n".join([
+        "def render(c, o):",
+        "    a = o.append",
+        "    try:",
+        *gen.lines,
+        "    except KeyError as e:",
+        "        raise KeyError(f'voucher missing {e.args[0]!r}') from None",
+    ])
+    namespace = dict(gen.env)
+    exec(compile(source, f"<xml plan {spec.tag}>", "exec"), namespace)
+    return namespace["render"], source
+
+
+class XMLPlan:
+    """A compiled format: render one record to bytes, or to markup for a stream"""
+
+    def __init__(self, spec: Node, nsmap: Optional[Dict[Optional[str], str]] = None,
+                 accessor: str = MAPPING, indent: str = "  "):
+        if accessor not in (MAPPING, ATTRIBUTE):
+            raise ValueError(f"Unknown accessor {accessor!r}")
+        self.spec = spec
+        self.nsmap = dict(nsmap or {})
+        self.accessor = accessor
+        self.indent = indent
+        self._compiled: Dict[Tuple[bool, bool], Tuple[Callable[[Any, List[str]], None], str]] = {}
+
+    def _variant(self, pretty: bool, declare_namespaces: bool) -> Tuple[Callable[[Any, List[str]], None], str]:
+        key = (pretty, declare_namespaces)
+        if key not in self._compiled:
+            spec = self.spec
+            if declare_namespaces and self.nsmap:
+                declarations = tuple(
+                    ("xmlns" if prefix is None else f"xmlns:{prefix}", const(uri)) for prefix, uri in self.nsmap.items()
+                )
+                spec = Node(**{**spec.__dict__, "attrs": declarations + spec.attrs})
+            self._compiled[key] = _compile(spec, self.nsmap, self.accessor, pretty, self.indent)
+        return self._compiled[key]
+
+    def source(self, pretty: bool = False, declare_namespaces: bool = True) -> str:
+        """Generated Python source of a variant, for debugging"""
+        return self._variant(pretty, declare_namespaces)[1]
+
+    def render_into(self, record: Any, out: List[str], pretty: bool = False, declare_namespaces: bool = True) -> None:
+        """Append the element markup for one record to `out`"""
+        self._variant(pretty, declare_namespaces)[0](record, out)
+
+    def render_str(self, record: Any, pretty: bool = False, declare_namespaces: bool = True) -> str:
+        """Element markup for one record, without an XML declaration"""
+        out: List[str] = []
+        self._variant(pretty, declare_namespaces)[0](record, out)
+        return "".join(out)
+
+    def render_text(self, record: Any, pretty: bool = False, xml_declaration: bool = True,
+                    standalone: Optional[bool] = None) -> str:
+        """A complete document as ``str``, for callers that return text"""
+        out: List[str] = [xml_declaration_str(standalone) + "\n"] if xml_declaration else []
+        self._variant(pretty, True)[0](record, out)
+        if pretty:
+            out.append("\n")
+        return "".join(out)
+
+    def render(self, record: Any, pretty: bool = False, xml_declaration: bool = True,
+               standalone: Optional[bool] = None) -> bytes:
+        """A complete document as UTF-8 bytes"""
+        return self.render_text(record, pretty, xml_declaration, standalone).encode("utf-8")
+
+
+def xml_declaration_str(standalone: Optional[bool] = None) -> str:
+    if standalone is None:
+        return "<?xml version='1.0' encoding='UTF-8'?>"
+    return f"<?xml version='1.0' encoding='UTF-8' standalone='{'yes' if standalone else 'no'}'?>"
+
+
+def compile_plan(spec: Node, nsmap: Optional[Dict[Optional[str], str]] = None,
+                 accessor: str = MAPPING, indent: str = "  ") -> XMLPlan:
+    """Compile a format spec; each (pretty, namespace declaration) variant is generated on first use"""
+    return XMLPlan(spec, nsmap, accessor, indent)
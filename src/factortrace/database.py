@@ -0,0 +1,237 @@
+"""
+FactorTrace storage layer
+─────────────────────────
+Builds the SQLAlchemy engine for the admin store from configuration instead
+of a hard-coded SQLite path:
+
+- FACTORTRACE_DATABASE_URL selects the backend (PostgreSQL, or a local
+  SQLite file by default)
+- SQLite connections run in WAL mode with tuned pragmas, so dashboard
+  reads proceed while an import is writing
+- pool size, overflow, timeout and recycle are explicit and configurable
+
+Schema migrations are not run on import; call `migrate()` once from the
+application's startup hook or ``python -m factortrace.database migrate``.
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATABASE_URL = "sqlite:///./vouchers.db"
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+@dataclass(frozen=True)
+class DatabaseSettings:
+    """Engine configuration, read from FACTORTRACE_DB_* environment variables by default"""
+    url: str = DEFAULT_DATABASE_URL
+    echo: bool = False
+
+    # Connection pool
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: int = 30  # seconds to wait for a free connection
+    pool_recycle: int = 1800  # seconds before a connection is replaced
+
+    # SQLite pragmas
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"  # safe with WAL; FULL fsyncs every commit
+    sqlite_cache_size: int = -64000  # negative = KiB, i.e. 64 MB page cache
+    sqlite_mmap_size: int = 268435456  # 256 MB memory-mapped I/O
+    sqlite_busy_timeout: int = 5000  # ms to wait on a locked database before failing
+
+    @classmethod
+    def from_env(cls) -> "DatabaseSettings":
+        return cls(
+            url=os.getenv("FACTORTRACE_DATABASE_URL", DEFAULT_DATABASE_URL),
+            echo=os.getenv("FACTORTRACE_DB_ECHO", "").lower() in ("1", "true", "yes"),
+            pool_size=_env_int("FACTORTRACE_DB_POOL_SIZE", cls.pool_size),
+            max_overflow=_env_int("FACTORTRACE_DB_MAX_OVERFLOW", cls.max_overflow),
+            pool_timeout=_env_int("FACTORTRACE_DB_POOL_TIMEOUT", cls.pool_timeout),
+            pool_recycle=_env_int("FACTORTRACE_DB_POOL_RECYCLE", cls.pool_recycle),
+            sqlite_synchronous=os.getenv("FACTORTRACE_SQLITE_SYNCHRONOUS", cls.sqlite_synchronous),
+            sqlite_cache_size=_env_int("FACTORTRACE_SQLITE_CACHE_SIZE", cls.sqlite_cache_size),
+            sqlite_mmap_size=_env_int("FACTORTRACE_SQLITE_MMAP_SIZE", cls.sqlite_mmap_size),
+            sqlite_busy_timeout=_env_int("FACTORTRACE_SQLITE_BUSY_TIMEOUT", cls.sqlite_busy_timeout),
+        )
+
+    @property
+    def is_sqlite(self) -> bool:
+        return make_url(self.url).get_backend_name() == "sqlite"
+
+    @property
+    def is_memory(self) -> bool:
+        return self.is_sqlite and make_url(self.url).database in (None, "", ":memory:")
+
+
+# ============================================================================
+# ENGINE
+# ============================================================================
+
+def sqlite_pragmas(settings: DatabaseSettings) -> Dict[str, Any]:
+    pragmas = {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "cache_size": settings.sqlite_cache_size,
+        "mmap_size": settings.sqlite_mmap_size,
+        "busy_timeout": settings.sqlite_busy_timeout,
+        "foreign_keys": "ON",
+        "temp_store": "MEMORY",
+    }
+    if settings.is_memory:
+        pragmas.pop("journal_mode")  # in-memory databases cannot use WAL
+        pragmas.pop("mmap_size")
+    return pragmas
+
+
+def build_engine(settings: DatabaseSettings) -> Engine:
+    """Create an engine with backend-appropriate pooling and connection setup"""
+    if not settings.is_sqlite:
+        return create_engine(
+            settings.url,
+            echo=settings.echo,
+            pool_size=settings.pool_size,
+            max_overflow=settings.max_overflow,
+            pool_timeout=settings.pool_timeout,
+            pool_recycle=settings.pool_recycle,
+            pool_pre_ping=True,
+        )
+
+    connect_args = {
+        "check_same_thread": False,
+        "timeout": settings.sqlite_busy_timeout / 1000,
+    }
+    if settings.is_memory:
+        # One shared connection, otherwise every checkout sees an empty database
+        engine = create_engine(settings.url, echo=settings.echo, connect_args=connect_args, poolclass=StaticPool)
+    else:
+        engine = create_engine(
+            settings.url,
+            echo=settings.echo,
+            connect_args=connect_args,
+            pool_size=settings.pool_size,
+            max_overflow=settings.max_overflow,
+            pool_timeout=settings.pool_timeout,
+        )
+
+    pragmas = sqlite_pragmas(settings)
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    return engine
+
+
+# ============================================================================
+# DATABASE HANDLE
+# ============================================================================
+
+@dataclass
+class Database:
+    """Engine, session factory and once-only migrations for one configured store"""
+    settings: DatabaseSettings
+    engine: Engine = field(init=False)
+    session_factory: sessionmaker = field(init=False)
+    _migrations: List[Callable[[Engine], None]] = field(default_factory=list, init=False)
+    _migrated: bool = field(default=False, init=False)
+    _migrate_lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
+    def __post_init__(self):
+        self.engine = build_engine(self.settings)
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+    def session(self) -> Session:
+        return self.session_factory()
+
+    def register_migration(self, migration: Callable[[Engine], None]) -> None:
+        """Add a schema step; steps run in registration order on the next `migrate()`"""
+        if migration not in self._migrations:
+            self._migrations.append(migration)
+            self._migrated = False
+
+    def migrate(self) -> None:
+        """Run registered migrations once per process"""
+        if self._migrated:
+            return
+        with self._migrate_lock:
+            if self._migrated:
+                return
+            for migration in self._migrations:
+                migration(self.engine)
+            self._migrated = True
+            logger.info(f"Database migrated ({len(self._migrations)} step(s)) at {self.engine.url!r}")
+
+    def dispose(self) -> None:
+        self.engine.dispose()
+
+
+_database: Optional[Database] = None
+_database_lock = threading.Lock()
+
+
+def get_database() -> Database:
+    """Process-wide database, configured from the environment on first use"""
+    global _database
+    if _database is None:
+        with _database_lock:
+            if _database is None:
+                _database = Database(DatabaseSettings.from_env())
+    return _database
+
+
+def configure_database(url: Optional[str] = None, **overrides: Any) -> Database:
+    """Replace the process-wide database (call before the routers are imported)"""
+    global _database
+    settings = DatabaseSettings.from_env()
+    if url is not None:
+        overrides["url"] = url
+    with _database_lock:
+        if _database is not None:
+            _database.dispose()
+        _database = Database(replace(settings, **overrides))
+    return _database
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="FactorTrace database maintenance")
+    parser.add_argument("command", choices=["migrate"])
+    parser.add_argument("--url", help="Database URL (default: FACTORTRACE_DATABASE_URL)")
+    args = parser.parse_args(argv)
+
+    # Under `python -m` this file is __main__; the routers register their
+    # migrations with the importable factortrace.database module
+    from factortrace import database
+
+    if args.url:
+        database.configure_database(args.url)
+    # Importing the admin router registers its tables and migrations
+    from factortrace.routes import admin  # noqa: F401
+
+    database.get_database().migrate()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
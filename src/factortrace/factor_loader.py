@@ -111,6 +111,7 @@ class EmissionFactorLoader:
 
         if not self.csv_path.exists():
             raise FileNotFoundError(f"Emission factors CSV not found: {self.csv_path}")
+        self._version = self._extract_version()
 
         self.factors: Dict[str, Dict[str, List[dict]]] = defaultdict(lambda: defaultdict(list))
         self.global_averages: Dict[str, Dict[str, List[dict]]] = defaultdict(lambda: defaultdict(list))
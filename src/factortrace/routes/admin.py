@@ -13,23 +13,29 @@ Provides:
 
 from pathlib import Path
 from datetime import datetime
-from enum import Enum
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional
 
 import hashlib
-import json
 import logging
 import os
 import secrets
+import tempfile
 
-import pandas as pd
 from pydantic import BaseModel, Field
 from fastapi import (
     APIRouter, Depends, HTTPException, Request, status, Query, BackgroundTasks
 )
-from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from fastapi.templating import Jinja2Templates
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
 
 from fastapi import APIRouter
 from factortrace.schemas import VouchersPayload  # import from your actual file
@@ -45,19 +51,36 @@ async def import_vouchers(payload: VouchersPayload):
 
 TEMPLATES_DIR = Path(__file__).resolve().parents[2] / "templates"
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
-from sqlalchemy import (
-    create_engine,
-    Column,
-    String,
-    DateTime,
-    Integer,
-    Float,
-    Boolean,
-    JSON,
-    Text,
+from sqlalchemy.orm import Session
+
+from factortrace.database import Database, get_database
+
+from factortrace.services.validator import VoucherValidator
+from factortrace.services.voucher_store import (
+    VoucherRecord,
+    apply_stats_deltas,
+    create_tables,
+    dashboard_stats,
+    decode_cursor,
+    encode_cursor,
+    iter_export_chunks,
+    keyset_after,
+    keyset_order,
+    record_stats_change,
+    status_key,
+    stream_csv,
+    stream_json_array,
+    stream_ndjson,
+    supplier_filter,
+    write_xlsx_report,
+)
+from factortrace.services.revalidation import RevalidationJob, StatusChange, run_revalidation
+from factortrace.services.voucher_import import (
+    ImportJob,
+    ImportJobRegistry,
+    iter_voucher_files,
+    run_import,
 )
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import Session, sessionmaker
 router = APIRouter(tags=["admin"])
 from factortrace.schemas import VoucherBatchImport
 
@@ -83,16 +106,6 @@ def authenticate_user(credentials: HTTPBasicCredentials = Depends(security)):
         )
     return credentials.username
 
-# ───────────────────────────────────────────────────────────────
-# Admin Dashboard (HTML)
-# ───────────────────────────────────────────────────────────────
-@router.get("/", response_class=HTMLResponse)
-def admin_dashboard(request: Request, username: str = Depends(authenticate_user)):
-    return templates.TemplateResponse("admin_dashboard.html", {
-        "request": request,
-        "user": username
-    })
-
 # ───────────────────────────────────────────────────────────────
 # File Paths & Logging Setup
 # ───────────────────────────────────────────────────────────────
@@ -147,317 +160,32 @@ async def import_voucher_json(batch: VoucherBatchImport):
     }
 
 # ───────────────────────────────────────────────────────────────
-# SQLAlchemy Base
+# Database
 # ───────────────────────────────────────────────────────────────
-Base = declarative_base()
-engine = create_engine("sqlite:///./vouchers.db", connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# ───────────────────────────────────────────────────────────────
-# SQLAlchemy Model Example (Optional)
-# ───────────────────────────────────────────────────────────────
-
-# 3. Table creation
-Base.metadata.create_all(bind=engine)
-
-# ============================================================================
-# MODELS & ENUMS
-# ============================================================================
-
-class ComplianceStatus(str, Enum):
-    """Overall compliance status per voucher"""
-    COMPLIANT = "compliant"
-    PARTIAL = "partial" 
-    NON_COMPLIANT = "non_compliant"
-    PENDING = "pending"
-
-
-class DataQualityTier(int, Enum):
-    """ESRS 1 §64 Data Quality Hierarchy"""
-    MEASURED_VERIFIED = 1
-    MEASURED_ASSURED = 2
-    CALCULATED_PRIMARY = 3
-    CALCULATED_ESTIMATED = 4
-    SUPPLIER_SPECIFIC = 5
-
-
-class ValidationFlag(BaseModel):
-    """Individual validation check result"""
-    field: str
-    requirement: str  # ESRS E1-6 §53, CBAM Art 35, etc.
-    status: bool
-    message: str
-    severity: str = "error"  # error, warning, info
-
-
-class VoucherRecord(Base):
-    """Database model for vouchers with compliance tracking"""
-    __tablename__ = "vouchers"
-    __table_args__ = {'extend_existing': True}
-
-    id = Column(Integer, primary_key=True, index=True)
-    voucher_id = Column(String, unique=True, index=True)
-    filename = Column(String)
-    format = Column(String)  # json or xml
-    
-    # Core data
-    supplier_id = Column(String, index=True)
-    supplier_name = Column(String)
-    lei = Column(String, index=True)
-    product_cn_code = Column(String, index=True)
-    reporting_period_start = Column(String)
-    reporting_period_end = Column(String)
-    total_emissions_tco2e = Column(Float)
-    
-    # Compliance tracking
-    compliance_status = Column(String, default="pending")
-    data_quality_score = Column(Integer)
-    validation_flags = Column(JSON)  # List of ValidationFlag dicts
-    missing_fields = Column(JSON)  # List of missing ESRS/CBAM fields
-    completeness_score = Column(Float)  # 0-100%
-    
-    # Audit fields
-    submission_timestamp = Column(DateTime, default=datetime.utcnow)
-    last_validated = Column(DateTime)
-    validated_by = Column(String)
-    calculation_hash = Column(String)
-    
-    # Full voucher data
-    raw_data = Column(JSON)
+# Engine and pool come from FACTORTRACE_DATABASE_URL / FACTORTRACE_DB_*. The
+# engine is built on first use, not on import; tables are created by
+# migrate() at startup
+def admin_database() -> Database:
+    """The configured store, with the admin tables registered as a migration"""
+    database = get_database()
+    database.register_migration(create_tables)
+    return database
 
 
-# ============================================================================
-# ESRS/CBAM VALIDATION ENGINE
-# ============================================================================
-
-class VoucherValidator:
-    """Validates vouchers against ESRS E1 and CBAM requirements"""
-    
-    # ESRS E1-6 Mandatory fields per §53
-    ESRS_E1_MANDATORY = {
-        "reporting_undertaking_lei": "ESRS 2 §17 - Reporting entity LEI",
-        "scope": "ESRS E1-6 §44-53 - GHG Protocol scope",
-        "total_emissions_tco2e": "ESRS E1-6 §53 - Total GHG emissions",
-        "reporting_period_start": "ESRS E1-6 §46 - Reporting period",
-        "reporting_period_end": "ESRS E1-6 §46 - Reporting period",
-        "calculation_methodology": "ESRS E1-6 §54 - Methodology disclosure",
-        "data_quality_rating": "ESRS 1 §64 - Data quality assessment"
-    }
-    
-    # CBAM Annex III Requirements
-    CBAM_MANDATORY = {
-        "product_cn_code": "CBAM Annex III - Combined Nomenclature code",
-        "installation_id": "CBAM Art 35.2(a) - Installation identifier", 
-        "installation_country": "CBAM Art 35.2(b) - Country of origin",
-        "quantity": "CBAM Art 35.2(c) - Quantity of goods",
-        "direct_emissions": "CBAM Art 35.2(f) - Direct emissions",
-        "emission_factor_source": "CBAM Art 35.2(g) - Emission factor source"
-    }
-    
-    # ESRS E1-6 §53(b) GHG breakdown
-    GHG_TYPES = ["CO2", "CH4", "N2O", "HFCs", "PFCs", "SF6", "NF3"]
-    
-    def __init__(self):
-        self.validation_results: List[ValidationFlag] = []
-        self.missing_fields: Set[str] = set()
-    
-    def validate_voucher(self, voucher_data: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Comprehensive validation against ESRS E1 and CBAM requirements
-        Returns validation summary with flags and completeness metrics
-        """
-        self.validation_results = []
-        self.missing_fields = set()
-        
-        # Check ESRS E1 mandatory fields
-        for field, requirement in self.ESRS_E1_MANDATORY.items():
-            if field not in voucher_data or not voucher_data[field]:
-                self.validation_results.append(ValidationFlag(
-                    field=field,
-                    requirement=requirement,
-                    status=False,
-                    message=f"Missing mandatory ESRS field: {field}",
-                    severity="error"
-                ))
-                self.missing_fields.add(field)
-            else:
-                self.validation_results.append(ValidationFlag(
-                    field=field,
-                    requirement=requirement,
-                    status=True,
-                    message=f"Field present: {field}",
-                    severity="info"
-                ))
-        
-        # Check CBAM requirements if applicable
-        if self._is_cbam_product(voucher_data.get("product_cn_code", "")):
-            for field, requirement in self.CBAM_MANDATORY.items():
-                if field not in voucher_data or not voucher_data[field]:
-                    self.validation_results.append(ValidationFlag(
-                        field=field,
-                        requirement=requirement,
-                        status=False,
-                        message=f"Missing CBAM mandatory field: {field}",
-                        severity="error"
-                    ))
-                    self.missing_fields.add(field)
-        
-        # Validate data quality
-        self._validate_data_quality(voucher_data)
-        
-        # Check GHG breakdown
-        self._validate_ghg_breakdown(voucher_data)
-        
-        # Check temporal consistency
-        self._validate_temporal_data(voucher_data)
-        
-        # LEI format validation
-        self._validate_lei_format(voucher_data)
-        
-        # Calculate completeness score
-        total_fields = len(self.ESRS_E1_MANDATORY) + len(self.CBAM_MANDATORY)
-        missing_count = len(self.missing_fields)
-        completeness = ((total_fields - missing_count) / total_fields) * 100
-        
-        # Determine overall compliance status
-        error_count = sum(1 for v in self.validation_results if v.severity == "error")
-        if error_count == 0:
-            status = ComplianceStatus.COMPLIANT
-        elif error_count < 3:
-            status = ComplianceStatus.PARTIAL
-        else:
-            status = ComplianceStatus.NON_COMPLIANT
-        
-        return {
-            "compliance_status": status,
-            "validation_flags": [v.dict() for v in self.validation_results],
-            "missing_fields": list(self.missing_fields),
-            "completeness_score": round(completeness, 2),
-            "error_count": error_count,
-            "warning_count": sum(1 for v in self.validation_results if v.severity == "warning")
-        }
-    
-    def _is_cbam_product(self, cn_code: str) -> bool:
-        """Check if CN code is CBAM-covered (Annex I goods)"""
-        if not cn_code:
-            return False
-        # Simplified check - in production, use full CN code database
-        cbam_prefixes = ["72", "76", "25", "28", "29"]  # Steel, Aluminum, Cement, Chemicals
-        return any(cn_code.startswith(prefix) for prefix in cbam_prefixes)
-    
-    def _validate_data_quality(self, data: Dict[str, Any]):
-        """Validate data quality tier per ESRS 1 §64"""
-        quality = data.get("data_quality_rating")
-        if not quality:
-            self.validation_results.append(ValidationFlag(
-                field="data_quality_rating",
-                requirement="ESRS 1 §64",
-                status=False,
-                message="Data quality rating missing",
-                severity="error"
-            ))
-        elif not isinstance(quality, int) or quality < 1 or quality > 5:
-            self.validation_results.append(ValidationFlag(
-                field="data_quality_rating",
-                requirement="ESRS 1 §64",
-                status=False,
-                message=f"Invalid data quality rating: {quality} (must be 1-5)",
-                severity="error"
-            ))
-    
-    def _validate_ghg_breakdown(self, data: Dict[str, Any]):
-        """Check GHG breakdown per ESRS E1-6 §53(b)"""
-        ghg_data = data.get("ghg_breakdown", {})
-        if not ghg_data:
-            self.validation_results.append(ValidationFlag(
-                field="ghg_breakdown",
-                requirement="ESRS E1-6 §53(b)",
-                status=False,
-                message="Missing GHG breakdown by gas type",
-                severity="warning"
-            ))
-        else:
-            # Check if total matches sum of components
-            total = data.get("total_emissions_tco2e", 0)
-            sum_components = sum(ghg_data.values())
-            if abs(total - sum_components) > 0.01:
-                self.validation_results.append(ValidationFlag(
-                    field="ghg_breakdown",
-                    requirement="ESRS E1-6 §53(b)",
-                    status=False,
-                    message=f"GHG breakdown sum ({sum_components}) doesn't match total ({total})",
-                    severity="error"
-                ))
-    
-    def _validate_temporal_data(self, data: Dict[str, Any]):
-        """Validate temporal consistency"""
-        start = data.get("reporting_period_start")
-        end = data.get("reporting_period_end")
-        
-        if start and end:
-            try:
-                start_date = datetime.fromisoformat(start).date()
-                end_date = datetime.fromisoformat(end).date()
-                
-                if end_date < start_date:
-                    self.validation_results.append(ValidationFlag(
-                        field="reporting_period",
-                        requirement="ESRS 1 §77",
-                        status=False,
-                        message="End date before start date",
-                        severity="error"
-                    ))
-                
-                # Check if period is reasonable (not more than 1 year)
-                if (end_date - start_date).days > 366:
-                    self.validation_results.append(ValidationFlag(
-                        field="reporting_period",
-                        requirement="ESRS 1 §77",
-                        status=False,
-                        message="Reporting period exceeds one year",
-                        severity="warning"
-                    ))
-            except ValueError:
-                self.validation_results.append(ValidationFlag(
-                    field="reporting_period",
-                    requirement="ESRS 1 §77",
-                    status=False,
-                    message="Invalid date format (use YYYY-MM-DD)",
-                    severity="error"
-                ))
-    
-    def _validate_lei_format(self, data: Dict[str, Any]):
-        """Validate LEI format per ISO 17442"""
-        for field in ["reporting_undertaking_lei", "lei", "legal_entity_identifier"]:
-            lei = data.get(field)
-            if lei and (len(lei) != 20 or not lei[:4].isalpha()):
-                self.validation_results.append(ValidationFlag(
-                    field=field,
-                    requirement="ISO 17442",
-                    status=False,
-                    message=f"Invalid LEI format: {lei}",
-                    severity="warning"
-                ))
-
+def admin_session() -> Session:
+    """New session on the admin store; doubles as a session factory for jobs and exports"""
+    return admin_database().session()
 
-# ============================================================================
-# DATABASE OPERATIONS
-# ============================================================================
 
 def get_db():
     """Database session dependency"""
-    db = SessionLocal()
+    db = admin_session()
     try:
         yield db
     finally:
         db.close()
 
 
-def create_tables():
-    """Create database tables"""
-    Base.metadata.create_all(bind=engine)
-
-
 # ============================================================================
 # AUTHENTICATION & AUTHORIZATION
 # ============================================================================
@@ -498,9 +226,11 @@ def authenticate_user(credentials: HTTPBasicCredentials = Depends(security)) ->
 # ============================================================================
 # ADMIN ROUTES
 # ============================================================================
+# Routes that use the synchronous ORM session are plain `def`, so FastAPI runs
+# them in its threadpool instead of blocking the event loop.
 
 @router.get("/", response_class=HTMLResponse)
-async def render_admin_dashboard(
+def render_admin_dashboard(
     request: Request,
     db: Session = Depends(get_db),
     current_user: Dict = Depends(authenticate_user),
@@ -510,20 +240,9 @@ async def render_admin_dashboard(
     sort_order: str = Query("desc", pattern="^(asc|desc)$"),
     filter_status: Optional[str] = Query(None),
     filter_supplier: Optional[str] = Query(None),
-    show_missing: bool = Query(False)
+    show_missing: bool = Query(False),
+    after: Optional[str] = Query(None, description="Keyset cursor from the previous page's next_cursor"),
 ):
-    return templates.TemplateResponse("admin_dashboard.html", {
-        "request": request,
-        "user": current_user,
-        "page": page,
-        "per_page": per_page,
-        "sort_by": sort_by,
-        "sort_order": sort_order,
-        "filter_status": filter_status,
-        "filter_supplier": filter_supplier,
-        "show_missing": show_missing
-    })
-
     """
     Main admin dashboard with sorting, filtering, and pagination
     Compliant with ESRS 1 §76 audit trail requirements
@@ -541,43 +260,35 @@ async def render_admin_dashboard(
     if filter_status:
         query = query.filter(VoucherRecord.compliance_status == filter_status)
     if filter_supplier:
-        query = query.filter(VoucherRecord.supplier_name.contains(filter_supplier))
+        query = query.filter(supplier_filter(db.get_bind(), filter_supplier))
     if show_missing:
         query = query.filter(VoucherRecord.completeness_score < 100)
     
-    # Get total count for pagination
-    total_count = query.count()
-    
-    # Apply sorting
-    order_column = getattr(VoucherRecord, sort_by)
-    if sort_order == "desc":
-        query = query.order_by(order_column.desc())
+    # Statistics come from the summary table; only filters it cannot answer need a count
+    stats = dashboard_stats(db)
+    if filter_supplier or show_missing:
+        total_count = query.order_by(None).count()
+    elif filter_status:
+        total_count = stats["by_status"].get(filter_status, 0)
     else:
-        query = query.order_by(order_column.asc())
-    
-    # Apply pagination
-    offset = (page - 1) * per_page
-    vouchers = query.offset(offset).limit(per_page).all()
-    
-    # Calculate statistics
-    stats = {
-        "total_vouchers": total_count,
-        "compliant": db.query(VoucherRecord).filter(
-            VoucherRecord.compliance_status == ComplianceStatus.COMPLIANT
-        ).count(),
-        "non_compliant": db.query(VoucherRecord).filter(
-            VoucherRecord.compliance_status == ComplianceStatus.NON_COMPLIANT
-        ).count(),
-        "average_completeness": db.query(VoucherRecord).with_entities(
-            VoucherRecord.completeness_score
-        ).all()
-    }
-    
-    if stats["average_completeness"]:
-        avg_scores = [s[0] for s in stats["average_completeness"] if s[0] is not None]
-        stats["average_completeness"] = round(sum(avg_scores) / len(avg_scores), 2) if avg_scores else 0
-    else:
-        stats["average_completeness"] = 0
+        total_count = stats["total_vouchers"]
+    
+    # Keyset pagination on (sort column, id); OFFSET only for direct page jumps
+    query = query.order_by(*keyset_order(sort_by, sort_order))
+    if after:
+        try:
+            cursor = decode_cursor(after, sort_by)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+        query = query.filter(keyset_after(sort_by, sort_order, *cursor))
+    elif page > 1:
+        query = query.offset((page - 1) * per_page)
+    vouchers = query.limit(per_page).all()
+    
+    next_cursor = None
+    if len(vouchers) == per_page:
+        last = vouchers[-1]
+        next_cursor = encode_cursor(getattr(last, sort_by), last.id)
     
     # Pagination info
     total_pages = (total_count + per_page - 1) // per_page
@@ -591,6 +302,7 @@ async def render_admin_dashboard(
         "per_page": per_page,
         "total_pages": total_pages,
         "total_count": total_count,
+        "next_cursor": next_cursor,
         "sort_by": sort_by,
         "sort_order": sort_order,
         "filter_status": filter_status,
@@ -600,7 +312,7 @@ async def render_admin_dashboard(
 
 
 @router.get("/voucher/{voucher_id}", response_class=HTMLResponse)
-async def view_voucher_detail(
+def view_voucher_detail(
     voucher_id: str,
     request: Request,
     db: Session = Depends(get_db),
@@ -640,7 +352,7 @@ async def view_voucher_detail(
 
 
 @router.post("/validate/{voucher_id}")
-async def revalidate_voucher(
+def revalidate_voucher(
     voucher_id: str,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
@@ -668,6 +380,11 @@ async def revalidate_voucher(
     validation_result = validator.validate_voucher(voucher.raw_data)
     
     # Update database
+    record_stats_change(
+        db,
+        added=(validation_result["compliance_status"], validation_result["completeness_score"]),
+        removed=(voucher.compliance_status, voucher.completeness_score),
+    )
     voucher.compliance_status = validation_result["compliance_status"]
     voucher.validation_flags = validation_result["validation_flags"]
     voucher.missing_fields = validation_result["missing_fields"]
@@ -685,10 +402,82 @@ async def revalidate_voucher(
     }
 
 
+def _record_revalidation_stats(db: Session, changes: List[StatusChange]) -> None:
+    deltas: Dict[str, List[float]] = {}
+    for sign, index in ((-1, 0), (1, 1)):
+        for change in changes:
+            status_value, completeness = change[index]
+            delta = deltas.setdefault(status_key(status_value), [0, 0.0, 0])
+            delta[0] += sign
+            if completeness is not None:
+                delta[1] += sign * completeness
+                delta[2] += sign
+    apply_stats_deltas(db, deltas)
+
+
+def _run_revalidation_job(job: RevalidationJob, username: str, batch_size: int) -> None:
+    run_revalidation(
+        job,
+        admin_session,
+        VoucherRecord.__table__,
+        batch_size=batch_size,
+        validated_by=username,
+        on_changed=_record_revalidation_stats,
+    )
+    
+    audit_logger.info(
+        f"Bulk revalidation {job.status} - Job: {job.job_id}, Processed: {job.processed}, "
+        f"Changed: {job.changed}, Errors: {job.error_count}",
+        extra={"user": username, "action": "REVALIDATE_ALL"}
+    )
+
+
+@router.post("/validate", status_code=status.HTTP_202_ACCEPTED)
+async def revalidate_all_vouchers(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    batch_size: int = Query(1000, ge=100, le=10000),
+    current_user: Dict = Depends(authenticate_user)
+):
+    """
+    Revalidate every voucher after a rules change
+    Only vouchers whose status columns change are written back
+    """
+    if "admin" not in current_user["roles"]:
+        raise HTTPException(status_code=403, detail="Admin role required")
+    
+    job = import_jobs.create(source="vouchers", factory=RevalidationJob)
+    background_tasks.add_task(_run_revalidation_job, job, current_user["username"], batch_size)
+    
+    return {
+        "status": "accepted",
+        "job_id": job.job_id,
+        "status_url": str(request.url_for("get_revalidation_job", job_id=job.job_id)),
+    }
+
+
+@router.get("/validate/jobs/{job_id}")
+async def get_revalidation_job(
+    job_id: str,
+    current_user: Dict = Depends(authenticate_user)
+):
+    """Progress of a bulk revalidation job"""
+    job = import_jobs.get(job_id)
+    if not isinstance(job, RevalidationJob):
+        raise HTTPException(status_code=404, detail="Revalidation job not found")
+    return job.to_dict()
+
+
+# ============================================================================
+# COMPLIANCE EXPORT
+# ============================================================================
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
 @router.get("/export/compliance-report")
 async def export_compliance_report(
-    format: str = Query("xlsx", regex="^(xlsx|csv|json)$"),
-    db: Session = Depends(get_db),
+    format: str = Query("xlsx", pattern="^(xlsx|csv|json|ndjson)$"),
     current_user: Dict = Depends(authenticate_user)
 ):
     """
@@ -701,186 +490,111 @@ async def export_compliance_report(
         extra={"user": current_user["username"], "action": "EXPORT_REPORT"}
     )
     
-    # Get all vouchers
-    vouchers = db.query(VoucherRecord).all()
-    
-    # Prepare data for export
-    export_data = []
-    for v in vouchers:
-        export_data.append({
-            "voucher_id": v.voucher_id,
-            "supplier_id": v.supplier_id,
-            "supplier_name": v.supplier_name,
-            "lei": v.lei,
-            "product_cn_code": v.product_cn_code,
-            "reporting_period": f"{v.reporting_period_start} to {v.reporting_period_end}",
-            "total_emissions_tco2e": v.total_emissions_tco2e,
-            "compliance_status": v.compliance_status,
-            "completeness_score": v.completeness_score,
-            "data_quality_score": v.data_quality_score,
-            "submission_timestamp": v.submission_timestamp.isoformat() if v.submission_timestamp else None,
-            "last_validated": v.last_validated.isoformat() if v.last_validated else None,
-            "validated_by": v.validated_by
-        })
-    
-    if format == "json":
-        return export_data
-    
-    # Convert to DataFrame for Excel/CSV export
-    df = pd.DataFrame(export_data)
-    
     if format == "csv":
-        output = df.to_csv(index=False)
         return StreamingResponse(
-            iter([output]),
+            stream_csv(iter_export_chunks(admin_session)),
             media_type="text/csv",
             headers={"Content-Disposition": "attachment; filename=compliance_report.csv"}
         )
     
-    else:  # xlsx
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            df.to_excel(writer, sheet_name='Compliance Report', index=False)
-            
-            # Add formatting
-            workbook = writer.book
-            worksheet = writer.sheets['Compliance Report']
-            
-            # Conditional formatting for compliance status
-            format_compliant = workbook.add_format({'bg_color': '#C6EFCE', 'font_color': '#006100'})
-            format_partial = workbook.add_format({'bg_color': '#FFEB9C', 'font_color': '#9C5700'})
-            format_non_compliant = workbook.add_format({'bg_color': '#FFC7CE', 'font_color': '#9C0006'})
-            
-            # Apply conditional formatting
-            worksheet.conditional_format(f'H2:H{len(df)+1}', {
-                'type': 'text',
-                'criteria': 'containing',
-                'value': 'compliant',
-                'format': format_compliant
-            })
-        
-        output.seek(0)
+    if format == "ndjson":
         return StreamingResponse(
-            io.BytesIO(output.read()),
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": "attachment; filename=compliance_report.xlsx"}
+            stream_ndjson(iter_export_chunks(admin_session)),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": "attachment; filename=compliance_report.ndjson"}
         )
+    
+    if format == "json":
+        return StreamingResponse(stream_json_array(iter_export_chunks(admin_session)), media_type="application/json")
+    
+    # xlsx: rows are spooled to a temporary workbook, which is streamed and then deleted
+    if not XLSXWRITER_AVAILABLE:
+        raise HTTPException(status_code=501, detail="XLSX export requires the xlsxwriter package")
+    
+    fd, path = tempfile.mkstemp(suffix=".xlsx", prefix="compliance_report_")
+    os.close(fd)
+    try:
+        await run_in_threadpool(write_xlsx_report, path, iter_export_chunks(admin_session))
+    except Exception:
+        os.unlink(path)
+        raise
+    
+    return FileResponse(
+        path,
+        media_type=XLSX_MEDIA_TYPE,
+        filename="compliance_report.xlsx",
+        background=BackgroundTask(os.unlink, path),
+    )
+
+
+# Recent bulk import jobs, polled through /import/jobs/{job_id}
+import_jobs = ImportJobRegistry()
+
 
+def _record_imported_stats(db: Session, inserted: List[Any]) -> None:
+    deltas: Dict[str, List[float]] = {}
+    for status_value, completeness in inserted:
+        delta = deltas.setdefault(status_key(status_value), [0, 0.0, 0])
+        delta[0] += 1
+        if completeness is not None:
+            delta[1] += completeness
+            delta[2] += 1
+    apply_stats_deltas(db, deltas)
 
-@router.post("/import/vouchers")
+
+def _run_import_job(job: ImportJob, voucher_dir: Path, username: str, workers: Optional[int]) -> None:
+    run_import(
+        job,
+        iter_voucher_files(voucher_dir),
+        admin_session,
+        VoucherRecord.__table__,
+        workers=workers,
+        on_inserted=_record_imported_stats,
+    )
+    
+    # Log import
+    audit_logger.info(
+        f"Batch import {job.status} - Job: {job.job_id}, Imported: {job.imported}, "
+        f"Skipped: {job.skipped}, Errors: {job.error_count}",
+        extra={"user": username, "action": "BATCH_IMPORT"}
+    )
+
+
+@router.post("/import/vouchers", status_code=status.HTTP_202_ACCEPTED)
 async def import_vouchers_batch(
+    request: Request,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    workers: Optional[int] = Query(None, ge=0, le=64, description="Parser processes; 0 parses in-process"),
     current_user: Dict = Depends(authenticate_user)
 ):
     """
     Import vouchers from filesystem and validate
-    Supports both JSON and XML formats
+    Supports both JSON and XML formats; runs as a background job
     """
     if "admin" not in current_user["roles"]:
         raise HTTPException(status_code=403, detail="Admin role required")
     
     voucher_dir = Path("data/vouchers")
-    imported_count = 0
-    errors = []
-    
-    for filename in voucher_dir.iterdir():
-        if filename.suffix in [".json", ".xml"]:
-            try:
-                # Load voucher data
-                if filename.suffix == ".json":
-                    with open(filename) as f:
-                        data = json.load(f)
-                else:  # XML
-                    # Parse XML to dict (simplified)
-                    tree = ET.parse(filename)
-                    data = xml_to_dict(tree.getroot())
-                
-                # Check if already exists
-                existing = db.query(VoucherRecord).filter(
-                    VoucherRecord.voucher_id == data.get("voucher_id")
-                ).first()
-                
-                if existing:
-                    continue
-                
-                # Validate
-                validator = VoucherValidator()
-                validation_result = validator.validate_voucher(data)
-                
-                # Create record
-                voucher = VoucherRecord(
-                    voucher_id=data.get("voucher_id", f"UNKNOWN_{filename.stem}"),
-                    filename=str(filename),
-                    format=filename.suffix[1:],
-                    supplier_id=data.get("supplier_id"),
-                    supplier_name=data.get("supplier_name"),
-                    lei=data.get("lei") or data.get("legal_entity_identifier"),
-                    product_cn_code=data.get("product_cn_code"),
-                    reporting_period_start=data.get("reporting_period_start"),
-                    reporting_period_end=data.get("reporting_period_end"),
-                    total_emissions_tco2e=float(data.get("total_emissions_tco2e", 0)),
-                    compliance_status=validation_result["compliance_status"],
-                    data_quality_score=data.get("data_quality_rating"),
-                    validation_flags=validation_result["validation_flags"],
-                    missing_fields=validation_result["missing_fields"],
-                    completeness_score=validation_result["completeness_score"],
-                    calculation_hash=data.get("calculation_hash"),
-                    raw_data=data
-                )
-                
-                db.add(voucher)
-                imported_count += 1
-                
-            except Exception as e:
-                errors.append(f"{filename.name}: {str(e)}")
-    
-    db.commit()
-    
-    # Log import
-    audit_logger.info(
-        f"Batch import completed - Imported: {imported_count}, Errors: {len(errors)}",
-        extra={"user": current_user["username"], "action": "BATCH_IMPORT"}
-    )
+    job = import_jobs.create(source=str(voucher_dir))
+    background_tasks.add_task(_run_import_job, job, voucher_dir, current_user["username"], workers)
     
     return {
-        "status": "success",
-        "imported": imported_count,
-        "errors": errors
+        "status": "accepted",
+        "job_id": job.job_id,
+        "status_url": str(request.url_for("get_import_job", job_id=job.job_id)),
     }
 
 
-# ============================================================================
-# UTILITY FUNCTIONS
-# ============================================================================
-
-def xml_to_dict(element) -> Dict[str, Any]:
-    """Convert XML element to dictionary (simplified)"""
-    result = {}
-    
-    # Add attributes
-    if element.attrib:
-        result.update(element.attrib)
-    
-    # Add text content
-    if element.text and element.text.strip():
-        if len(element) == 0:  # No children
-            return element.text.strip()
-        else:
-            result['_text'] = element.text.strip()
-    
-    # Add children
-    for child in element:
-        child_data = xml_to_dict(child)
-        if child.tag in result:
-            # Convert to list if multiple children with same tag
-            if not isinstance(result[child.tag], list):
-                result[child.tag] = [result[child.tag]]
-            result[child.tag].append(child_data)
-        else:
-            result[child.tag] = child_data
-    
-    return result
+@router.get("/import/jobs/{job_id}")
+async def get_import_job(
+    job_id: str,
+    current_user: Dict = Depends(authenticate_user)
+):
+    """Progress of a bulk import job"""
+    job = import_jobs.get(job_id)
+    if not isinstance(job, ImportJob):
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job.to_dict()
 
 
 # ============================================================================
@@ -890,7 +604,7 @@ def xml_to_dict(element) -> Dict[str, Any]:
 @router.on_event("startup")
 async def startup_event():
     """Initialize database and create tables"""
-    create_tables()
+    await run_in_threadpool(admin_database().migrate)
     
     # Create log directory if not exists
     Path("logs").mkdir(exist_ok=True)
@@ -923,21 +637,4 @@ class VoucherBatchImport(BaseModel):
 
 admin_router = router
 # Export the router for main.py
-__all__ = ["router"]
-from fastapi.responses import HTMLResponse
-
-@router.get("/", response_class=HTMLResponse)
-async def admin_home(
-    request: Request,
-    db: Session = Depends(get_db),
-    current_user: Dict = Depends(authenticate_user)
-):
-    vouchers = db.query(VoucherRecord).order_by(VoucherRecord.submission_timestamp.desc()).limit(50).all()
-    return templates.TemplateResponse("admin_dashboard.html", {
-        "request": request,
-        "user": current_user,
-        "vouchers": vouchers,
-        "total_count": db.query(VoucherRecord).count()
-    })
-
-admin_router = router
\ No newline at end of file
+__all__ = ["router"]
\ No newline at end of file
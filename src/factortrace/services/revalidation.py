@@ -0,0 +1,165 @@
+"""
+Bulk voucher revalidation
+─────────────────────────
+Re-runs the compiled VoucherValidator plan over the whole vouchers table
+after a rules change. Rows are read in primary-key order, one keyset batch
+per transaction, and only rows whose status columns changed are written
+back, as batched executemany UPDATEs grouped by the set of changed columns.
+"""
+
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from sqlalchemy import Table, bindparam, select, update
+
+from factortrace.services.validator import VoucherValidator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_RECORDED_ERRORS = 1000
+
+# (removed, added) pairs of (compliance_status, completeness_score) for rows that changed
+StatusChange = Tuple[Tuple[Any, Any], Tuple[Any, Any]]
+
+
+@dataclass
+class RevalidationJob:
+    """Progress of one bulk revalidation"""
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    source: str = "vouchers"
+    status: str = "queued"  # queued, running, completed, failed
+    processed: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    error_count: int = 0
+    errors: List[str] = field(default_factory=list)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    def record_error(self, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_RECORDED_ERRORS:
+            self.errors.append(message)
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = None
+        if self.started_at:
+            elapsed = ((self.finished_at or datetime.utcnow()) - self.started_at).total_seconds()
+        return {
+            "job_id": self.job_id,
+            "source": self.source,
+            "status": self.status,
+            "processed": self.processed,
+            "changed": self.changed,
+            "unchanged": self.unchanged,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "elapsed_seconds": elapsed,
+        }
+
+
+def _write_changes(db, table: Table, changes: Dict[FrozenSet[str], List[Dict[str, Any]]],
+                   validated_by: Optional[str]) -> None:
+    now = datetime.utcnow()
+    for columns, params in changes.items():
+        # bind names must not collide with the column names UPDATE binds implicitly
+        values = {column: bindparam(f"new_{column}") for column in columns}
+        values["last_validated"] = now
+        values["validated_by"] = validated_by
+        db.execute(update(table).where(table.c.id == bindparam("_id")).values(values), params)
+
+
+def revalidate_batch(
+    db,
+    table: Table,
+    validator: VoucherValidator,
+    after_id: int,
+    batch_size: int,
+    job: RevalidationJob,
+    validated_by: Optional[str] = None,
+) -> Tuple[Optional[int], List[StatusChange]]:
+    """Revalidate the next `batch_size` rows after `after_id`; returns (last id or None, status changes)"""
+    rows = db.execute(
+        select(
+            table.c.id,
+            table.c.voucher_id,
+            table.c.raw_data,
+            *(table.c[column] for column in validator.RESULT_COLUMNS),
+        )
+        .where(table.c.id > after_id)
+        .order_by(table.c.id)
+        .limit(batch_size)
+    ).mappings().all()
+    if not rows:
+        return None, []
+
+    changes: Dict[FrozenSet[str], List[Dict[str, Any]]] = {}
+    status_changes: List[StatusChange] = []
+    for row in rows:
+        try:
+            result = validator.validate_voucher(row["raw_data"] or {})
+        except Exception as e:
+            job.record_error(f"{row['voucher_id']}: {str(e)}")
+            continue
+        changed = validator.changed_columns(result, row)
+        if not changed:
+            job.unchanged += 1
+            continue
+        job.changed += 1
+        params = {f"new_{column}": value for column, value in changed.items()}
+        params["_id"] = row["id"]
+        changes.setdefault(frozenset(changed), []).append(params)
+        if "compliance_status" in changed or "completeness_score" in changed:
+            status_changes.append((
+                (row["compliance_status"], row["completeness_score"]),
+                (result["compliance_status"], result["completeness_score"]),
+            ))
+
+    _write_changes(db, table, changes, validated_by)
+    job.processed += len(rows)
+    return rows[-1]["id"], status_changes
+
+
+def run_revalidation(
+    job: RevalidationJob,
+    session_factory: Callable,
+    table: Table,
+    validator: Optional[VoucherValidator] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    validated_by: Optional[str] = None,
+    on_changed: Optional[Callable[[Any, List[StatusChange]], None]] = None,
+) -> RevalidationJob:
+    """
+    Revalidate every voucher in `table`, committing once per batch.
+
+    `on_changed(session, changes)` runs inside each batch's transaction with
+    the status/completeness transitions it wrote.
+    """
+    validator = validator or VoucherValidator()
+    job.status = "running"
+    job.started_at = datetime.utcnow()
+    try:
+        last_id = 0
+        while last_id is not None:
+            with session_factory() as db, db.begin():
+                last_id, status_changes = revalidate_batch(
+                    db, table, validator, last_id, batch_size, job, validated_by
+                )
+                if status_changes and on_changed is not None:
+                    on_changed(db, status_changes)
+        job.status = "completed"
+    except Exception as e:
+        logger.exception("Voucher revalidation %s failed", job.job_id)
+        job.record_error(f"Revalidation aborted: {e}")
+        job.status = "failed"
+    finally:
+        job.finished_at = datetime.utcnow()
+    return job
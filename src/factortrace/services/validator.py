@@ -0,0 +1,302 @@
+"""
+ESRS E1 / CBAM voucher validation
+──────────────────────────────────
+Compliance status, data-quality tiers and the VoucherValidator used by the
+admin viewer and the bulk import pipeline. Kept free of web and database
+imports so it can run inside import worker processes.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+from pydantic import BaseModel
+
+
+class ComplianceStatus(str, Enum):
+    """Overall compliance status per voucher"""
+    COMPLIANT = "compliant"
+    PARTIAL = "partial" 
+    NON_COMPLIANT = "non_compliant"
+    PENDING = "pending"
+
+
+class DataQualityTier(int, Enum):
+    """ESRS 1 §64 Data Quality Hierarchy"""
+    MEASURED_VERIFIED = 1
+    MEASURED_ASSURED = 2
+    CALCULATED_PRIMARY = 3
+    CALCULATED_ESTIMATED = 4
+    SUPPLIER_SPECIFIC = 5
+
+
+class ValidationFlag(BaseModel):
+    """Individual validation check result"""
+    field: str
+    requirement: str  # ESRS E1-6 §53, CBAM Art 35, etc.
+    status: bool
+    message: str
+    severity: str = "error"  # error, warning, info
+
+
+# ============================================================================
+# RULE PLAN
+# ============================================================================
+
+_END = ""  # marks the end of a prefix in a PrefixTrie node (never a CN digit)
+
+
+class PrefixTrie:
+    """Set of code prefixes; `matches` walks at most len(longest prefix) characters"""
+
+    def __init__(self, prefixes: Iterable[str] = ()):
+        self._root: Dict[str, Any] = {}
+        for prefix in prefixes:
+            self.add(prefix)
+
+    def add(self, prefix: str) -> None:
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[_END] = True
+
+    def matches(self, code: str) -> bool:
+        """True if any stored prefix is a prefix of `code`"""
+        node = self._root
+        for char in code:
+            if _END in node:
+                return True
+            node = node.get(char)
+            if node is None:
+                return False
+        return _END in node
+
+
+def _flag(field: str, requirement: str, message: str, severity: str, status: bool = False) -> Dict[str, Any]:
+    """A ValidationFlag as the plain dict stored in vouchers.validation_flags"""
+    return {
+        "field": field,
+        "requirement": requirement,
+        "status": status,
+        "message": message,
+        "severity": severity,
+    }
+
+
+@dataclass(frozen=True)
+class RulePlan:
+    """Validator tables compiled once per VoucherValidator class"""
+    esrs_required: Tuple[Tuple[str, str, str, str], ...]  # (field, requirement, missing msg, present msg)
+    cbam_required: Tuple[Tuple[str, str, str], ...]  # (field, requirement, missing msg)
+    cbam_prefixes: PrefixTrie
+    checks: Tuple[Callable[[Dict[str, Any], List[Dict[str, Any]]], None], ...]
+    total_fields: int
+
+
+# ============================================================================
+# ESRS/CBAM VALIDATION ENGINE
+# ============================================================================
+
+class VoucherValidator:
+    """Validates vouchers against ESRS E1 and CBAM requirements"""
+    
+    # ESRS E1-6 Mandatory fields per §53
+    ESRS_E1_MANDATORY = {
+        "reporting_undertaking_lei": "ESRS 2 §17 - Reporting entity LEI",
+        "scope": "ESRS E1-6 §44-53 - GHG Protocol scope",
+        "total_emissions_tco2e": "ESRS E1-6 §53 - Total GHG emissions",
+        "reporting_period_start": "ESRS E1-6 §46 - Reporting period",
+        "reporting_period_end": "ESRS E1-6 §46 - Reporting period",
+        "calculation_methodology": "ESRS E1-6 §54 - Methodology disclosure",
+        "data_quality_rating": "ESRS 1 §64 - Data quality assessment"
+    }
+    
+    # CBAM Annex III Requirements
+    CBAM_MANDATORY = {
+        "product_cn_code": "CBAM Annex III - Combined Nomenclature code",
+        "installation_id": "CBAM Art 35.2(a) - Installation identifier", 
+        "installation_country": "CBAM Art 35.2(b) - Country of origin",
+        "quantity": "CBAM Art 35.2(c) - Quantity of goods",
+        "direct_emissions": "CBAM Art 35.2(f) - Direct emissions",
+        "emission_factor_source": "CBAM Art 35.2(g) - Emission factor source"
+    }
+    
+    # CBAM Annex I goods by CN code prefix
+    # Simplified list - in production, use full CN code database
+    CBAM_CN_PREFIXES = ("72", "76", "25", "28", "29")  # Steel, Aluminum, Cement, Chemicals
+    
+    # ESRS E1-6 §53(b) GHG breakdown
+    GHG_TYPES = ["CO2", "CH4", "N2O", "HFCs", "PFCs", "SF6", "NF3"]
+    
+    LEI_FIELDS = ("reporting_undertaking_lei", "lei", "legal_entity_identifier")
+    
+    # Status columns written back by bulk revalidation
+    RESULT_COLUMNS = ("compliance_status", "validation_flags", "missing_fields", "completeness_score")
+    
+    def __init__(self, include_passing: bool = False):
+        """`include_passing` also emits the informational "Field present" flags"""
+        self.include_passing = include_passing
+        self.plan = self.compile_plan()
+    
+    @classmethod
+    def compile_plan(cls) -> RulePlan:
+        """Build (once per class) the tables and check sequence used by validate_voucher"""
+        plan = cls.__dict__.get("_plan")
+        if plan is None:
+            plan = RulePlan(
+                esrs_required=tuple(
+                    (field, requirement, f"Missing mandatory ESRS field: {field}", f"Field present: {field}")
+                    for field, requirement in cls.ESRS_E1_MANDATORY.items()
+                ),
+                cbam_required=tuple(
+                    (field, requirement, f"Missing CBAM mandatory field: {field}")
+                    for field, requirement in cls.CBAM_MANDATORY.items()
+                ),
+                cbam_prefixes=PrefixTrie(cls.CBAM_CN_PREFIXES),
+                checks=(
+                    cls._validate_data_quality,
+                    cls._validate_ghg_breakdown,
+                    cls._validate_temporal_data,
+                    cls._validate_lei_format,
+                ),
+                total_fields=len(cls.ESRS_E1_MANDATORY) + len(cls.CBAM_MANDATORY),
+            )
+            cls._plan = plan
+        return plan
+    
+    def validate_voucher(self, voucher_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Comprehensive validation against ESRS E1 and CBAM requirements
+        Returns validation summary with flags and completeness metrics
+        """
+        plan = self.plan
+        flags: List[Dict[str, Any]] = []
+        missing_fields: List[str] = []
+        
+        # Check ESRS E1 mandatory fields
+        for field, requirement, missing_message, present_message in plan.esrs_required:
+            if not voucher_data.get(field):
+                flags.append(_flag(field, requirement, missing_message, "error"))
+                missing_fields.append(field)
+            elif self.include_passing:
+                flags.append(_flag(field, requirement, present_message, "info", status=True))
+        
+        # Check CBAM requirements if applicable
+        if self._is_cbam_product(voucher_data.get("product_cn_code", "")):
+            for field, requirement, missing_message in plan.cbam_required:
+                if not voucher_data.get(field):
+                    flags.append(_flag(field, requirement, missing_message, "error"))
+                    if field not in missing_fields:
+                        missing_fields.append(field)
+        
+        # Data quality, GHG breakdown, temporal consistency, LEI format
+        for check in plan.checks:
+            check(voucher_data, flags)
+        
+        # Calculate completeness score
+        completeness = ((plan.total_fields - len(missing_fields)) / plan.total_fields) * 100
+        
+        # Determine overall compliance status
+        error_count = 0
+        warning_count = 0
+        for flag in flags:
+            if flag["severity"] == "error":
+                error_count += 1
+            elif flag["severity"] == "warning":
+                warning_count += 1
+        if error_count == 0:
+            status = ComplianceStatus.COMPLIANT
+        elif error_count < 3:
+            status = ComplianceStatus.PARTIAL
+        else:
+            status = ComplianceStatus.NON_COMPLIANT
+        
+        return {
+            "compliance_status": status,
+            "validation_flags": flags,
+            "missing_fields": missing_fields,
+            "completeness_score": round(completeness, 2),
+            "error_count": error_count,
+            "warning_count": warning_count
+        }
+    
+    def validate_many(self, vouchers: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Validate a stream of vouchers with one compiled plan"""
+        validate = self.validate_voucher
+        for voucher_data in vouchers:
+            yield validate(voucher_data)
+    
+    def _is_cbam_product(self, cn_code: str) -> bool:
+        """Check if CN code is CBAM-covered (Annex I goods)"""
+        if not cn_code:
+            return False
+        return self.plan.cbam_prefixes.matches(cn_code)
+    
+    @staticmethod
+    def _validate_data_quality(data: Dict[str, Any], flags: List[Dict[str, Any]]):
+        """Validate data quality tier per ESRS 1 §64"""
+        quality = data.get("data_quality_rating")
+        if not quality:
+            flags.append(_flag("data_quality_rating", "ESRS 1 §64", "Data quality rating missing", "error"))
+        elif not isinstance(quality, int) or quality < 1 or quality > 5:
+            flags.append(_flag(
+                "data_quality_rating", "ESRS 1 §64",
+                f"Invalid data quality rating: {quality} (must be 1-5)", "error"
+            ))
+    
+    @staticmethod
+    def _validate_ghg_breakdown(data: Dict[str, Any], flags: List[Dict[str, Any]]):
+        """Check GHG breakdown per ESRS E1-6 §53(b)"""
+        ghg_data = data.get("ghg_breakdown", {})
+        if not ghg_data:
+            flags.append(_flag("ghg_breakdown", "ESRS E1-6 §53(b)", "Missing GHG breakdown by gas type", "warning"))
+        else:
+            # Check if total matches sum of components
+            total = data.get("total_emissions_tco2e", 0)
+            sum_components = sum(ghg_data.values())
+            if abs(total - sum_components) > 0.01:
+                flags.append(_flag(
+                    "ghg_breakdown", "ESRS E1-6 §53(b)",
+                    f"GHG breakdown sum ({sum_components}) doesn't match total ({total})", "error"
+                ))
+    
+    @staticmethod
+    def _validate_temporal_data(data: Dict[str, Any], flags: List[Dict[str, Any]]):
+        """Validate temporal consistency"""
+        start = data.get("reporting_period_start")
+        end = data.get("reporting_period_end")
+        
+        if start and end:
+            try:
+                start_date = datetime.fromisoformat(start).date()
+                end_date = datetime.fromisoformat(end).date()
+            except ValueError:
+                flags.append(_flag("reporting_period", "ESRS 1 §77", "Invalid date format (use YYYY-MM-DD)", "error"))
+                return
+            
+            if end_date < start_date:
+                flags.append(_flag("reporting_period", "ESRS 1 §77", "End date before start date", "error"))
+            
+            # Check if period is reasonable (not more than 1 year)
+            if (end_date - start_date).days > 366:
+                flags.append(_flag("reporting_period", "ESRS 1 §77", "Reporting period exceeds one year", "warning"))
+    
+    @classmethod
+    def _validate_lei_format(cls, data: Dict[str, Any], flags: List[Dict[str, Any]]):
+        """Validate LEI format per ISO 17442"""
+        for field in cls.LEI_FIELDS:
+            lei = data.get(field)
+            if lei and (len(lei) != 20 or not lei[:4].isalpha()):
+                flags.append(_flag(field, "ISO 17442", f"Invalid LEI format: {lei}", "warning"))
+    
+    def changed_columns(self, result: Dict[str, Any], stored: Dict[str, Any]) -> Dict[str, Any]:
+        """The RESULT_COLUMNS whose new value differs from the `stored` row"""
+        changes = {}
+        for column in self.RESULT_COLUMNS:
+            value = result[column]
+            if isinstance(value, Enum):
+                value = value.value
+            if value != stored.get(column):
+                changes[column] = value
+        return changes
@@ -0,0 +1,288 @@
+"""
+Bulk voucher import pipeline
+────────────────────────────
+Parses and validates supplier voucher files in a process pool and writes
+them in chunked transactions:
+
+- XML files may hold one voucher or a batch; each voucher becomes a row
+- one ``IN`` lookup per chunk for voucher IDs that already exist
+- Core bulk ``INSERT ... ON CONFLICT DO NOTHING`` (SQLite / PostgreSQL)
+- progress tracked on an ImportJob that a status endpoint can poll
+
+Workers only parse and validate; all database writes happen in the
+coordinating thread, so SQLite sees a single writer.
+"""
+
+import json
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, insert, select
+
+from factortrace.services.validator import VoucherValidator
+from factortrace.services.voucher_xml_parser import iter_vouchers
+
+logger = logging.getLogger(__name__)
+
+VOUCHER_SUFFIXES = (".json", ".xml")
+DEFAULT_CHUNK_SIZE = 500
+MAX_RECORDED_ERRORS = 1000
+
+# ============================================================================
+# PARSING & VALIDATION (runs in worker processes)
+# ============================================================================
+
+def load_voucher_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Voucher dicts in a JSON or XML file. XML is streamed through
+    voucher_xml_parser, so one file may hold a whole batch of vouchers.
+    """
+    if path.suffix == ".json":
+        with open(path, "rb") as f:
+            yield json.load(f)
+        return
+    yield from iter_vouchers(path)
+
+
+def load_voucher_file(path: Path) -> Dict[str, Any]:
+    """Load a JSON or XML voucher file into a dict (the first voucher of an XML batch)"""
+    for data in load_voucher_records(path):
+        return data
+    raise ValueError(f"No voucher found in {path.name}")
+
+
+def build_voucher_row(
+    path: Path, data: Dict[str, Any], validator: VoucherValidator, index: int = 0
+) -> Dict[str, Any]:
+    """Validate `data` (the `index`-th voucher of its file) and map it onto the columns of the vouchers table"""
+    validation_result = validator.validate_voucher(data)
+    return {
+        "voucher_id": data.get("voucher_id", f"UNKNOWN_{path.stem}_{index}" if index else f"UNKNOWN_{path.stem}"),
+        "filename": str(path),
+        "format": path.suffix[1:],
+        "supplier_id": data.get("supplier_id"),
+        "supplier_name": data.get("supplier_name"),
+        "lei": data.get("lei") or data.get("legal_entity_identifier"),
+        "product_cn_code": data.get("product_cn_code"),
+        "reporting_period_start": data.get("reporting_period_start"),
+        "reporting_period_end": data.get("reporting_period_end"),
+        "total_emissions_tco2e": float(data.get("total_emissions_tco2e", 0)),
+        "compliance_status": validation_result["compliance_status"].value,
+        "data_quality_score": data.get("data_quality_rating"),
+        "validation_flags": validation_result["validation_flags"],
+        "missing_fields": validation_result["missing_fields"],
+        "completeness_score": validation_result["completeness_score"],
+        "calculation_hash": data.get("calculation_hash"),
+        "raw_data": data,
+    }
+
+
+def prepare_chunk(paths: Sequence[str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Parse and validate a chunk of files; returns (rows, errors)"""
+    validator = VoucherValidator()
+    rows: List[Dict[str, Any]] = []
+    errors: List[str] = []
+    for name in paths:
+        path = Path(name)
+        try:
+            for index, data in enumerate(load_voucher_records(path)):
+                rows.append(build_voucher_row(path, data, validator, index))
+        except Exception as e:
+            errors.append(f"{path.name}: {str(e)}")
+    return rows, errors
+
+
+# ============================================================================
+# JOB TRACKING
+# ============================================================================
+
+@dataclass
+class ImportJob:
+    """Progress of one bulk import, updated by the pipeline as chunks land"""
+    job_id: str
+    source: str
+    status: str = "queued"  # queued, running, completed, failed
+    total_files: int = 0
+    processed: int = 0
+    imported: int = 0
+    skipped: int = 0
+    error_count: int = 0
+    errors: List[str] = field(default_factory=list)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    def record_errors(self, errors: List[str]) -> None:
+        self.error_count += len(errors)
+        room = MAX_RECORDED_ERRORS - len(self.errors)
+        if room > 0:
+            self.errors.extend(errors[:room])
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = None
+        if self.started_at:
+            elapsed = ((self.finished_at or datetime.utcnow()) - self.started_at).total_seconds()
+        return {
+            "job_id": self.job_id,
+            "source": self.source,
+            "status": self.status,
+            "total_files": self.total_files,
+            "processed": self.processed,
+            "imported": self.imported,
+            "skipped": self.skipped,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "elapsed_seconds": elapsed,
+        }
+
+
+class ImportJobRegistry:
+    """In-process registry of recent import (and revalidation) jobs"""
+
+    def __init__(self, keep: int = 50):
+        self.keep = keep
+        self._jobs: Dict[str, ImportJob] = {}
+        self._lock = threading.Lock()
+
+    def create(self, source: str, factory: Callable[..., Any] = ImportJob) -> Any:
+        """Register a new job; `factory` builds it from job_id and source"""
+        job = factory(job_id=uuid.uuid4().hex, source=source)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            while len(self._jobs) > self.keep:
+                self._jobs.pop(next(iter(self._jobs)))
+        return job
+
+    def get(self, job_id: str) -> Optional[Any]:
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[Any]:
+        return list(self._jobs.values())
+
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+
+def iter_voucher_files(directory: Path) -> Iterator[str]:
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith(VOUCHER_SUFFIXES):
+                yield entry.path
+
+
+def _chunks(items: List[str], size: int) -> Iterator[List[str]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def insert_ignoring_duplicates(table: Table, dialect_name: str):
+    """INSERT that silently skips existing voucher_ids where the backend supports it"""
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return insert(table)
+    return dialect_insert(table).on_conflict_do_nothing(index_elements=["voucher_id"])
+
+
+def write_chunk(
+    session_factory: Callable,
+    table: Table,
+    rows: List[Dict[str, Any]],
+    on_inserted: Optional[Callable[[Any, List[Any]], None]] = None,
+) -> Tuple[int, int]:
+    """Insert the new rows of one chunk in a single transaction; returns (imported, skipped)"""
+    unique: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        unique.setdefault(row["voucher_id"], row)
+
+    with session_factory() as db, db.begin():
+        if unique:
+            existing = db.execute(
+                select(table.c.voucher_id).where(table.c.voucher_id.in_(list(unique)))
+            ).scalars().all()
+            for voucher_id in existing:
+                del unique[voucher_id]
+        if not unique:
+            return 0, len(rows)
+
+        stmt = insert_ignoring_duplicates(table, db.get_bind().dialect.name)
+        inserted = db.execute(
+            stmt.returning(table.c.compliance_status, table.c.completeness_score),
+            list(unique.values()),
+        ).all()
+        if on_inserted is not None:
+            on_inserted(db, inserted)
+    return len(inserted), len(rows) - len(inserted)
+
+
+def run_import(
+    job: ImportJob,
+    paths: Iterable[str],
+    session_factory: Callable,
+    table: Table,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_inserted: Optional[Callable[[Any, List[Any]], None]] = None,
+) -> ImportJob:
+    """
+    Import `paths` into `table`, updating `job` as each chunk commits.
+
+    `workers=0` parses in the calling process; `None` uses one worker per CPU.
+    At most two chunks per worker are submitted ahead of the writer, so memory
+    follows the chunk size rather than the size of the import.
+    `on_inserted(session, rows)` runs inside each chunk's transaction with the
+    (compliance_status, completeness_score) of the rows actually inserted.
+    """
+    job.status = "running"
+    job.started_at = datetime.utcnow()
+    try:
+        files = sorted(paths)
+        job.total_files = len(files)
+        chunks = list(_chunks(files, chunk_size))
+
+        def land(chunk_len: int, rows: List[Dict[str, Any]], errors: List[str]) -> None:
+            imported, skipped = write_chunk(session_factory, table, rows, on_inserted)
+            job.imported += imported
+            job.skipped += skipped
+            job.record_errors(errors)
+            job.processed += chunk_len
+
+        if workers == 0 or len(chunks) <= 1:
+            for chunk in chunks:
+                land(len(chunk), *prepare_chunk(chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                max_pending = 2 * pool._max_workers
+                queued = iter(chunks)
+                pending: Dict[Future, int] = {}
+                while True:
+                    for chunk in islice(queued, max_pending - len(pending)):
+                        pending[pool.submit(prepare_chunk, chunk)] = len(chunk)
+                    if not pending:
+                        break
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        land(pending.pop(future), *future.result())
+
+        job.status = "completed"
+    except Exception as e:
+        logger.exception("Voucher import %s failed", job.job_id)
+        job.record_errors([f"Import aborted: {e}"])
+        job.status = "failed"
+    finally:
+        job.finished_at = datetime.utcnow()
+    return job
@@ -0,0 +1,461 @@
+"""
+Admin voucher store
+───────────────────
+ORM tables behind the admin dashboard and the queries it serves from them:
+the supplier search index (FTS5 on SQLite, LIKE elsewhere), the per-status
+summary table kept current by incremental deltas, and keyset pagination
+cursors over (sort column, id). Compliance exports stream from the same
+tables in fixed-size chunks as CSV, NDJSON, a JSON array or an XLSX workbook.
+
+Nothing here touches the web layer or opens an engine, so the store can be
+migrated, queried and tested against any bind.
+"""
+
+import base64
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    String,
+    and_,
+    func,
+    or_,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, declarative_base
+
+from factortrace.services.validator import ComplianceStatus
+
+Base = declarative_base()
+
+# Dashboard sort options; each has a composite (column, id) index
+SORT_COLUMNS = ("submission_timestamp", "compliance_status", "completeness_score", "supplier_name")
+
+
+# ============================================================================
+# MODELS
+# ============================================================================
+
+class VoucherRecord(Base):
+    """Database model for vouchers with compliance tracking"""
+    __tablename__ = "vouchers"
+    __table_args__ = (
+        # One composite index per dashboard sort option; the trailing id makes
+        # (sort value, id) a unique keyset for pagination
+        Index("ix_vouchers_submitted_id", "submission_timestamp", "id"),
+        Index("ix_vouchers_status_submitted_id", "compliance_status", "submission_timestamp", "id"),
+        Index("ix_vouchers_completeness_id", "completeness_score", "id"),
+        Index("ix_vouchers_supplier_name_id", "supplier_name", "id"),
+        {'extend_existing': True},
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    voucher_id = Column(String, unique=True, index=True)
+    filename = Column(String)
+    format = Column(String)  # json or xml
+
+    # Core data
+    supplier_id = Column(String, index=True)
+    supplier_name = Column(String)
+    lei = Column(String, index=True)
+    product_cn_code = Column(String, index=True)
+    reporting_period_start = Column(String)
+    reporting_period_end = Column(String)
+    total_emissions_tco2e = Column(Float)
+
+    # Compliance tracking
+    compliance_status = Column(String, default="pending")
+    data_quality_score = Column(Integer)
+    validation_flags = Column(JSON)  # List of ValidationFlag dicts
+    missing_fields = Column(JSON)  # List of missing ESRS/CBAM fields
+    completeness_score = Column(Float)  # 0-100%
+
+    # Audit fields
+    submission_timestamp = Column(DateTime, default=datetime.utcnow)
+    last_validated = Column(DateTime)
+    validated_by = Column(String)
+    calculation_hash = Column(String)
+
+    # Full voucher data
+    raw_data = Column(JSON)
+
+
+class VoucherSummaryStats(Base):
+    """Per-status running totals behind the dashboard header"""
+    __tablename__ = "voucher_summary_stats"
+    __table_args__ = {'extend_existing': True}
+
+    compliance_status = Column(String, primary_key=True)
+    voucher_count = Column(Integer, nullable=False, default=0)
+    completeness_sum = Column(Float, nullable=False, default=0.0)
+    completeness_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+# Supplier search: external-content FTS5 table over vouchers.supplier_name,
+# kept in sync by triggers (SQLite only; other backends fall back to LIKE)
+SUPPLIER_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS vouchers_fts USING fts5("
+    "supplier_name, content='vouchers', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS vouchers_fts_ai AFTER INSERT ON vouchers BEGIN "
+    "INSERT INTO vouchers_fts(rowid, supplier_name) VALUES (new.id, new.supplier_name); END",
+    "CREATE TRIGGER IF NOT EXISTS vouchers_fts_ad AFTER DELETE ON vouchers BEGIN "
+    "INSERT INTO vouchers_fts(vouchers_fts, rowid, supplier_name) VALUES ('delete', old.id, old.supplier_name); END",
+    "CREATE TRIGGER IF NOT EXISTS vouchers_fts_au AFTER UPDATE OF supplier_name ON vouchers BEGIN "
+    "INSERT INTO vouchers_fts(vouchers_fts, rowid, supplier_name) VALUES ('delete', old.id, old.supplier_name); "
+    "INSERT INTO vouchers_fts(rowid, supplier_name) VALUES (new.id, new.supplier_name); END",
+)
+
+
+# ============================================================================
+# SCHEMA
+# ============================================================================
+
+def create_tables(bind: Engine) -> None:
+    """Create database tables, dashboard indexes, search index and summary stats"""
+    Base.metadata.create_all(bind=bind)
+    # create_all skips indexes on tables that already exist
+    for index in VoucherRecord.__table__.indexes:
+        index.create(bind=bind, checkfirst=True)
+    ensure_supplier_search(bind)
+
+    with Session(bind=bind) as db:
+        if db.query(VoucherSummaryStats).first() is None:
+            refresh_summary_stats(db)
+            db.commit()
+
+
+def supports_supplier_fts(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def ensure_supplier_search(bind) -> None:
+    """Create the FTS5 supplier index and its triggers, backfilling it once"""
+    if not supports_supplier_fts(bind):
+        return
+    with bind.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'vouchers_fts'")
+        ).first()
+        for ddl in SUPPLIER_FTS_DDL:
+            conn.execute(text(ddl))
+        if not exists:
+            conn.execute(text("INSERT INTO vouchers_fts(vouchers_fts) VALUES ('rebuild')"))
+
+
+def _fts_query(term: str) -> str:
+    """Prefix-match every word of `term`, quoted so FTS5 syntax is never interpreted"""
+    words = [w.replace('"', '""') for w in term.split()]
+    return " ".join(f'"{w}"*' for w in words)
+
+
+def supplier_filter(bind, term: str):
+    """WHERE clause matching vouchers whose supplier name matches `term`"""
+    if supports_supplier_fts(bind):
+        match = text("SELECT rowid FROM vouchers_fts WHERE vouchers_fts MATCH :q").bindparams(q=_fts_query(term))
+        return VoucherRecord.id.in_(match.columns(rowid=Integer))
+    return VoucherRecord.supplier_name.ilike(f"%{term}%")
+
+
+# ============================================================================
+# SUMMARY STATISTICS
+# ============================================================================
+
+def refresh_summary_stats(db: Session) -> None:
+    """Rebuild the summary table from a single GROUP BY over vouchers"""
+    rows = db.execute(
+        select(
+            VoucherRecord.compliance_status,
+            func.count(VoucherRecord.id),
+            func.coalesce(func.sum(VoucherRecord.completeness_score), 0.0),
+            func.count(VoucherRecord.completeness_score),
+        ).group_by(VoucherRecord.compliance_status)
+    ).all()
+
+    db.query(VoucherSummaryStats).delete()
+    now = datetime.utcnow()
+    for status_value, count, completeness_sum, completeness_count in rows:
+        db.add(VoucherSummaryStats(
+            compliance_status=status_key(status_value),
+            voucher_count=count,
+            completeness_sum=completeness_sum,
+            completeness_count=completeness_count,
+            updated_at=now,
+        ))
+    db.flush()
+
+
+def status_key(value: Any) -> str:
+    """Summary-table key for a compliance status (enum, string or NULL)"""
+    if isinstance(value, Enum):
+        return value.value
+    return value or ComplianceStatus.PENDING.value
+
+
+def record_stats_change(
+    db: Session,
+    added: Optional[tuple] = None,
+    removed: Optional[tuple] = None,
+) -> None:
+    """
+    Apply one voucher's contribution to the summary table.
+
+    `added` / `removed` are (compliance_status, completeness_score) pairs;
+    revalidation passes both, import only `added`.
+    """
+    deltas: Dict[str, List[float]] = {}
+    for sign, entry in ((1, added), (-1, removed)):
+        if entry is None:
+            continue
+        status_value, completeness = entry
+        delta = deltas.setdefault(status_key(status_value), [0, 0.0, 0])
+        delta[0] += sign
+        if completeness is not None:
+            delta[1] += sign * completeness
+            delta[2] += sign
+    apply_stats_deltas(db, deltas)
+
+
+def apply_stats_deltas(db: Session, deltas: Dict[str, List[float]]) -> None:
+    """Add {status: [count, completeness_sum, completeness_count]} to the summary table"""
+    now = datetime.utcnow()
+    for status_value, (count, completeness_sum, completeness_count) in deltas.items():
+        if not (count or completeness_sum or completeness_count):
+            continue
+        result = db.execute(
+            update(VoucherSummaryStats)
+            .where(VoucherSummaryStats.compliance_status == status_value)
+            .values(
+                voucher_count=VoucherSummaryStats.voucher_count + count,
+                completeness_sum=VoucherSummaryStats.completeness_sum + completeness_sum,
+                completeness_count=VoucherSummaryStats.completeness_count + completeness_count,
+                updated_at=now,
+            )
+        )
+        if result.rowcount == 0:
+            db.add(VoucherSummaryStats(
+                compliance_status=status_value,
+                voucher_count=count,
+                completeness_sum=completeness_sum,
+                completeness_count=completeness_count,
+                updated_at=now,
+            ))
+            db.flush()
+
+
+def dashboard_stats(db: Session) -> Dict[str, Any]:
+    """Header statistics read from the summary table (one row per status)"""
+    by_status = {row.compliance_status: row for row in db.query(VoucherSummaryStats).all()}
+    completeness_sum = sum(row.completeness_sum for row in by_status.values())
+    completeness_count = sum(row.completeness_count for row in by_status.values())
+
+    def count(status_value: ComplianceStatus) -> int:
+        row = by_status.get(status_value.value)
+        return row.voucher_count if row else 0
+
+    return {
+        "total_vouchers": sum(row.voucher_count for row in by_status.values()),
+        "by_status": {key: row.voucher_count for key, row in by_status.items() if row.voucher_count},
+        "compliant": count(ComplianceStatus.COMPLIANT),
+        "non_compliant": count(ComplianceStatus.NON_COMPLIANT),
+        "average_completeness": round(completeness_sum / completeness_count, 2) if completeness_count else 0,
+    }
+
+
+# ============================================================================
+# KEYSET PAGINATION
+# ============================================================================
+
+def encode_cursor(value: Any, row_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str) -> tuple:
+    """(sort value, id) from an encode_cursor string; ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, row_id = json.loads(raw)
+        if sort_by == "submission_timestamp" and value is not None:
+            value = datetime.fromisoformat(value)
+        return value, int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid pagination cursor")
+
+
+def keyset_order(sort_by: str, sort_order: str) -> list:
+    """ORDER BY for (sort column, id); NULLs sort lowest on every backend, as SQLite does"""
+    column = getattr(VoucherRecord, sort_by)
+    if sort_order == "desc":
+        return [column.desc().nulls_last(), VoucherRecord.id.desc()]
+    return [column.asc().nulls_first(), VoucherRecord.id.asc()]
+
+
+def keyset_after(sort_by: str, sort_order: str, value: Any, row_id: int):
+    """WHERE clause selecting the rows that follow (value, row_id) in keyset_order"""
+    column = getattr(VoucherRecord, sort_by)
+    if sort_order == "desc":
+        if value is None:
+            return and_(column.is_(None), VoucherRecord.id < row_id)
+        return or_(
+            column < value,
+            and_(column == value, VoucherRecord.id < row_id),
+            column.is_(None),
+        )
+    if value is None:
+        return or_(and_(column.is_(None), VoucherRecord.id > row_id), column.is_not(None))
+    return or_(column > value, and_(column == value, VoucherRecord.id > row_id))
+
+
+# ============================================================================
+# COMPLIANCE EXPORT
+# ============================================================================
+
+# Exported columns, in spreadsheet order
+EXPORT_COLUMNS = (
+    "voucher_id",
+    "supplier_id",
+    "supplier_name",
+    "lei",
+    "product_cn_code",
+    "reporting_period",
+    "total_emissions_tco2e",
+    "compliance_status",
+    "completeness_score",
+    "data_quality_score",
+    "submission_timestamp",
+    "last_validated",
+    "validated_by",
+)
+EXPORT_CHUNK_SIZE = 1000
+
+
+def _export_select():
+    """Only the columns the report needs; raw_data and validation_flags are never loaded"""
+    return select(
+        VoucherRecord.voucher_id,
+        VoucherRecord.supplier_id,
+        VoucherRecord.supplier_name,
+        VoucherRecord.lei,
+        VoucherRecord.product_cn_code,
+        VoucherRecord.reporting_period_start,
+        VoucherRecord.reporting_period_end,
+        VoucherRecord.total_emissions_tco2e,
+        VoucherRecord.compliance_status,
+        VoucherRecord.completeness_score,
+        VoucherRecord.data_quality_score,
+        VoucherRecord.submission_timestamp,
+        VoucherRecord.last_validated,
+        VoucherRecord.validated_by,
+    ).order_by(VoucherRecord.id)
+
+
+def _export_row(row) -> tuple:
+    return (
+        row.voucher_id,
+        row.supplier_id,
+        row.supplier_name,
+        row.lei,
+        row.product_cn_code,
+        f"{row.reporting_period_start} to {row.reporting_period_end}",
+        row.total_emissions_tco2e,
+        row.compliance_status,
+        row.completeness_score,
+        row.data_quality_score,
+        row.submission_timestamp.isoformat() if row.submission_timestamp else None,
+        row.last_validated.isoformat() if row.last_validated else None,
+        row.validated_by,
+    )
+
+
+def iter_export_chunks(
+    session_factory: Callable[[], Session],
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[List[tuple]]:
+    """
+    Yield export rows `chunk_size` at a time, fetched with yield_per.
+
+    Uses its own session: the response body is produced after the
+    request-scoped session may already be closed.
+    """
+    with session_factory() as db:
+        result = db.execute(_export_select().execution_options(yield_per=chunk_size))
+        for partition in result.partitions():
+            yield [_export_row(row) for row in partition]
+
+
+def stream_csv(chunks: Iterator[List[tuple]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for chunk in chunks:
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_ndjson(chunks: Iterator[List[tuple]]) -> Iterator[str]:
+    for chunk in chunks:
+        yield "".join(json.dumps(dict(zip(EXPORT_COLUMNS, row))) + "\n" for row in chunk)
+
+
+def stream_json_array(chunks: Iterator[List[tuple]]) -> Iterator[str]:
+    yield "["
+    separator = ""
+    for chunk in chunks:
+        yield separator + ",".join(json.dumps(dict(zip(EXPORT_COLUMNS, row))) for row in chunk)
+        separator = ","
+    yield "]"
+
+
+def write_xlsx_report(path: str, chunks: Iterator[List[tuple]]) -> int:
+    """Write the report with xlsxwriter's constant-memory mode; returns the row count"""
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    worksheet = workbook.add_worksheet("Compliance Report")
+
+    # constant_memory flushes each row once the next starts, so rows go strictly in order
+    worksheet.write_row(0, 0, EXPORT_COLUMNS)
+    row_count = 0
+    for chunk in chunks:
+        for row in chunk:
+            row_count += 1
+            worksheet.write_row(row_count, 0, row)
+
+    # Conditional formatting for compliance status
+    status_column = EXPORT_COLUMNS.index("compliance_status")
+    formats = {
+        ComplianceStatus.COMPLIANT: {'bg_color': '#C6EFCE', 'font_color': '#006100'},
+        ComplianceStatus.PARTIAL: {'bg_color': '#FFEB9C', 'font_color': '#9C5700'},
+        ComplianceStatus.NON_COMPLIANT: {'bg_color': '#FFC7CE', 'font_color': '#9C0006'},
+    }
+    if row_count:
+        for status_value, cell_format in formats.items():
+            worksheet.conditional_format(1, status_column, row_count, status_column, {
+                'type': 'cell',
+                'criteria': '==',
+                'value': f'"{status_value.value}"',
+                'format': workbook.add_format(cell_format),
+            })
+
+    workbook.close()
+    return row_count
@@ -0,0 +1,370 @@
+"""
+Streaming voucher XML parser
+────────────────────────────
+Reads voucher XML straight into the flat field dicts that the import
+pipeline, the validator and VoucherRecord rows use:
+
+- the known formats (ESRS E1 v2/CBAM, ESRS E1 v1, flat Scope-3) are read
+  through the field paths of their export.voucher_plans writers, compiled
+  once into a trie of tags; anything else in a voucher is never visited
+- large files and streams go through ``lxml.etree.iterparse``, which only
+  reports voucher root elements; each one is read in a single walk and
+  then cleared, along with the already-read siblings, so a multi-voucher
+  batch parses in constant memory
+- numeric, integer and boolean fields are converted as they are read, so
+  records match the JSON import path
+
+A document with an unknown root falls back to one record of its leaf
+elements keyed by local name (without namespace). Such a document is read
+whole and must hold a single voucher: if its root repeats a child element
+that has children of its own, it is rejected with ValueError rather than
+merged into one record.
+"""
+
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from lxml import etree
+
+from export.voucher_plans import (
+    ESRS_V1_NAMESPACE,
+    ESRS_V2_NAMESPACE,
+    SCOPE3_NAMESPACE,
+    esrs_v1_spec,
+    esrs_v2_spec,
+    scope3_spec,
+)
+from export.xml_plan import field_paths, qualified_name
+
+Record = Dict[str, Any]
+Source = Union[str, Path, BinaryIO]
+
+# Files up to this size are parsed whole; larger files and streams go through iterparse
+WHOLE_DOCUMENT_BYTES = 1 << 20
+
+_XML_PARSER = etree.XMLParser(remove_comments=True, remove_pis=True, resolve_entities=False, no_network=True)
+
+FLOAT_FIELDS = frozenset({
+    "quantity", "monetary_value", "emission_factor_value", "total_emissions_tco2e", "embedded_emissions_direct",
+    "embedded_emissions_indirect", "direct_emissions", "indirect_emissions", "biogenic_emissions",
+    "carbon_price_paid", "uncertainty_lower", "uncertainty_upper", "activity_quantity", "cost", "emission_factor",
+    "total_co2e", "primary_data_percentage",
+})
+INT_FIELDS = frozenset({"data_quality_rating", "data_quality_score", "reporting_year"})
+BOOL_FIELDS = frozenset({"fallback_factor_used", "emission_factor_is_default"})
+
+
+def _to_float(text: str) -> Any:
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def _to_int(text: str) -> Any:
+    try:
+        return int(text)
+    except ValueError:
+        return text
+
+
+def _to_bool(text: str) -> Any:
+    lowered = text.lower()
+    if lowered in ("true", "1"):
+        return True
+    if lowered in ("false", "0"):
+        return False
+    return text
+
+
+def converter(field: str) -> Optional[Callable[[str], Any]]:
+    """Text conversion for a voucher field; None keeps the text as is"""
+    if field in FLOAT_FIELDS:
+        return _to_float
+    if field in INT_FIELDS:
+        return _to_int
+    if field in BOOL_FIELDS:
+        return _to_bool
+    return None
+
+
+def _local(tag: str) -> str:
+    return tag.rpartition("}")[2]
+
+
+# ============================================================================
+# PATH TRIE
+# ============================================================================
+
+class PathNode:
+    """One known element of a format: the fields it holds and its known children"""
+
+    __slots__ = ("children", "text_fields", "attr_fields", "collect")
+
+    def __init__(self):
+        self.children: Dict[str, "PathNode"] = {}
+        self.text_fields: List[Tuple[str, Optional[Callable[[str], Any]]]] = []
+        self.attr_fields: List[Tuple[str, str, Optional[Callable[[str], Any]]]] = []
+        self.collect: Optional[Callable[[Any, Record], None]] = None
+
+    def child(self, tag: str) -> "PathNode":
+        node = self.children.get(tag)
+        if node is None:
+            node = self.children[tag] = PathNode()
+            # Also match children written without a namespace
+            self.children.setdefault(_local(tag), node)
+        return node
+
+    def bind(self, attribute: Optional[str], field: str) -> None:
+        if attribute is None:
+            self.text_fields.append((field, converter(field)))
+        else:
+            self.attr_fields.append((attribute, field, converter(field)))
+
+
+def build_trie(
+    bindings: Iterable[Tuple[Tuple[str, ...], Optional[str], str]],
+    aliases: Optional[Dict[str, Tuple[str, ...]]] = None,
+    collectors: Optional[Dict[Tuple[str, ...], Callable[[Any, Record], None]]] = None,
+    skip: Tuple[str, ...] = (),
+) -> PathNode:
+    """
+    Trie of (path, attribute, field) bindings. `aliases` binds extra field
+    names to a field's path; `collectors` read repeated groups at a path;
+    fields starting with a `skip` prefix are left to a collector.
+    """
+    root = PathNode()
+    for path, attribute, field in bindings:
+        if field.startswith(skip):
+            continue
+        node = root
+        for tag in path:
+            node = node.child(tag)
+        for name in (field, *(aliases or {}).get(field, ())):
+            node.bind(attribute, name)
+    for path, collect in (collectors or {}).items():
+        node = root
+        for tag in path:
+            node = node.child(tag)
+        node.collect = collect
+    return root
+
+
+# ============================================================================
+# FORMATS
+# ============================================================================
+
+def _children_text(element) -> Dict[str, str]:
+    return {_local(child.tag): (child.text or "").strip() for child in element}
+
+
+def _collect_gas_emissions(element, record: Record) -> None:
+    """ESRS v2 <EmissionsBreakdown>: per-gas detail plus CO2e totals for the GHG check"""
+    detail: Dict[str, Dict[str, Any]] = {}
+    ghg: Dict[str, Any] = {}
+    for gas in element:
+        name = gas.get("gas")
+        values = _children_text(gas)
+        co2e = _to_float(values.get("CO2e", ""))
+        detail[name] = {
+            "gwp_factor": _to_float(gas.get("gwpFactor", "")),
+            "amount": _to_float(values.get("Amount", "")),
+            "co2e": co2e,
+        }
+        ghg[name] = co2e
+    record["emissions_breakdown"] = detail
+    record["ghg_breakdown"] = ghg
+
+
+def _collect_ghg_breakdown(element, record: Record) -> None:
+    """ESRS v1 <GHGBreakdown>: one element per gas, plus a Total"""
+    ghg: Dict[str, Any] = {}
+    for gas, text in _children_text(element).items():
+        if gas == "Total":
+            record.setdefault("total_emissions_tco2e", _to_float(text))
+        else:
+            ghg[gas] = _to_float(text)
+    record["ghg_breakdown"] = ghg
+
+
+def _esrs_v2_trie() -> PathNode:
+    E = ESRS_V2_NAMESPACE
+    calculation, factor = qualified_name("EmissionCalculation", E), qualified_name("EmissionFactor", E)
+    quality = qualified_name("DataQuality", E)
+    # Fields the writer computes with a default, so they have no field path in the spec
+    computed = [
+        ((), "schemaVersion", "schema_version"),
+        ((calculation, qualified_name("GWPVersion", E)), None, "gwp_version"),
+        ((calculation, factor, qualified_name("Unit", E)), None, "emission_factor_unit"),
+        ((calculation, factor), "fallbackUsed", "fallback_factor_used"),
+        ((calculation, quality), "tier", "data_quality_tier"),
+        ((calculation, quality, qualified_name("Uncertainty", E)), "confidenceLevel", "confidence_level"),
+        ((qualified_name("Product", E), qualified_name("MonetaryValue", E)), "currency", "currency"),
+    ]
+    return build_trie(
+        [*field_paths(esrs_v2_spec()), *computed],
+        aliases={
+            "reporting_undertaking_id": ("reporting_undertaking_lei",),
+            "emission_scope": ("scope",),
+            "embedded_emissions_direct": ("direct_emissions",),
+        },
+        collectors={(calculation, qualified_name("EmissionsBreakdown", E)): _collect_gas_emissions},
+    )
+
+
+def _esrs_v1_trie() -> PathNode:
+    E = ESRS_V1_NAMESPACE
+    return build_trie(
+        field_paths(esrs_v1_spec()),
+        aliases={
+            "reporting_entity_lei": ("reporting_undertaking_lei",),
+            "supplier_lei": ("legal_entity_identifier",),
+            "emission_scope": ("scope",),
+            "reporting_start_date": ("reporting_period_start",),
+            "reporting_end_date": ("reporting_period_end",),
+            "calculation_method": ("calculation_methodology",),
+            "installation.installation_id": ("installation_id",),
+            "installation.country": ("installation_country",),
+            "activity_quantity": ("quantity",),
+        },
+        collectors={
+            (qualified_name("EmissionData", E), qualified_name("GHGBreakdown", E)): _collect_ghg_breakdown,
+        },
+        skip=("ghg_breakdown.",),
+    )
+
+
+def _scope3_trie() -> PathNode:
+    return build_trie(
+        field_paths(scope3_spec()),
+        aliases={
+            "voucher_uuid": ("voucher_id",),
+            "total_co2e": ("total_emissions_tco2e",),
+            "hash": ("calculation_hash",),
+        },
+    )
+
+
+@lru_cache(maxsize=None)
+def voucher_formats() -> Dict[str, PathNode]:
+    """Trie of each known format, keyed by the Clark tag of its voucher root"""
+    return {
+        qualified_name("EmissionVoucher", ESRS_V2_NAMESPACE): _esrs_v2_trie(),
+        qualified_name("EmissionVoucher", ESRS_V1_NAMESPACE): _esrs_v1_trie(),
+        qualified_name("voucher", SCOPE3_NAMESPACE): _scope3_trie(),
+    }
+
+
+# ============================================================================
+# PARSING
+# ============================================================================
+
+def read_element(node: PathNode, element, record: Record) -> None:
+    """Copy the fields bound under `node` from `element` and its known descendants"""
+    for attribute, field, convert in node.attr_fields:
+        value = element.get(attribute)
+        if value is not None:
+            record[field] = convert(value) if convert else value
+    if node.text_fields:
+        text = element.text
+        if text is not None:
+            text = text.strip()
+            if text:
+                for field, convert in node.text_fields:
+                    record[field] = convert(text) if convert else text
+    if node.collect is not None:
+        node.collect(element, record)
+    children = node.children
+    if children:
+        for child in element:
+            sub = children.get(child.tag)
+            if sub is not None:
+                read_element(sub, child, record)
+
+
+def _repeated_child(root) -> Optional[str]:
+    """Tag of the first non-leaf child that occurs more than once under `root`"""
+    seen = set()
+    for child in root.iterchildren(etree.Element):
+        if len(child):
+            if child.tag in seen:
+                return child.tag
+            seen.add(child.tag)
+    return None
+
+
+def _generic_record(root) -> Record:
+    """Leaf texts of an unrecognised document by local name; the first occurrence wins"""
+    repeated = _repeated_child(root)
+    if repeated is not None:
+        raise ValueError(
+            f"Unrecognised voucher format: <{_local(root.tag)}> repeats <{_local(repeated)}>, "
+            "and only the known formats may hold several vouchers"
+        )
+    record: Record = {}
+    for element in root.iter(etree.Element):
+        if len(element) == 0 and element.text and element.text.strip():
+            name = _local(element.tag)
+            if name not in record:
+                convert = converter(name)
+                text = element.text.strip()
+                record[name] = convert(text) if convert else text
+    return record
+
+
+def _voucher_elements(source: Source, formats: Dict[str, PathNode]) -> Iterator[Any]:
+    """Voucher elements in document order; the document root if there are none"""
+    if isinstance(source, Path):
+        source = str(source)
+    if isinstance(source, str) and os.path.getsize(source) <= WHOLE_DOCUMENT_BYTES:
+        # One-voucher files parse faster in one go than through iterparse
+        root = etree.parse(source, _XML_PARSER).getroot()
+        found = False
+        for element in root.iter(*formats):
+            found = True
+            yield element
+        if not found:
+            yield root
+        return
+
+    events = etree.iterparse(
+        source, events=("end",), tag=list(formats),
+        remove_comments=True, remove_pis=True, resolve_entities=False, no_network=True,
+    )
+    found = False
+    for _, element in events:
+        found = True
+        yield element
+        # Drop the voucher and everything already read before it
+        element.clear(keep_tail=True)
+        parent = element.getparent()
+        if parent is not None:
+            while element.getprevious() is not None:
+                del parent[0]
+    if not found and events.root is not None:
+        yield events.root
+
+
+def iter_vouchers(source: Source) -> Iterator[Record]:
+    """
+    Flat records for every voucher in `source` (a path or binary file),
+    in document order, whether the root is one voucher or a batch envelope.
+    """
+    formats = voucher_formats()
+    for element in _voucher_elements(source, formats):
+        node = formats.get(element.tag)
+        if node is None:
+            yield _generic_record(element)
+            continue
+        record: Record = {}
+        read_element(node, element, record)
+        yield record
+
+
+def parse_voucher(source: Source) -> Record:
+    """The first voucher in `source`"""
+    for record in iter_vouchers(source):
+        return record
+    raise ValueError("No voucher found in XML document")
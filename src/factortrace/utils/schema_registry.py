@@ -0,0 +1,168 @@
+"""
+Process-wide registry of compiled XSD schemas.
+
+Each schema is compiled once per process and reused until the file on disk
+changes (entries are keyed by absolute path and revalidated against the
+file's mtime and size). lxml schema objects keep their error log on the
+instance, so validation against one compiled schema is serialised behind a
+per-schema lock; different schemas validate in parallel.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Union
+
+from lxml import etree
+
+PathLike = Union[str, Path]
+
+
+@dataclass
+class _Entry:
+    schema: Any
+    signature: Tuple[int, int]  # (st_mtime_ns, st_size)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+@dataclass
+class SchemaStats:
+    compiles: int = 0
+    cache_hits: int = 0
+    invalidations: int = 0
+    validations: int = 0
+    failures: int = 0
+    compile_seconds: float = 0.0
+    validate_seconds: float = 0.0
+
+
+class SchemaRegistry:
+    """Thread-safe cache of compiled lxml and xmlschema schemas."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, SchemaStats] = {}
+
+    # ------------------------------------------------------------------ #
+    # Lookup
+    # ------------------------------------------------------------------ #
+    def _entry(self, xsd_path: PathLike, kind: str) -> _Entry:
+        path = os.path.abspath(str(xsd_path))
+        st = os.stat(path)
+        signature = (st.st_mtime_ns, st.st_size)
+        key = (path, kind)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry.signature == signature:
+            self._stats_for(path).cache_hits += 1
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature:
+                self._stats_for(path).cache_hits += 1
+                return entry
+
+            stats = self._stats_for(path)
+            if entry is not None:
+                stats.invalidations += 1
+
+            started = time.perf_counter()
+            schema = self._compile(path, kind)
+            stats.compile_seconds += time.perf_counter() - started
+            stats.compiles += 1
+
+            entry = _Entry(schema=schema, signature=signature)
+            self._entries[key] = entry
+            return entry
+
+    @staticmethod
+    def _compile(path: str, kind: str) -> Any:
+        if kind == "lxml":
+            return etree.XMLSchema(etree.parse(path))
+        from xmlschema import XMLSchema  # only needed by the xmlschema-based validators
+
+        return XMLSchema(path)
+
+    def _stats_for(self, path: str) -> SchemaStats:
+        stats = self._stats.get(path)
+        if stats is None:
+            stats = self._stats.setdefault(path, SchemaStats())
+        return stats
+
+    def get(self, xsd_path: PathLike) -> etree.XMLSchema:
+        """Compiled lxml schema for *xsd_path*. Do not validate with it concurrently; use `validate`."""
+        return self._entry(xsd_path, "lxml").schema
+
+    def get_xmlschema(self, xsd_path: PathLike) -> Any:
+        """Compiled ``xmlschema.XMLSchema`` for *xsd_path*."""
+        return self._entry(xsd_path, "xmlschema").schema
+
+    # ------------------------------------------------------------------ #
+    # Validation
+    # ------------------------------------------------------------------ #
+    def validate(self, xml: Union[str, bytes, etree._Element], xsd_path: PathLike) -> Tuple[bool, List[str]]:
+        """Validate *xml* against the cached lxml schema. Returns (is_valid, errors)."""
+        entry = self._entry(xsd_path, "lxml")
+        if isinstance(xml, str):
+            xml = xml.encode("utf-8")
+        doc = etree.fromstring(xml) if isinstance(xml, bytes) else xml
+
+        started = time.perf_counter()
+        with entry.lock:
+            is_valid = entry.schema.validate(doc)
+            errors = [] if is_valid else [str(e) for e in entry.schema.error_log]
+        self._record(xsd_path, is_valid, time.perf_counter() - started)
+        return is_valid, errors
+
+    def validate_xmlschema(self, xml: Union[str, bytes], xsd_path: PathLike) -> Tuple[bool, List[str]]:
+        """Validate *xml* with the cached xmlschema schema. Returns (is_valid, errors)."""
+        schema = self.get_xmlschema(xsd_path)
+
+        started = time.perf_counter()
+        errors = [str(e) for e in schema.iter_errors(xml)]
+        self._record(xsd_path, not errors, time.perf_counter() - started)
+        return not errors, errors
+
+    def _record(self, xsd_path: PathLike, is_valid: bool, seconds: float) -> None:
+        stats = self._stats_for(os.path.abspath(str(xsd_path)))
+        with self._lock:
+            stats.validations += 1
+            stats.failures += not is_valid
+            stats.validate_seconds += seconds
+
+    # ------------------------------------------------------------------ #
+    # Introspection
+    # ------------------------------------------------------------------ #
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-schema compile/validate counters and timings."""
+        return {
+            path: {
+                "compiles": s.compiles,
+                "cache_hits": s.cache_hits,
+                "invalidations": s.invalidations,
+                "validations": s.validations,
+                "failures": s.failures,
+                "compile_seconds": round(s.compile_seconds, 6),
+                "validate_seconds": round(s.validate_seconds, 6),
+            }
+            for path, s in self._stats.items()
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+
+# Shared by every validator in the process
+schema_registry = SchemaRegistry()
+
+
+def get_schema_registry() -> SchemaRegistry:
+    return schema_registry
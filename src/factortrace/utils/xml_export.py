@@ -1,6 +1,16 @@
+from export.voucher_plans import esrs_v1_plan
+
+
 def add_to_xml_method(cls):
     """
-    Stub decorator that can be extended to add XML export capabilities.
+    Attach ``to_xml()`` to a voucher model: pretty-printed ESRS E1 v1 XML
+    (resources/schema/voucher.xsd), rendered by the compiled plan in
+    export.voucher_plans.
     """
-    return cls
+    plan = esrs_v1_plan()
 
+    def to_xml(self) -> str:
+        return plan.render_text(self, pretty=True)
+
+    cls.to_xml = to_xml
+    return cls
@@ -1,4 +1,4 @@
-from xmlschema import XMLSchema
+from .schema_registry import schema_registry
 from typing import Tuple, List
 def validate_vsme_xml(xml_string: str):
     return True, []
@@ -16,10 +16,7 @@ def validate_vsme_xml(xml_string: str) -> Tuple[bool, List[str]]:
         (is_valid: bool, errors: list of str)
     """
     try:
-        schema = XMLSchema(VSME_SCHEMA_PATH)
-        is_valid = schema.is_valid(xml_string)
-        errors = [str(e) for e in schema.validate(xml_string)] if not is_valid else []
-        return is_valid, errors
+        return schema_registry.validate_xmlschema(xml_string, VSME_SCHEMA_PATH)
     except Exception as e:
         return False, [f"Schema load or validation error: {e}"]
     
\ No newline at end of file
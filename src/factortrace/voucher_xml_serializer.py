@@ -1,6 +1,8 @@
 """
 Serialize a Scope-3 voucher (dict or dataclass) to XML and validate
 it against resources/schema/voucher.xsd.  Only lxml is required.
+
+The XML layout is the compiled Scope-3 plan in export.voucher_plans.
 """
 
 from __future__ import annotations
@@ -8,33 +10,18 @@ from __future__ import annotations
 from dataclasses import asdict, is_dataclass
 from pathlib import Path
 from typing import Any, Dict, List
-from enum import Enum
-from lxml import etree
-from lxml.etree import Element, QName, SubElement, tostring
+
+from export.voucher_plans import SCOPE3_FIELD_ORDER, SCOPE3_NAMESPACE, SCOPE3_NSMAP, scope3_plan
+from factortrace.utils.schema_registry import schema_registry
 
 # --------------------------------------------------------------------------- #
 # Constants – these MUST match voucher.xsd                                    #
 # --------------------------------------------------------------------------- #
 
-NAMESPACE: str = "https://scope3.dev/voucher/2025-06"
-NSMAP = {None: NAMESPACE}                     # default namespace
-
-FIELD_ORDER: List[str] = [
-    "supplier_id",
-    "supplier_name",
-    "legal_entity_identifier",
-    "tier",
-    "product_category",
-    "cost",
-    "material_type",
-    "origin_country",
-    "emission_factor",
-    "fallback_factor_used",
-    "total_co2e",
-    "submission_date",
-    "voucher_uuid",
-    "hash",
-]
+NAMESPACE: str = SCOPE3_NAMESPACE
+NSMAP = SCOPE3_NSMAP                          # default namespace
+
+FIELD_ORDER: List[str] = list(SCOPE3_FIELD_ORDER)
 
 # --------------------------------------------------------------------------- #
 # Public helpers                                                              #
@@ -48,37 +35,18 @@ def serialize_voucher(voucher: Any) -> str:
     if is_dataclass(voucher):
         data: Dict[str, Any] = asdict(voucher)
     elif isinstance(voucher, dict):
-        data = dict(voucher)
+        data = voucher
     else:
         raise TypeError("voucher must be a dict or dataclass")
 
-    # build XML --------------------------------------------------------------
-    root = Element(QName(NAMESPACE, "voucher"), nsmap=NSMAP)
-
-    for field in FIELD_ORDER:
-        if field not in data:
-            raise KeyError(f"voucher missing {field!r}")
-        val = data[field]
-
-        elem = SubElement(root, QName(NAMESPACE, field))
-        elem.text = "true" if val is True else "false" if val is False else str(val)
-
-    xml_bytes = tostring(
-        root, pretty_print=True, xml_declaration=True, encoding="UTF-8"
-    )
-    return xml_bytes.decode()
+    # render compiled plan (KeyError on a missing field) ---------------------
+    return scope3_plan().render_text(data, pretty=True)
 
 
 def validate_xml(xml: str | bytes, xsd_path: str | Path) -> bool:
     """Validate *xml* against *xsd_path*.  Return ``True`` if valid."""
-    if isinstance(xsd_path, Path):
-        xsd_path = str(xsd_path)
-
-    if isinstance(xml, str):
-        xml = xml.encode()
-
-    schema = etree.XMLSchema(etree.parse(xsd_path))
-    return schema.validate(etree.fromstring(xml))
+    is_valid, _ = schema_registry.validate(xml, xsd_path)
+    return is_valid
 
 
 # --------------------------------------------------------------------------- #
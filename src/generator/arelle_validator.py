@@ -1,3 +1,322 @@
+"""
+In-process XBRL validation for generated iXBRL reports.
+
+The DTS (ESRS taxonomy plus the local schemas under schemas/) is loaded once
+per worker process and kept in memory. Reports are then validated in-process
+against it, either directly or through a long-lived ValidatorDaemon that
+serialises requests from many producers through a queue. When Arelle is
+installed its full XBRL 2.1 / Inline XBRL validation runs on top, reusing a
+single controller instead of launching a process per file.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from lxml import etree
+
+try:
+    from arelle import Cntlr
+    ARELLE_AVAILABLE = True
+except ImportError:
+    ARELLE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA_ROOT = Path(__file__).resolve().parents[2] / "schemas"
+
+# Local DTS entry points, relative to SCHEMA_ROOT; directories are globbed for *.xsd
+DEFAULT_SCHEMAS = ("esrs-taxonomy.xsd", "xbrli.xsd", "vsme")
+
+XS_NS = "http://www.w3.org/2001/XMLSchema"
+XBRLI_NS = "http://www.xbrl.org/2003/instance"
+IX_NS = "http://www.xbrl.org/2013/inlineXBRL"
+
+_CONTEXT = f"{{{XBRLI_NS}}}context"
+_UNIT = f"{{{XBRLI_NS}}}unit"
+_IDENTIFIER = f"{{{XBRLI_NS}}}identifier"
+_PERIOD = f"{{{XBRLI_NS}}}period"
+_NON_FRACTION = f"{{{IX_NS}}}nonFraction"
+_NON_NUMERIC = f"{{{IX_NS}}}nonNumeric"
+
+
+# --------------------------------------------------------------------------- #
+# Discoverable Taxonomy Set
+# --------------------------------------------------------------------------- #
+@dataclass
+class TaxonomyDTS:
+    """Schemas and concept declarations loaded once per worker"""
+    schemas: Dict[str, etree.XMLSchema] = field(default_factory=dict)
+    concepts: Dict[str, Set[str]] = field(default_factory=dict)  # namespace -> element names
+    skipped: Dict[str, str] = field(default_factory=dict)  # path -> reason
+    load_seconds: float = 0.0
+
+    def knows_namespace(self, namespace: Optional[str]) -> bool:
+        return namespace in self.concepts
+
+    def has_concept(self, namespace: Optional[str], name: str) -> bool:
+        return name in self.concepts.get(namespace, ())
+
+
+def _iter_schema_files(entries: Iterable[str], root: Path) -> Iterable[Path]:
+    for entry in entries:
+        path = Path(entry) if Path(entry).is_absolute() else root / entry
+        if path.is_dir():
+            yield from sorted(path.glob("*.xsd"))
+        else:
+            yield path
+
+
+def load_dts(entries: Iterable[str] = DEFAULT_SCHEMAS, root: Path = SCHEMA_ROOT) -> TaxonomyDTS:
+    """
+    Parse and compile every schema of the DTS.
+
+    Missing or empty schema files are recorded in `skipped` rather than
+    raised, so a worker with a partial taxonomy still validates structure;
+    facts in namespaces with no loaded schema are simply not concept-checked.
+    """
+    started = time.perf_counter()
+    dts = TaxonomyDTS()
+
+    for path in _iter_schema_files(entries, root):
+        key = str(path)
+        if not path.exists():
+            dts.skipped[key] = "schema file not found"
+            continue
+        if path.stat().st_size == 0:
+            dts.skipped[key] = "schema file is empty"
+            continue
+        try:
+            doc = etree.parse(key)
+        except etree.XMLSyntaxError as e:
+            dts.skipped[key] = f"schema is not well-formed: {e}"
+            continue
+
+        namespace = doc.getroot().get("targetNamespace")
+        names = dts.concepts.setdefault(namespace, set())
+        names.update(el.get("name") for el in doc.getroot().iterfind(f"{{{XS_NS}}}element") if el.get("name"))
+
+        try:
+            dts.schemas[key] = etree.XMLSchema(doc)
+        except etree.XMLSchemaParseError as e:
+            # Concepts are still usable even when imports cannot be resolved locally
+            logger.warning(f"Could not compile schema {key}: {e}")
+
+    dts.load_seconds = time.perf_counter() - started
+    if dts.skipped:
+        logger.info(f"DTS loaded with {len(dts.skipped)} schema(s) skipped: {sorted(dts.skipped)}")
+    return dts
+
+
+# --------------------------------------------------------------------------- #
+# Inline XBRL checks
+# --------------------------------------------------------------------------- #
+def _parse_number(text: str, fmt: Optional[str]) -> float:
+    value = (text or "").strip()
+    if fmt and fmt.endswith("numcommadot"):
+        value = value.replace(".", "").replace(",", ".")
+    else:
+        value = value.replace(",", "")
+    return float(value)
+
+
+def check_ixbrl(doc: etree._ElementTree, dts: TaxonomyDTS) -> Tuple[List[str], List[str]]:
+    """Return (errors, warnings) for the inline XBRL structure of `doc`"""
+    errors: List[str] = []
+    warnings: List[str] = []
+    root = doc.getroot()
+
+    contexts: Set[str] = set()
+    for context in root.iter(_CONTEXT):
+        context_id = context.get("id")
+        if context_id in contexts:
+            errors.append(f"Duplicate context id '{context_id}'")
+        contexts.add(context_id)
+        if context.find(f".//{_IDENTIFIER}") is None:
+            errors.append(f"Context '{context_id}' has no entity identifier")
+        if context.find(_PERIOD) is None:
+            errors.append(f"Context '{context_id}' has no period")
+
+    units: Set[str] = set()
+    for unit in root.iter(_UNIT):
+        unit_id = unit.get("id")
+        if unit_id in units:
+            errors.append(f"Duplicate unit id '{unit_id}'")
+        units.add(unit_id)
+
+    for fact in root.iter(_NON_FRACTION, _NON_NUMERIC):
+        name = fact.get("name") or ""
+        context_ref = fact.get("contextRef")
+        if context_ref not in contexts:
+            errors.append(f"Fact '{name}' references undefined context '{context_ref}'")
+
+        prefix, _, local = name.rpartition(":")
+        namespace = fact.nsmap.get(prefix) if prefix else None
+        if dts.knows_namespace(namespace) and not dts.has_concept(namespace, local):
+            errors.append(f"Concept '{name}' is not declared in the taxonomy")
+
+        if fact.tag != _NON_FRACTION:
+            continue
+        unit_ref = fact.get("unitRef")
+        if unit_ref is not None and unit_ref not in units:
+            errors.append(f"Fact '{name}' references undefined unit '{unit_ref}'")
+        try:
+            _parse_number(fact.text, fact.get("format"))
+        except ValueError:
+            errors.append(f"Fact '{name}' has non-numeric value '{fact.text}'")
+
+    if not contexts:
+        warnings.append("Document contains no xbrli:context definitions")
+    return errors, warnings
+
+
+# --------------------------------------------------------------------------- #
+# Validation service
+# --------------------------------------------------------------------------- #
+class XBRLValidationService:
+    """
+    Validates iXBRL files against a DTS that is loaded at most once.
+
+    Instances are safe to share between threads: the DTS is read-only after
+    loading and Arelle calls are serialised behind a lock.
+    """
+
+    def __init__(self, schemas: Iterable[str] = DEFAULT_SCHEMAS, root: Path = SCHEMA_ROOT,
+                 use_arelle: Optional[bool] = None):
+        self.schema_entries = tuple(schemas)
+        self.root = root
+        self.use_arelle = ARELLE_AVAILABLE if use_arelle is None else use_arelle and ARELLE_AVAILABLE
+        self._dts: Optional[TaxonomyDTS] = None
+        self._load_lock = threading.Lock()
+        self._arelle_lock = threading.Lock()
+        self._arelle_controller = None
+        self.dts_loads = 0
+        self.validations = 0
+
+    @property
+    def dts(self) -> TaxonomyDTS:
+        if self._dts is None:
+            with self._load_lock:
+                if self._dts is None:
+                    self._dts = load_dts(self.schema_entries, self.root)
+                    self.dts_loads += 1
+        return self._dts
+
+    def validate(self, file_path: str) -> dict:
+        """Validate one report; result carries 'status' ('valid'/'invalid'), 'errors' and 'warnings'"""
+        started = time.perf_counter()
+        dts = self.dts
+        self.validations += 1
+
+        try:
+            doc = etree.parse(str(file_path))
+        except (OSError, etree.XMLSyntaxError) as e:
+            errors, warnings = [f"Report is not well-formed XML: {e}"], []
+        else:
+            errors, warnings = check_ixbrl(doc, dts)
+            if not errors and self.use_arelle:
+                errors.extend(self._validate_with_arelle(str(file_path)))
+
+        return {
+            "status": "invalid" if errors else "valid",
+            "errors": errors,
+            "warnings": warnings,
+            "validation_seconds": round(time.perf_counter() - started, 6),
+        }
+
+    def _validate_with_arelle(self, file_path: str) -> List[str]:
+        with self._arelle_lock:
+            if self._arelle_controller is None:
+                self._arelle_controller = Cntlr.Cntlr(logFileName="logToBuffer")
+            model_manager = self._arelle_controller.modelManager
+            model_xbrl = model_manager.load(file_path)
+            try:
+                model_manager.validate()
+                return [str(code) for code in model_xbrl.errors if code]
+            finally:
+                model_xbrl.close()
+
+
+_service: Optional[XBRLValidationService] = None
+_service_lock = threading.Lock()
+
+
+def get_validation_service() -> XBRLValidationService:
+    """Per-process validation service, created on first use"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = XBRLValidationService()
+    return _service
+
+
+# --------------------------------------------------------------------------- #
+# Long-lived validator daemon
+# --------------------------------------------------------------------------- #
+_STOP = object()
+
+
+class ValidatorDaemon:
+    """
+    Background validator fed through a request queue.
+
+    Producers call `submit()` and get a Future back; a single daemon thread
+    owns the warm service and works through the queue in order.
+    """
+
+    def __init__(self, service: Optional[XBRLValidationService] = None, maxsize: int = 0):
+        self.service = service or get_validation_service()
+        self._requests: "queue.Queue" = queue.Queue(maxsize=maxsize)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ValidatorDaemon":
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="xbrl-validator", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, file_path: str) -> Future:
+        future: Future = Future()
+        self._requests.put((str(file_path), future))
+        return future
+
+    def validate(self, file_path: str, timeout: Optional[float] = None) -> dict:
+        return self.submit(file_path).result(timeout)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        if self._thread is not None:
+            self._requests.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        self.service.dts  # warm the DTS before the first request arrives
+        while True:
+            request = self._requests.get()
+            if request is _STOP:
+                break
+            file_path, future = request
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self.service.validate(file_path))
+            except Exception as e:
+                future.set_exception(e)
+
+    def __enter__(self) -> "ValidatorDaemon":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
 def validate_with_arelle(file_path: str) -> dict:
-    # Example placeholder implementation
-    return {'status': 'valid'}
\ No newline at end of file
+    """Validate a generated report with the per-process validation service"""
+    return get_validation_service().validate(file_path)
@@ -18,10 +18,13 @@ import traceback
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import hashlib
 import re
+import time
 
 # Assume these are imported from existing modules
 from xhtml_generator import generate_ixbrl
 from arelle_validator import validate_with_arelle
+from data_quality import BatchDataQualityAnalyzer, DataQualityFeedback, DataQualityFindings, load_rules
+from pipeline_metrics import PipelineMetrics
 
 
 # Configure logging for production environment
@@ -36,19 +39,6 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class DataQualityFeedback:
-    """AI-generated data quality feedback"""
-    severity: str  # 'critical', 'warning', 'suggestion'
-    field: str
-    issue: str
-    recommendation: str
-    compliance_impact: str
-    
-    def to_string(self) -> str:
-        return f"[{self.severity.upper()}] {self.field}: {self.issue} | Recommendation: {self.recommendation}"
-
-
 @dataclass
 class ProcessingResult:
     """Result of processing a single company's report"""
@@ -83,7 +73,10 @@ class AIDataQualityAnalyzer:
     This is a mock implementation that would be replaced with GPT/Claude API in production
     """
     
-    def __init__(self):
+    def __init__(self, rule_files: Optional[List[str]] = None):
+        # Client-specific rule files layered over the default data quality rules
+        self.rules = load_rules(*rule_files) if rule_files else None
+        
         # Industry benchmarks and thresholds
         self.benchmarks = {
             'scope3_to_total_ratio': {'min': 0.4, 'max': 0.95},  # Scope 3 typically 40-95% of total
@@ -321,6 +314,10 @@ class AIDataQualityAnalyzer:
         
         return all_feedback
     
+    def analyze_batch(self, rows: List[Dict[str, Any]]) -> DataQualityFindings:
+        """Evaluate every rule across a whole batch at once (vectorized)"""
+        return BatchDataQualityAnalyzer(self.benchmarks, self.rules).analyze(rows)
+    
     def analyze_data_quality(self, data: Dict[str, Any]) -> List[DataQualityFeedback]:
         """Main entry point for data quality analysis"""
         all_feedback = []
@@ -358,12 +355,18 @@ class BatchReportGenerator:
         'narrative': 'Data not available for current reporting period.'
     }
     
-    def __init__(self, output_base_dir: str = 'output', max_workers: int = 4):
+    def __init__(self, output_base_dir: str = 'output', max_workers: int = 4,
+                 rule_files: Optional[List[str]] = None, metrics_path: Optional[str] = None,
+                 trace_path: Optional[str] = None):
         self.output_base_dir = Path(output_base_dir)
         self.output_base_dir.mkdir(parents=True, exist_ok=True)
         self.max_workers = max_workers
         self.results: List[ProcessingResult] = []
-        self.ai_analyzer = AIDataQualityAnalyzer()
+        self.ai_analyzer = AIDataQualityAnalyzer(rule_files)
+        # Stage timings; also written as Prometheus text / a Chrome trace when paths are given
+        self.metrics_path = metrics_path
+        self.trace_path = trace_path
+        self.metrics = PipelineMetrics(max_workers, keep_spans=trace_path is not None)
         
     def process_csv_batch(self, csv_path: str) -> Tuple[List[ProcessingResult], str]:
         """
@@ -371,17 +374,24 @@ class BatchReportGenerator:
         Returns: (results_list, zip_file_path)
         """
         logger.info(f"Starting batch processing of {csv_path}")
-        start_time = datetime.utcnow()
+        self.metrics = metrics = PipelineMetrics(self.max_workers, keep_spans=self.trace_path is not None)
         
         try:
             # Load and validate CSV
-            rows = self._load_and_validate_csv(csv_path)
+            with metrics.span('load_csv'):
+                rows = self._load_and_validate_csv(csv_path)
             logger.info(f"Loaded {len(rows)} valid rows from CSV")
             
+            # Data quality analysis runs once over the whole batch, not per worker
+            with metrics.span('quality_analysis'):
+                findings = self.ai_analyzer.analyze_batch(rows)
+            logger.info(f"Data quality analysis produced {len(findings)} findings")
+            
             # Process rows in parallel
+            metrics.enqueued(len(rows))
             with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
                 futures = {
-                    executor.submit(self._process_single_company, row, idx): (row, idx)
+                    executor.submit(self._process_single_company, row, idx, findings.for_row(idx - 1)): (row, idx)
                     for idx, row in enumerate(rows, 1)
                 }
                 
@@ -402,17 +412,26 @@ class BatchReportGenerator:
                         ))
             
             # Generate summary report
-            summary_path = self._generate_summary_report()
+            with metrics.span('write_report_log'):
+                summary_path = self._generate_summary_report()
             logger.info(f"Generated summary report: {summary_path}")
             
             # Create ZIP archive
-            zip_path = self._create_zip_archive()
+            with metrics.span('zip_archive'):
+                zip_path = self._create_zip_archive()
             logger.info(f"Created ZIP archive: {zip_path}")
             
             # Calculate stats
-            total_time = (datetime.utcnow() - start_time).total_seconds()
+            metrics.finish()
+            summary = metrics.summary()
+            self._add_stage_metrics(summary)
+            self._export_metrics()
             success_count = sum(1 for r in self.results if r.validation_status == 'success')
-            logger.info(f"Batch processing complete. {success_count}/{len(self.results)} reports validated successfully in {total_time:.2f}s")
+            logger.info(f"Batch processing complete. {success_count}/{len(self.results)} reports validated successfully in {summary['wall_seconds']:.2f}s")
+            logger.info("Stage breakdown: " + ", ".join(
+                f"{stage} {stats['total_seconds']:.2f}s (p95 {stats['p95_ms']:.1f}ms, cpu {stats['cpu_share']:.0%})"
+                for stage, stats in summary['stages'].items()
+            ) + f"; worker utilization {summary['workers']['utilization']:.0%}")
             
             return self.results, zip_path
             
@@ -477,28 +496,41 @@ class BatchReportGenerator:
         
         return rows
     
-    def _process_single_company(self, row: Dict[str, str], row_number: int) -> ProcessingResult:
+    def _process_single_company(self, row: Dict[str, str], row_number: int,
+                                data_quality_feedback: Optional[List[DataQualityFeedback]] = None) -> ProcessingResult:
         """Process a single company's data"""
-        start_time = datetime.utcnow()
+        with self.metrics.task(row['lei']):
+            return self._process_company_stages(row, row_number, data_quality_feedback)
+
+    def _process_company_stages(self, row: Dict[str, str], row_number: int,
+                                data_quality_feedback: Optional[List[DataQualityFeedback]]) -> ProcessingResult:
+        started = time.perf_counter_ns()
         lei = row['lei']
+        metrics = self.metrics
         
         try:
-            # Run AI data quality analysis
-            data_quality_feedback = self.ai_analyzer.analyze_data_quality(row)
+            # Run AI data quality analysis unless the batch pass already did
+            if data_quality_feedback is None:
+                with metrics.span('quality_analysis', lei):
+                    data_quality_feedback = self.ai_analyzer.analyze_data_quality(row)
             
             # Create output directory for this LEI
-            lei_dir = self.output_base_dir / self._sanitize_lei(lei)
-            lei_dir.mkdir(parents=True, exist_ok=True)
+            with metrics.span('disk_io', lei):
+                lei_dir = self.output_base_dir / self._sanitize_lei(lei)
+                lei_dir.mkdir(parents=True, exist_ok=True)
             
             # Construct voucher data (includes AI suggestions)
-            voucher_data = self._construct_voucher_data(row, data_quality_feedback)
+            with metrics.span('voucher_construction', lei):
+                voucher_data = self._construct_voucher_data(row, data_quality_feedback)
             
             # Generate report
             output_path = lei_dir / 'compliance_report.xhtml'
-            generate_ixbrl(voucher_data, str(output_path))
+            with metrics.span('generate_ixbrl', lei):
+                generate_ixbrl(voucher_data, str(output_path))
             
             # Validate with Arelle
-            validation_result = validate_with_arelle(str(output_path))
+            with metrics.span('validation', lei):
+                validation_result = validate_with_arelle(str(output_path))
             
             # Process validation result
             validation_errors = []
@@ -515,7 +547,7 @@ class BatchReportGenerator:
                 # Add data quality feedback to validation errors
                 validation_errors.extend([f.to_string() for f in data_quality_feedback if f.severity == 'critical'])
             
-            processing_time = (datetime.utcnow() - start_time).total_seconds()
+            processing_time = (time.perf_counter_ns() - started) / 1e9
             
             return ProcessingResult(
                 lei=lei,
@@ -537,8 +569,8 @@ class BatchReportGenerator:
                 output_path='',
                 validation_status='error',
                 validation_errors=[f"Processing error: {str(e)}"],
-                data_quality_feedback=data_quality_feedback if 'data_quality_feedback' in locals() else [],
-                processing_time_seconds=(datetime.utcnow() - start_time).total_seconds()
+                data_quality_feedback=data_quality_feedback or [],
+                processing_time_seconds=(time.perf_counter_ns() - started) / 1e9
             )
     
     def _construct_voucher_data(self, row: Dict[str, str], quality_feedback: List[DataQualityFeedback]) -> Dict[str, Any]:
@@ -695,6 +727,29 @@ class BatchReportGenerator:
         
         return str(summary_path)
     
+    def _add_stage_metrics(self, summary: Dict[str, Any]) -> None:
+        """
+        Add the finished run's stage summary to report_log.json.
+
+        Written after the archive so it covers every stage, including
+        write_report_log and zip_archive; the copy inside the ZIP has none.
+        """
+        json_path = self.output_base_dir / 'report_log.json'
+        with open(json_path, encoding='utf-8') as f:
+            report = json.load(f)
+        report['stage_metrics'] = summary
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    
+    def _export_metrics(self) -> None:
+        """Write the Prometheus text file and Chrome trace, when configured"""
+        if self.metrics_path:
+            self.metrics.write_prometheus(self.metrics_path)
+            logger.info(f"Wrote batch metrics: {self.metrics_path}")
+        if self.trace_path:
+            self.metrics.write_chrome_trace(self.trace_path)
+            logger.info(f"Wrote batch trace: {self.trace_path}")
+    
     def _create_zip_archive(self) -> str:
         """Create ZIP file of all generated reports"""
         timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
@@ -723,7 +778,9 @@ class BatchReportGenerator:
         return sha256_hash.hexdigest()
 
 
-def main(csv_path: str, output_dir: str = 'output', max_workers: int = 4) -> Tuple[List[ProcessingResult], str]:
+def main(csv_path: str, output_dir: str = 'output', max_workers: int = 4,
+         rule_files: Optional[List[str]] = None, metrics_path: Optional[str] = None,
+         trace_path: Optional[str] = None) -> Tuple[List[ProcessingResult], str]:
     """
     Main entry point for batch processing
     
@@ -731,11 +788,14 @@ def main(csv_path: str, output_dir: str = 'output', max_workers: int = 4) -> Tup
         csv_path: Path to input CSV file
         output_dir: Base directory for output files
         max_workers: Maximum parallel workers
+        rule_files: Client data quality rule files (JSON/YAML) layered over the defaults
+        metrics_path: Prometheus text file for per-stage timings, queue depth and worker utilization
+        trace_path: Chrome trace JSON of every stage span
     
     Returns:
         Tuple of (results_list, zip_file_path)
     """
-    generator = BatchReportGenerator(output_dir, max_workers)
+    generator = BatchReportGenerator(output_dir, max_workers, rule_files, metrics_path, trace_path)
     return generator.process_csv_batch(csv_path)
 
 
@@ -747,11 +807,15 @@ if __name__ == "__main__":
     parser.add_argument('csv_file', help='Input CSV file path')
     parser.add_argument('--output-dir', default='output', help='Output directory (default: output)')
     parser.add_argument('--max-workers', type=int, default=4, help='Max parallel workers (default: 4)')
+    parser.add_argument('--rules', action='append', default=[], help='Additional data quality rule file (JSON/YAML); repeatable')
+    parser.add_argument('--metrics-file', help='Write per-stage metrics in Prometheus text format to this file')
+    parser.add_argument('--trace-file', help='Write a Chrome trace (chrome://tracing, Perfetto) of the run to this file')
     
     args = parser.parse_args()
     
     try:
-        results, zip_path = main(args.csv_file, args.output_dir, args.max_workers)
+        results, zip_path = main(args.csv_file, args.output_dir, args.max_workers, args.rules,
+                                 args.metrics_file, args.trace_file)
         print(f"\nProcessing complete!")
         print(f"Reports generated: {len(results)}")
         print(f"Successful validations: {sum(1 for r in results if r.validation_status == 'success')}")
@@ -0,0 +1,655 @@
+"""
+Vectorized data quality analysis for CSRD/ESRS batch inputs.
+
+Rules are declared in a JSON (or YAML) rule file and compiled once into an
+evaluation plan: every condition becomes a vectorized expression evaluated
+over the whole batch, and peer-benchmark rules are computed with a single
+group-by pass. Findings are kept in a compact table (row, rule code, two
+numeric parameters) and only expanded into DataQualityFeedback objects when a
+report or log needs the text.
+
+Rule file layout::
+
+    benchmarks: {name: {min: .., max: ..}}   # exposed to expressions as name_min / name_max
+    groups:     {name: [columns]}            # rules in a group only run when all columns parse
+    derived:    {name: expression}           # computed once, usable by later expressions
+    rules:      [{id, severity, field, issue, recommendation, compliance_impact, type, ...}]
+
+Rule types: ``expr`` (default; ``when`` plus optional ``a``/``b``
+expressions), ``invalid`` (group has unparsable cells), ``pattern`` (string
+column fails a regex), ``missing`` (column absent or empty), ``peer`` (``metric`` above or
+below a percentile of rows sharing ``by``) and ``escalation`` (at least
+``min_count`` earlier findings of ``count_severity``).
+
+``score_quality`` applies the per-voucher 1-5 data quality score and tier
+(temporal gap, geography, technology, verification) to whole arrays against
+one reporting year, and ``quality_histogram`` counts scores per entity.
+"""
+
+import ast
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import yaml
+    YAML_AVAILABLE = True
+except ImportError:
+    YAML_AVAILABLE = False
+
+
+@dataclass
+class DataQualityFeedback:
+    """AI-generated data quality feedback"""
+    severity: str  # 'critical', 'warning', 'suggestion'
+    field: str
+    issue: str
+    recommendation: str
+    compliance_impact: str
+
+    def to_string(self) -> str:
+        return f"[{self.severity.upper()}] {self.field}: {self.issue} | Recommendation: {self.recommendation}"
+
+
+SEVERITY_ORDER = {'critical': 0, 'warning': 1, 'suggestion': 2}
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent / 'data_quality_rules.json'
+
+FINDING_COLUMNS = ['row', 'rule', 'a', 'b', 'detail']
+
+
+class RuleError(ValueError):
+    """Raised when a rule file is malformed or an expression is not allowed"""
+
+
+@dataclass(frozen=True)
+class FindingTemplate:
+    """Static text of a finding; `issue` may reference {a}, {b} and {detail}"""
+    code: str
+    severity: str
+    field: str
+    issue: str
+    recommendation: str
+    compliance_impact: str
+
+
+# --------------------------------------------------------------------------- #
+# Expression compiler
+# --------------------------------------------------------------------------- #
+def _and(*values):
+    return np.logical_and.reduce(values)
+
+
+def _or(*values):
+    return np.logical_or.reduce(values)
+
+
+EXPRESSION_FUNCTIONS: Dict[str, Callable] = {
+    'abs': np.abs,
+    'where': np.where,
+    'fmod': np.fmod,
+    'minimum': np.minimum,
+    'maximum': np.maximum,
+    'isnan': np.isnan,
+    'log': np.log,
+    'sqrt': np.sqrt,
+}
+
+_INTERNAL = {'_and': _and, '_or': _or, '_not': np.logical_not}
+
+_BIN_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.Pow)
+_CMP_OPS = (ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE)
+
+
+class _Vectorize(ast.NodeTransformer):
+    """Rewrite boolean syntax into elementwise numpy calls, rejecting anything else"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.names: set = set()
+
+    def _call(self, name: str, args: List[ast.expr]) -> ast.Call:
+        return ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=args, keywords=[])
+
+    def visit_Expression(self, node):
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_BoolOp(self, node):
+        values = [self.visit(v) for v in node.values]
+        return self._call('_and' if isinstance(node.op, ast.And) else '_or', values)
+
+    def visit_UnaryOp(self, node):
+        operand = self.visit(node.operand)
+        if isinstance(node.op, ast.Not):
+            return self._call('_not', [operand])
+        if isinstance(node.op, (ast.USub, ast.UAdd)):
+            return ast.UnaryOp(op=node.op, operand=operand)
+        raise RuleError(f"Operator not allowed in '{self.source}'")
+
+    def visit_Compare(self, node):
+        if not all(isinstance(op, _CMP_OPS) for op in node.ops):
+            raise RuleError(f"Comparison not allowed in '{self.source}'")
+        operands = [self.visit(node.left)] + [self.visit(c) for c in node.comparators]
+        pairs = [
+            ast.Compare(left=operands[i], ops=[op], comparators=[operands[i + 1]])
+            for i, op in enumerate(node.ops)
+        ]
+        return pairs[0] if len(pairs) == 1 else self._call('_and', pairs)
+
+    def visit_BinOp(self, node):
+        if not isinstance(node.op, _BIN_OPS):
+            raise RuleError(f"Operator not allowed in '{self.source}'")
+        return ast.BinOp(left=self.visit(node.left), op=node.op, right=self.visit(node.right))
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.func.id not in EXPRESSION_FUNCTIONS or node.keywords:
+            raise RuleError(f"Only {sorted(EXPRESSION_FUNCTIONS)} may be called in '{self.source}'")
+        return self._call(node.func.id, [self.visit(a) for a in node.args])
+
+    def visit_Name(self, node):
+        if node.id.startswith('_'):
+            raise RuleError(f"Name '{node.id}' not allowed in '{self.source}'")
+        self.names.add(node.id)
+        return node
+
+    def visit_Constant(self, node):
+        if not isinstance(node.value, (int, float)) or isinstance(node.value, bool):
+            raise RuleError(f"Only numeric constants are allowed in '{self.source}'")
+        return node
+
+    def generic_visit(self, node):
+        raise RuleError(f"Unsupported syntax {type(node).__name__} in '{self.source}'")
+
+
+@dataclass(frozen=True)
+class CompiledExpression:
+    source: str
+    code: Any
+    names: frozenset
+
+    def __call__(self, namespace: Dict[str, Any]) -> Any:
+        return eval(self.code, {'__builtins__': {}}, namespace)
+
+
+def compile_expression(source: Union[str, int, float]) -> CompiledExpression:
+    """Compile a rule expression into a vectorized code object"""
+    source = str(source)
+    try:
+        tree = ast.parse(source, mode='eval')
+    except SyntaxError as e:
+        raise RuleError(f"Invalid expression '{source}': {e.msg}") from e
+    visitor = _Vectorize(source)
+    tree = ast.fix_missing_locations(visitor.visit(tree))
+    return CompiledExpression(source, compile(tree, f'<rule {source}>', 'eval'), frozenset(visitor.names))
+
+
+# --------------------------------------------------------------------------- #
+# Rule sets
+# --------------------------------------------------------------------------- #
+RULE_TYPES = ('expr', 'invalid', 'pattern', 'missing', 'peer', 'escalation')
+
+
+@dataclass
+class CompiledRule:
+    template: FindingTemplate
+    kind: str
+    group: Optional[str] = None
+    when: Optional[CompiledExpression] = None
+    a: Optional[CompiledExpression] = None
+    b: Optional[CompiledExpression] = None
+    column: Optional[str] = None
+    remove: Tuple[str, ...] = ()
+    pattern: Optional[re.Pattern] = None
+    by: Tuple[str, ...] = ()
+    percentile: float = 0.0
+    above: bool = True
+    min_peers: int = 1
+    count_severity: str = 'critical'
+    min_count: int = 1
+
+
+def _compile_rule(spec: Dict[str, Any], groups: Dict[str, List[str]]) -> CompiledRule:
+    try:
+        template = FindingTemplate(
+            code=spec['id'], severity=spec['severity'], field=spec['field'], issue=spec['issue'],
+            recommendation=spec.get('recommendation', ''), compliance_impact=spec.get('compliance_impact', ''),
+        )
+    except KeyError as e:
+        raise RuleError(f"Rule {spec.get('id', '?')} is missing {e}") from e
+    if template.severity not in SEVERITY_ORDER:
+        raise RuleError(f"Rule {template.code}: unknown severity '{template.severity}'")
+
+    kind = spec.get('type', 'expr')
+    if kind not in RULE_TYPES:
+        raise RuleError(f"Rule {template.code}: unknown type '{kind}'")
+    group = spec.get('group')
+    if group is not None and group not in groups:
+        raise RuleError(f"Rule {template.code}: unknown group '{group}'")
+
+    rule = CompiledRule(template=template, kind=kind, group=group)
+    try:
+        if 'a' in spec:
+            rule.a = compile_expression(spec['a'])
+        if 'b' in spec:
+            rule.b = compile_expression(spec['b'])
+
+        if kind == 'expr':
+            rule.when = compile_expression(spec['when'])
+        elif kind == 'invalid':
+            if group is None:
+                raise RuleError(f"Rule {template.code}: 'group' is required for invalid rules")
+        elif kind in ('pattern', 'missing'):
+            rule.column = spec['column']
+            rule.remove = tuple(spec.get('remove', ()))
+            if kind == 'pattern':
+                rule.pattern = re.compile(spec['pattern'])
+        elif kind == 'peer':
+            rule.a = compile_expression(spec['metric'])
+            by = spec['by']
+            rule.by = (by,) if isinstance(by, str) else tuple(by)
+            if 'above_percentile' in spec:
+                rule.percentile, rule.above = float(spec['above_percentile']), True
+            else:
+                rule.percentile, rule.above = float(spec['below_percentile']), False
+            rule.min_peers = int(spec.get('min_peers', 1))
+        elif kind == 'escalation':
+            rule.count_severity = spec.get('count_severity', 'critical')
+            rule.min_count = int(spec['min_count'])
+    except KeyError as e:
+        raise RuleError(f"Rule {template.code} ({kind}) is missing {e}") from e
+    return rule
+
+
+@dataclass
+class RuleSet:
+    """A compiled rule file: benchmarks, validity groups, derived columns and rules in order"""
+    benchmarks: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    groups: Dict[str, List[str]] = field(default_factory=dict)
+    derived: Dict[str, CompiledExpression] = field(default_factory=dict)
+    rules: List[CompiledRule] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.templates = {rule.template.code: rule.template for rule in self.rules}
+        self.rule_codes = pd.CategoricalDtype(list(self.templates), ordered=True)
+        self.severity_rank = np.array([SEVERITY_ORDER[r.template.severity] for r in self.rules], dtype=np.int8)
+
+        constants = {f'{name}_{bound}' for name, bounds in self.benchmarks.items() for bound in bounds}
+        known = constants | set(self.derived) | set(EXPRESSION_FUNCTIONS)
+        referenced = set()
+        for expr in self.derived.values():
+            referenced |= expr.names
+        for rule in self.rules:
+            for expr in (rule.when, rule.a, rule.b):
+                if expr is not None:
+                    referenced |= expr.names
+        for cols in self.groups.values():
+            referenced |= set(cols)
+        # Every name that is not a constant, derived value or function is an input column
+        self.numeric_columns = sorted(referenced - known)
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any]) -> 'RuleSet':
+        groups = {name: list(cols) for name, cols in spec.get('groups', {}).items()}
+        return cls(
+            benchmarks={name: dict(bounds) for name, bounds in spec.get('benchmarks', {}).items()},
+            groups=groups,
+            derived={name: compile_expression(expr) for name, expr in spec.get('derived', {}).items()},
+            rules=[_compile_rule(rule, groups) for rule in spec.get('rules', [])],
+        )
+
+    def extend(self, spec: Dict[str, Any]) -> 'RuleSet':
+        """Layer a client rule spec on top; rules with the same id are replaced in place"""
+        groups = {**self.groups, **{name: list(cols) for name, cols in spec.get('groups', {}).items()}}
+        rules = list(self.rules)
+        positions = {rule.template.code: i for i, rule in enumerate(rules)}
+        for rule_spec in spec.get('rules', []):
+            rule = _compile_rule(rule_spec, groups)
+            if rule.template.code in positions:
+                rules[positions[rule.template.code]] = rule
+            else:
+                rules.append(rule)
+        return RuleSet(
+            benchmarks={**self.benchmarks, **spec.get('benchmarks', {})},
+            groups=groups,
+            derived={**self.derived, **{n: compile_expression(e) for n, e in spec.get('derived', {}).items()}},
+            rules=rules,
+        )
+
+    def with_benchmarks(self, benchmarks: Dict[str, Dict[str, float]]) -> 'RuleSet':
+        merged = {name: dict(bounds) for name, bounds in self.benchmarks.items()}
+        for name, bounds in benchmarks.items():
+            merged.setdefault(name, {}).update(bounds)
+        return RuleSet(merged, self.groups, self.derived, self.rules)
+
+    def namespace(self) -> Dict[str, Any]:
+        namespace: Dict[str, Any] = dict(EXPRESSION_FUNCTIONS)
+        namespace.update(_INTERNAL)
+        for name, bounds in self.benchmarks.items():
+            for bound, value in bounds.items():
+                namespace[f'{name}_{bound}'] = value
+        return namespace
+
+
+def _read_rule_file(path: Union[str, Path]) -> Dict[str, Any]:
+    path = Path(path)
+    text = path.read_text(encoding='utf-8')
+    if path.suffix.lower() in ('.yaml', '.yml'):
+        if not YAML_AVAILABLE:
+            raise RuleError(f"PyYAML is required to load {path}")
+        return yaml.safe_load(text) or {}
+    return json.loads(text)
+
+
+def load_rules(*paths: Union[str, Path]) -> RuleSet:
+    """
+    Load and compile the default rules plus any client rule files.
+
+    Later files add rules or replace rules with the same id, so a client file
+    only needs to contain what differs from the defaults.
+    """
+    ruleset = RuleSet.from_dict(_read_rule_file(DEFAULT_RULES_PATH))
+    for path in paths:
+        ruleset = ruleset.extend(_read_rule_file(path))
+    return ruleset
+
+
+_default_rules: Optional[RuleSet] = None
+
+
+def default_rules() -> RuleSet:
+    global _default_rules
+    if _default_rules is None:
+        _default_rules = load_rules()
+    return _default_rules
+
+
+# --------------------------------------------------------------------------- #
+# Findings
+# --------------------------------------------------------------------------- #
+class DataQualityFindings:
+    """
+    Compact findings table for a batch.
+
+    One row per finding with columns `row` (input position), `rule`
+    (categorical rule id), numeric parameters `a`/`b` and a sparse `detail`
+    string, sorted by input row then severity then rule order.
+    """
+
+    def __init__(self, table: pd.DataFrame, n_rows: int, templates: Dict[str, FindingTemplate]):
+        self.table = table
+        self.n_rows = n_rows
+        self.templates = templates
+        self._offsets = np.searchsorted(table['row'].to_numpy(), np.arange(n_rows + 1))
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def severity_counts(self) -> pd.DataFrame:
+        """Per-row finding counts by severity (rows without findings included)"""
+        severity = self.table['rule'].map({code: t.severity for code, t in self.templates.items()})
+        counts = pd.crosstab(self.table['row'], severity)
+        counts = counts.reindex(index=range(self.n_rows), columns=list(SEVERITY_ORDER), fill_value=0)
+        return counts.rename_axis(index='row', columns=None)
+
+    def for_row(self, row: int) -> List[DataQualityFeedback]:
+        """Expand the findings of one input row into DataQualityFeedback objects"""
+        start, stop = self._offsets[row], self._offsets[row + 1]
+        block = self.table.iloc[start:stop]
+        return [
+            self._render(code, a, b, detail)
+            for code, a, b, detail in zip(block['rule'], block['a'], block['b'], block['detail'])
+        ]
+
+    def to_feedback(self) -> List[List[DataQualityFeedback]]:
+        return [self.for_row(i) for i in range(self.n_rows)]
+
+    def _render(self, code: str, a: float, b: float, detail: Optional[str]) -> DataQualityFeedback:
+        template = self.templates[code]
+        issue = template.issue
+        if '{' in issue:
+            issue = issue.format(a=a, b=b, detail=detail)
+        return DataQualityFeedback(
+            severity=template.severity,
+            field=template.field,
+            issue=issue,
+            recommendation=template.recommendation,
+            compliance_impact=template.compliance_impact,
+        )
+
+
+# --------------------------------------------------------------------------- #
+# Evaluation
+# --------------------------------------------------------------------------- #
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return np.nan
+
+
+def _numeric(frame: pd.DataFrame, columns: Sequence[str]) -> pd.DataFrame:
+    """Coerce columns to float; missing columns/cells count as 0, unparsable cells as NaN"""
+    out = {}
+    for col in columns:
+        if col not in frame:
+            out[col] = np.zeros(len(frame))
+            continue
+        raw = frame[col].to_numpy(dtype=object, na_value=0)
+        try:
+            out[col] = np.array(raw, dtype=float)
+        except (ValueError, TypeError):
+            # Slow path only for columns holding bad cells; same parsing rules as float()
+            out[col] = np.fromiter((_to_float(v) for v in raw), dtype=float, count=len(raw))
+    return pd.DataFrame(out, index=frame.index)
+
+
+def _first_invalid_detail(frame: pd.DataFrame, numbers: pd.DataFrame, rows: np.ndarray,
+                          columns: Sequence[str]) -> List[str]:
+    """Reproduce the float() error message for the first unparsable column of each row"""
+    invalid = numbers[list(columns)].isna().to_numpy()[rows]
+    first = invalid.argmax(axis=1)
+    raw = frame.reindex(columns=list(columns)).to_numpy(dtype=object)[rows, first]
+    return [f"could not convert string to float: {value!r}" for value in raw]
+
+
+def _strings(frame: pd.DataFrame, column: str) -> List[str]:
+    if column not in frame:
+        return [''] * len(frame)
+    return frame[column].to_numpy(dtype=object, na_value='').astype(str).tolist()
+
+
+def _peer_thresholds(metric: np.ndarray, keys: pd.DataFrame, eligible: np.ndarray,
+                     percentile: float, min_peers: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-row percentile of the row's peer group, from one group-by over eligible rows"""
+    if keys.shape[1] == 1:
+        codes, uniques = pd.factorize(keys.iloc[:, 0])
+        labels = np.array([str(u) for u in uniques], dtype=object)
+    else:
+        codes, uniques = pd.factorize(pd.MultiIndex.from_frame(keys))
+        labels = np.array([' / '.join(map(str, u)) for u in uniques], dtype=object)
+    eligible = eligible & (codes >= 0)
+
+    thresholds = np.full(len(uniques), np.nan)
+    peers = np.bincount(codes[eligible], minlength=len(uniques))
+    if eligible.any():
+        quantiles = pd.Series(metric[eligible]).groupby(codes[eligible]).quantile(percentile / 100.0)
+        thresholds[quantiles.index.to_numpy()] = quantiles.to_numpy()
+    thresholds[peers < min_peers] = np.nan
+
+    safe_codes = np.maximum(codes, 0)
+    row_threshold = np.where(codes >= 0, thresholds[safe_codes], np.nan) if len(uniques) else np.full(len(codes), np.nan)
+    row_label = labels[safe_codes] if len(uniques) else np.full(len(codes), '', dtype=object)
+    return row_threshold, row_label
+
+
+class BatchDataQualityAnalyzer:
+    """Evaluates a compiled rule set over a whole batch at once"""
+
+    def __init__(self, benchmarks: Optional[Dict[str, Dict[str, float]]] = None,
+                 rules: Optional[RuleSet] = None):
+        rules = rules or default_rules()
+        self.rules = rules.with_benchmarks(benchmarks) if benchmarks else rules
+
+    def analyze(self, rows: Sequence[Dict[str, Any]]) -> DataQualityFindings:
+        return self.analyze_frame(pd.DataFrame.from_records(list(rows)))
+
+    def analyze_frame(self, frame: pd.DataFrame) -> DataQualityFindings:
+        frame = frame.reset_index(drop=True)
+        ruleset = self.rules
+        n = len(frame)
+        parts: List[pd.DataFrame] = []
+        counts = {severity: np.zeros(n, dtype=np.int64) for severity in SEVERITY_ORDER}
+
+        numbers = _numeric(frame, ruleset.numeric_columns)
+        namespace = ruleset.namespace()
+        namespace.update({col: numbers[col].to_numpy() for col in numbers})
+        valid = {name: numbers[cols].notna().all(axis=1).to_numpy() for name, cols in ruleset.groups.items()}
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for name, expr in ruleset.derived.items():
+                namespace[name] = expr(namespace)
+
+            for rule in ruleset.rules:
+                mask, detail, a, b = self._evaluate(rule, frame, numbers, namespace, valid, counts)
+                rows = np.flatnonzero(mask)
+                if not len(rows):
+                    continue
+                if a is None and rule.a is not None:
+                    a = rule.a(namespace)
+                if b is None and rule.b is not None:
+                    b = rule.b(namespace)
+                parts.append(pd.DataFrame({
+                    'row': rows,
+                    'rule': rule.template.code,
+                    'a': np.broadcast_to(a, n)[rows] if a is not None else np.nan,
+                    'b': np.broadcast_to(b, n)[rows] if b is not None else np.nan,
+                    'detail': detail(rows) if detail else None,
+                }))
+                counts[rule.template.severity][rows] += 1
+
+        return self._finalize(parts, n)
+
+    def _evaluate(self, rule: CompiledRule, frame: pd.DataFrame, numbers: pd.DataFrame,
+                  namespace: Dict[str, Any], valid: Dict[str, np.ndarray], counts: Dict[str, np.ndarray]):
+        """Return (mask, detail_fn, a, b) for one rule; a/b None means use the rule's expressions"""
+        n = len(frame)
+        group_ok = valid[rule.group] if rule.group else np.ones(n, dtype=bool)
+        detail = None
+        a = b = None
+
+        if rule.kind == 'expr':
+            mask = group_ok & np.broadcast_to(np.asarray(rule.when(namespace), dtype=bool), n)
+        elif rule.kind == 'invalid':
+            mask = ~group_ok
+            columns = self.rules.groups[rule.group]
+            detail = lambda rows: _first_invalid_detail(frame, numbers, rows, columns)  # noqa: E731
+        elif rule.kind == 'pattern':
+            match, remove = rule.pattern.match, rule.remove
+
+            def failed(value: str) -> bool:
+                for token in remove:
+                    value = value.replace(token, '')
+                return match(value) is None
+
+            mask = np.fromiter(map(failed, _strings(frame, rule.column)), dtype=bool, count=n)
+        elif rule.kind == 'missing':
+            if rule.column in frame:
+                # Keys absent from some rows come through as NaN, which is truthy
+                mask = ~frame[rule.column].fillna('').astype(bool).to_numpy(dtype=bool)
+            else:
+                mask = np.ones(n, dtype=bool)
+        elif rule.kind == 'peer':
+            inputs = [name for name in rule.a.names if name in numbers.columns]
+            if any(col not in frame for col in (*rule.by, *inputs)):
+                # Peer rules need their benchmark columns; batches without them skip the rule
+                return np.zeros(n, dtype=bool), None, None, None
+            metric = np.broadcast_to(np.asarray(rule.a(namespace), dtype=float), n)
+            eligible = group_ok & np.isfinite(metric)
+            threshold, labels = _peer_thresholds(metric, frame[list(rule.by)], eligible,
+                                                 rule.percentile, rule.min_peers)
+            beyond = metric > threshold if rule.above else metric < threshold
+            mask = eligible & np.isfinite(threshold) & beyond
+            a, b = metric, threshold
+            detail = lambda rows: labels[rows].tolist()  # noqa: E731
+        else:  # escalation
+            mask = counts[rule.count_severity] >= rule.min_count
+
+        return np.asarray(mask, dtype=bool), detail, a, b
+
+    def _finalize(self, parts: List[pd.DataFrame], n: int) -> DataQualityFindings:
+        ruleset = self.rules
+        if parts:
+            table = pd.concat(parts, ignore_index=True)
+        else:
+            table = pd.DataFrame({c: pd.Series(dtype=float if c in ('a', 'b') else object) for c in FINDING_COLUMNS})
+            table['row'] = table['row'].astype(np.int64)
+        table['rule'] = table['rule'].astype(ruleset.rule_codes)
+        codes = table['rule'].cat.codes.to_numpy()
+        # Stable order: input row, then severity, then rule file order (matches the per-row analyzer)
+        order = np.lexsort((codes, ruleset.severity_rank[codes], table['row'].to_numpy()))
+        table = table.iloc[order].reset_index(drop=True)
+        return DataQualityFindings(table, n, ruleset.templates)
+
+
+# --------------------------------------------------------------------------- #
+# Quality scores and tiers                                                    #
+# --------------------------------------------------------------------------- #
+QUALITY_TIERS = pd.CategoricalDtype(['tier_1', 'tier_2', 'tier_3'])
+QUALITY_SCORES = range(1, 6)
+
+
+def score_quality(source_year: Any, reporting_year: int, geographical_match: Any, technology_match: Any,
+                  verification_level: Any = None, factor_tier: Any = None) -> Tuple[np.ndarray, pd.Categorical]:
+    """
+    DataQualityScorer.calculate_score over arrays: 1-5 scores (int8) and
+    quality tiers. `reporting_year` is fixed for the whole batch.
+    """
+    gap = reporting_year - np.asarray(source_year, dtype=np.int64)
+    score = (1 + 2 * (gap > 5) + (gap > 2) * (gap <= 5)
+             + ~np.asarray(geographical_match, dtype=bool) + ~np.asarray(technology_match, dtype=bool))
+    if verification_level is not None:
+        verified = pd.Series(verification_level).to_numpy(dtype=object) == 'reasonable_assurance'
+        score = np.maximum(1, score - verified)
+    if factor_tier is not None:
+        measured = pd.Series(factor_tier).map(lambda t: getattr(t, 'value', t)).to_numpy(dtype=object) == 'tier_3'
+    else:
+        measured = np.zeros(len(score), dtype=bool)
+    # Tier uses the uncapped score, as the per-voucher scorer does
+    tier_codes = np.where(measured, 2, np.where(score <= 2, 1, 0)).astype(np.int8)
+    tiers = pd.Categorical.from_codes(tier_codes, dtype=QUALITY_TIERS)
+    return np.minimum(5, score).astype(np.int8), tiers
+
+
+def score_vouchers(frame: pd.DataFrame, reporting_year: int) -> pd.DataFrame:
+    """
+    Score a frame with source_year, factor_country, installation_country,
+    technology and (optionally) verification_level / factor_tier columns;
+    returns data_quality_rating and data_quality_tier columns.
+    """
+    scores, tiers = score_quality(
+        frame['source_year'].to_numpy(),
+        reporting_year,
+        (frame['factor_country'] == frame['installation_country']).to_numpy(),
+        frame['technology'].notna().to_numpy() & (frame['technology'].astype(str) != ''),
+        frame['verification_level'] if 'verification_level' in frame else None,
+        frame['factor_tier'] if 'factor_tier' in frame else None,
+    )
+    return pd.DataFrame({'data_quality_rating': scores, 'data_quality_tier': tiers}, index=frame.index)
+
+
+def quality_histogram(entities: Any, scores: Any) -> pd.DataFrame:
+    """Vouchers per quality score (columns 1-5) for each entity, with the entity's mean score"""
+    codes, labels = pd.factorize(pd.Series(entities), sort=True)
+    scores = np.asarray(scores, dtype=np.int64)
+    width = len(QUALITY_SCORES)
+    counts = np.bincount(codes * width + (scores - 1), minlength=len(labels) * width).reshape(len(labels), width)
+    histogram = pd.DataFrame(counts, index=pd.Index(labels, name='entity'), columns=list(QUALITY_SCORES))
+    with np.errstate(invalid='ignore'):
+        histogram['mean_score'] = counts @ np.arange(1, width + 1) / counts.sum(axis=1)
+    return histogram
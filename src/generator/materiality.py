@@ -0,0 +1,162 @@
+"""
+Batch double materiality screening over an entity's vouchers.
+
+``assess_materiality`` in voucher_generator.py screens one voucher against a
+company total. For group-wide screening the vouchers are taken as columns
+instead and every supplier and every category is scored in one pass:
+
+- emissions and spend are summed per (entity, supplier) and per (entity,
+  category) with a single group-by each; entity totals come from the same
+  sums, so shares need no second scan
+- impact materiality: the topic's share of entity emissions reaches
+  ``impact_share`` percent
+- financial materiality: spend above ``financial_value`` on a topic that
+  also carries more than ``financial_share`` percent of entity emissions
+- scores are shares in [0, 1] (impact: emissions, financial: spend), as in
+  MaterialityAssessment, and material topics are ranked per entity
+
+The category is the voucher's Scope 3 category, or its emission scope for
+Scope 1 and 2 vouchers.
+"""
+
+import logging
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Iterable, Mapping, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TOPIC_COLUMNS = [
+    "emissions", "spend", "vouchers", "emission_share", "spend_share",
+    "impact_score", "financial_score", "impact_material", "financial_material", "materiality_type",
+]
+
+
+@dataclass(frozen=True)
+class MaterialityThresholds:
+    """Screening thresholds; shares are percentages of the entity total"""
+    impact_share: float = 5.0
+    financial_value: float = 100_000.0
+    financial_share: float = 5.0
+
+
+DEFAULT_THRESHOLDS = MaterialityThresholds()
+
+
+def materiality_type(impact_material: bool, financial_material: bool) -> str:
+    """'double', 'impact', 'financial' or 'none'"""
+    if impact_material and financial_material:
+        return "double"
+    if impact_material:
+        return "impact"
+    if financial_material:
+        return "financial"
+    return "none"
+
+
+def screen(
+    emission_share: Union[float, Decimal],
+    spend: Union[float, Decimal, None],
+    thresholds: MaterialityThresholds = DEFAULT_THRESHOLDS,
+) -> Tuple[bool, bool]:
+    """(impact_material, financial_material) for one topic"""
+    share = float(emission_share)
+    impact_material = share >= thresholds.impact_share
+    financial_material = bool(spend) and float(spend) > thresholds.financial_value and share > thresholds.financial_share
+    return impact_material, financial_material
+
+
+# --------------------------------------------------------------------------- #
+# Batch engine                                                                #
+# --------------------------------------------------------------------------- #
+
+def voucher_columns(vouchers: Iterable[Mapping[str, Any]]) -> pd.DataFrame:
+    """entity / supplier / category / emissions / spend columns from generated voucher dicts"""
+    rows = [
+        (
+            v.get("reporting_undertaking_id"),
+            v.get("supplier_id"),
+            v.get("scope3_category") or v.get("emission_scope"),
+            v.get("total_emissions_tco2e"),
+            v.get("monetary_value"),
+        )
+        for v in vouchers
+    ]
+    frame = pd.DataFrame(rows, columns=["entity", "supplier_id", "category", "emissions", "spend"])
+    frame["emissions"] = pd.to_numeric(frame["emissions"], errors="coerce").fillna(0.0)
+    frame["spend"] = pd.to_numeric(frame["spend"], errors="coerce").fillna(0.0)
+    return frame
+
+
+@dataclass
+class MaterialityResult:
+    """Scored suppliers and categories, and the material ones ranked per entity"""
+    suppliers: pd.DataFrame
+    categories: pd.DataFrame
+    topics: pd.DataFrame
+
+
+class MaterialityEngine:
+    """Vectorized double materiality screening for every supplier and category of each entity"""
+
+    def __init__(self, thresholds: MaterialityThresholds = DEFAULT_THRESHOLDS):
+        self.thresholds = thresholds
+
+    def _score(self, frame: pd.DataFrame, key: str) -> pd.DataFrame:
+        grouped = frame.groupby(["entity", key], sort=False, observed=True)
+        topics = grouped.agg(emissions=("emissions", "sum"), spend=("spend", "sum"), vouchers=("emissions", "size"))
+        entity = topics.groupby(level="entity", sort=False)
+        entity_emissions = entity["emissions"].transform("sum").to_numpy()
+        entity_spend = entity["spend"].transform("sum").to_numpy()
+
+        emissions = topics["emissions"].to_numpy()
+        spend = topics["spend"].to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            emission_share = np.where(entity_emissions > 0, emissions / entity_emissions * 100, 0.0)
+            spend_share = np.where(entity_spend > 0, spend / entity_spend * 100, 0.0)
+
+        t = self.thresholds
+        impact = emission_share >= t.impact_share
+        financial = (spend > t.financial_value) & (emission_share > t.financial_share)
+        topics["emission_share"] = emission_share
+        topics["spend_share"] = spend_share
+        topics["impact_score"] = emission_share / 100
+        topics["financial_score"] = spend_share / 100
+        topics["impact_material"] = impact
+        topics["financial_material"] = financial
+        topics["materiality_type"] = np.select(
+            [impact & financial, impact, financial], ["double", "impact", "financial"], default="none"
+        )
+        return topics[TOPIC_COLUMNS].sort_index()
+
+    def _rank(self, suppliers: pd.DataFrame, categories: pd.DataFrame) -> pd.DataFrame:
+        parts = []
+        for dimension, scored in (("supplier", suppliers), ("category", categories)):
+            material = scored[scored["materiality_type"] != "none"].reset_index()
+            material = material.rename(columns={material.columns[1]: "topic"})
+            material.insert(1, "dimension", dimension)
+            parts.append(material)
+        topics = pd.concat(parts, ignore_index=True)
+        # Double materiality first, then the larger of the two scores
+        topics["score"] = topics[["impact_score", "financial_score"]].max(axis=1)
+        topics["double"] = topics["materiality_type"] == "double"
+        topics = topics.sort_values(["entity", "double", "score"], ascending=[True, False, False], kind="stable")
+        topics["rank"] = topics.groupby("entity", sort=False).cumcount() + 1
+        return topics.drop(columns="double").reset_index(drop=True)
+
+    def assess(self, vouchers: Union[pd.DataFrame, Iterable[Mapping[str, Any]]]) -> MaterialityResult:
+        """
+        Screen `vouchers`: a frame with entity, supplier_id, category,
+        emissions and spend columns, or generated voucher dicts.
+        """
+        frame = vouchers if isinstance(vouchers, pd.DataFrame) else voucher_columns(vouchers)
+        suppliers = self._score(frame, "supplier_id")
+        categories = self._score(frame, "category")
+        topics = self._rank(suppliers, categories)
+        logger.info(
+            f"Screened {len(suppliers)} supplier and {len(categories)} category topics; {len(topics)} material"
+        )
+        return MaterialityResult(suppliers=suppliers, categories=categories, topics=topics)
@@ -0,0 +1,236 @@
+"""
+Per-stage timing and worker metrics for batch report runs.
+
+Every pipeline stage (quality analysis, voucher construction, iXBRL
+generation, validation, report and archive writing) is timed as a span with
+``perf_counter_ns``. Each span also records the thread's CPU time, so a slow
+stage shows whether it is computing or waiting on disk:
+
+- per stage: count, total wall and CPU seconds, and p50/p95/p99/max
+- queue depth: rows submitted to the worker pool and not yet picked up
+  (maximum and time-weighted mean)
+- worker utilization: time spent inside row tasks over wall time times
+  workers, and how many distinct threads ran at least one task
+
+The summary goes into report_log.json. It can also be written as a
+Prometheus text file (for the node_exporter textfile collector, or served as
+``/metrics``) and as a Chrome trace (chrome://tracing or Perfetto).
+Durations are kept as packed integers, and individual spans are kept only
+when a trace is requested.
+"""
+
+import json
+import os
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+PERCENTILES = (50, 95, 99)
+
+# (stage, start ns, wall ns, cpu ns, thread number, label)
+Span = Tuple[str, int, int, int, int, Optional[str]]
+
+
+def percentile(ordered: List[int], pct: float) -> int:
+    """Nearest-rank percentile of an ascending list"""
+    if not ordered:
+        return 0
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+class PipelineMetrics:
+    """Thread-safe span recorder for one batch run"""
+
+    def __init__(self, workers: int = 1, keep_spans: bool = False):
+        self.workers = workers
+        self.keep_spans = keep_spans
+        self._lock = threading.Lock()
+        # Threads are numbered per run: get_ident() values are reused once a
+        # thread exits, which would merge distinct workers
+        self._local = threading.local()
+        self._thread_count = 0
+        self._wall: Dict[str, array] = {}
+        self._cpu: Dict[str, int] = {}
+        self._busy: Dict[int, int] = {}
+        self._spans: List[Span] = []
+        self._queue_samples: List[Tuple[int, int]] = []
+        self._queued = 0
+        self._max_queued = 0
+        self._queue_area = 0  # depth integrated over time, in ns
+        self._queue_changed = self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+
+    # ------------------------------------------------------------------ #
+    # Recording
+    # ------------------------------------------------------------------ #
+    @contextmanager
+    def span(self, stage: str, label: Optional[str] = None) -> Iterator[None]:
+        """Time the enclosed block as one `stage` span"""
+        cpu_start = time.thread_time_ns()
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(stage, start, time.perf_counter_ns() - start, time.thread_time_ns() - cpu_start, label)
+
+    def _thread(self) -> int:
+        """Run-local number of the calling thread"""
+        number = getattr(self._local, "number", None)
+        if number is None:
+            with self._lock:
+                number = self._local.number = self._thread_count
+                self._thread_count += 1
+        return number
+
+    def record(self, stage: str, start_ns: int, wall_ns: int, cpu_ns: int = 0, label: Optional[str] = None) -> None:
+        thread = self._thread()
+        with self._lock:
+            durations = self._wall.get(stage)
+            if durations is None:
+                durations = self._wall[stage] = array("q")
+            durations.append(wall_ns)
+            self._cpu[stage] = self._cpu.get(stage, 0) + cpu_ns
+            if self.keep_spans:
+                self._spans.append((stage, start_ns, wall_ns, cpu_ns, thread, label))
+
+    def _move_queue(self, delta: int) -> None:
+        now = time.perf_counter_ns()
+        with self._lock:
+            self._queue_area += self._queued * (now - self._queue_changed)
+            self._queue_changed = now
+            self._queued = max(0, self._queued + delta)
+            self._max_queued = max(self._max_queued, self._queued)
+            if self.keep_spans:
+                self._queue_samples.append((now, self._queued))
+
+    def enqueued(self, count: int = 1) -> None:
+        """`count` rows were submitted to the worker pool"""
+        self._move_queue(count)
+
+    @contextmanager
+    def task(self, label: Optional[str] = None) -> Iterator[None]:
+        """One row on a worker: leaves the queue, and its wall time counts as busy"""
+        self._move_queue(-1)
+        start = time.perf_counter_ns()
+        try:
+            with self.span("task", label):
+                yield
+        finally:
+            busy = time.perf_counter_ns() - start
+            thread = self._thread()
+            with self._lock:
+                self._busy[thread] = self._busy.get(thread, 0) + busy
+
+    def finish(self) -> None:
+        self.end_ns = time.perf_counter_ns()
+
+    # ------------------------------------------------------------------ #
+    # Aggregates
+    # ------------------------------------------------------------------ #
+    def summary(self) -> Dict[str, Any]:
+        """Per-stage percentiles, queue depth and worker utilization (seconds / milliseconds)"""
+        end = self.end_ns or time.perf_counter_ns()
+        wall_ns = max(1, end - self.start_ns)
+        with self._lock:
+            durations = {stage: sorted(values) for stage, values in self._wall.items()}
+            cpu = dict(self._cpu)
+            busy = dict(self._busy)
+            queue_area = self._queue_area + self._queued * (end - self._queue_changed)
+            max_queued = self._max_queued
+
+        stages = {}
+        for stage, ordered in durations.items():
+            total = sum(ordered)
+            stats = {
+                "count": len(ordered),
+                "total_seconds": round(total / 1e9, 6),
+                "cpu_seconds": round(cpu[stage] / 1e9, 6),
+                "cpu_share": round(cpu[stage] / total, 4) if total else 0.0,
+                "mean_ms": round(total / len(ordered) / 1e6, 3),
+            }
+            for pct in PERCENTILES:
+                stats[f"p{pct}_ms"] = round(percentile(ordered, pct) / 1e6, 3)
+            stats["max_ms"] = round(ordered[-1] / 1e6, 3)
+            stages[stage] = stats
+
+        busy_total = sum(busy.values())
+        return {
+            "wall_seconds": round(wall_ns / 1e9, 6),
+            "stages": stages,
+            "queue": {"max_depth": max_queued, "mean_depth": round(queue_area / wall_ns, 3)},
+            "workers": {
+                "count": self.workers,
+                "active": len(busy),  # distinct threads that ran a task, not a concurrency peak
+                "busy_seconds": round(busy_total / 1e9, 6),
+                "utilization": round(busy_total / (wall_ns * max(1, self.workers)), 4),
+            },
+        }
+
+    # ------------------------------------------------------------------ #
+    # Export
+    # ------------------------------------------------------------------ #
+    def to_prometheus(self, prefix: str = "factortrace_batch") -> str:
+        """Prometheus text exposition format"""
+        summary = self.summary()
+        lines = [
+            f"# HELP {prefix}_stage_seconds Wall time per pipeline stage span",
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        for stage, stats in summary["stages"].items():
+            for pct in PERCENTILES:
+                lines.append(f'{prefix}_stage_seconds{{stage="{stage}",quantile="{pct / 100}"}} {round(stats[f"p{pct}_ms"] / 1000, 9)}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {stats["total_seconds"]}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+        lines += [f"# HELP {prefix}_stage_cpu_seconds_total CPU time per pipeline stage",
+                  f"# TYPE {prefix}_stage_cpu_seconds_total counter"]
+        lines += [f'{prefix}_stage_cpu_seconds_total{{stage="{stage}"}} {stats["cpu_seconds"]}'
+                  for stage, stats in summary["stages"].items()]
+        gauges = [
+            ("wall_seconds", "Wall time of the batch run", summary["wall_seconds"]),
+            ("queue_depth_max", "Most rows waiting for a worker at once", summary["queue"]["max_depth"]),
+            ("queue_depth_mean", "Time-weighted mean of rows waiting for a worker", summary["queue"]["mean_depth"]),
+            ("workers", "Worker pool size", summary["workers"]["count"]),
+            ("worker_utilization", "Share of worker time spent on rows", summary["workers"]["utilization"]),
+        ]
+        for name, help_text, value in gauges:
+            lines += [f"# HELP {prefix}_{name} {help_text}", f"# TYPE {prefix}_{name} gauge", f"{prefix}_{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Union[str, Path], prefix: str = "factortrace_batch") -> None:
+        """Write atomically, so a textfile collector never reads a partial file"""
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(self.to_prometheus(prefix), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Trace Event Format: one complete event per span and a queue depth counter"""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self._spans)
+            samples = list(self._queue_samples)
+        events: List[Dict[str, Any]] = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": f"thread-{tid}"}}
+            for tid in sorted({span[4] for span in spans})
+        ]
+        for stage, start, wall, cpu, thread, label in spans:
+            args = {"cpu_ms": round(cpu / 1e6, 3)}
+            if label is not None:
+                args["lei"] = label
+            events.append({
+                "name": stage, "cat": "batch", "ph": "X", "pid": pid, "tid": thread,
+                "ts": (start - self.start_ns) / 1000, "dur": wall / 1000, "args": args,
+            })
+        events += [
+            {"name": "queue_depth", "ph": "C", "pid": pid, "ts": (at - self.start_ns) / 1000, "args": {"rows": depth}}
+            for at, depth in samples
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: Union[str, Path]) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
@@ -0,0 +1,442 @@
+"""
+Monte Carlo uncertainty propagation for emission inventories.
+
+``EmissionCalculator.calculate_emissions`` reports a linear ±% range around
+each voucher. CSRD uncertainty disclosures need the combined distribution of
+a whole inventory instead, so this module samples it:
+
+- every emission factor is sampled from its own distribution (normal,
+  lognormal, triangular or uniform, as in ``EmissionFactorData.distribution``)
+  as a relative multiplier with a central value of 1. Line items that share a
+  factor share its draws, so they are fully correlated
+- each factor has its own random stream, seeded from ``seed`` and the factor
+  id, so results are reproducible and do not depend on chunk size or on
+  which other factors the inventory holds
+- line items are processed as (items x samples) matrices in chunks sized to
+  ``memory_limit`` and cut at voucher boundaries. Only entity and
+  entity/scope totals are carried across chunks, so a million line items
+  with 10k samples runs in bounded memory
+
+Results are percentile tables per voucher, per (entity, scope) and per entity.
+
+``AnalyticAggregator`` gives the same tables in milliseconds for dashboards:
+IPCC error propagation on the same per-factor moments, with items that share
+a factor summed as fully correlated, and lognormal moment matching for the
+intervals.
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLES = 10_000
+DEFAULT_PERCENTILES = (2.5, 50.0, 97.5)
+DEFAULT_MEMORY_LIMIT = 256 * 1024 * 1024
+
+ITEM_COLUMNS = [
+    "voucher_id", "entity", "scope", "emissions",
+    "factor_id", "uncertainty_percent", "confidence_level", "distribution",
+]
+
+# --------------------------------------------------------------------------- #
+# Factor distributions                                                        #
+# --------------------------------------------------------------------------- #
+
+def distribution_name(distribution: Any) -> str:
+    """'lognormal', 'LOGNORMAL' and UncertaintyDistributionEnum members all map to 'lognormal'"""
+    name = str(getattr(distribution, "value", distribution) or "lognormal").lower()
+    if name not in SAMPLERS:
+        raise ValueError(f"Unsupported uncertainty distribution: {distribution!r}")
+    return name
+
+
+def relative_sigma(uncertainty_percent: float, confidence_level: float) -> float:
+    """Standard deviation, relative to the central value, of a ±percent interval at a confidence level"""
+    z = NormalDist().inv_cdf(0.5 + confidence_level / 200)
+    return uncertainty_percent / 100 / z
+
+
+def relative_std(uncertainty_percent: float, confidence_level: float, distribution: Any = "lognormal") -> float:
+    """Relative standard deviation of a factor's multiplier, as sampled by SAMPLERS"""
+    name = distribution_name(distribution)
+    fraction = uncertainty_percent / 100
+    if name == "uniform":
+        return fraction / (confidence_level / 100) / np.sqrt(3)
+    if name == "triangular":
+        return fraction / (1 - np.sqrt(1 - confidence_level / 100)) / np.sqrt(6)
+    return relative_sigma(uncertainty_percent, confidence_level)
+
+
+def _normal(rng: np.random.Generator, percent: float, confidence: float, size: int) -> np.ndarray:
+    # Emission factors are non-negative; the lower tail is cut at zero
+    draws = rng.normal(1.0, relative_sigma(percent, confidence), size)
+    return np.maximum(draws, 0.0, out=draws)
+
+
+def _lognormal(rng: np.random.Generator, percent: float, confidence: float, size: int) -> np.ndarray:
+    # Moment matched: mean 1 and the same relative standard deviation as the normal case
+    cv = relative_sigma(percent, confidence)
+    sigma = np.sqrt(np.log1p(cv * cv))
+    return rng.lognormal(-sigma * sigma / 2, sigma, size)
+
+
+def _uniform(rng: np.random.Generator, percent: float, confidence: float, size: int) -> np.ndarray:
+    # ±percent holds `confidence` of the mass, so the full half-width is wider
+    half_width = percent / 100 / (confidence / 100)
+    return rng.uniform(max(0.0, 1 - half_width), 1 + half_width, size)
+
+
+def _triangular(rng: np.random.Generator, percent: float, confidence: float, size: int) -> np.ndarray:
+    # Symmetric triangle: P(|x - 1| <= h) = 1 - (1 - h/a)^2
+    half_width = percent / 100 / (1 - np.sqrt(1 - confidence / 100))
+    return rng.triangular(max(0.0, 1 - half_width), 1.0, 1 + half_width, size)
+
+
+SAMPLERS: Dict[str, Callable[[np.random.Generator, float, float, int], np.ndarray]] = {
+    "normal": _normal,
+    "lognormal": _lognormal,
+    "uniform": _uniform,
+    "triangular": _triangular,
+}
+
+
+def _factor_key(factor_id: str) -> int:
+    return int.from_bytes(hashlib.blake2b(str(factor_id).encode(), digest_size=8).digest(), "little")
+
+
+def sample_factor(
+    factor_id: str,
+    uncertainty_percent: float,
+    confidence_level: float = 95.0,
+    distribution: Any = "lognormal",
+    samples: int = DEFAULT_SAMPLES,
+    seed: int = 0,
+) -> np.ndarray:
+    """Relative multipliers for one factor; the same arguments always give the same draws"""
+    rng = np.random.default_rng([seed, _factor_key(factor_id)])
+    if uncertainty_percent <= 0:
+        return np.ones(samples)
+    return SAMPLERS[distribution_name(distribution)](rng, float(uncertainty_percent), float(confidence_level), samples)
+
+
+# --------------------------------------------------------------------------- #
+# Line items                                                                  #
+# --------------------------------------------------------------------------- #
+
+def line_items(vouchers: Iterable[Mapping[str, Any]], factors: Optional[Mapping[str, Any]] = None) -> pd.DataFrame:
+    """
+    One line item per generated voucher (``generate_voucher`` output).
+
+    Uncertainty parameters come from the voucher's EmissionFactorData in
+    `factors` when given; otherwise the ±% is recovered from the voucher's
+    uncertainty bounds and the distribution defaults to lognormal. The
+    voucher's data_quality_rating is kept for ``AnalyticAggregator``.
+    """
+    factors = factors or {}
+    rows = []
+    for voucher in vouchers:
+        total = float(voucher.get("total_emissions_tco2e") or 0)
+        factor = factors.get(voucher.get("emission_factor_id"))
+        if factor is not None:
+            _, upper = factor.get_uncertainty_range()
+            percent = (float(upper) / float(factor.value) - 1) * 100 if factor.value else 0.0
+            confidence = float(factor.confidence_level)
+            distribution = factor.distribution
+        else:
+            upper = voucher.get("uncertainty_upper")
+            percent = (float(upper) / total - 1) * 100 if upper is not None and total else 0.0
+            confidence = float(voucher.get("confidence_level") or 95)
+            distribution = "lognormal"
+        rows.append((
+            voucher.get("voucher_id"), voucher.get("reporting_undertaking_id"), voucher.get("emission_scope"),
+            total, voucher.get("emission_factor_id"), percent, confidence, distribution_name(distribution),
+            voucher.get("data_quality_rating"),
+        ))
+    return pd.DataFrame(rows, columns=[*ITEM_COLUMNS, "data_quality_rating"])
+
+
+def _combined_codes(columns: Sequence[pd.Series], names: Sequence[str]) -> Tuple[np.ndarray, pd.MultiIndex]:
+    """Codes of the distinct combinations of `columns`, in sorted order, without building tuples per row"""
+    key = np.zeros(len(columns[0]), dtype=np.int64)
+    levels, radices = [], []
+    for column in columns:
+        codes, values = pd.factorize(column, sort=True, use_na_sentinel=False)
+        key = key * len(values) + codes
+        levels.append(values)
+        radices.append(len(values))
+    codes, keys = pd.factorize(key, sort=True)
+    level_codes = []
+    for radix in reversed(radices):
+        level_codes.append(keys % radix)
+        keys = keys // radix
+    return codes, pd.MultiIndex(levels=levels, codes=level_codes[::-1], names=list(names))
+
+
+# --------------------------------------------------------------------------- #
+# Engine                                                                      #
+# --------------------------------------------------------------------------- #
+
+@dataclass
+class UncertaintyReport:
+    """Percentile tables per voucher, per (entity, scope) and per entity; analytic reports have 0 samples"""
+    vouchers: pd.DataFrame
+    scopes: pd.DataFrame
+    entities: pd.DataFrame
+    samples: int = 0
+    seed: Optional[int] = None
+
+
+class MonteCarloEngine:
+    """Seeded, chunked Monte Carlo propagation of emission factor uncertainty"""
+
+    def __init__(
+        self,
+        samples: int = DEFAULT_SAMPLES,
+        seed: int = 0,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+        memory_limit: int = DEFAULT_MEMORY_LIMIT,
+    ):
+        if samples < 2:
+            raise ValueError("Monte Carlo needs at least 2 samples")
+        self.samples = samples
+        self.seed = seed
+        self.percentiles = tuple(percentiles)
+        self.memory_limit = memory_limit
+        self._slots: Dict[int, int] = {}
+        self._table = np.empty((0, samples))
+
+    @property
+    def chunk_items(self) -> int:
+        """Line items per chunk: half the budget holds factor draws, the rest voucher totals"""
+        return max(1, self.memory_limit // (4 * 8 * self.samples))
+
+    def _stats(self, totals: np.ndarray) -> np.ndarray:
+        """mean, std and percentiles for each row of a (groups x samples) matrix; sorts `totals` in place"""
+        out = np.empty((len(totals), 2 + len(self.percentiles)))
+        if len(totals):
+            out[:, 0] = totals.mean(axis=1)
+            out[:, 1] = totals.std(axis=1, ddof=1)
+            # One sort serves every percentile and is cheaper than np.percentile's partitions
+            totals.sort(axis=1)
+            position = np.asarray(self.percentiles) / 100 * (self.samples - 1)
+            lower = np.floor(position).astype(int)
+            upper = np.minimum(lower + 1, self.samples - 1)
+            weight = position - lower
+            out[:, 2:] = totals[:, lower] * (1 - weight) + totals[:, upper] * weight
+        return out
+
+    def _frame(self, keys: Any, stats: np.ndarray) -> pd.DataFrame:
+        columns = ["mean", "std", *(f"p{q:g}" for q in self.percentiles)]
+        return pd.DataFrame(stats, index=keys, columns=columns)
+
+    def _factor_rows(self, codes: np.ndarray, params: List[Tuple[Any, ...]]) -> np.ndarray:
+        """Rows of the draw table holding each factor in `codes`, drawing factors not held yet"""
+        missing = [code for code in codes.tolist() if code not in self._slots]
+        if len(self._slots) + len(missing) > len(self._table):
+            # Table full: start over with this chunk's factors
+            self._slots.clear()
+            missing = codes.tolist()
+            if len(missing) > len(self._table):
+                self._table = np.empty((len(missing), self.samples))
+        for code in missing:
+            factor_id, percent, confidence, distribution = params[code]
+            row = self._slots[code] = len(self._slots)
+            self._table[row] = sample_factor(factor_id, percent, confidence, distribution, self.samples, self.seed)
+        return np.array([self._slots[code] for code in codes.tolist()], dtype=np.intp)
+
+    def _voucher_totals(self, rows: np.ndarray, emissions: np.ndarray, heads: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """(vouchers x samples) totals, summed by position within the voucher instead of over an items matrix"""
+        totals = self._table[rows[heads]]
+        totals *= emissions[heads, None]
+        for offset in range(1, int(lengths.max())):
+            longer = np.flatnonzero(lengths > offset)
+            item = heads[longer] + offset
+            totals[longer] += self._table[rows[item]] * emissions[item, None]
+        return totals
+
+    def run(self, items: pd.DataFrame) -> UncertaintyReport:
+        """Propagate factor uncertainty through `items` (see ITEM_COLUMNS, or ``line_items``)"""
+        n = len(items)
+        entity_codes, entities = pd.factorize(items["entity"], sort=True)
+        group_codes, groups = _combined_codes([items["entity"], items["scope"]], ["entity", "scope"])
+        voucher_codes, voucher_ids = pd.factorize(items["voucher_id"])
+        # Line items without a factor_id share one unnamed factor
+        factor_codes, _ = pd.factorize(items["factor_id"], use_na_sentinel=False)
+        # Parameters of a factor are taken from its first line item
+        _, first_items = np.unique(factor_codes, return_index=True)
+        params = list(
+            items[["factor_id", "uncertainty_percent", "confidence_level", "distribution"]]
+            .iloc[first_items].itertuples(index=False, name=None)
+        )
+
+        # Sorting by (entity, scope, voucher) makes every group a contiguous run
+        order = np.lexsort((voucher_codes, group_codes, entity_codes))
+        emissions = items["emissions"].to_numpy(dtype=float)[order]
+        voucher_codes, group_codes, factor_codes = voucher_codes[order], group_codes[order], factor_codes[order]
+        voucher_starts = np.flatnonzero(np.r_[True, voucher_codes[1:] != voucher_codes[:-1]]) if n else np.empty(0, int)
+        voucher_group = group_codes[voucher_starts]
+        group_entity = entities.get_indexer(groups.get_level_values("entity"))
+        capacity = min(len(params), self.memory_limit // 2 // (8 * self.samples))
+        self._table = np.empty((max(1, capacity), self.samples))
+        self._slots.clear()
+
+        group_totals = np.zeros((len(groups), self.samples))
+        voucher_stats: List[np.ndarray] = []
+        step = self.chunk_items
+        first = 0
+        while first < len(voucher_starts):
+            # Whole vouchers only; a voucher larger than the budget is still taken in one piece
+            begin = voucher_starts[first]
+            last = max(first + 1, int(np.searchsorted(voucher_starts, begin + step, side="right")) - 1)
+            end = voucher_starts[last] if last < len(voucher_starts) else n
+
+            uniq, inverse = np.unique(factor_codes[begin:end], return_inverse=True)
+            rows = self._factor_rows(uniq, params)[inverse]
+            heads = voucher_starts[first:last] - begin
+            totals = self._voucher_totals(rows, emissions[begin:end], heads, np.diff(np.r_[heads, end - begin]))
+
+            chunk_groups = voucher_group[first:last]
+            runs = np.r_[np.flatnonzero(np.r_[True, chunk_groups[1:] != chunk_groups[:-1]]), len(chunk_groups)]
+            for run_start, run_end in zip(runs[:-1], runs[1:]):
+                group_totals[chunk_groups[run_start]] += totals[run_start:run_end].sum(axis=0)
+            voucher_stats.append(self._stats(totals))
+            first = last
+
+        entity_totals = np.zeros((len(entities), self.samples))
+        np.add.at(entity_totals, group_entity, group_totals)
+
+        voucher_keys = pd.Index(voucher_ids[voucher_codes[voucher_starts]], name="voucher_id")
+        stats = np.concatenate(voucher_stats) if voucher_stats else self._stats(np.empty((0, self.samples)))
+        self._table = np.empty((0, self.samples))
+        self._slots.clear()
+        logger.info(f"Propagated {n} line items over {self.samples} samples in {len(voucher_stats)} chunks")
+        return UncertaintyReport(
+            vouchers=self._frame(voucher_keys, stats),
+            scopes=self._frame(groups, self._stats(group_totals)),
+            entities=self._frame(pd.Index(entities, name="entity"), self._stats(entity_totals)),
+            samples=self.samples,
+            seed=self.seed,
+        )
+
+
+# --------------------------------------------------------------------------- #
+# Analytic aggregation                                                        #
+# --------------------------------------------------------------------------- #
+
+# Extra activity-data uncertainty (±%, 95%) per DataQualityScorer rating;
+# independent per line item, so it adds in quadrature
+DATA_QUALITY_UNCERTAINTY = {1: 0.0, 2: 5.0, 3: 10.0, 4: 20.0, 5: 30.0}
+
+
+def _item_sigmas(items: pd.DataFrame, quality_uncertainty: Optional[Mapping[int, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-item standard deviation from the factor (correlated) and from data quality (independent)"""
+    emissions = items["emissions"].to_numpy(dtype=float)
+    relative = np.empty(len(items))
+    codes, combos = _combined_codes(
+        [items["uncertainty_percent"], items["confidence_level"], items["distribution"]],
+        ["uncertainty_percent", "confidence_level", "distribution"],
+    )
+    for code, (percent, confidence, distribution) in enumerate(combos):
+        relative[codes == code] = relative_std(float(percent), float(confidence), distribution)
+    factor_sigma = np.abs(emissions) * relative
+
+    quality_var = np.zeros(len(items))
+    if quality_uncertainty and "data_quality_rating" in items:
+        percent = items["data_quality_rating"].map(quality_uncertainty).fillna(0).to_numpy(dtype=float)
+        # relative_sigma is linear in the percent, so one call covers every rating
+        quality_var = (emissions * percent * relative_sigma(1.0, 95.0)) ** 2
+    return factor_sigma, quality_var
+
+
+def _correlated_moments(
+    levels: np.ndarray, factors: np.ndarray, mean: np.ndarray, sigma: np.ndarray, extra_var: np.ndarray, n_levels: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Mean and variance per level. Sigmas within a (level, factor) pair add
+    linearly, pairs add in quadrature. Also returns the pair sums and pair
+    levels, so a coarser level can be rolled up without revisiting items.
+    """
+    pairs, (pair_levels, pair_factors) = _factorize_pairs(levels, factors)
+    pair_sigma = np.bincount(pairs, weights=sigma, minlength=len(pair_levels))
+    variance = np.bincount(pair_levels, weights=pair_sigma * pair_sigma, minlength=n_levels)
+    variance += np.bincount(levels, weights=extra_var, minlength=n_levels)
+    return np.bincount(levels, weights=mean, minlength=n_levels), variance, pair_sigma, np.stack([pair_levels, pair_factors])
+
+
+def _factorize_pairs(a: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+    """Codes of the distinct (a, b) pairs of two code arrays, and the a and b of each pair"""
+    width = int(b.max(initial=0)) + 1
+    codes, uniques = pd.factorize(a.astype(np.int64) * width + b)
+    return codes, (uniques // width, uniques % width)
+
+
+class AnalyticAggregator:
+    """
+    Uncertainty bounds without sampling: IPCC Approach 1 error propagation
+    with full correlation between items that share a factor_id.
+    """
+
+    def __init__(
+        self,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+        distribution: str = "lognormal",
+        quality_uncertainty: Optional[Mapping[int, float]] = None,
+    ):
+        if distribution not in ("lognormal", "normal"):
+            raise ValueError("Analytic totals are either lognormal (moment matched) or normal")
+        self.percentiles = tuple(percentiles)
+        self.distribution = distribution
+        self.quality_uncertainty = quality_uncertainty
+
+    def _frame(self, keys: Any, mean: np.ndarray, variance: np.ndarray) -> pd.DataFrame:
+        std = np.sqrt(variance)
+        z = np.array([NormalDist().inv_cdf(q / 100) for q in self.percentiles])
+        if self.distribution == "normal":
+            bounds = mean[:, None] + std[:, None] * z
+        else:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                log_var = np.log1p(variance / (mean * mean))
+                mu = np.log(mean) - log_var / 2
+                bounds = np.exp(mu[:, None] + np.sqrt(log_var)[:, None] * z)
+            # No spread (or no emissions): the interval collapses onto the mean
+            flat = (variance == 0) | (mean <= 0)
+            bounds[flat] = mean[flat, None]
+        columns = ["mean", "std", *(f"p{q:g}" for q in self.percentiles)]
+        return pd.DataFrame(np.column_stack([mean, std, bounds]), index=keys, columns=columns)
+
+    def run(self, items: pd.DataFrame) -> UncertaintyReport:
+        """Moments and intervals per voucher, per (entity, scope) and per entity for `items`"""
+        emissions = items["emissions"].to_numpy(dtype=float)
+        sigma, quality_var = _item_sigmas(items, self.quality_uncertainty)
+        # As in MonteCarloEngine, items without a factor_id share one unnamed factor
+        factor_codes, _ = pd.factorize(items["factor_id"], use_na_sentinel=False)
+        voucher_codes, voucher_ids = pd.factorize(items["voucher_id"])
+        entity_codes, entities = pd.factorize(items["entity"], sort=True)
+        group_codes, groups = _combined_codes([items["entity"], items["scope"]], ["entity", "scope"])
+        group_entity = entities.get_indexer(groups.get_level_values("entity"))
+
+        voucher_mean, voucher_var, _, _ = _correlated_moments(
+            voucher_codes, factor_codes, emissions, sigma, quality_var, len(voucher_ids)
+        )
+        group_mean, group_var, pair_sigma, (pair_groups, pair_factors) = _correlated_moments(
+            group_codes, factor_codes, emissions, sigma, quality_var, len(groups)
+        )
+        # Entities from the (entity, scope, factor) sums: a factor stays correlated across scopes
+        entity_pairs, (entity_of_pair, _) = _factorize_pairs(group_entity[pair_groups], pair_factors)
+        entity_sigma = np.bincount(entity_pairs, weights=pair_sigma, minlength=len(entity_of_pair))
+        entity_var = np.bincount(entity_of_pair, weights=entity_sigma * entity_sigma, minlength=len(entities))
+        entity_var += np.bincount(entity_codes, weights=quality_var, minlength=len(entities))
+        entity_mean = np.bincount(group_entity, weights=group_mean, minlength=len(entities))
+
+        return UncertaintyReport(
+            vouchers=self._frame(pd.Index(voucher_ids, name="voucher_id"), voucher_mean, voucher_var),
+            scopes=self._frame(groups, group_mean, group_var),
+            entities=self._frame(pd.Index(entities, name="entity"), entity_mean, entity_var),
+        )
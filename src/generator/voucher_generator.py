@@ -27,12 +27,18 @@ from factortrace.models.uncertainty_model import (
     UncertaintyDistributionEnum,
 )
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 from functools import lru_cache
-import redis
 
-from lxml import etree
-from lxml.etree import Element, QName, SubElement, XMLSchema, XMLSyntaxError
+from lxml.etree import QName, SubElement, XMLSyntaxError
+
+from factortrace.utils.schema_registry import schema_registry
+from export.voucher_plans import esrs_v2_plan
+
+# redis and the pandas-backed batch modules are imported where they are used,
+# so workers and CLI tools that only generate vouchers start quickly
+if TYPE_CHECKING:
+    import redis
 
 # Configure audit logging per ESRS 1 §76
 logger = logging.getLogger(__name__)
@@ -309,7 +315,7 @@ class EmissionCalculator:
                 
                 total_co2e += co2e_emissions
         
-        # Calculate uncertainty
+        # Linear range for this voucher; inventory-level sampling is in uncertainty.py
         uncertainty_range = emission_factor.get_uncertainty_range()
         lower_bound = total_co2e * (uncertainty_range[0] / emission_factor.value)
         upper_bound = total_co2e * (uncertainty_range[1] / emission_factor.value)
@@ -562,6 +568,22 @@ class DataQualityScorer:
         
         return min(5, score), tier
 
+    @staticmethod
+    def score_batch(
+        source_year: Any,
+        reporting_year: int,
+        geographical_match: Any,
+        technology_match: Any,
+        verification_level: Any = None,
+        factor_tier: Any = None,
+    ) -> Tuple[Any, Any]:
+        """calculate_score over arrays of vouchers; see data_quality.score_quality"""
+        from generator.data_quality import score_quality
+
+        return score_quality(
+            source_year, reporting_year, geographical_match, technology_match, verification_level, factor_tier
+        )
+
 
 # --------------------------------------------------------------------------- #
 # VOUCHER GENERATION LOGIC                                                    #
@@ -605,7 +627,7 @@ def generate_voucher(
     )
     
     # Calculate data quality score
-    temporal_gap = datetime.now().year - emission_factor.source_year
+    temporal_gap = input_data.reporting_period_end.year - emission_factor.source_year
     quality_score, quality_tier = DataQualityScorer.calculate_score(
         emission_factor=emission_factor,
         temporal_correlation=temporal_gap,
@@ -723,6 +745,10 @@ def serialize_voucher(
     """
     Serialize emission voucher to ESRS/CBAM-compliant XML.
     Enhanced with AR6 GWP and full regulatory compliance.
+
+    The layout is the compiled ESRS v2 plan in export.voucher_plans; for
+    batches use voucher_xml_stream.write_voucher_batch, which streams the
+    same plan into one envelope.
     """
     logger.info(f"Serializing voucher ID: {voucher.get('voucher_id', 'UNKNOWN')}")
     
@@ -730,152 +756,15 @@ def serialize_voucher(
     if is_dataclass(voucher):
         data = asdict(voucher)
     elif isinstance(voucher, dict):
-        data = dict(voucher)
+        data = voucher
     else:
         raise TypeError(f"Voucher must be dict or dataclass, got {type(voucher)}")
     
-    # Build XML structure
-    root = Element(
-        QName(NAMESPACE, "EmissionVoucher"),
-        nsmap=NSMAP if include_cbam_namespace else {None: NAMESPACE}
-    )
-    
-    # Set schema location and version
-    root.set(QName(XSI_NAMESPACE, "schemaLocation"), f"{NAMESPACE} emission-voucher-v2.xsd")
-    root.set("schemaVersion", data.get("schema_version", SCHEMA_VERSION))
-    
-    # Header section
-    header = SubElement(root, QName(NAMESPACE, "Header"))
-    SubElement(header, QName(NAMESPACE, "MessageId")).text = data["voucher_id"]
-    SubElement(header, QName(NAMESPACE, "CreationDateTime")).text = data["submission_timestamp"]
-    SubElement(header, QName(NAMESPACE, "SchemaVersion")).text = SCHEMA_VERSION
-    
-    # Reporting entity
-    entity = SubElement(root, QName(NAMESPACE, "ReportingEntity"))
-    SubElement(entity, QName(NAMESPACE, "LEI")).text = data["reporting_undertaking_id"]
-    
-    # Supplier section
-    supplier = SubElement(root, QName(NAMESPACE, "Supplier"))
-    SubElement(supplier, QName(NAMESPACE, "Id")).text = data["supplier_id"]
-    SubElement(supplier, QName(NAMESPACE, "Name")).text = data["supplier_name"]
-    if data.get("legal_entity_identifier"):
-        SubElement(supplier, QName(NAMESPACE, "LEI")).text = data["legal_entity_identifier"]
-    
-    # Emission scope section (NEW)
-    scope_elem = SubElement(root, QName(NAMESPACE, "EmissionScope"))
-    SubElement(scope_elem, QName(NAMESPACE, "Scope")).text = data["emission_scope"]
-    if data.get("scope3_category"):
-        SubElement(scope_elem, QName(NAMESPACE, "Scope3Category")).text = data["scope3_category"]
-    
-    # Product section
-    product = SubElement(root, QName(NAMESPACE, "Product"))
-    SubElement(product, QName(NAMESPACE, "CNCcode")).text = data["product_cn_code"]
-    SubElement(product, QName(NAMESPACE, "Category")).text = data["product_category"]
-    SubElement(product, QName(NAMESPACE, "Description")).text = data["activity_description"]
-    if data.get("material_type"):
-        SubElement(product, QName(NAMESPACE, "MaterialType")).text = data["material_type"]
-    
-    # Quantity
-    quantity = SubElement(product, QName(NAMESPACE, "Quantity"))
-    quantity.set("unit", data["quantity_unit"])
-    quantity.text = str(data["quantity"])
-    
-    # Monetary value
-    if data.get("monetary_value"):
-        value = SubElement(product, QName(NAMESPACE, "MonetaryValue"))
-        value.set("currency", data.get("currency", "EUR"))
-        value.text = str(data["monetary_value"])
-    
-    # Installation (CBAM)
-    if include_cbam_namespace:
-        installation = SubElement(root, QName(CBAM_NAMESPACE, "Installation"))
-        SubElement(installation, QName(CBAM_NAMESPACE, "Country")).text = data["installation_country"]
-        if data.get("installation_id"):
-            SubElement(installation, QName(CBAM_NAMESPACE, "Id")).text = data["installation_id"]
-        
-        # CBAM specific emissions
-        if data.get("embedded_emissions_direct"):
-            cbam_emissions = SubElement(installation, QName(CBAM_NAMESPACE, "EmbeddedEmissions"))
-            SubElement(cbam_emissions, QName(CBAM_NAMESPACE, "Direct")).text = str(data["embedded_emissions_direct"])
-            if data.get("embedded_emissions_indirect"):
-                SubElement(cbam_emissions, QName(CBAM_NAMESPACE, "Indirect")).text = str(data["embedded_emissions_indirect"])
-        
-        if data.get("carbon_price_paid"):
-            carbon_price = SubElement(installation, QName(CBAM_NAMESPACE, "CarbonPrice"))
-            carbon_price.set("currency", "EUR")
-            carbon_price.text = str(data["carbon_price_paid"])
-    
-    # Emission calculation section (ENHANCED)
-    emissions = SubElement(root, QName(NAMESPACE, "EmissionCalculation"))
-    
-    # GWP version (NEW)
-    SubElement(emissions, QName(NAMESPACE, "GWPVersion")).text = data.get("gwp_version", "AR6")
-    
-    # Emission factor
-    factor = SubElement(emissions, QName(NAMESPACE, "EmissionFactor"))
-    factor.set("id", data["emission_factor_id"])
-    factor.set("source", data["emission_factor_source"])
-    SubElement(factor, QName(NAMESPACE, "Value")).text = str(data["emission_factor_value"])
-    SubElement(factor, QName(NAMESPACE, "Unit")).text = data.get("emission_factor_unit", "tCO2e/unit")
-    
-    if data.get("fallback_factor_used"):
-        factor.set("fallbackUsed", "true")
-    
-    # Data quality (ENHANCED)
-    quality = SubElement(emissions, QName(NAMESPACE, "DataQuality"))
-    quality.set("rating", str(data["data_quality_rating"]))
-    quality.set("tier", data.get("data_quality_tier", "tier_1"))
-    
-    # Uncertainty (NEW)
-    if data.get("uncertainty_lower") and data.get("uncertainty_upper"):
-        uncertainty = SubElement(quality, QName(NAMESPACE, "Uncertainty"))
-        uncertainty.set("confidenceLevel", str(data.get("confidence_level", "95")))
-        SubElement(uncertainty, QName(NAMESPACE, "LowerBound")).text = str(data["uncertainty_lower"])
-        SubElement(uncertainty, QName(NAMESPACE, "UpperBound")).text = str(data["uncertainty_upper"])
-    
-    # Methodology
-    SubElement(emissions, QName(NAMESPACE, "Methodology")).text = data["calculation_methodology"]
-    
-    # Total emissions
-    total = SubElement(emissions, QName(NAMESPACE, "TotalEmissions"))
-    total.set("unit", "tCO2e")
-    total.text = str(data["total_emissions_tco2e"])
-    
-    # Emissions breakdown (NEW)
-    if data.get("emissions_breakdown"):
-        breakdown = SubElement(emissions, QName(NAMESPACE, "EmissionsBreakdown"))
-        for gas, details in data["emissions_breakdown"].items():
-            gas_elem = SubElement(breakdown, QName(NAMESPACE, "GasEmission"))
-            gas_elem.set("gas", gas)
-            gas_elem.set("gwpFactor", str(details["gwp_factor"]))
-            SubElement(gas_elem, QName(NAMESPACE, "Amount")).text = str(details["amount"])
-            SubElement(gas_elem, QName(NAMESPACE, "CO2e")).text = str(details["co2e"])
-    
-    # Reporting period
-    period = SubElement(root, QName(NAMESPACE, "ReportingPeriod"))
-    SubElement(period, QName(NAMESPACE, "StartDate")).text = data["reporting_period_start"]
-    SubElement(period, QName(NAMESPACE, "EndDate")).text = data["reporting_period_end"]
-    
-    # Verification section
-    verification = SubElement(root, QName(NAMESPACE, "Verification"))
-    SubElement(verification, QName(NAMESPACE, "CalculationHash")).text = data["calculation_hash"]
-    
-    if data.get("verifier_accreditation_id"):
-        verifier = SubElement(verification, QName(NAMESPACE, "Verifier"))
-        SubElement(verifier, QName(NAMESPACE, "AccreditationId")).text = data["verifier_accreditation_id"]
-    
-    # Serialize
-    xml_bytes = etree.tostring(
-        root,
-        pretty_print=True,
-        xml_declaration=True,
-        encoding="UTF-8",
-        standalone=False
-    )
-    
+    xml = esrs_v2_plan(include_cbam_namespace).render_text(data, pretty=True, standalone=False)
+
     logger.info(f"Successfully serialized voucher {data['voucher_id']}")
     
-    return xml_bytes.decode('utf-8')
+    return xml
 
 
 # --------------------------------------------------------------------------- #
@@ -915,21 +804,11 @@ def validate_xml(
     """Validate XML against XSD schema"""
     logger.info(f"Validating XML against schema: {xsd_path}")
     
-    if isinstance(xsd_path, Path):
-        xsd_path = str(xsd_path)
-    
-    if isinstance(xml, str):
-        xml = xml.encode('utf-8')
-    
     try:
-        schema_doc = etree.parse(xsd_path)
-        schema = XMLSchema(schema_doc)
-        xml_doc = etree.fromstring(xml)
-        
-        is_valid = schema.validate(xml_doc)
+        # Compiled once per process and reused until the XSD changes on disk
+        is_valid, errors = schema_registry.validate(xml, xsd_path)
         
         if return_errors and not is_valid:
-            errors = [str(error) for error in schema.error_log]
             logger.error(f"Validation failed with {len(errors)} errors")
             return is_valid, errors
         
@@ -1056,7 +935,6 @@ async def generate_voucher_batch(
         return await asyncio.gather(*tasks)
     
     from functools import lru_cache
-import redis
 
 class CachedEmissionFactorRepository(EmissionFactorRepository):
     def __init__(self, redis_client: redis.Redis):
@@ -1086,30 +964,22 @@ def assess_materiality(
     monetary_value: Optional[Decimal],
     company_total_emissions: Decimal
 ) -> Dict[str, Any]:
+    """ESRS double materiality screen for one voucher; whole entities go through materiality.MaterialityEngine"""
+    from generator.materiality import materiality_type, screen
+
+    emission_percentage = (
+        total_emissions / company_total_emissions * 100 if company_total_emissions else Decimal("0")
+    )
+    impact_material, financial_material = screen(emission_percentage, monetary_value)
 
-    def calculate_materiality_emissions(company_total_emissions: Decimal, total_emissions: Decimal) -> Decimal:
-        """ESRS double materiality assessment"""
-        emission_percentage = (total_emissions / company_total_emissions) * 100
-        return emission_percentage
-    
-    # Financial materiality
-    financial_material = False
-    if monetary_value:
-        # Example: material if >€100k and >5% emissions
-        financial_material = (
-            monetary_value > 100000 and 
-            emission_percentage > Decimal("5.0")
-        )
-    
     return {
         "impact_material": impact_material,
         "financial_material": financial_material,
         "emission_percentage": float(emission_percentage),
-        "materiality_type": "double" if impact_material and financial_material else
-                          "impact" if impact_material else
-                          "financial" if financial_material else "none"
+        "materiality_type": materiality_type(impact_material, financial_material),
     }
 
+# Reference DDL; the live table, partitions and bulk writer are in voucher_warehouse.py
 sql_schema = """
 CREATE TABLE emission_vouchers (
     voucher_id UUID PRIMARY KEY,
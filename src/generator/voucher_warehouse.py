@@ -0,0 +1,761 @@
+"""
+Voucher warehouse: partitioned, denormalized storage for generated vouchers.
+
+Implements the ``sql_schema`` / ``sql_indexes_and_partitions`` design from
+voucher_generator.py. The columns that regulatory queries filter and group
+on (reporting LEI, scope, Scope 3 category, period, quality tier, CBAM code)
+are real columns, and the calculation details stay in a JSON(B) column.
+
+On PostgreSQL the table is range-partitioned by ``reporting_period_start``
+into monthly partitions, which are created on demand as batches arrive,
+and bulk loads go through ``COPY``. The query helpers always constrain the
+partition key, so period roll-ups only touch the months they cover. On
+SQLite, which is used for tests and local runs, the same table is a single
+heap, and the period index gives the same range restriction. Writes there
+use executemany.
+
+Reporting roll-ups are served from ``emissions_cube``, a pre-aggregated
+table keyed by reporting entity x month x scope x Scope 3 category x
+supplier x CN code. Every write and revision adds its delta to the cube in
+the same transaction, so dashboard and group totals never rescan vouchers.
+Windows that do not fall on month boundaries use the raw table instead.
+"""
+
+import csv
+import io
+import json
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Index,
+    Integer,
+    MetaData,
+    Numeric,
+    SmallInteger,
+    String,
+    Table,
+    create_engine,
+    delete,
+    func,
+    insert,
+    literal_column,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------------- #
+# Schema                                                                      #
+# --------------------------------------------------------------------------- #
+
+metadata = MetaData()
+
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
+emission_vouchers = Table(
+    "emission_vouchers",
+    metadata,
+    # PostgreSQL requires the partition key in every unique constraint
+    Column("voucher_id", String(36), primary_key=True),
+    Column("reporting_period_start", Date, primary_key=True),
+    Column("schema_version", String(10), nullable=False),
+
+    # Denormalized for query performance
+    Column("reporting_lei", String(20), nullable=False),
+    Column("supplier_id", String(50), nullable=False),
+    Column("emission_scope", String(20), nullable=False),
+    Column("scope3_category", String(50)),
+
+    # Numeric fields
+    Column("total_co2e", Numeric(15, 3), nullable=False),
+    Column("data_quality_tier", String(10), nullable=False),
+    Column("data_quality_score", SmallInteger, nullable=False),
+
+    # CBAM fields
+    Column("product_cn_code", String(10)),
+    Column("cbam_product_code", String(10)),
+    Column("fallback_used", Boolean, default=False),
+    Column("carbon_price_paid", Numeric(10, 2)),
+
+    # Temporal
+    Column("reporting_period_end", Date, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)),
+
+    # JSONB for flexibility
+    Column("calculation_details", JSONType, nullable=False),
+    Column("verification_data", JSONType),
+
+    # Audit
+    Column("calculation_hash", String(64), nullable=False),
+
+    # Indexes for regulatory queries
+    Index("idx_vouchers_period", "reporting_period_start", "reporting_period_end"),
+    Index("idx_vouchers_scope", "emission_scope", "scope3_category"),
+    Index("idx_vouchers_quality", "data_quality_tier", "data_quality_score"),
+    Index(
+        "idx_vouchers_cbam", "cbam_product_code",
+        postgresql_where=text("cbam_product_code IS NOT NULL"),
+        sqlite_where=text("cbam_product_code IS NOT NULL"),
+    ),
+    Index("idx_vouchers_lei_period", "reporting_lei", "reporting_period_start"),
+    postgresql_partition_by="RANGE (reporting_period_start)",
+)
+
+# Column order used for COPY and executemany
+WAREHOUSE_COLUMNS = tuple(c.name for c in emission_vouchers.columns)
+
+# Rollup cube: one row per entity x month x scope x Scope 3 category x
+# supplier x CN code. Missing category / CN code are stored as "" because
+# they are part of the primary key.
+emissions_cube = Table(
+    "emissions_cube",
+    metadata,
+    Column("reporting_lei", String(20), primary_key=True),
+    Column("period_month", Date, primary_key=True),
+    Column("emission_scope", String(20), primary_key=True),
+    Column("scope3_category", String(50), primary_key=True),
+    Column("supplier_id", String(50), primary_key=True),
+    Column("cn_code", String(10), primary_key=True),
+
+    # Additive measures, maintained by delta
+    Column("total_co2e", Numeric(18, 3), nullable=False),
+    Column("voucher_count", Integer, nullable=False),
+    Column("data_quality_score_sum", Integer, nullable=False),
+    Column("fallback_count", Integer, nullable=False),
+    Column("carbon_price_paid", Numeric(14, 2), nullable=False),
+
+    Index("idx_cube_period_scope", "period_month", "emission_scope", "scope3_category"),
+    Index("idx_cube_supplier_period", "supplier_id", "period_month"),
+)
+
+CUBE_DIMENSIONS = ("reporting_lei", "period_month", "emission_scope", "scope3_category", "supplier_id", "cn_code")
+CUBE_MEASURES = ("total_co2e", "voucher_count", "data_quality_score_sum", "fallback_count", "carbon_price_paid")
+
+# Warehouse columns a voucher's cube contribution is derived from
+CUBE_SOURCE_COLUMNS = (
+    "reporting_lei", "reporting_period_start", "emission_scope", "scope3_category", "supplier_id",
+    "product_cn_code", "total_co2e", "data_quality_score", "fallback_used", "carbon_price_paid",
+)
+
+# CBAM Annex I goods by CN code prefix: cement, electricity, fertilisers,
+# hydrogen, iron & steel, aluminium
+CBAM_CN_PREFIXES = ("2523", "2716", "2808", "2814", "2834", "3102", "3105", "2804", "72", "73", "76")
+
+
+def is_cbam_code(cn_code: Optional[str]) -> bool:
+    return bool(cn_code) and cn_code.startswith(CBAM_CN_PREFIXES)
+
+
+# --------------------------------------------------------------------------- #
+# Row mapping                                                                 #
+# --------------------------------------------------------------------------- #
+
+_CO2E_QUANTUM = Decimal("0.001")
+_PRICE_QUANTUM = Decimal("0.01")
+
+# Voucher keys kept in calculation_details
+CALCULATION_DETAIL_KEYS = (
+    "tier",
+    "supplier_name",
+    "product_cn_code",
+    "product_category",
+    "activity_description",
+    "quantity",
+    "quantity_unit",
+    "monetary_value",
+    "currency",
+    "installation_country",
+    "installation_id",
+    "emission_factor_id",
+    "emission_factor_value",
+    "emission_factor_source",
+    "emission_factor_unit",
+    "gwp_version",
+    "calculation_methodology",
+    "emissions_breakdown",
+    "uncertainty_lower",
+    "uncertainty_upper",
+    "confidence_level",
+    "embedded_emissions_direct",
+    "embedded_emissions_indirect",
+)
+
+
+def _as_date(value: Union[str, date, None]) -> Optional[date]:
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(value[:10])
+
+
+def _as_decimal(value: Any, quantum: Decimal) -> Optional[Decimal]:
+    if value is None:
+        return None
+    return Decimal(str(value)).quantize(quantum, rounding=ROUND_HALF_UP)
+
+
+def _as_datetime(value: Union[str, datetime, None]) -> datetime:
+    if value is None:
+        return datetime.now(timezone.utc)
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def warehouse_row(voucher: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a generate_voucher() dict onto the warehouse columns"""
+    cn_code = voucher.get("product_cn_code")
+    verifier = voucher.get("verifier_accreditation_id")
+    return {
+        "voucher_id": str(voucher["voucher_id"]),
+        "reporting_period_start": _as_date(voucher["reporting_period_start"]),
+        "schema_version": voucher.get("schema_version", ""),
+        "reporting_lei": (voucher.get("legal_entity_identifier") or voucher["reporting_undertaking_id"])[:20],
+        "supplier_id": voucher["supplier_id"],
+        "emission_scope": voucher["emission_scope"],
+        "scope3_category": voucher.get("scope3_category"),
+        "total_co2e": _as_decimal(voucher["total_emissions_tco2e"], _CO2E_QUANTUM),
+        "data_quality_tier": voucher["data_quality_tier"],
+        "data_quality_score": int(voucher["data_quality_rating"]),
+        "product_cn_code": cn_code,
+        "cbam_product_code": cn_code if is_cbam_code(cn_code) else None,
+        "fallback_used": bool(voucher.get("fallback_factor_used", False)),
+        "carbon_price_paid": _as_decimal(voucher.get("carbon_price_paid"), _PRICE_QUANTUM),
+        "reporting_period_end": _as_date(voucher["reporting_period_end"]),
+        "created_at": _as_datetime(voucher.get("submission_timestamp")),
+        "calculation_details": {key: voucher.get(key) for key in CALCULATION_DETAIL_KEYS},
+        "verification_data": {"verifier_accreditation_id": verifier} if verifier else None,
+        "calculation_hash": voucher["calculation_hash"],
+    }
+
+
+# --------------------------------------------------------------------------- #
+# Partitions                                                                  #
+# --------------------------------------------------------------------------- #
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def next_month(day: date) -> date:
+    return date(day.year + (day.month == 12), day.month % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{emission_vouchers.name}_{month.year:04d}_{month.month:02d}"
+
+
+def partition_ddl(month: date) -> str:
+    """CREATE TABLE ... PARTITION OF for the month containing `month`"""
+    start = month_start(month)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(start)} PARTITION OF {emission_vouchers.name} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{next_month(start).isoformat()}')"
+    )
+
+
+def months_between(start: date, end: date) -> Iterator[date]:
+    """First day of every month from start's month up to and including end's month"""
+    month = month_start(start)
+    while month <= end:
+        yield month
+        month = next_month(month)
+
+
+# --------------------------------------------------------------------------- #
+# Cube maintenance                                                            #
+# --------------------------------------------------------------------------- #
+
+CubeKey = Tuple[str, date, str, str, str, str]
+
+
+def cube_key(row: Dict[str, Any]) -> CubeKey:
+    return (
+        row["reporting_lei"],
+        month_start(row["reporting_period_start"]),
+        row["emission_scope"],
+        row["scope3_category"] or "",
+        row["supplier_id"],
+        row["product_cn_code"] or "",
+    )
+
+
+def cube_deltas(rows: Iterable[Dict[str, Any]], sign: int = 1,
+                into: Optional[Dict[CubeKey, List[Any]]] = None) -> Dict[CubeKey, List[Any]]:
+    """
+    Sum the cube contribution of warehouse rows per cube cell.
+
+    Use sign=-1 for rows being removed; pass `into` to net several batches
+    (e.g. the old and new versions of revised vouchers) before applying.
+    """
+    deltas = {} if into is None else into
+    for row in rows:
+        key = cube_key(row)
+        delta = deltas.get(key)
+        if delta is None:
+            delta = deltas[key] = [Decimal(0), 0, 0, 0, Decimal(0)]
+        delta[0] += sign * _as_decimal(row["total_co2e"], _CO2E_QUANTUM)
+        delta[1] += sign
+        delta[2] += sign * int(row["data_quality_score"])
+        delta[3] += sign * bool(row["fallback_used"])
+        delta[4] += sign * (_as_decimal(row["carbon_price_paid"], _PRICE_QUANTUM) or 0)
+    return deltas
+
+
+def apply_cube_deltas(conn, deltas: Dict[CubeKey, List[Any]]) -> None:
+    """Add per-cell deltas to the cube inside the caller's transaction"""
+    rows = [
+        dict(zip(CUBE_DIMENSIONS, key), **dict(zip(CUBE_MEASURES, delta)))
+        for key, delta in deltas.items()
+        if any(delta)
+    ]
+    if not rows:
+        return
+
+    c = emissions_cube.c
+    if conn.dialect.name in ("postgresql", "sqlite"):
+        if conn.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(emissions_cube)
+        conn.execute(
+            stmt.on_conflict_do_update(
+                index_elements=list(CUBE_DIMENSIONS),
+                set_={name: c[name] + stmt.excluded[name] for name in CUBE_MEASURES},
+            ),
+            rows,
+        )
+    else:
+        for row in rows:
+            cell = [c[name] == row[name] for name in CUBE_DIMENSIONS]
+            updated = conn.execute(
+                emissions_cube.update()
+                .where(*cell)
+                .values({name: c[name] + row[name] for name in CUBE_MEASURES})
+            )
+            if updated.rowcount == 0:
+                conn.execute(insert(emissions_cube), row)
+
+    if any(delta[1] < 0 for delta in deltas.values()):
+        conn.execute(delete(emissions_cube).where(c.voucher_count <= 0))
+
+
+# --------------------------------------------------------------------------- #
+# Warehouse                                                                   #
+# --------------------------------------------------------------------------- #
+
+@dataclass(frozen=True)
+class PeriodScopeTotal:
+    emission_scope: str
+    scope3_category: Optional[str]
+    total_co2e: Decimal
+    voucher_count: int
+
+
+class VoucherWarehouse:
+    """Bulk writer and regulatory query helpers over emission_vouchers"""
+
+    def __init__(self, engine: Union[Engine, str], chunk_size: int = 5000):
+        self.engine = create_engine(engine) if isinstance(engine, str) else engine
+        self.chunk_size = chunk_size
+        self.table = emission_vouchers
+        self._partitions: Set[date] = set()
+
+    @property
+    def partitioned(self) -> bool:
+        return self.engine.dialect.name == "postgresql"
+
+    # ------------------------------------------------------------------ #
+    # Schema
+    # ------------------------------------------------------------------ #
+    def create_schema(self) -> None:
+        metadata.create_all(self.engine)
+
+    def ensure_partitions(self, months: Iterable[date]) -> None:
+        """Create any missing monthly partitions (PostgreSQL only)"""
+        if not self.partitioned:
+            return
+        missing = sorted({month_start(m) for m in months} - self._partitions)
+        if not missing:
+            return
+        with self.engine.begin() as conn:
+            for month in missing:
+                conn.execute(text(partition_ddl(month)))
+        self._partitions.update(missing)
+
+    # ------------------------------------------------------------------ #
+    # Writes
+    # ------------------------------------------------------------------ #
+    def write(self, vouchers: Iterable[Dict[str, Any]], skip_existing: bool = True) -> int:
+        """
+        Persist generated vouchers; returns the number of rows written.
+
+        With `skip_existing` (default) rows already in the warehouse are
+        filtered out by one IN lookup per chunk, with ON CONFLICT DO NOTHING
+        covering concurrent writers. Without it, PostgreSQL loads
+        use COPY, and a duplicate voucher aborts that chunk.
+        """
+        written = 0
+        for chunk in self._chunks(warehouse_row(v) for v in vouchers):
+            self.ensure_partitions(row["reporting_period_start"] for row in chunk)
+            if self.partitioned and not skip_existing and self._supports_copy():
+                written += self._copy(chunk)
+            else:
+                written += self._executemany(chunk, skip_existing)
+        return written
+
+    def revise(self, vouchers: Iterable[Dict[str, Any]]) -> int:
+        """
+        Replace stored vouchers with corrected versions (revalidation,
+        factor updates); returns the number of vouchers replaced.
+
+        The old rows' cube contribution is subtracted and the new one added
+        in the same transaction, so the cube stays exact. Vouchers not yet
+        in the warehouse are inserted.
+        """
+        c = self.table.c
+        revised = 0
+        for chunk in self._chunks(warehouse_row(v) for v in vouchers):
+            self.ensure_partitions(row["reporting_period_start"] for row in chunk)
+            with self.engine.begin() as conn:
+                old = conn.execute(
+                    delete(self.table)
+                    .where(c.voucher_id.in_([row["voucher_id"] for row in chunk]))
+                    .returning(*(c[name] for name in CUBE_SOURCE_COLUMNS))
+                ).mappings().all()
+                conn.execute(insert(self.table), chunk)
+                apply_cube_deltas(conn, cube_deltas(chunk, into=cube_deltas(old, sign=-1)))
+            revised += len(old)
+        return revised
+
+    def rebuild_cube(self) -> int:
+        """Recompute the cube from raw vouchers (backfill or consistency repair)"""
+        c = self.table.c
+        if self.engine.dialect.name == "postgresql":
+            month = func.cast(func.date_trunc("month", c.reporting_period_start), Date)
+        else:
+            month = func.date(c.reporting_period_start, "start of month")
+        dimensions = (
+            c.reporting_lei,
+            month,
+            c.emission_scope,
+            func.coalesce(c.scope3_category, ""),
+            c.supplier_id,
+            func.coalesce(c.product_cn_code, ""),
+        )
+        aggregate = select(
+            *dimensions,
+            func.sum(c.total_co2e),
+            func.count(),
+            func.sum(c.data_quality_score),
+            func.sum(c.fallback_used.cast(SmallInteger)),
+            func.coalesce(func.sum(c.carbon_price_paid), 0),
+        ).group_by(*dimensions)
+
+        with self.engine.begin() as conn:
+            conn.execute(delete(emissions_cube))
+            conn.execute(insert(emissions_cube).from_select(CUBE_DIMENSIONS + CUBE_MEASURES, aggregate))
+            return conn.execute(select(func.count()).select_from(emissions_cube)).scalar()
+
+    def _chunks(self, rows: Iterable[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        chunk: List[Dict[str, Any]] = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _executemany(self, rows: List[Dict[str, Any]], skip_existing: bool) -> int:
+        stmt = insert(self.table)
+        if skip_existing and self.engine.dialect.name in ("postgresql", "sqlite"):
+            if self.engine.dialect.name == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            stmt = dialect_insert(self.table).on_conflict_do_nothing()
+        with self.engine.begin() as conn:
+            if skip_existing:
+                rows = self._new_rows(conn, rows)
+                if not rows:
+                    return 0
+            if skip_existing and self.engine.dialect.insert_executemany_returning:
+                # Only rows that were actually inserted come back, so the
+                # cube never double counts a re-delivered voucher
+                keys = {
+                    (voucher_id, start)
+                    for voucher_id, start in conn.execute(
+                        stmt.returning(self.table.c.voucher_id, self.table.c.reporting_period_start), rows,
+                    )
+                }
+                rows = [row for row in rows if (row["voucher_id"], row["reporting_period_start"]) in keys]
+            else:
+                conn.execute(stmt, rows)
+            apply_cube_deltas(conn, cube_deltas(rows))
+        return len(rows)
+
+    def _new_rows(self, conn, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Drop rows repeated within the chunk or already stored, with one IN lookup.
+
+        ON CONFLICT DO NOTHING skips them too, but without RETURNING the
+        caller could not tell which rows were written, and the cube and the
+        returned count would include the duplicates.
+        """
+        unique: Dict[Tuple[str, date], Dict[str, Any]] = {}
+        for row in rows:
+            unique.setdefault((row["voucher_id"], row["reporting_period_start"]), row)
+        c = self.table.c
+        existing = conn.execute(
+            select(c.voucher_id, c.reporting_period_start)
+            .where(c.voucher_id.in_({voucher_id for voucher_id, _ in unique}))
+        )
+        for voucher_id, start in existing:
+            unique.pop((voucher_id, start), None)
+        return list(unique.values())
+
+    def _supports_copy(self) -> bool:
+        return self.engine.dialect.driver in ("psycopg2", "psycopg")
+
+    def _copy(self, rows: List[Dict[str, Any]]) -> int:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([_copy_value(row[name]) for name in WAREHOUSE_COLUMNS])
+        buffer.seek(0)
+
+        sql = f"COPY {self.table.name} ({', '.join(WAREHOUSE_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+        with self.engine.begin() as conn:
+            cursor = conn.connection.driver_connection.cursor()
+            try:
+                if self.engine.dialect.driver == "psycopg":
+                    with cursor.copy(sql) as copy:
+                        copy.write(buffer.getvalue())
+                else:
+                    cursor.copy_expert(sql, buffer)
+            finally:
+                cursor.close()
+            apply_cube_deltas(conn, cube_deltas(rows))
+        return len(rows)
+
+    # ------------------------------------------------------------------ #
+    # Rollups (served from the cube)
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def cube_covers(start: date, end: date) -> bool:
+        """The cube has monthly grain, so it answers windows on month boundaries"""
+        return start.day == 1 and end.day == 1
+
+    def rollup(self, start: date, end: date, by: Sequence[str] = ("emission_scope",),
+               top: Optional[int] = None, **filters: Any) -> List[Dict[str, Any]]:
+        """
+        Sum the cube measures over months in [start, end), grouped by `by`.
+
+        Filters are ``dimension=value`` or ``dimension=[values]``; None
+        matches a missing Scope 3 category / CN code. With `top`, only the
+        largest groups by tCO2e are returned.
+        """
+        unknown = (set(by) | set(filters)) - set(CUBE_DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown cube dimension(s): {', '.join(sorted(unknown))}")
+        if not self.cube_covers(start, end):
+            raise ValueError(f"Cube windows must start and end on the 1st of a month, got {start} - {end}")
+
+        c = emissions_cube.c
+        groups = [c[name] for name in by]
+        total = func.sum(c.total_co2e).label("total_co2e")
+        stmt = (
+            select(
+                *groups,
+                total,
+                func.sum(c.voucher_count),
+                func.sum(c.data_quality_score_sum),
+                func.sum(c.fallback_count),
+                func.sum(c.carbon_price_paid),
+            )
+            .where(c.period_month >= start, c.period_month < end)
+            .group_by(*groups)
+        )
+        for name, value in filters.items():
+            if isinstance(value, (list, tuple, set, frozenset)):
+                stmt = stmt.where(c[name].in_([_cube_value(v) for v in value]))
+            else:
+                stmt = stmt.where(c[name] == _cube_value(value))
+        stmt = stmt.order_by(total.desc()).limit(top) if top else stmt.order_by(*groups)
+
+        results = []
+        with self.engine.connect() as conn:
+            for row in conn.execute(stmt):
+                keys, (co2e, count, score_sum, fallbacks, price) = row[:len(by)], row[len(by):]
+                result = {name: (None if value == "" else value) for name, value in zip(by, keys)}
+                result.update(
+                    total_co2e=_as_decimal(co2e, _CO2E_QUANTUM),
+                    voucher_count=count,
+                    avg_data_quality_score=score_sum / count,
+                    fallback_count=fallbacks,
+                    carbon_price_paid=_as_decimal(price, _PRICE_QUANTUM),
+                )
+                results.append(result)
+        return results
+
+    def entity_totals(self, reporting_leis: Iterable[str], start: date, end: date) -> Dict[str, Dict[str, Decimal]]:
+        """tCO2e per scope for each entity of a group, e.g. for iXBRL group reporting"""
+        totals: Dict[str, Dict[str, Decimal]] = {}
+        by = ("reporting_lei", "emission_scope")
+        for row in self.rollup(start, end, by=by, reporting_lei=list(reporting_leis)):
+            totals.setdefault(row["reporting_lei"], {})[row["emission_scope"]] = row["total_co2e"]
+        return totals
+
+    # ------------------------------------------------------------------ #
+    # Regulatory queries (cube for whole months, otherwise raw vouchers
+    # constrained on the partition key)
+    # ------------------------------------------------------------------ #
+    def _period(self, start: date, end: date):
+        """Vouchers whose reporting period starts in [start, end)"""
+        c = self.table.c
+        return (c.reporting_period_start >= start) & (c.reporting_period_start < end)
+
+    def period_scope_totals(self, start: date, end: date, reporting_lei: Optional[str] = None) -> List[PeriodScopeTotal]:
+        """Total tCO2e per scope / Scope 3 category for a reporting window"""
+        if self.cube_covers(start, end):
+            filters = {"reporting_lei": reporting_lei} if reporting_lei else {}
+            return [
+                PeriodScopeTotal(row["emission_scope"], row["scope3_category"], row["total_co2e"], row["voucher_count"])
+                for row in self.rollup(start, end, by=("emission_scope", "scope3_category"), **filters)
+            ]
+
+        c = self.table.c
+        stmt = (
+            select(c.emission_scope, c.scope3_category, func.sum(c.total_co2e), func.count())
+            .where(self._period(start, end))
+            .group_by(c.emission_scope, c.scope3_category)
+            .order_by(c.emission_scope, c.scope3_category)
+        )
+        if reporting_lei:
+            stmt = stmt.where(c.reporting_lei == reporting_lei)
+        with self.engine.connect() as conn:
+            return [
+                PeriodScopeTotal(scope, category, _as_decimal(total, _CO2E_QUANTUM), count)
+                for scope, category, total, count in conn.execute(stmt)
+            ]
+
+    def monthly_totals(self, start: date, end: date, emission_scope: Optional[str] = None) -> List[Tuple[str, Decimal]]:
+        """(YYYY-MM, tCO2e) per month of reporting_period_start"""
+        if self.cube_covers(start, end):
+            filters = {"emission_scope": emission_scope} if emission_scope else {}
+            return [
+                (row["period_month"].strftime("%Y-%m"), row["total_co2e"])
+                for row in self.rollup(start, end, by=("period_month",), **filters)
+            ]
+
+        c = self.table.c
+        if self.engine.dialect.name == "postgresql":
+            month = func.to_char(c.reporting_period_start, literal_column("'YYYY-MM'"))
+        else:
+            month = func.strftime("%Y-%m", c.reporting_period_start)
+        stmt = (
+            select(month.label("month"), func.sum(c.total_co2e))
+            .where(self._period(start, end))
+            .group_by(month)
+            .order_by(month)
+        )
+        if emission_scope:
+            stmt = stmt.where(c.emission_scope == emission_scope)
+        with self.engine.connect() as conn:
+            return [(m, _as_decimal(total, _CO2E_QUANTUM)) for m, total in conn.execute(stmt)]
+
+    def quality_distribution(self, start: date, end: date) -> Dict[Tuple[str, int], int]:
+        """Voucher counts per (data quality tier, score)"""
+        c = self.table.c
+        stmt = (
+            select(c.data_quality_tier, c.data_quality_score, func.count())
+            .where(self._period(start, end))
+            .group_by(c.data_quality_tier, c.data_quality_score)
+        )
+        with self.engine.connect() as conn:
+            return {(tier, score): count for tier, score, count in conn.execute(stmt)}
+
+    def cbam_totals(self, start: date, end: date) -> Dict[str, Dict[str, Any]]:
+        """Embedded emissions and carbon price paid per CBAM CN code"""
+        if self.cube_covers(start, end):
+            return {
+                row["cn_code"]: {
+                    "total_co2e": row["total_co2e"],
+                    "carbon_price_paid": row["carbon_price_paid"],
+                    "voucher_count": row["voucher_count"],
+                    "fallback_count": row["fallback_count"],
+                }
+                for row in self.rollup(start, end, by=("cn_code",))
+                if is_cbam_code(row["cn_code"])
+            }
+
+        c = self.table.c
+        stmt = (
+            select(
+                c.cbam_product_code,
+                func.sum(c.total_co2e),
+                func.coalesce(func.sum(c.carbon_price_paid), 0),
+                func.count(),
+                func.sum(c.fallback_used.cast(SmallInteger)),
+            )
+            .where(self._period(start, end) & c.cbam_product_code.is_not(None))
+            .group_by(c.cbam_product_code)
+        )
+        with self.engine.connect() as conn:
+            return {
+                code: {
+                    "total_co2e": _as_decimal(total, _CO2E_QUANTUM),
+                    "carbon_price_paid": _as_decimal(price, _PRICE_QUANTUM),
+                    "voucher_count": count,
+                    "fallback_count": int(fallbacks or 0),
+                }
+                for code, total, price, count, fallbacks in conn.execute(stmt)
+            }
+
+    def supplier_totals(self, start: date, end: date, limit: int = 20) -> List[Tuple[str, Decimal]]:
+        """Largest suppliers by tCO2e in the window"""
+        if self.cube_covers(start, end):
+            return [
+                (row["supplier_id"], row["total_co2e"])
+                for row in self.rollup(start, end, by=("supplier_id",), top=limit)
+            ]
+
+        c = self.table.c
+        total = func.sum(c.total_co2e).label("total")
+        stmt = (
+            select(c.supplier_id, total)
+            .where(self._period(start, end))
+            .group_by(c.supplier_id)
+            .order_by(total.desc())
+            .limit(limit)
+        )
+        with self.engine.connect() as conn:
+            return [(supplier, _as_decimal(t, _CO2E_QUANTUM)) for supplier, t in conn.execute(stmt)]
+
+
+def _cube_value(value: Any) -> Any:
+    return "" if value is None else value
+
+
+def _copy_value(value: Any) -> Any:
+    """Render one value for COPY ... FORMAT csv (empty unquoted field = NULL)"""
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
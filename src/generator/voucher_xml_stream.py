@@ -0,0 +1,145 @@
+"""
+Streaming XML serialization for voucher batches.
+
+``serialize_voucher`` in voucher_generator.py returns one pretty-printed
+voucher as ``str``. CBAM quarterly declarations bundle tens of thousands
+of vouchers, so this module writes them incrementally instead:
+
+- one ``<VoucherBatch>`` envelope for the whole stream (namespaces are
+  declared once on the envelope), or one file per voucher
+- each voucher is rendered by the compiled ESRS v2 plan from
+  export.voucher_plans (the same plan ``serialize_voucher`` uses) and
+  written out every `flush_every` vouchers; no tree is built, so memory
+  stays flat regardless of batch size
+- output is bytes from end to end; nothing is decoded to ``str``
+"""
+
+import logging
+from datetime import datetime, timezone
+from dataclasses import asdict, is_dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Union
+
+from export.voucher_plans import (
+    CBAM_NAMESPACE,
+    ESRS_V2_NAMESPACE as NAMESPACE,
+    ESRS_V2_NSMAP as NSMAP,
+    ESRS_V2_ONLY_NSMAP as ESRS_ONLY_NSMAP,
+    ESRS_V2_SCHEMA_LOCATION as SCHEMA_LOCATION,
+    ESRS_V2_SCHEMA_VERSION as SCHEMA_VERSION,
+    esrs_v2_plan,
+)
+from export.xml_plan import escape_attr, xml_declaration_str
+
+logger = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------------- #
+# Namespaces and tags                                                         #
+# --------------------------------------------------------------------------- #
+
+ESRS_ELEMENTS = (
+    "VoucherBatch", "EmissionVoucher", "Header", "MessageId", "CreationDateTime", "SchemaVersion",
+    "ReportingEntity", "LEI", "Supplier", "Id", "Name", "EmissionScope", "Scope", "Scope3Category",
+    "Product", "CNCcode", "Category", "Description", "MaterialType", "Quantity", "MonetaryValue",
+    "EmissionCalculation", "GWPVersion", "EmissionFactor", "Value", "Unit", "DataQuality",
+    "Uncertainty", "LowerBound", "UpperBound", "Methodology", "TotalEmissions", "EmissionsBreakdown",
+    "GasEmission", "Amount", "CO2e", "ReportingPeriod", "StartDate", "EndDate", "Verification",
+    "CalculationHash", "Verifier", "AccreditationId",
+)
+CBAM_ELEMENTS = ("Installation", "Country", "Id", "EmbeddedEmissions", "Direct", "Indirect", "CarbonPrice")
+
+# "{namespace}local" tags, for reading the output back with lxml / ElementTree
+T = {local: f"{{{NAMESPACE}}}{local}" for local in ESRS_ELEMENTS}
+C = {local: f"{{{CBAM_NAMESPACE}}}{local}" for local in CBAM_ELEMENTS}
+
+
+# --------------------------------------------------------------------------- #
+# Voucher element                                                             #
+# --------------------------------------------------------------------------- #
+
+def _normalize(voucher: Union[Dict[str, Any], Any]) -> Dict[str, Any]:
+    if isinstance(voucher, dict):
+        return voucher
+    if is_dataclass(voucher):
+        return asdict(voucher)
+    raise TypeError(f"Voucher must be dict or dataclass, got {type(voucher)}")
+
+
+def serialize_voucher_bytes(voucher: Union[Dict[str, Any], Any], include_cbam_namespace: bool = True) -> bytes:
+    """One standalone voucher document as UTF-8 bytes"""
+    return esrs_v2_plan(include_cbam_namespace).render(_normalize(voucher), standalone=False)
+
+
+def _envelope_open(include_cbam_namespace: bool) -> str:
+    nsmap = NSMAP if include_cbam_namespace else ESRS_ONLY_NSMAP
+    attrib = {
+        **{("xmlns" if prefix is None else f"xmlns:{prefix}"): uri for prefix, uri in nsmap.items()},
+        "xsi:schemaLocation": SCHEMA_LOCATION,
+        "schemaVersion": SCHEMA_VERSION,
+        "creationDateTime": datetime.now(timezone.utc).isoformat(),
+    }
+    return "<VoucherBatch" + "".join(f' {name}="{escape_attr(value)}"' for name, value in attrib.items()) + ">"
+
+
+# --------------------------------------------------------------------------- #
+# Streaming writers                                                           #
+# --------------------------------------------------------------------------- #
+
+def write_voucher_batch(
+    vouchers: Iterable[Union[Dict[str, Any], Any]],
+    output: Union[str, Path, BinaryIO],
+    include_cbam_namespace: bool = True,
+    flush_every: int = 1000,
+) -> int:
+    """
+    Stream vouchers into one <VoucherBatch> document; returns the voucher count.
+
+    `output` is a path or a binary file object; rendered vouchers are
+    written out every `flush_every` vouchers.
+    """
+    if isinstance(output, (str, Path)):
+        with open(output, "wb") as stream:
+            return write_voucher_batch(vouchers, stream, include_cbam_namespace, flush_every)
+
+    # Vouchers inherit namespaces and schema location from the envelope
+    render = esrs_v2_plan(include_cbam_namespace, standalone=False).render_into
+    pending: List[str] = [xml_declaration_str(standalone=False), "\n", _envelope_open(include_cbam_namespace)]
+    count = 0
+    for voucher in vouchers:
+        render(_normalize(voucher), pending, declare_namespaces=False)
+        count += 1
+        if count % flush_every == 0:
+            output.write("".join(pending).encode("utf-8"))
+            pending.clear()
+    pending.append("</VoucherBatch>")
+    output.write("".join(pending).encode("utf-8"))
+    logger.info(f"Serialized {count} vouchers into one batch document")
+    return count
+
+
+def iter_voucher_documents(
+    vouchers: Iterable[Union[Dict[str, Any], Any]],
+    include_cbam_namespace: bool = True,
+) -> Iterator[bytes]:
+    """Standalone voucher documents, one bytes object per voucher"""
+    for voucher in vouchers:
+        yield serialize_voucher_bytes(voucher, include_cbam_namespace)
+
+
+def write_voucher_files(
+    vouchers: Iterable[Union[Dict[str, Any], Any]],
+    directory: Union[str, Path],
+    include_cbam_namespace: bool = True,
+    filename: str = "{voucher_id}.xml",
+) -> int:
+    """Write each voucher to its own file named after its voucher_id; returns the count"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    count = 0
+    for voucher in vouchers:
+        data = _normalize(voucher)
+        (directory / filename.format(voucher_id=data["voucher_id"])).write_bytes(
+            serialize_voucher_bytes(data, include_cbam_namespace)
+        )
+        count += 1
+    return count
@@ -1,12 +1,319 @@
+import io
 import textwrap
 from pathlib import Path
-from typing import Dict, Any
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, Iterator, List, Optional, TextIO, Tuple
+from xml.sax.saxutils import escape
+
+
+# Write buffer for report files; sections are flushed in 64 KiB blocks
+IXBRL_WRITE_BUFFER = 64 * 1024
+
+# Reporting periods referenced by the fact table: key -> period definition
+REPORTING_PERIODS: Dict[str, Dict[str, str]] = {
+    "FY2024": {"startDate": "2024-01-01", "endDate": "2024-12-31"},
+    "FY2023": {"startDate": "2023-01-01", "endDate": "2023-12-31"},
+    "FY2024_instant": {"instant": "2024-12-31"},
+}
+
+# Stable ids for the undimensioned contexts of each reporting period
+STANDARD_CONTEXTS: Dict[str, str] = {
+    "c_2024": "FY2024",
+    "c_2023": "FY2023",
+    "c_2024_instant": "FY2024_instant",
+}
+
+# Standard units: id -> measure
+STANDARD_UNITS: Dict[str, str] = {
+    "u_tCO2e": "esrs:tCO2e",
+    "u_EUR": "iso4217:EUR",
+    "u_MWh": "esrs:MWh",
+    "u_m3": "esrs:m3",
+    "u_tonnes": "esrs:tonnes",
+    "u_pure": "xbrli:pure",
+}
+
+# Axis used for per-subsidiary dimensional contexts
+SUBSIDIARY_AXIS = "esrs:LegalEntityAxis"
+
+Dimensions = Tuple[Tuple[str, str], ...]
+
+_STANDARD_CONTEXT_IDS = {(period, ()): context_id for context_id, period in STANDARD_CONTEXTS.items()}
+_STANDARD_UNIT_IDS = {measure: unit_id for unit_id, measure in STANDARD_UNITS.items()}
+
+
+class ContextRegistry:
+    """
+    Deduplicates xbrli:context definitions.
+
+    Facts sharing a period and dimension set share one context; the registry
+    hands out its id in O(1) and remembers first-use order for output.
+    """
+
+    def __init__(self):
+        self._ids: Dict[Tuple[str, Dimensions], str] = {}
+        self._dimensioned = 0
+
+    def context_id(self, period: str, dimensions: Dimensions = ()) -> str:
+        key = (period, tuple(sorted(dimensions)))
+        context_id = self._ids.get(key)
+        if context_id is None:
+            if period not in REPORTING_PERIODS:
+                raise KeyError(f"Unknown reporting period: {period}")
+            context_id = _STANDARD_CONTEXT_IDS.get(key)
+            if context_id is None:
+                self._dimensioned += 1
+                context_id = f"cd_{self._dimensioned}"
+            self._ids[key] = context_id
+        return context_id
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[Tuple[str, str, Dimensions]]:
+        for (period, dimensions), context_id in self._ids.items():
+            yield context_id, period, dimensions
+
+
+class UnitRegistry:
+    """Deduplicates xbrli:unit definitions by measure."""
+
+    def __init__(self):
+        self._ids: Dict[str, str] = {}
+
+    def unit_id(self, measure: str) -> str:
+        unit_id = self._ids.get(measure)
+        if unit_id is None:
+            unit_id = _STANDARD_UNIT_IDS.get(measure) or f"u_{measure.split(':')[-1]}"
+            if unit_id in self._ids.values():
+                unit_id = f"{unit_id}_{len(self._ids) + 1}"
+            self._ids[measure] = unit_id
+        return unit_id
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        for measure, unit_id in self._ids.items():
+            yield unit_id, measure
+
+
+@dataclass(frozen=True)
+class FactDefinition:
+    """One row of the iXBRL fact table"""
+    concept: str
+    source_field: str
+    section: str
+    label: str
+    unit: Optional[str] = "esrs:tCO2e"  # measure; None for pure counts
+    decimals: str = "0"
+    period: str = "FY2024"
+    default: Optional[str] = None  # None: fact is skipped when the field is missing
+    fmt: str = "ixt:numdotdecimal"
+    materiality: Optional[str] = "impact materiality"
+    uncertainty: Optional[str] = None
+    footnote: Optional[str] = None
+    per_subsidiary: bool = False
+
+
+@dataclass(frozen=True)
+class CompiledFact:
+    """Fact table row with its static markup rendered once"""
+    definition: FactDefinition
+    paragraph_open: str
+    open_tag: str
+    close_attrs: str
+    trailer: str
+
+
+SCOPE3_CATEGORIES = (
+    "Purchased goods and services", "Capital goods", "Fuel- and energy-related activities",
+    "Upstream transportation and distribution", "Waste generated in operations", "Business travel",
+    "Employee commuting", "Upstream leased assets", "Downstream transportation and distribution",
+    "Processing of sold products", "Use of sold products", "End-of-life treatment of sold products",
+    "Downstream leased assets", "Franchises", "Investments",
+)
+
+SCOPE3_FOOTNOTE = (
+    "Scope 3 emissions calculated using spend-based method for categories 1-2, \n"
+    "        average-data method for categories 3-8, and supplier-specific method where available. \n"
+    "        Uncertainty estimated at ±15% due to data limitations in supply chain."
+)
+
+FACT_TABLE: List[FactDefinition] = [
+    # E1 - Climate Change
+    FactDefinition("esrs-e1:GHGEmissionsScope1", "scope1_emissions", "esrs-e1", "Scope 1 GHG Emissions",
+                   decimals="INF", default="12500.5", uncertainty="tier2", per_subsidiary=True),
+    FactDefinition("esrs-e1:GHGEmissionsScope2LocationBased", "scope2_emissions_location", "esrs-e1",
+                   "Scope 2 GHG Emissions (Location-based)", decimals="INF", default="8300.2",
+                   uncertainty="tier2", per_subsidiary=True),
+    FactDefinition("esrs-e1:GHGEmissionsScope2MarketBased", "scope2_emissions_market", "esrs-e1",
+                   "Scope 2 GHG Emissions (Market-based)", default="6200.0", uncertainty="tier2",
+                   per_subsidiary=True),
+    FactDefinition("esrs-e1:GHGEmissionsScope3Total", "scope3_emissions", "esrs-e1",
+                   "Scope 3 GHG Emissions (Total)", default="45000.0", uncertainty="tier2",
+                   footnote=SCOPE3_FOOTNOTE, per_subsidiary=True),
+    *[
+        FactDefinition(f"esrs-e1:GHGEmissionsScope3Category{i}", f"scope3_cat{i}", "esrs-e1",
+                       f"Scope 3 Category {i} ({name})", uncertainty="tier2", per_subsidiary=True)
+        for i, name in enumerate(SCOPE3_CATEGORIES, 1)
+    ],
+    FactDefinition("esrs-e1:TotalGHGEmissions", "total_emissions", "esrs-e1", "Total GHG Emissions",
+                   decimals="INF", default="65800.7", materiality="double materiality",
+                   uncertainty="tier2", per_subsidiary=True),
+    # E2 - Pollution
+    FactDefinition("esrs-e2:AirPollutantsReductionTarget", "air_pollutants_reduction_target", "esrs-e2",
+                   "Air Pollutants Reduction Target", unit="xbrli:pure", decimals="2", default="0.50"),
+    # E3 - Water and Marine Resources
+    FactDefinition("esrs-e3:WaterConsumption", "water_consumption", "esrs-e3", "Water Consumption",
+                   unit="esrs:m3", default="250000.0", per_subsidiary=True),
+    FactDefinition("esrs-e3:WaterWithdrawal", "water_withdrawal", "esrs-e3", "Water Withdrawal",
+                   unit="esrs:m3", default="300000.0", per_subsidiary=True),
+    # E4 - Biodiversity and Ecosystems
+    FactDefinition("esrs-e4:NumberOfSitesNearProtectedAreas", "sites_near_protected_areas", "esrs-e4",
+                   "Sites Near Protected Areas", unit=None, default="5", fmt="ixt:numcommadot",
+                   materiality=None),
+    # E5 - Resource Use and Circular Economy
+    FactDefinition("esrs-e5:WasteGenerated", "waste_generated", "esrs-e5", "Total Waste Generated",
+                   unit="esrs:tonnes", default="1500.0", per_subsidiary=True),
+    FactDefinition("esrs-e5:WasteRecycled", "waste_recycled", "esrs-e5", "Waste Recycled",
+                   unit="esrs:tonnes", default="1200.0", per_subsidiary=True),
+]
+
+
+def _indicators(materiality: Optional[str] = None, uncertainty: Optional[str] = None) -> str:
+    lines = ""
+    if materiality:
+        lines += f'        <span class="materiality-indicator">[{materiality}]</span>\n'
+    if uncertainty:
+        lines += f'        <span class="uncertainty-indicator">[Uncertainty: {uncertainty}]</span>\n'
+    return lines
+
+
+def compile_fact_table(table: List[FactDefinition]) -> Dict[str, Tuple[CompiledFact, ...]]:
+    """
+    Compile a fact table into per-section tuples of CompiledFact.
+
+    Everything that does not depend on the reported value (labels, tag
+    attributes, indicators, footnotes) is rendered here once, so a report
+    only pays for a dict lookup and one string join per fact.
+    """
+    sections: Dict[str, List[CompiledFact]] = {}
+    footnote_no = 0
+    for fact in table:
+        trailer = ""
+        if fact.footnote:
+            footnote_no += 1
+            trailer += f'        <ix:footnote id="fn{footnote_no}">{fact.footnote}</ix:footnote>\n'
+        trailer += _indicators(fact.materiality, fact.uncertainty)
+        sections.setdefault(fact.section, []).append(CompiledFact(
+            definition=fact,
+            paragraph_open=f'      <p>\n        <span class="data-label">{escape(fact.label)}:</span>\n        ',
+            open_tag=f'<ix:nonFraction name="{fact.concept}" ',
+            close_attrs=f' decimals="{fact.decimals}" format="{fact.fmt}">',
+            trailer=trailer,
+        ))
+    return {section: tuple(facts) for section, facts in sections.items()}
+
+
+COMPILED_FACT_TABLE = compile_fact_table(FACT_TABLE)
+FACT_DEFAULTS = {fact.source_field: fact.default for fact in FACT_TABLE if fact.default is not None}
+
+
+def subsidiary_dimensions(subsidiary: Dict[str, Any]) -> Dimensions:
+    """Dimension set tagging a fact as belonging to one subsidiary."""
+    identifier = subsidiary.get("lei") or subsidiary.get("id") or subsidiary.get("name", "")
+    member = "".join(c for c in str(identifier) if c.isalnum() or c == "_")
+    return ((SUBSIDIARY_AXIS, f"esrs:LegalEntity_{member}"),)
+
+
+DOCUMENT_PROLOGUE = textwrap.dedent("""\
+    <?xml version="1.0" encoding="UTF-8"?>
+    <!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.1//EN" "http://www.w3.org/TR/xhtml11/DTD/xhtml11.dtd">
+    <html xmlns="http://www.w3.org/1999/xhtml"
+          xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+          xmlns:xbrli="http://www.xbrl.org/2003/instance"
+          xmlns:xbrldi="http://xbrl.org/2006/xbrldi"
+          xmlns:ix="http://www.xbrl.org/2013/inlineXBRL"
+          xmlns:ixt="http://www.xbrl.org/inlineXBRL/transformation/2015-02-26"
+          xmlns:iso4217="http://www.xbrl.org/2003/iso4217"
+          xmlns:esrs="http://xbrl.efrag.org/taxonomy/2024-03-31/esrs"
+          xmlns:esrs-e1="http://xbrl.efrag.org/taxonomy/2024-03-31/esrs-e1"
+          xmlns:esrs-e2="http://xbrl.efrag.org/taxonomy/2024-03-31/esrs-e2"
+          xmlns:esrs-e3="http://xbrl.efrag.org/taxonomy/2024-03-31/esrs-e3"
+          xmlns:esrs-e4="http://xbrl.efrag.org/taxonomy/2024-03-31/esrs-e4"
+          xmlns:esrs-e5="http://xbrl.efrag.org/taxonomy/2024-03-31/esrs-e5"
+          xmlns:esrs-e6="http://xbrl.efrag.org/taxonomy/2024-03-31/esrs-e6"
+          xmlns:link="http://www.xbrl.org/2003/linkbase"
+          xmlns:xlink="http://www.w3.org/1999/xlink">
+""")
+
+DOCUMENT_EPILOGUE = "  </body>\n</html>\n"
+
+
+class IXBRLStreamWriter:
+    """
+    Incremental iXBRL writer.
+
+    Sections are written straight to the underlying text handle as they are
+    rendered, so a report never exists as a single string in memory. Contexts
+    and units go through shared registries the first time a fact references
+    them and are written exactly once, in first-reference order, by
+    `write_instance_data`.
+    """
+
+    def __init__(self, out: TextIO, lei: str):
+        self.out = out
+        self.lei = lei
+        self.contexts = ContextRegistry()
+        self.units = UnitRegistry()
+
+    def write(self, chunk: str) -> None:
+        self.out.write(chunk)
+
+    def render_fact(
+        self,
+        fact: CompiledFact,
+        value: Any,
+        dimensions: Dimensions = (),
+        label: Optional[str] = None,
+    ) -> str:
+        """Render a compiled fact table row as a labelled ix:nonFraction paragraph"""
+        definition = fact.definition
+        context_id = self.contexts.context_id(definition.period, dimensions)
+        unit_attr = f' unitRef="{self.units.unit_id(definition.unit)}"' if definition.unit else ""
+
+        if label is None:
+            paragraph_open, trailer = fact.paragraph_open, fact.trailer
+        else:
+            # Dimensional breakdowns share the group footnote, so only the label differs
+            paragraph_open = f'      <p>\n        <span class="data-label">{escape(label)}:</span>\n        '
+            trailer = ""
+
+        return (
+            f'{paragraph_open}{fact.open_tag}contextRef="{context_id}"{unit_attr}{fact.close_attrs}'
+            f'{escape(str(value))}</ix:nonFraction>\n{trailer}      </p>\n'
+        )
+
+    def non_numeric(self, name: str, text: str, period: str = "FY2024") -> str:
+        """Render an ix:nonNumeric fact and register its context"""
+        return (
+            f'<ix:nonNumeric name="{name}" contextRef="{self.contexts.context_id(period)}">'
+            f"{text}</ix:nonNumeric>"
+        )
+
+    def write_instance_data(self) -> None:
+        """Write the hidden instance section for every referenced context/unit"""
+        self.write(build_hidden_instance_data(self.lei, self.contexts, self.units))
 
 
 def generate_ixbrl(voucher_data: Dict[str, Any], output_path: str) -> None:
     """
     Generate XHTML/iXBRL report compliant with CSRD/ESRS standards.
-    
+
+    The document is streamed section by section to a buffered file handle,
+    so peak memory does not grow with the size of the report.
+
     Args:
         voucher_data: Dictionary containing report data (LEI, emissions, etc.)
         output_path: Path where the XHTML file will be saved
@@ -14,60 +321,43 @@ def generate_ixbrl(voucher_data: Dict[str, Any], output_path: str) -> None:
     # Extract data with defaults
     lei = voucher_data.get("lei", "LEI:123456789012EXAMPLE")
     total_emissions = voucher_data.get("total_emissions", "65800.7")
-    
-    # Build the complete XHTML document
-    xhtml_content = build_xhtml_document(lei, total_emissions, voucher_data)
-    
+
     # Ensure output directory exists
     output_file = Path(output_path)
     output_file.parent.mkdir(parents=True, exist_ok=True)
-    
 
-    with open(output_file, "w", encoding="utf-8") as f:
-      print("=== XHTML OUTPUT PREVIEW ===")
-      print(xhtml_content[:500])  # show first 500 chars only
-      print("============================")
-      f.write(xhtml_content)
+    with open(output_file, "w", encoding="utf-8", buffering=IXBRL_WRITE_BUFFER) as f:
+        write_xhtml_document(f, lei, total_emissions, voucher_data)
+
 
+def write_xhtml_document(
+    out: TextIO,
+    lei: str,
+    total_emissions: str,
+    voucher_data: Dict[str, Any],
+    fact_table: Optional[Dict[str, Tuple[CompiledFact, ...]]] = None,
+) -> None:
+    """Stream the complete XHTML document with all sections to `out`."""
+    writer = IXBRLStreamWriter(out, lei)
+
+    writer.write(DOCUMENT_PROLOGUE)
+    writer.write(build_head_section(get_css_styles()))
+    writer.write("  <body>\n")
+    writer.write(build_ixbrl_header())
+
+    for chunk in iter_report_content(writer, lei, total_emissions, voucher_data, fact_table):
+        writer.write(chunk)
+
+    # Contexts and units are only known once every fact has been written
+    writer.write_instance_data()
+    writer.write(DOCUMENT_EPILOGUE)
 
 
 def build_xhtml_document(lei: str, total_emissions: str, voucher_data: Dict[str, Any]) -> str:
-    """Build the complete XHTML document with all sections."""
-    
-    css_styles = get_css_styles()
-    head_section = build_head_section(css_styles)
-    header_section = build_ixbrl_header()
-    hidden_instance_data = build_hidden_instance_data(lei)
-    report_content = build_report_content(lei, total_emissions, voucher_data)
-    
-    xhtml = textwrap.dedent(f"""<?xml version="1.0" encoding="UTF-8"?>
-        <!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.1//EN" "http://www.w3.org/TR/xhtml11/DTD/xhtml11.dtd">
-        <html xmlns="http://www.w3.org/1999/xhtml"
-              xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
-              xmlns:xbrli="http://www.xbrl.org/2003/instance"
-              xmlns:xbrldi="http://xbrl.org/2006/xbrldi"
-              xmlns:ix="http://www.xbrl.org/2013/inlineXBRL"
-              xmlns:ixt="http://www.xbrl.org/inlineXBRL/transformation/2015-02-26"
-              xmlns:iso4217="http://www.xbrl.org/2003/iso4217"
-              xmlns:esrs="http://xbrl.efrag.org/taxonomy/2024-03-31/esrs"
-              xmlns:esrs-e1="http://xbrl.efrag.org/taxonomy/2024-03-31/esrs-e1"
-              xmlns:esrs-e2="http://xbrl.efrag.org/taxonomy/2024-03-31/esrs-e2"
-              xmlns:esrs-e3="http://xbrl.efrag.org/taxonomy/2024-03-31/esrs-e3"
-              xmlns:esrs-e4="http://xbrl.efrag.org/taxonomy/2024-03-31/esrs-e4"
-              xmlns:esrs-e5="http://xbrl.efrag.org/taxonomy/2024-03-31/esrs-e5"
-              xmlns:esrs-e6="http://xbrl.efrag.org/taxonomy/2024-03-31/esrs-e6"
-              xmlns:link="http://www.xbrl.org/2003/linkbase"
-              xmlns:xlink="http://www.w3.org/1999/xlink">
-        {head_section}
-          <body>
-        {header_section}
-        {hidden_instance_data}
-        {report_content}
-          </body>
-        </html>
-    """)
-    
-    return xhtml
+    """Build the complete XHTML document as a string (small reports, previews)."""
+    buffer = io.StringIO()
+    write_xhtml_document(buffer, lei, total_emissions, voucher_data)
+    return buffer.getvalue()
 
 
 def get_css_styles() -> str:
@@ -118,331 +408,289 @@ def build_ixbrl_header() -> str:
     """)
 
 
-def build_hidden_instance_data(lei: str) -> str:
-    """Build the hidden XBRL instance data section."""
-    return textwrap.dedent(f"""\
-        <!-- Hidden XBRL Instance Data -->
-        <div class="hidden" xsi:schemaLocation="http://xbrl.efrag.org/taxonomy/2024-03-31/esrs-all http://xbrl.efrag.org/taxonomy/2024-03-31/esrs-all.xsd">
-          
-          <!-- Context Definitions -->
-          <div id="contexts">
-            <xbrli:context id="c_2024">
-              <xbrli:entity>
-                <xbrli:identifier scheme="http://www.efrag.org/esrs">{lei}</xbrli:identifier>
-              </xbrli:entity>
-              <xbrli:period>
-                <xbrli:startDate>2024-01-01</xbrli:startDate>
-                <xbrli:endDate>2024-12-31</xbrli:endDate>
-              </xbrli:period>
-            </xbrli:context>
-            
-            <xbrli:context id="c_2023">
-              <xbrli:entity>
-                <xbrli:identifier scheme="http://www.efrag.org/esrs">{lei}</xbrli:identifier>
-              </xbrli:entity>
-              <xbrli:period>
-                <xbrli:startDate>2023-01-01</xbrli:startDate>
-                <xbrli:endDate>2023-12-31</xbrli:endDate>
-              </xbrli:period>
-            </xbrli:context>
-            
-            <xbrli:context id="c_2024_instant">
-              <xbrli:entity>
-                <xbrli:identifier scheme="http://www.efrag.org/esrs">{lei}</xbrli:identifier>
-              </xbrli:entity>
-              <xbrli:period>
-                <xbrli:instant>2024-12-31</xbrli:instant>
-              </xbrli:period>
-            </xbrli:context>
-          </div>
-          
-          <!-- Unit Definitions -->
-          <div id="units">
-            <xbrli:unit id="u_tCO2e">
-              <xbrli:measure>esrs:tCO2e</xbrli:measure>
-            </xbrli:unit>
-            <xbrli:unit id="u_EUR">
-              <xbrli:measure>iso4217:EUR</xbrli:measure>
-            </xbrli:unit>
-            <xbrli:unit id="u_MWh">
-              <xbrli:measure>esrs:MWh</xbrli:measure>
-            </xbrli:unit>
-            <xbrli:unit id="u_m3">
-              <xbrli:measure>esrs:m3</xbrli:measure>
-            </xbrli:unit>
-            <xbrli:unit id="u_tonnes">
-              <xbrli:measure>esrs:tonnes</xbrli:measure>
-            </xbrli:unit>
-            <xbrli:unit id="u_pure">
-              <xbrli:measure>xbrli:pure</xbrli:measure>
-            </xbrli:unit>
-          </div>
-        </div>
-    """)
+def build_context(context_id: str, lei: str, period: str, dimensions: Dimensions = ()) -> str:
+    """Build a single xbrli:context definition."""
+    definition = REPORTING_PERIODS[period]
+    if "instant" in definition:
+        period_xml = f"<xbrli:instant>{definition['instant']}</xbrli:instant>"
+    else:
+        period_xml = (
+            f"<xbrli:startDate>{definition['startDate']}</xbrli:startDate>"
+            f"<xbrli:endDate>{definition['endDate']}</xbrli:endDate>"
+        )
+    segment = ""
+    if dimensions:
+        members = "".join(
+            f'<xbrldi:explicitMember dimension="{axis}">{member}</xbrldi:explicitMember>'
+            for axis, member in dimensions
+        )
+        segment = f"<xbrli:segment>{members}</xbrli:segment>"
+    return (
+        f'      <xbrli:context id="{context_id}">'
+        f'<xbrli:entity><xbrli:identifier scheme="http://www.efrag.org/esrs">{escape(lei)}</xbrli:identifier>{segment}</xbrli:entity>'
+        f"<xbrli:period>{period_xml}</xbrli:period>"
+        f"</xbrli:context>\n"
+    )
+
+
+def build_unit(unit_id: str, measure: str) -> str:
+    """Build a single xbrli:unit definition."""
+    return f'      <xbrli:unit id="{unit_id}"><xbrli:measure>{measure}</xbrli:measure></xbrli:unit>\n'
+
+
+def build_hidden_instance_data(
+    lei: str,
+    contexts: Optional[ContextRegistry] = None,
+    units: Optional[UnitRegistry] = None,
+) -> str:
+    """
+    Build the hidden XBRL instance data section.
+
+    Only the contexts/units held by the registries are emitted; by default
+    every standard context and unit is included.
+    """
+    if contexts is None:
+        contexts = ContextRegistry()
+        for period in STANDARD_CONTEXTS.values():
+            contexts.context_id(period)
+    if units is None:
+        units = UnitRegistry()
+        for measure in STANDARD_UNITS.values():
+            units.unit_id(measure)
+
+    context_xml = "".join(
+        build_context(context_id, lei, period, dimensions) for context_id, period, dimensions in contexts
+    )
+    unit_xml = "".join(build_unit(unit_id, measure) for unit_id, measure in units)
+
+    return (
+        "    <!-- Hidden XBRL Instance Data -->\n"
+        '    <div class="hidden" xsi:schemaLocation="http://xbrl.efrag.org/taxonomy/2024-03-31/esrs-all http://xbrl.efrag.org/taxonomy/2024-03-31/esrs-all.xsd">\n'
+        "      <!-- Context Definitions -->\n"
+        '      <div id="contexts">\n'
+        f"{context_xml}"
+        "      </div>\n"
+        "      <!-- Unit Definitions -->\n"
+        '      <div id="units">\n'
+        f"{unit_xml}"
+        "      </div>\n"
+        "    </div>\n"
+    )
 
 
 def build_report_content(lei: str, total_emissions: str, voucher_data: Dict[str, Any]) -> str:
-    """Build the main report content sections."""
-    
-    # Extract additional data from voucher_data
-    scope1 = voucher_data.get("scope1_emissions", "12500.5")
-    scope2_location = voucher_data.get("scope2_emissions_location", "8300.2")
-    scope2_market = voucher_data.get("scope2_emissions_market", "6200.0")
-    scope3_total = voucher_data.get("scope3_emissions", "45000.0")
-    scope3_travel = voucher_data.get("scope3_cat6_business_travel", "1200.5")
-    
-    water_consumption = voucher_data.get("water_consumption", "250000.0")
-    water_withdrawal = voucher_data.get("water_withdrawal", "300000.0")
-    
-    waste_generated = voucher_data.get("waste_generated", "1500.0")
-    waste_recycled = voucher_data.get("waste_recycled", "1200.0")
-    
-    return textwrap.dedent(f"""\
+    """Build the main report content sections as a single string."""
+    writer = IXBRLStreamWriter(io.StringIO(), lei)
+    return "".join(iter_report_content(writer, lei, total_emissions, voucher_data))
+
+
+def iter_report_content(
+    writer: IXBRLStreamWriter,
+    lei: str,
+    total_emissions: str,
+    voucher_data: Dict[str, Any],
+    fact_table: Optional[Dict[str, Tuple[CompiledFact, ...]]] = None,
+) -> Iterator[str]:
+    """
+    Yield the main report content one section at a time.
+
+    Tagged numeric facts come from a single pass over the compiled fact table;
+    facts flagged `per_subsidiary` are repeated for every entry of
+    `voucher_data["subsidiaries"]` under a dimensional context.
+    """
+    if fact_table is None:
+        fact_table = COMPILED_FACT_TABLE
+
+    values = dict(voucher_data)
+    values["total_emissions"] = total_emissions
+    subsidiaries = voucher_data.get("subsidiaries") or []
+
+    yield textwrap.dedent("""\
         <!-- Main Report Content -->
         <div id="sustainability-report">
           <h1>CSRD Sustainability Report 2024</h1>
-          
-          <section id="esrs-e1">
-            <h2>E1 - Climate Change</h2>
-            
-            <p class="narrative">
-              During the reporting period, our organization's total GHG emissions were {total_emissions} tCO₂e, 
-              comprising Scope 1 emissions of {scope1} tCO₂e, Scope 2 location-based emissions of {scope2_location} tCO₂e, 
-              and Scope 3 emissions of {scope3_total} tCO₂e. This represents a continued focus on emissions reduction. 
-              Climate change has been assessed as a material topic with both financial and impact implications.
-            </p>
-            
-            <p>
-              <span class="data-label">Scope 1 GHG Emissions:</span>
-              <ix:nonFraction name="esrs-e1:GHGEmissionsScope1" 
-                             contextRef="c_2024" 
-                             unitRef="u_tCO2e" 
-                             decimals="INF"
-                             format="ixt:numdotdecimal">{scope1}</ix:nonFraction>
-              <span class="materiality-indicator">[impact materiality]</span>
-              <span class="uncertainty-indicator">[Uncertainty: tier2]</span>
-            </p>
-            
-            <p>
-              <span class="data-label">Scope 2 GHG Emissions (Location-based):</span>
-              <ix:nonFraction name="esrs-e1:GHGEmissionsScope2LocationBased" 
-                             contextRef="c_2024" 
-                             unitRef="u_tCO2e" 
-                             decimals="INF"
-                             format="ixt:numdotdecimal">{scope2_location}</ix:nonFraction>
-              <span class="materiality-indicator">[impact materiality]</span>
-              <span class="uncertainty-indicator">[Uncertainty: tier2]</span>
-            </p>
-            
-            <p>
-              <span class="data-label">Scope 2 GHG Emissions (Market-based):</span>
-              <ix:nonFraction name="esrs-e1:GHGEmissionsScope2MarketBased" 
-                             contextRef="c_2024" 
-                             unitRef="u_tCO2e" 
-                             decimals="0"
-                             format="ixt:numdotdecimal">{scope2_market}</ix:nonFraction>
-              <span class="materiality-indicator">[impact materiality]</span>
-              <span class="uncertainty-indicator">[Uncertainty: tier2]</span>
-            </p>
-            
-            <p>
-              <span class="data-label">Scope 3 GHG Emissions (Total):</span>
-              <ix:nonFraction name="esrs-e1:GHGEmissionsScope3Total" 
-                             contextRef="c_2024" 
-                             unitRef="u_tCO2e" 
-                             decimals="0"
-                             format="ixt:numdotdecimal">{scope3_total}</ix:nonFraction>
-              <ix:footnote id="fn1">Scope 3 emissions calculated using spend-based method for categories 1-2, 
-              average-data method for categories 3-8, and supplier-specific method where available. 
-              Uncertainty estimated at ±15% due to data limitations in supply chain.</ix:footnote>
-              <span class="materiality-indicator">[impact materiality]</span>
-              <span class="uncertainty-indicator">[Uncertainty: tier2]</span>
-            </p>
-            
-            <p>
-              <span class="data-label">Total GHG Emissions:</span>
-              <ix:nonFraction name="esrs-e1:TotalGHGEmissions" 
-                             contextRef="c_2024" 
-                             unitRef="u_tCO2e" 
-                             decimals="INF"
-                             format="ixt:numdotdecimal">{total_emissions}</ix:nonFraction>
-              <span class="materiality-indicator">[double materiality]</span>
-              <span class="uncertainty-indicator">[Uncertainty: tier2]</span>
-            </p>
-            
-            <p>
-              <span class="data-label">Climate Transition Plan:</span>
-              <ix:nonNumeric name="esrs-e1:TransitionPlanDescription" contextRef="c_2024">
-                We have committed to achieving net-zero emissions by 2040 through a comprehensive transition plan that includes: 
-                (1) transitioning to 100% renewable energy by 2030, (2) implementing energy efficiency measures across all facilities 
-                targeting 30% reduction in energy intensity, (3) engaging our supply chain to reduce Scope 3 emissions by 50% by 2035, 
-                and (4) investing €50 million in carbon removal technologies and nature-based solutions.
-              </ix:nonNumeric>
-            </p>
-          </section>
-          
-          <section id="esrs-e2">
-            <h2>E2 - Pollution</h2>
-            
-            <p>
-              <span class="data-label">Pollution Prevention Measures:</span>
-              <ix:nonNumeric name="esrs-e2:PollutionPreventionMeasuresDescription" contextRef="c_2024">
-                We have implemented comprehensive pollution prevention measures including: installation of advanced air filtration 
-                systems reducing particulate emissions by 85%, deployment of closed-loop water treatment systems preventing discharge 
-                of pollutants, and transition to non-toxic alternatives for 95% of our chemical inputs. Regular monitoring ensures 
-                compliance with all EU pollution thresholds.
-              </ix:nonNumeric>
-            </p>
-            
-            <p>
-              <span class="data-label">Air Pollutants Reduction Target:</span>
-              <ix:nonFraction name="esrs-e2:AirPollutantsReductionTarget" 
-                             contextRef="c_2024" 
-                             unitRef="u_pure" 
-                             decimals="2"
-                             format="ixt:numdotdecimal">0.50</ix:nonFraction>
-              <span class="materiality-indicator">[impact materiality]</span>
-            </p>
-          </section>
-          
-          <section id="esrs-e3">
-            <h2>E3 - Water and Marine Resources</h2>
-            
-            <p class="narrative">
-              Water management remains a material priority. Total water consumption was {water_consumption} m³, 
-              with withdrawal totaling {water_withdrawal} m³. Water efficiency measures are being implemented across all facilities.
-            </p>
-            
-            <p>
-              <span class="data-label">Water Consumption:</span>
-              <ix:nonFraction name="esrs-e3:WaterConsumption" 
-                             contextRef="c_2024" 
-                             unitRef="u_m3" 
-                             decimals="0"
-                             format="ixt:numdotdecimal">{water_consumption}</ix:nonFraction>
-              <span class="materiality-indicator">[impact materiality]</span>
-            </p>
-            
-            <p>
-              <span class="data-label">Water Withdrawal:</span>
-              <ix:nonFraction name="esrs-e3:WaterWithdrawal" 
-                             contextRef="c_2024" 
-                             unitRef="u_m3" 
-                             decimals="0"
-                             format="ixt:numdotdecimal">{water_withdrawal}</ix:nonFraction>
-              <span class="materiality-indicator">[impact materiality]</span>
-            </p>
-          </section>
-          
-          <section id="esrs-e4">
-            <h2>E4 - Biodiversity and Ecosystems</h2>
-            
-            <p>
-              <span class="data-label">Biodiversity Impact Assessment:</span>
-              <ix:nonNumeric name="esrs-e4:BiodiversityMaterialImpact" contextRef="c_2024">
-                Our biodiversity impact assessment identified 5 sites adjacent to protected areas. We have implemented 
-                biodiversity action plans at each site, including habitat restoration, wildlife corridors, and elimination 
-                of harmful pesticides. Partnership with conservation NGOs ensures science-based approach to biodiversity protection.
-              </ix:nonNumeric>
-            </p>
-            
-            <p>
-              <span class="data-label">Sites Near Protected Areas:</span>
-              <ix:nonFraction name="esrs-e4:NumberOfSitesNearProtectedAreas" 
-                             contextRef="c_2024" 
-                             decimals="0"
-                             format="ixt:numcommadot">5</ix:nonFraction>
-            </p>
-          </section>
-          
-          <section id="esrs-e5">
-            <h2>E5 - Resource Use and Circular Economy</h2>
-            
-            <p class="narrative">
-              Our circular economy initiatives resulted in {waste_recycled} tonnes of waste recycled out of {waste_generated} tonnes generated, 
-              achieving an 80.0% recycling rate. Continuous improvement in waste reduction remains a key objective.
-            </p>
-            
-            <p>
-              <span class="data-label">Total Waste Generated:</span>
-              <ix:nonFraction name="esrs-e5:WasteGenerated" 
-                             contextRef="c_2024" 
-                             unitRef="u_tonnes" 
-                             decimals="0"
-                             format="ixt:numdotdecimal">{waste_generated}</ix:nonFraction>
-              <span class="materiality-indicator">[impact materiality]</span>
-            </p>
-            
-            <p>
-              <span class="data-label">Waste Recycled:</span>
-              <ix:nonFraction name="esrs-e5:WasteRecycled" 
-                             contextRef="c_2024" 
-                             unitRef="u_tonnes" 
-                             decimals="0"
-                             format="ixt:numdotdecimal">{waste_recycled}</ix:nonFraction>
-              <span class="materiality-indicator">[impact materiality]</span>
-            </p>
-          </section>
-          
-          <section id="esrs-e6">
-            <h2>E6 - General Disclosures</h2>
-            
-            <p>
-              <span class="data-label">Material Impacts, Risks and Opportunities:</span>
-              <ix:nonNumeric name="esrs:MaterialImpactsDescription" contextRef="c_2024">
-                Our double materiality assessment identified climate change, water scarcity, and circular economy as our most 
-                material sustainability matters. Financial materiality stems from transition risks (carbon pricing, technology 
-                shifts) and physical risks (supply chain disruption). Impact materiality relates to our GHG emissions 
-                ({total_emissions} tCO₂e), water consumption in stressed regions, and waste generation. These matters directly influence 
-                our strategic planning and capital allocation decisions.
-              </ix:nonNumeric>
-            </p>
-            
-            <p>
-              <span class="data-label">Governance Body Climate Oversight:</span>
-              <ix:nonNumeric name="esrs:GovernanceBodyClimateOversightDescription" contextRef="c_2024">
-                The Board of Directors maintains ultimate oversight of climate-related matters through quarterly reviews. 
-                The Sustainability Committee, comprising 5 board members, meets monthly to monitor progress against targets. 
-                Executive compensation is linked to ESG performance with 20% of variable pay tied to emissions reduction 
-                and sustainability KPIs. The Chief Sustainability Officer reports directly to the CEO and Board.
-              </ix:nonNumeric>
-            </p>
-          </section>
-          
-          <!-- Compliance Analysis -->
-          <section id="compliance-analysis">
-            <h3>Compliance Analysis</h3>
-            <p>Taxonomy Coverage: 94.2%</p>
-            <p>Compliance Score: 1.00</p>
-            <h4>Validation Results</h4>
-            <ul>
-              <li>✓ All mandatory ESRS disclosures present</li>
-              <li>✓ iXBRL structure validated against ESRS taxonomy</li>
-              <li>✓ Decimal precision appropriately applied (INF for exact values)</li>
-              <li>✓ Narrative disclosures properly tagged with ix:nonNumeric</li>
-              <li>✓ All ESRS modules (E1-E6) contain substantive disclosures</li>
-            </ul>
-            <p style="font-size:0.9em; color:#666; margin-top:10px;">Report ready for ESMA submission gateway</p>
-          </section>
-          
-          <!-- Document Information -->
-          <section id="document-info">
-            <h3>Document Information</h3>
-            <ul>
-              <li>Document ID: <ix:nonNumeric name="esrs:DocumentID" contextRef="c_2024">DOC-2024-CSRD-001</ix:nonNumeric></li>
-              <li>Generated: 2025-01-09T10:30:00Z</li>
-              <li>Taxonomy: <ix:nonNumeric name="esrs:TaxonomyUsed" contextRef="c_2024">ESRS Set 1 (2024-03-31) - EFRAG Implementation</ix:nonNumeric></li>
-              <li>Validation: <ix:nonNumeric name="esrs:ValidationStatus" contextRef="c_2024">Pre-submission validation completed - Arelle v2024.3.1</ix:nonNumeric></li>
-              <li>Entity: {lei}</li>
-              <li>Reporting Period: 2024-01-01 to 2024-12-31</li>
-              <li>Engine Version: ESRS iXBRL Compliance Engine v2.0</li>
-              <li>Report Type: <ix:nonNumeric name="esrs:ReportType" contextRef="c_2024">Annual Sustainability Statement - Consolidated</ix:nonNumeric></li>
-              <li>Assurance Level: <ix:nonNumeric name="esrs:AssuranceLevel" contextRef="c_2024">Self-declared — not externally assured</ix:nonNumeric></li>
-            </ul>
-          </section>
-        </div>
     """)
 
+    for section_id, title, narrative, disclosures in SECTION_LAYOUT:
+        yield f'      <section id="{section_id}">\n      <h2>{title}</h2>\n'
+        if narrative:
+            yield narrative(values)
+
+        for fact in fact_table.get(section_id, ()):
+            definition = fact.definition
+            value = values.get(definition.source_field, definition.default)
+            if value is not None and value != "":
+                yield writer.render_fact(fact, value)
+
+            if definition.per_subsidiary:
+                for subsidiary in subsidiaries:
+                    sub_value = subsidiary.get(definition.source_field)
+                    if sub_value is None or sub_value == "":
+                        continue
+                    name = subsidiary.get("name") or subsidiary.get("lei", "")
+                    yield writer.render_fact(
+                        fact, sub_value, subsidiary_dimensions(subsidiary), f"{definition.label} - {name}"
+                    )
+
+        if disclosures:
+            yield disclosures(writer, values)
+        yield "      </section>\n"
+
+    yield build_compliance_section()
+    yield build_document_info_section(writer, lei)
+    yield "    </div>\n"
+
+
+def _value(values: Dict[str, Any], field: str) -> str:
+    """Escaped value for narrative text, falling back to the fact table default."""
+    return escape(str(values.get(field, FACT_DEFAULTS.get(field, ""))))
+
+
+def _fact_paragraph(label: str, fact: str) -> str:
+    """Wrap a tagged narrative fact in a labelled paragraph."""
+    return (
+        f'      <p>\n'
+        f'        <span class="data-label">{label}:</span>\n'
+        f'        {fact}\n'
+        f'      </p>\n'
+    )
+
+
+def _e1_narrative(v: Dict[str, Any]) -> str:
+    return (
+        '      <p class="narrative">\n'
+        f"        During the reporting period, our organization's total GHG emissions were {_value(v, 'total_emissions')} tCO₂e, \n"
+        f"        comprising Scope 1 emissions of {_value(v, 'scope1_emissions')} tCO₂e, Scope 2 location-based emissions of {_value(v, 'scope2_emissions_location')} tCO₂e, \n"
+        f"        and Scope 3 emissions of {_value(v, 'scope3_emissions')} tCO₂e. This represents a continued focus on emissions reduction. \n"
+        "        Climate change has been assessed as a material topic with both financial and impact implications.\n"
+        "      </p>\n"
+    )
+
+
+def _e1_disclosures(writer: IXBRLStreamWriter, v: Dict[str, Any]) -> str:
+    return _fact_paragraph("Climate Transition Plan", writer.non_numeric(
+        "esrs-e1:TransitionPlanDescription",
+        "\n          We have committed to achieving net-zero emissions by 2040 through a comprehensive transition plan that includes: \n"
+        "          (1) transitioning to 100% renewable energy by 2030, (2) implementing energy efficiency measures across all facilities \n"
+        "          targeting 30% reduction in energy intensity, (3) engaging our supply chain to reduce Scope 3 emissions by 50% by 2035, \n"
+        "          and (4) investing €50 million in carbon removal technologies and nature-based solutions.\n        ",
+    ))
+
+
+def _e2_disclosures(writer: IXBRLStreamWriter, v: Dict[str, Any]) -> str:
+    return _fact_paragraph("Pollution Prevention Measures", writer.non_numeric(
+        "esrs-e2:PollutionPreventionMeasuresDescription",
+        "\n          We have implemented comprehensive pollution prevention measures including: installation of advanced air filtration \n"
+        "          systems reducing particulate emissions by 85%, deployment of closed-loop water treatment systems preventing discharge \n"
+        "          of pollutants, and transition to non-toxic alternatives for 95% of our chemical inputs. Regular monitoring ensures \n"
+        "          compliance with all EU pollution thresholds.\n        ",
+    ))
+
+
+def _e3_narrative(v: Dict[str, Any]) -> str:
+    return (
+        '      <p class="narrative">\n'
+        f"        Water management remains a material priority. Total water consumption was {_value(v, 'water_consumption')} m³, \n"
+        f"        with withdrawal totaling {_value(v, 'water_withdrawal')} m³. Water efficiency measures are being implemented across all facilities.\n"
+        "      </p>\n"
+    )
+
+
+def _e4_disclosures(writer: IXBRLStreamWriter, v: Dict[str, Any]) -> str:
+    return _fact_paragraph("Biodiversity Impact Assessment", writer.non_numeric(
+        "esrs-e4:BiodiversityMaterialImpact",
+        "\n          Our biodiversity impact assessment identified 5 sites adjacent to protected areas. We have implemented \n"
+        "          biodiversity action plans at each site, including habitat restoration, wildlife corridors, and elimination \n"
+        "          of harmful pesticides. Partnership with conservation NGOs ensures science-based approach to biodiversity protection.\n        ",
+    ))
+
+
+def _e5_narrative(v: Dict[str, Any]) -> str:
+    return (
+        '      <p class="narrative">\n'
+        f"        Our circular economy initiatives resulted in {_value(v, 'waste_recycled')} tonnes of waste recycled out of {_value(v, 'waste_generated')} tonnes generated, \n"
+        "        achieving an 80.0% recycling rate. Continuous improvement in waste reduction remains a key objective.\n"
+        "      </p>\n"
+    )
+
+
+def _e6_disclosures(writer: IXBRLStreamWriter, v: Dict[str, Any]) -> str:
+    impacts = writer.non_numeric(
+        "esrs:MaterialImpactsDescription",
+        "\n          Our double materiality assessment identified climate change, water scarcity, and circular economy as our most \n"
+        "          material sustainability matters. Financial materiality stems from transition risks (carbon pricing, technology \n"
+        "          shifts) and physical risks (supply chain disruption). Impact materiality relates to our GHG emissions \n"
+        f"          ({_value(v, 'total_emissions')} tCO₂e), water consumption in stressed regions, and waste generation. These matters directly influence \n"
+        "          our strategic planning and capital allocation decisions.\n        ",
+    )
+    oversight = writer.non_numeric(
+        "esrs:GovernanceBodyClimateOversightDescription",
+        "\n          The Board of Directors maintains ultimate oversight of climate-related matters through quarterly reviews. \n"
+        "          The Sustainability Committee, comprising 5 board members, meets monthly to monitor progress against targets. \n"
+        "          Executive compensation is linked to ESG performance with 20% of variable pay tied to emissions reduction \n"
+        "          and sustainability KPIs. The Chief Sustainability Officer reports directly to the CEO and Board.\n        ",
+    )
+    return (
+        _fact_paragraph("Material Impacts, Risks and Opportunities", impacts)
+        + _fact_paragraph("Governance Body Climate Oversight", oversight)
+    )
+
+
+# Section order with the untagged narrative before and tagged narratives after the facts
+SECTION_LAYOUT: Tuple[Tuple[str, str, Optional[Callable], Optional[Callable]], ...] = (
+    ("esrs-e1", "E1 - Climate Change", _e1_narrative, _e1_disclosures),
+    ("esrs-e2", "E2 - Pollution", None, _e2_disclosures),
+    ("esrs-e3", "E3 - Water and Marine Resources", _e3_narrative, None),
+    ("esrs-e4", "E4 - Biodiversity and Ecosystems", None, _e4_disclosures),
+    ("esrs-e5", "E5 - Resource Use and Circular Economy", _e5_narrative, None),
+    ("esrs-e6", "E6 - General Disclosures", None, _e6_disclosures),
+)
+
+
+def build_compliance_section() -> str:
+    """Compliance analysis summary (untagged)."""
+    return textwrap.indent(textwrap.dedent("""\
+        <!-- Compliance Analysis -->
+        <section id="compliance-analysis">
+          <h3>Compliance Analysis</h3>
+          <p>Taxonomy Coverage: 94.2%</p>
+          <p>Compliance Score: 1.00</p>
+          <h4>Validation Results</h4>
+          <ul>
+            <li>✓ All mandatory ESRS disclosures present</li>
+            <li>✓ iXBRL structure validated against ESRS taxonomy</li>
+            <li>✓ Decimal precision appropriately applied (INF for exact values)</li>
+            <li>✓ Narrative disclosures properly tagged with ix:nonNumeric</li>
+            <li>✓ All ESRS modules (E1-E6) contain substantive disclosures</li>
+          </ul>
+          <p style="font-size:0.9em; color:#666; margin-top:10px;">Report ready for ESMA submission gateway</p>
+        </section>
+    """), "      ")
+
+
+def build_document_info_section(writer: IXBRLStreamWriter, lei: str) -> str:
+    """Document information block."""
+    items = [
+        f"Document ID: {writer.non_numeric('esrs:DocumentID', 'DOC-2024-CSRD-001')}",
+        "Generated: 2025-01-09T10:30:00Z",
+        f"Taxonomy: {writer.non_numeric('esrs:TaxonomyUsed', 'ESRS Set 1 (2024-03-31) - EFRAG Implementation')}",
+        f"Validation: {writer.non_numeric('esrs:ValidationStatus', 'Pre-submission validation completed - Arelle v2024.3.1')}",
+        f"Entity: {escape(lei)}",
+        "Reporting Period: 2024-01-01 to 2024-12-31",
+        "Engine Version: ESRS iXBRL Compliance Engine v2.0",
+        f"Report Type: {writer.non_numeric('esrs:ReportType', 'Annual Sustainability Statement - Consolidated')}",
+        f"Assurance Level: {writer.non_numeric('esrs:AssuranceLevel', 'Self-declared — not externally assured')}",
+    ]
+    return (
+        "      <!-- Document Information -->\n"
+        '      <section id="document-info">\n'
+        "        <h3>Document Information</h3>\n"
+        "        <ul>\n"
+        + "".join(f"          <li>{item}</li>\n" for item in items)
+        + "        </ul>\n"
+        "      </section>\n"
+    )
+
 
 if __name__ == "__main__":
     # Example usage
@@ -453,11 +701,11 @@ if __name__ == "__main__":
         "scope2_emissions_location": "8300.2",
         "scope2_emissions_market": "6200.0",
         "scope3_emissions": "45000.0",
-        "scope3_cat6_business_travel": "1200.5",
+        "scope3_cat6": "1200.5",
         "water_consumption": "250000.0",
         "water_withdrawal": "300000.0",
         "waste_generated": "1500.0",
         "waste_recycled": "1200.0"
     }
-    
+
     generate_ixbrl(sample_voucher_data, "output/compliance_report.xhtml")
@@ -1,8 +1,16 @@
 # tests/conftest.py
+import importlib.util
 import sys
 from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
+SERVICES = Path(__file__).resolve().parents[1] / "src" / "factortrace" / "services"
+
 def _sample_record():
     return {
         "scope": "SCOPE_3",
@@ -41,3 +49,66 @@ def _sample_record():
         "emission_date_end": "2024-01-31"
     }
 
+
+# --------------------------------------------------------------------------- #
+# factortrace.services, loaded by path: importing the package pulls in the    #
+# whole app, whose models do not import here                                  #
+# --------------------------------------------------------------------------- #
+def _load_service(name, filename):
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, SERVICES / filename)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+
+@pytest.fixture(scope="session")
+def validator():
+    return _load_service("factortrace.services.validator", "validator.py")
+
+
+@pytest.fixture(scope="session")
+def voucher_store(validator):
+    return _load_service("factortrace.services.voucher_store", "voucher_store.py")
+
+
+@pytest.fixture(scope="session")
+def voucher_import(validator, voucher_store):
+    _load_service("factortrace.services.voucher_xml_parser", "voucher_xml_parser.py")
+    # Top-level name, so worker processes can unpickle prepare_chunk without importing factortrace
+    return _load_service("voucher_import", "voucher_import.py")
+
+
+@pytest.fixture(scope="session")
+def revalidation(validator, voucher_store):
+    return _load_service("factortrace.services.revalidation", "revalidation.py")
+
+
+@pytest.fixture
+def complete_voucher():
+    """A voucher that passes every ESRS E1 check"""
+    return {
+        "reporting_undertaking_lei": "ABCD1234567890123456",
+        "scope": "3",
+        "total_emissions_tco2e": 12.5,
+        "reporting_period_start": "2024-01-01",
+        "reporting_period_end": "2024-12-31",
+        "calculation_methodology": "GHG Protocol",
+        "data_quality_rating": 2,
+        "ghg_breakdown": {"CO2": 12.0, "CH4": 0.5},
+    }
+
+
+@pytest.fixture
+def engine(tmp_path, voucher_store):
+    """SQLite file database with the voucher tables (no search index or summary rows)"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'vouchers.db'}")
+    voucher_store.Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine)
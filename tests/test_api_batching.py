@@ -0,0 +1,78 @@
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+# Loaded by path: the api package __init__ imports the full application
+_spec = importlib.util.spec_from_file_location(
+    "api_batching",
+    Path(__file__).resolve().parents[1] / "src" / "api" / "batching.py",
+)
+batching = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(batching)
+
+
+@dataclass
+class _Line:
+    co2e: Decimal
+    tags: list
+
+
+def _double(chunk):
+    records = []
+    for index, raw in chunk:
+        try:
+            records.append({"index": index, "value": batching.decode_item(raw)["x"] * 2})
+        except Exception as e:
+            records.append(batching.error_record(index, e))
+    return batching.encode_ndjson(records)
+
+
+def _client(max_items=batching.MAX_BATCH_ITEMS):
+    app = FastAPI()
+    executor = ThreadPoolExecutor(max_workers=2)
+
+    @app.post("/batch")
+    async def batch(request: Request, chunk_size: int = 2):
+        return await batching.stream_batch(request, _double, executor, chunk_size, max_items)
+
+    return TestClient(app)
+
+
+def test_dumps_encodes_dataclasses_without_asdict():
+    assert batching.loads(batching.dumps(_Line(Decimal("1.5"), ["a"]))) == {"co2e": 1.5, "tags": ["a"]}
+    assert batching.encode_ndjson([{"a": 1}, {"b": 2}]).count(b"\n") == 2
+
+
+def test_ndjson_and_json_array_stream_in_order():
+    client = _client()
+    ndjson = b"".join(b'{"x": %d}\n' % i for i in range(7)) + b"not json\n\n"
+    response = client.post("/batch", content=ndjson, headers={"content-type": "application/x-ndjson"})
+    assert response.headers["content-type"].startswith(batching.NDJSON_MEDIA_TYPE)
+    lines = [batching.loads(line) for line in response.content.splitlines()]
+    assert [line["index"] for line in lines] == list(range(8))
+    assert [line.get("value") for line in lines[:7]] == [2 * i for i in range(7)]
+    assert "error" in lines[7]
+
+    response = client.post("/batch", json=[{"x": 1}, {"x": 2}, {"x": 3}])
+    assert [batching.loads(line)["value"] for line in response.content.splitlines()] == [2, 4, 6]
+
+
+def test_malformed_or_oversized_batches_are_rejected_up_front():
+    assert _client().post("/batch", content=b"{not json", headers={"content-type": "application/json"}).status_code == 400
+    assert _client().post("/batch", json={"x": 1}).status_code == 400
+    assert _client(max_items=2).post("/batch", json=[{"x": 1}] * 3).status_code == 413
+
+    # Past the first chunk an NDJSON upload can only be cut short in-band
+    ndjson = b'{"x": 1}\n' * 5
+    response = _client(max_items=3).post("/batch?chunk_size=1", content=ndjson,
+                                         headers={"content-type": "application/x-ndjson"})
+    lines = [batching.loads(line) for line in response.content.splitlines()]
+    # Items accepted before the limit still stream out ahead of the error record
+    assert [line.get("value") for line in lines[:-1]] == [2, 2, 2]
+    assert [line["index"] for line in lines[:-1]] == [0, 1, 2]
+    assert lines[-1]["index"] is None and lines[-1]["error_type"] == "BatchRequestError"
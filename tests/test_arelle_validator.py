@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "generator"))
+
+from arelle_validator import ValidatorDaemon, XBRLValidationService  # noqa: E402
+from xhtml_generator import generate_ixbrl  # noqa: E402
+
+SAMPLE = {"lei": "5493001KJTIIGC8Y1R12", "total_emissions": "100", "scope1_emissions": "10"}
+
+
+def test_generated_report_is_valid_and_dts_loaded_once(tmp_path):
+    report = tmp_path / "report.xhtml"
+    generate_ixbrl(SAMPLE, str(report))
+    service = XBRLValidationService(use_arelle=False)
+
+    results = [service.validate(str(report)) for _ in range(3)]
+
+    assert all(r["status"] == "valid" for r in results), results[0]["errors"]
+    assert service.dts_loads == 1
+    # The bundled schema files are empty placeholders; they are skipped, not fatal
+    assert any("empty" in reason for reason in service.dts.skipped.values())
+
+
+def test_undefined_context_and_bad_xml_are_invalid(tmp_path):
+    report = tmp_path / "report.xhtml"
+    generate_ixbrl(SAMPLE, str(report))
+    broken = tmp_path / "broken.xhtml"
+    broken.write_text(report.read_text().replace('contextRef="c_2024"', 'contextRef="c_missing"', 1))
+    truncated = tmp_path / "truncated.xhtml"
+    truncated.write_text(report.read_text()[:500])
+
+    service = XBRLValidationService(use_arelle=False)
+    with ValidatorDaemon(service) as daemon:
+        futures = [daemon.submit(str(p)) for p in (report, broken, truncated)]
+        ok, bad, torn = (f.result(timeout=10) for f in futures)
+
+    assert ok["status"] == "valid"
+    assert bad["status"] == "invalid" and "c_missing" in bad["errors"][0]
+    assert torn["status"] == "invalid"
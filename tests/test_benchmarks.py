@@ -0,0 +1,26 @@
+import importlib.util
+from pathlib import Path
+
+# Loaded by path: benchmarks/ is not a package
+_spec = importlib.util.spec_from_file_location(
+    "hot_paths", Path(__file__).resolve().parents[1] / "benchmarks" / "hot_paths.py"
+)
+hot_paths = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(hot_paths)
+
+
+def test_regressions_against_baseline():
+    baseline = {"items_per_second": 1000.0, "peak_rss_mb": 100.0}
+
+    assert hot_paths.compare({"items_per_second": 800.0, "peak_rss_mb": 120.0}, baseline, 0.25, 0.25) == []
+    assert hot_paths.compare({"items_per_second": 10.0, "peak_rss_mb": 10.0}, None, 0.25, 0.25) == []
+    problems = hot_paths.compare({"items_per_second": 700.0, "peak_rss_mb": 130.0}, baseline, 0.25, 0.25)
+    assert len(problems) == 2
+    assert problems[0].startswith("throughput") and problems[1].startswith("peak RSS")
+
+
+def test_case_runs_in_a_fresh_interpreter():
+    result = hot_paths.measure("validate_voucher", 50, 1)
+    assert result["items"] == 50
+    assert result["items_per_second"] > 0
+    assert result["peak_rss_mb"] >= result["setup_rss_mb"] > 0
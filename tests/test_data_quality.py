@@ -0,0 +1,180 @@
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "generator"))
+
+from batch_runner import AIDataQualityAnalyzer  # noqa: E402
+from data_quality import (  # noqa: E402
+    BatchDataQualityAnalyzer,
+    RuleError,
+    compile_expression,
+    load_rules,
+    quality_histogram,
+    score_quality,
+    score_vouchers,
+)
+
+CLEAN = {
+    "lei": "5493001KJTIIGC8Y1R12",
+    "total_emissions": "1500.5",
+    "scope1_emissions": "100",
+    "scope2_emissions_location": "200",
+    "scope2_emissions_market": "150",
+    "scope3_emissions": "1200.5",
+    "water_consumption": "80",
+    "water_withdrawal": "100",
+    "waste_generated": "10",
+    "waste_recycled": "5",
+    "narratives": "present",
+}
+
+
+def test_findings_match_row_rules_in_severity_order():
+    rows = [
+        CLEAN,
+        dict(CLEAN, lei="LEI: bad", total_emissions="2000", water_consumption="120", waste_recycled="1"),
+        dict(CLEAN, scope1_emissions="abc", water_withdrawal="", narratives=""),
+    ]
+    findings = BatchDataQualityAnalyzer().analyze(rows)
+
+    assert findings.for_row(0) == []
+
+    second = findings.for_row(1)
+    assert [(f.severity, f.field) for f in second] == [
+        ("critical", "lei"),
+        ("critical", "water_consumption"),
+        ("warning", "total_emissions"),
+        ("suggestion", "total_emissions"),
+        ("suggestion", "recycling_rate"),
+    ]
+    assert second[2].issue == "Total emissions (2000.0) does not match sum of scopes (1500.5)"
+    assert second[4].issue == "Low recycling rate (10.0%)"
+
+    third = [(f.field, f.issue) for f in findings.for_row(2)]
+    assert third[:2] == [
+        ("emissions_data", "Invalid numeric data: could not convert string to float: 'abc'"),
+        ("water_data", "Invalid water data format"),
+    ]
+    assert ("narrative_disclosures", "No narrative disclosures provided") in third
+
+    counts = findings.severity_counts()
+    assert counts.loc[1].tolist() == [2, 1, 2]
+    assert counts.loc[0].sum() == 0
+
+
+def test_rows_without_a_column_match_the_row_analyzer():
+    bare = {k: v for k, v in CLEAN.items() if k != "narratives"}
+    rows = [CLEAN, bare, dict(CLEAN, narratives=None), dict(CLEAN, narratives=""), dict(bare, lei="x")]
+    findings = BatchDataQualityAnalyzer().analyze(rows)
+
+    analyzer = AIDataQualityAnalyzer()
+    for i, row in enumerate(rows):
+        expected = [(f.severity, f.field, f.issue) for f in analyzer.analyze_data_quality(row)]
+        assert sorted((f.severity, f.field, f.issue) for f in findings.for_row(i)) == sorted(expected)
+    assert [f.field for f in findings.for_row(1)] == ["narrative_disclosures"]
+
+
+def test_three_critical_findings_escalate():
+    row = dict(CLEAN, lei="x", total_emissions="0", scope3_emissions="0", waste_recycled="50")
+    feedback = BatchDataQualityAnalyzer().analyze([row]).for_row(0)
+
+    assert [f.field for f in feedback if f.severity == "critical"] == [
+        "lei", "total_emissions", "waste_recycled", "overall_data_quality",
+    ]
+
+
+def test_peer_percentile_outliers_per_sector():
+    rows = [dict(CLEAN, sector="steel", revenue="1", total_emissions=str(1000 + i)) for i in range(9)]
+    rows.append(dict(CLEAN, sector="steel", revenue="1", total_emissions="50000"))
+    rows += [dict(CLEAN, sector="retail", revenue="1", total_emissions="50000") for _ in range(3)]
+
+    findings = BatchDataQualityAnalyzer().analyze(rows)
+    outliers = findings.table[findings.table["rule"] == "emissions_intensity_outlier"]
+
+    # Only the steel outlier; retail has fewer than min_peers entities
+    assert outliers["row"].tolist() == [9]
+    assert outliers["detail"].tolist() == ["steel"]
+    assert any("above the 95th percentile of steel peers" in f.issue for f in findings.for_row(9))
+
+
+def test_client_rule_file_adds_and_overrides_rules(tmp_path):
+    client = tmp_path / "client.json"
+    client.write_text(json.dumps({
+        "benchmarks": {"recycling_rate": {"min": 0.6}},
+        "rules": [
+            {"id": "total_rounded", "group": "emissions", "severity": "warning", "field": "total_emissions",
+             "when": "total_emissions > 100 and fmod(total_emissions, 100) == 0",
+             "issue": "Rounded to hundreds", "recommendation": "", "compliance_impact": ""},
+            {"id": "scope1_share_high", "group": "emissions", "severity": "suggestion", "field": "scope1_emissions",
+             "when": "scope1_emissions / total_emissions > 0.5", "a": "scope1_emissions / total_emissions * 100",
+             "issue": "Scope 1 is {a:.0f}% of total", "recommendation": "", "compliance_impact": ""},
+        ],
+    }))
+    rules = load_rules(client)
+    row = dict(CLEAN, total_emissions="1500", scope1_emissions="1000", scope3_emissions="300")
+    issues = {(f.severity, f.issue) for f in BatchDataQualityAnalyzer(rules=rules).analyze([row]).for_row(0)}
+
+    assert ("warning", "Rounded to hundreds") in issues
+    assert ("suggestion", "Scope 1 is 67% of total") in issues
+    assert ("suggestion", "Low recycling rate (50.0%)") in issues
+    assert [r.template.code for r in rules.rules].index("total_rounded") < len(load_rules().rules)
+
+
+def test_client_missing_rule_flags_absent_and_empty_values(tmp_path):
+    client = tmp_path / "client.json"
+    client.write_text(json.dumps({"rules": [
+        {"id": "transition_plan_missing", "type": "missing", "column": "transition_plan", "severity": "warning",
+         "field": "transition_plan", "issue": "No transition plan", "recommendation": "", "compliance_impact": ""},
+    ]}))
+    rules = load_rules(client)
+    rows = [dict(CLEAN, transition_plan="2030 targets"), CLEAN, dict(CLEAN, transition_plan=None),
+            dict(CLEAN, transition_plan="")]
+
+    findings = BatchDataQualityAnalyzer(rules=rules).analyze(rows)
+    flagged = findings.table.loc[findings.table["rule"] == "transition_plan_missing", "row"]
+    assert flagged.tolist() == [1, 2, 3]
+    # A batch where no row has the column flags every row
+    assert BatchDataQualityAnalyzer(rules=rules).analyze([CLEAN, CLEAN]).table["rule"].tolist() == [
+        "transition_plan_missing", "transition_plan_missing",
+    ]
+
+
+@pytest.mark.parametrize("expr", ["__import__('os')", "total.real", "lei == 'x'", "[1, 2]"])
+def test_expression_compiler_rejects_non_numeric_syntax(expr):
+    with pytest.raises(RuleError):
+        compile_expression(expr)
+
+
+def test_batch_quality_scores_follow_per_voucher_rules():
+    # gap 1 / geo miss / gap 4 + tech miss / gap 8 + both misses / gap 8 assured / measured factor
+    scores, tiers = score_quality(
+        [2023, 2023, 2020, 2016, 2016, 2024],
+        2024,
+        [True, False, True, False, True, True],
+        [True, True, False, False, True, True],
+        [None, None, None, None, "reasonable_assurance", None],
+        ["tier_1"] * 5 + ["tier_3"],
+    )
+    assert scores.tolist() == [1, 2, 3, 5, 2, 1]
+    assert list(tiers) == ["tier_2", "tier_2", "tier_1", "tier_1", "tier_2", "tier_3"]
+
+
+def test_quality_histogram_per_entity():
+    frame = pd.DataFrame({
+        "entity": ["A", "A", "B", "A"],
+        "source_year": [2024, 2015, 2024, 2024],
+        "factor_country": ["DE", "DE", "FR", "DE"],
+        "installation_country": ["DE", "FR", "FR", "DE"],
+        "technology": ["EAF", None, "BOF", ""],
+    })
+    scored = score_vouchers(frame, reporting_year=2024)
+    assert scored["data_quality_rating"].tolist() == [1, 5, 1, 2]
+
+    histogram = quality_histogram(frame["entity"], scored["data_quality_rating"])
+    assert histogram.loc["A", [1, 2, 3, 4, 5]].tolist() == [1, 1, 0, 0, 1]
+    assert histogram.loc["B", 1] == 1
+    assert histogram.loc["A", "mean_score"] == pytest.approx(8 / 3)
@@ -0,0 +1,48 @@
+import importlib.util
+from pathlib import Path
+
+from sqlalchemy import text
+
+_spec = importlib.util.spec_from_file_location(
+    "factortrace_database",
+    Path(__file__).resolve().parents[1] / "src" / "factortrace" / "database.py",
+)
+database = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(database)
+
+
+def test_sqlite_file_engine_uses_wal_and_tuned_pragmas(tmp_path):
+    settings = database.DatabaseSettings(url=f"sqlite:///{tmp_path / 'vouchers.db'}", pool_size=3)
+    engine = database.build_engine(settings)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == settings.sqlite_cache_size
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == settings.sqlite_busy_timeout
+    assert engine.pool.size() == 3
+    engine.dispose()
+
+
+def test_settings_from_env(monkeypatch):
+    monkeypatch.setenv("FACTORTRACE_DATABASE_URL", "postgresql://ft@db/factortrace")
+    monkeypatch.setenv("FACTORTRACE_DB_POOL_SIZE", "20")
+    settings = database.DatabaseSettings.from_env()
+    assert settings.url == "postgresql://ft@db/factortrace"
+    assert settings.pool_size == 20
+    assert not settings.is_sqlite
+
+
+def test_migrations_run_once_per_database():
+    db = database.Database(database.DatabaseSettings(url="sqlite://"))
+    calls = []
+    db.register_migration(lambda engine: calls.append(engine))
+    db.migrate()
+    db.migrate()
+    assert calls == [db.engine]
+
+    # In-memory databases share one connection, so tables survive across sessions
+    with db.engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+    with db.session() as session:
+        assert session.execute(text("SELECT count(*) FROM t")).scalar() == 0
@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "generator"))
+
+from materiality import MaterialityEngine, MaterialityThresholds, screen, voucher_columns  # noqa: E402
+
+
+def _vouchers():
+    return [
+        {"reporting_undertaking_id": "LEI-A", "supplier_id": "S1", "scope3_category": "1_purchased_goods_services",
+         "total_emissions_tco2e": 900.0, "monetary_value": 500_000},
+        {"reporting_undertaking_id": "LEI-A", "supplier_id": "S2", "scope3_category": "1_purchased_goods_services",
+         "total_emissions_tco2e": 60.0, "monetary_value": 20_000},
+        {"reporting_undertaking_id": "LEI-A", "supplier_id": "S3", "scope3_category": "4_upstream_transportation",
+         "total_emissions_tco2e": 40.0, "monetary_value": None},
+        {"reporting_undertaking_id": "LEI-B", "supplier_id": "S1", "emission_scope": "scope_1",
+         "total_emissions_tco2e": 10.0, "monetary_value": 150_000},
+    ]
+
+
+def test_suppliers_and_categories_are_scored_per_entity():
+    result = MaterialityEngine().assess(_vouchers())
+
+    s1 = result.suppliers.loc[("LEI-A", "S1")]
+    assert s1["emission_share"] == pytest.approx(90.0)
+    assert s1["financial_score"] == pytest.approx(500_000 / 520_000)
+    assert s1["materiality_type"] == "double"
+    assert result.suppliers.loc[("LEI-A", "S2"), "materiality_type"] == "impact"
+    assert result.suppliers.loc[("LEI-A", "S3"), "materiality_type"] == "none"
+    assert result.categories.loc[("LEI-B", "scope_1"), "emission_share"] == pytest.approx(100.0)
+
+    topics = result.topics[result.topics["entity"] == "LEI-A"]
+    assert topics.iloc[0][["dimension", "topic", "rank"]].tolist() == ["category", "1_purchased_goods_services", 1]
+    assert topics["rank"].tolist() == list(range(1, len(topics) + 1))
+    assert "S3" not in topics["topic"].tolist()
+
+
+def test_thresholds_and_single_voucher_screen_agree():
+    strict = MaterialityEngine(MaterialityThresholds(impact_share=95.0))
+    result = strict.assess(voucher_columns(_vouchers()))
+    assert result.suppliers.loc[("LEI-A", "S1"), "materiality_type"] == "financial"
+
+    assert screen(90.0, 500_000) == (True, True)
+    assert screen(6.0, None) == (True, False)
+    assert screen(4.0, 500_000) == (False, False)
+    assert MaterialityEngine().assess(pd.DataFrame(
+        columns=["entity", "supplier_id", "category", "emissions", "spend"]
+    )).topics.empty
@@ -0,0 +1,75 @@
+import json
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "generator"))
+
+from pipeline_metrics import PipelineMetrics, percentile  # noqa: E402
+
+
+def test_nearest_rank_percentiles():
+    ordered = list(range(1, 101))
+    assert [percentile(ordered, p) for p in (50, 95, 99, 100)] == [50, 95, 99, 100]
+    assert percentile([7], 99) == 7
+    assert percentile([], 50) == 0
+
+
+def test_stage_summary_queue_and_workers():
+    metrics = PipelineMetrics(workers=2, keep_spans=True)
+    for n in range(10):
+        metrics.record("generate_ixbrl", 0, (n + 1) * 1_000_000)
+    metrics.enqueued(4)
+    both_running = threading.Barrier(2)
+
+    def worker():
+        both_running.wait()  # both workers are alive at once
+        for _ in range(2):
+            with metrics.task("LEI"), metrics.span("validation", "LEI"):
+                sum(range(1000))
+
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    metrics.finish()
+
+    summary = metrics.summary()
+    ixbrl = summary["stages"]["generate_ixbrl"]
+    assert ixbrl["count"] == 10
+    assert (ixbrl["p50_ms"], ixbrl["p95_ms"], ixbrl["max_ms"]) == (5.0, 10.0, 10.0)
+    assert summary["stages"]["validation"]["count"] == summary["stages"]["task"]["count"] == 4
+    assert summary["queue"]["max_depth"] == 4
+    assert summary["workers"]["active"] == 2
+    assert 0 < summary["workers"]["utilization"] <= 1
+
+    text = metrics.to_prometheus()
+    assert 'factortrace_batch_stage_seconds{stage="generate_ixbrl",quantile="0.95"} 0.01' in text
+    assert 'factortrace_batch_stage_seconds_count{stage="validation"} 4' in text
+    assert "factortrace_batch_queue_depth_max 4" in text
+
+    events = json.loads(json.dumps(metrics.chrome_trace()))["traceEvents"]
+    spans = [e for e in events if e["ph"] == "X"]
+    assert len(spans) == 18
+    assert {e["args"].get("lei") for e in spans if e["name"] == "validation"} == {"LEI"}
+    assert [e["args"]["rows"] for e in events if e["ph"] == "C"][0] == 4
+
+
+def test_threads_are_counted_once_even_if_idents_are_reused():
+    metrics = PipelineMetrics(workers=1, keep_spans=True)
+    metrics.enqueued(3)
+
+    def worker():
+        with metrics.task():
+            pass
+
+    for _ in range(3):
+        # Sequential threads: CPython usually hands the next one the same ident
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+    assert metrics.summary()["workers"]["active"] == 3
+    tids = {e["tid"] for e in metrics.chrome_trace()["traceEvents"] if e["ph"] == "X"}
+    assert tids == {0, 1, 2}
@@ -0,0 +1,48 @@
+import importlib.util
+from pathlib import Path
+
+_spec = importlib.util.spec_from_file_location(
+    "api_response_cache",
+    Path(__file__).resolve().parents[1] / "src" / "api" / "response_cache.py",
+)
+response_cache = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(response_cache)
+
+REQUEST = {"activity": "cotton_fabric", "activity_data": 100.0, "activity_unit": "kg", "region": "EU"}
+
+
+def test_request_key_is_canonical_and_versioned():
+    key = response_cache.request_key(REQUEST, "v2025-06-04")
+    assert key == response_cache.request_key(dict(reversed(list(REQUEST.items()))), "v2025-06-04")
+    assert key != response_cache.request_key(REQUEST, "v2025-07-01")
+    assert key != response_cache.request_key(dict(REQUEST, activity_data=100.5), "v2025-06-04")
+
+    etag = response_cache.etag_for(key)
+    assert response_cache.etag_matches(f'W/"other", {etag}', etag)
+    assert response_cache.etag_matches("*", etag)
+    assert not response_cache.etag_matches(None, etag)
+
+
+def test_lru_evicts_least_recently_used():
+    lru = response_cache.LRUCache(maxsize=2)
+    lru.set("a", b"1")
+    lru.set("b", b"2")
+    assert lru.get("a") == b"1"
+    lru.set("c", b"3")
+    assert lru.get("b") is None and lru.get("a") == b"1" and len(lru) == 2
+
+
+def test_shared_sqlite_tier_and_version_invalidation(tmp_path):
+    path = str(tmp_path / "responses.db")
+    cache = response_cache.ResponseCache(maxsize=10, shared=response_cache.SQLiteResponseStore(path))
+    cache.set("k", "v1", b"{}")
+
+    # A second process sharing the store sees the entry
+    other = response_cache.ResponseCache(maxsize=10, shared=response_cache.SQLiteResponseStore(path))
+    assert other.get("k", "v1") == b"{}"
+    assert other.hits == 1
+
+    # A new factor dataset version drops both tiers
+    assert cache.get("k", "v2") is None
+    assert len(cache.local) == 0
+    assert other.shared.get("k", "v1") is None
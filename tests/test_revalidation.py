@@ -0,0 +1,83 @@
+import pytest
+from sqlalchemy import select
+
+CBAM_FIELDS = {
+    "installation_id": "INST-1",
+    "installation_country": "TR",
+    "quantity": 10,
+    "direct_emissions": 12.0,
+    "emission_factor_source": "EU default",
+}
+
+
+@pytest.fixture
+def stricter_validator(validator):
+    class MachineryIsCbam(validator.VoucherValidator):
+        """Rule change: CN chapter 84 becomes CBAM-relevant and supplier LEIs are format-checked"""
+        CBAM_CN_PREFIXES = validator.VoucherValidator.CBAM_CN_PREFIXES + ("84",)
+        LEI_FIELDS = validator.VoucherValidator.LEI_FIELDS + ("supplier_lei",)
+
+    return MachineryIsCbam
+
+
+def _seed(session_factory, table, validator, complete):
+    vouchers = {
+        "V-steel": dict(complete, product_cn_code="72081000"),        # already CBAM, no change
+        "V-machine": dict(complete, product_cn_code="84713000"),      # newly CBAM, fields missing
+        "V-machine-full": dict(complete, product_cn_code="84713000", **CBAM_FIELDS),  # newly CBAM, complete
+        "V-lei": dict(complete, supplier_lei="bad"),                  # new warning only
+        "V-textile": dict(complete, product_cn_code="52081100"),      # untouched
+    }
+    current = validator.VoucherValidator()
+    with session_factory() as db, db.begin():
+        for voucher_id, raw in vouchers.items():
+            result = current.validate_voucher(raw)
+            db.execute(table.insert().values(
+                voucher_id=voucher_id,
+                raw_data=raw,
+                compliance_status=result["compliance_status"].value,
+                validation_flags=result["validation_flags"],
+                missing_fields=result["missing_fields"],
+                completeness_score=result["completeness_score"],
+            ))
+    return vouchers
+
+
+def _rows(session_factory, table):
+    with session_factory() as db:
+        return {row.voucher_id: row for row in db.execute(select(table)).all()}
+
+
+def test_rule_change_rewrites_only_affected_rows(session_factory, validator, voucher_store, revalidation,
+                                                 stricter_validator, complete_voucher):
+    table = voucher_store.VoucherRecord.__table__
+    vouchers = _seed(session_factory, table, validator, complete_voucher)
+    before = _rows(session_factory, table)
+
+    reported = []
+    job = revalidation.run_revalidation(
+        revalidation.RevalidationJob(), session_factory, table, validator=stricter_validator(),
+        batch_size=2, validated_by="auditor", on_changed=lambda db, changes: reported.extend(changes),
+    )
+
+    assert job.status == "completed"
+    assert (job.processed, job.changed, job.unchanged, job.error_count) == (5, 2, 3, 0)
+
+    after = _rows(session_factory, table)
+    stricter = stricter_validator()
+    for voucher_id in ("V-machine", "V-lei"):
+        expected = stricter.validate_voucher(vouchers[voucher_id])
+        row = after[voucher_id]
+        assert row.compliance_status == expected["compliance_status"].value
+        assert row.validation_flags == expected["validation_flags"]
+        assert row.missing_fields == expected["missing_fields"]
+        assert row.completeness_score == expected["completeness_score"]
+        assert row.validated_by == "auditor" and row.last_validated is not None
+    for voucher_id in ("V-steel", "V-machine-full", "V-textile"):
+        assert after[voucher_id] == before[voucher_id]
+
+    assert after["V-machine"].compliance_status == "non_compliant"
+    assert after["V-lei"].validation_flags[-1]["field"] == "supplier_lei"
+    # The LEI warning changes flags only, so it is not a status transition
+    machine = after["V-machine"]
+    assert reported == [(("compliant", 100.0), (validator.ComplianceStatus.NON_COMPLIANT, machine.completeness_score))]
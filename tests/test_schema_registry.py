@@ -0,0 +1,68 @@
+import os
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "factortrace" / "utils"))
+
+from schema_registry import SchemaRegistry  # noqa: E402
+
+XSD = """<?xml version="1.0"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">
+  <xs:element name="voucher"><xs:complexType><xs:sequence>
+    <xs:element name="amount" type="xs:{amount_type}"/>
+  </xs:sequence></xs:complexType></xs:element>
+</xs:schema>
+"""
+
+
+def _write_xsd(path, amount_type):
+    path.write_text(XSD.format(amount_type=amount_type))
+
+
+def test_schema_compiled_once_and_recompiled_on_change(tmp_path):
+    xsd = tmp_path / "voucher.xsd"
+    _write_xsd(xsd, "decimal")
+    registry = SchemaRegistry()
+
+    assert registry.validate("<voucher><amount>1.5</amount></voucher>", xsd) == (True, [])
+    ok, errors = registry.validate("<voucher><amount>abc</amount></voucher>", str(xsd))
+    assert not ok and errors
+
+    stats = registry.stats()[str(xsd)]
+    assert stats["compiles"] == 1 and stats["cache_hits"] == 1
+    assert stats["validations"] == 2 and stats["failures"] == 1
+
+    _write_xsd(xsd, "string")
+    os.utime(xsd, ns=(0, 10**9))  # force a distinct mtime on coarse filesystems
+    assert registry.validate("<voucher><amount>abc</amount></voucher>", xsd)[0]
+    assert registry.stats()[str(xsd)]["invalidations"] == 1
+
+
+def test_concurrent_validation_reports_correct_errors(tmp_path):
+    xsd = tmp_path / "voucher.xsd"
+    _write_xsd(xsd, "decimal")
+    registry = SchemaRegistry()
+    results = []
+
+    def worker(i):
+        amount = str(i) if i % 2 else "bad"
+        results.append((i, registry.validate(f"<voucher><amount>{amount}</amount></voucher>", xsd)))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(32)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert all(valid == bool(i % 2) and bool(errors) != valid for i, (valid, errors) in results)
+    assert registry.stats()[str(xsd)]["compiles"] == 1
+
+
+def test_xmlschema_backend_shares_cache(tmp_path):
+    xsd = tmp_path / "voucher.xsd"
+    _write_xsd(xsd, "decimal")
+    registry = SchemaRegistry()
+
+    assert registry.validate_xmlschema("<voucher><amount>2</amount></voucher>", xsd) == (True, [])
+    assert registry.get_xmlschema(xsd) is registry.get_xmlschema(xsd)
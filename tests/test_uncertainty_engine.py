@@ -0,0 +1,142 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "generator"))
+
+from uncertainty import (  # noqa: E402
+    DATA_QUALITY_UNCERTAINTY,
+    ITEM_COLUMNS,
+    AnalyticAggregator,
+    MonteCarloEngine,
+    line_items,
+    sample_factor,
+)
+
+
+def _items(n=600):
+    rng = np.random.default_rng(7)
+    return pd.DataFrame({
+        "voucher_id": [f"V{i // 3}" for i in range(n)],
+        "entity": [f"LEI-{(i // 3) % 4}" for i in range(n)],
+        "scope": np.where((np.arange(n) // 3) % 2 == 0, "scope_1", "scope_3"),
+        "emissions": rng.uniform(1, 50, n),
+        "factor_id": [f"EF-{i % 25}" for i in range(n)],
+        "uncertainty_percent": 20.0,
+        "confidence_level": 95.0,
+        "distribution": np.array(["lognormal", "normal", "uniform", "triangular"])[np.arange(n) % 4],
+    })
+
+
+@pytest.mark.parametrize("distribution", ["normal", "LOGNORMAL", "uniform", "triangular"])
+def test_factor_interval_matches_uncertainty_percent(distribution):
+    draws = sample_factor("EF-1", 10, 95, distribution, samples=200_000)
+    lower, upper = np.percentile(draws, [2.5, 97.5])
+    assert draws.mean() == pytest.approx(1.0, abs=2e-3)
+    assert lower == pytest.approx(0.9, abs=6e-3)
+    assert upper == pytest.approx(1.1, abs=6e-3)
+
+
+def test_results_are_seeded_and_independent_of_chunk_size():
+    items = _items()
+    whole = MonteCarloEngine(samples=2000, seed=11).run(items)
+    chunked = MonteCarloEngine(samples=2000, seed=11, memory_limit=200_000).run(items)
+    other_seed = MonteCarloEngine(samples=2000, seed=12).run(items)
+
+    pd.testing.assert_frame_equal(whole.vouchers, chunked.vouchers)
+    pd.testing.assert_frame_equal(whole.entities, chunked.entities, check_exact=False)
+    assert not whole.entities.equals(other_seed.entities)
+
+    assert len(whole.vouchers) == 200
+    assert list(whole.entities.index) == ["LEI-0", "LEI-1", "LEI-2", "LEI-3"]
+    assert whole.scopes.loc[("LEI-0", "scope_1"), "p50"] < whole.scopes.loc[("LEI-0", "scope_1"), "p97.5"]
+    assert whole.entities["mean"].sum() == pytest.approx(items["emissions"].sum(), rel=0.01)
+
+
+def test_items_sharing_a_factor_are_fully_correlated():
+    items = pd.DataFrame(
+        [("V1", "LEI", "scope_3", 10.0, "EF-1", 10, 95, "normal"),
+         ("V2", "LEI", "scope_3", 30.0, "EF-1", 10, 95, "normal")],
+        columns=ITEM_COLUMNS,
+    )
+    report = MonteCarloEngine(samples=5000).run(items)
+    # Correlated: standard deviations add instead of adding in quadrature
+    assert report.entities.loc["LEI", "std"] == pytest.approx(report.vouchers["std"].sum())
+
+
+def test_items_without_a_factor_id_keep_their_own_parameters():
+    items = pd.DataFrame(
+        [("V1", "LEI", "scope_3", 10.0, None, 50, 95, "normal"),
+         ("V2", "LEI", "scope_3", 10.0, "EF-1", 1, 95, "normal"),
+         ("V3", "LEI", "scope_3", 10.0, None, 50, 95, "normal")],
+        columns=ITEM_COLUMNS,
+    )
+    vouchers = MonteCarloEngine(samples=20_000).run(items).vouchers
+    assert vouchers.loc["V1", "std"] == pytest.approx(10 * 0.5 / 1.959964, rel=0.05)
+    assert vouchers.loc["V2", "std"] == pytest.approx(10 * 0.01 / 1.959964, rel=0.05)
+    # Null factor ids share one factor, like any other id
+    assert vouchers.loc["V3", "std"] == vouchers.loc["V1", "std"]
+
+
+def test_analytic_items_without_a_factor_id():
+    items = pd.DataFrame(
+        [("V1", "LEI", "scope_1", 10.0, None, 10, 95, "normal"),
+         ("V2", "LEI", "scope_1", 30.0, "EF-1", 10, 95, "normal"),
+         ("V3", "LEI", "scope_3", 40.0, None, 10, 95, "normal")],
+        columns=ITEM_COLUMNS,
+    )
+    sigma = 0.1 / 1.959964
+    report = AnalyticAggregator(distribution="normal").run(items)
+
+    assert report.vouchers["std"].tolist() == pytest.approx([10 * sigma, 30 * sigma, 40 * sigma])
+    assert report.scopes.loc[("LEI", "scope_1"), "std"] == pytest.approx(np.hypot(10 * sigma, 30 * sigma))
+    # The two null-factor items are correlated across scopes, like a shared factor_id
+    assert report.entities.loc["LEI", "std"] == pytest.approx(np.hypot(50 * sigma, 30 * sigma))
+
+
+def test_line_items_from_generated_vouchers():
+    vouchers = [
+        {"voucher_id": "V1", "reporting_undertaking_id": "LEI", "emission_scope": "scope_3",
+         "total_emissions_tco2e": 100.0, "emission_factor_id": "EF-1", "uncertainty_upper": 115.0,
+         "confidence_level": 95.0},
+    ]
+    items = line_items(vouchers)
+    assert items.loc[0, "uncertainty_percent"] == pytest.approx(15.0)
+    assert items.loc[0, "distribution"] == "lognormal"
+    with pytest.raises(ValueError):
+        sample_factor("EF-1", 10, distribution="poisson")
+
+
+def test_analytic_bounds_match_monte_carlo():
+    items = _items()
+    sampled = MonteCarloEngine(samples=20_000, seed=5).run(items)
+    analytic = AnalyticAggregator().run(items)
+
+    for level in ("entities", "scopes"):
+        expected, actual = getattr(sampled, level), getattr(analytic, level)
+        assert np.allclose(actual["mean"], expected["mean"], rtol=0.01)
+        assert np.allclose(actual["std"], expected["std"], rtol=0.05)
+        assert np.allclose(actual["p97.5"], expected["p97.5"], rtol=0.01)
+    assert analytic.samples == 0
+
+
+def test_analytic_correlation_and_data_quality():
+    items = pd.DataFrame(
+        [("V1", "LEI", "scope_1", 10.0, "EF-1", 10, 95, "normal", 1),
+         ("V2", "LEI", "scope_3", 30.0, "EF-1", 10, 95, "normal", 1),
+         ("V3", "LEI", "scope_3", 40.0, "EF-2", 10, 95, "normal", 5)],
+        columns=[*ITEM_COLUMNS, "data_quality_rating"],
+    )
+    sigma = 0.1 / 1.959964
+    report = AnalyticAggregator(distribution="normal").run(items)
+    # EF-1 is shared across scopes, so its items stay correlated at entity level
+    assert report.entities.loc["LEI", "std"] == pytest.approx(np.hypot(40 * sigma, 40 * sigma))
+    assert report.scopes.loc[("LEI", "scope_3"), "std"] == pytest.approx(np.hypot(30 * sigma, 40 * sigma))
+    assert report.entities.loc["LEI", "p97.5"] == pytest.approx(80 + 1.959964 * report.entities.loc["LEI", "std"])
+
+    widened = AnalyticAggregator(quality_uncertainty=DATA_QUALITY_UNCERTAINTY).run(items)
+    assert widened.vouchers.loc["V3", "std"] > report.vouchers.loc["V3", "std"]
+    assert widened.vouchers.loc["V1", "std"] == pytest.approx(report.vouchers.loc["V1", "std"])
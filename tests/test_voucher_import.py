@@ -0,0 +1,78 @@
+import json
+
+import pytest
+from sqlalchemy import select
+
+
+def _row(voucher_id, status="compliant", completeness=100.0):
+    return {"voucher_id": voucher_id, "compliance_status": status, "completeness_score": completeness}
+
+
+def _stored(session_factory, table):
+    with session_factory() as db:
+        return db.execute(
+            select(table.c.voucher_id, table.c.compliance_status, table.c.completeness_score)
+            .order_by(table.c.voucher_id)
+        ).all()
+
+
+def test_write_chunk_skips_duplicates_within_and_across_chunks(session_factory, voucher_store, voucher_import):
+    table = voucher_store.VoucherRecord.__table__
+    inserted = []
+
+    def on_inserted(db, rows):
+        inserted.append([tuple(row) for row in rows])
+
+    first = [_row("V-1"), _row("V-1", "partial", 50.0), _row("V-2", "partial", 75.0)]
+    assert voucher_import.write_chunk(session_factory, table, first, on_inserted) == (2, 1)
+    assert voucher_import.write_chunk(session_factory, table, [_row("V-2"), _row("V-3", "non_compliant", None)],
+                                      on_inserted) == (1, 1)
+    assert voucher_import.write_chunk(session_factory, table, [_row("V-1"), _row("V-3")], on_inserted) == (0, 2)
+
+    # Only rows that were written reach the callback; the fully duplicate chunk does not call it
+    assert inserted == [[("compliant", 100.0), ("partial", 75.0)], [("non_compliant", None)]]
+    assert _stored(session_factory, table) == [
+        ("V-1", "compliant", 100.0), ("V-2", "partial", 75.0), ("V-3", "non_compliant", None),
+    ]
+
+
+def _write_files(directory, complete):
+    directory.mkdir()
+    vouchers = {
+        "a.json": dict(complete, voucher_id="V-1"),
+        "b.json": dict(complete, voucher_id="V-2", scope=None),
+        "c.json": dict(complete, voucher_id="V-3"),
+        "d.json": dict(complete, voucher_id="V-1"),  # duplicate of a.json, in a later chunk
+        "f.json": dict(complete, voucher_id="V-4"),
+    }
+    for name, data in vouchers.items():
+        (directory / name).write_text(json.dumps(data))
+    (directory / "e.json").write_text("{not json")
+    (directory / "notes.txt").write_text("ignored")
+    return directory
+
+
+# One worker with one-file chunks keeps the pool window (two chunks) full and refilling
+@pytest.mark.parametrize("workers, chunk_size", [(0, 2), (2, 2), (1, 1)])
+def test_run_import_counts_and_error_handling(session_factory, voucher_store, voucher_import, complete_voucher,
+                                            tmp_path, workers, chunk_size):
+    table = voucher_store.VoucherRecord.__table__
+    files = voucher_import.iter_voucher_files(_write_files(tmp_path / "vouchers", complete_voucher))
+    inserted = []
+    job = voucher_import.ImportJob(job_id="job", source="vouchers")
+
+    voucher_import.run_import(job, files, session_factory, table, workers=workers, chunk_size=chunk_size,
+                              on_inserted=lambda db, rows: inserted.extend(rows))
+
+    assert job.status == "completed"
+    assert (job.total_files, job.processed) == (6, 6)
+    assert (job.imported, job.skipped) == (4, 1)
+    assert job.error_count == 1 and job.errors[0].startswith("e.json:")
+    assert len(inserted) == 4
+
+    stored = _stored(session_factory, table)
+    assert [row.voucher_id for row in stored] == ["V-1", "V-2", "V-3", "V-4"]
+    assert stored[1].compliance_status != "compliant"
+    assert sorted(map(tuple, inserted), key=str) == sorted(
+        ((row.compliance_status, row.completeness_score) for row in stored), key=str
+    )
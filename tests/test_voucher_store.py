@@ -0,0 +1,206 @@
+import csv
+import io
+import json
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+from lxml import etree
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+
+@pytest.fixture
+def admin_engine(engine, voucher_store):
+    """The test database with the supplier search index and summary stats as well"""
+    voucher_store.create_tables(engine)
+    return engine
+
+
+def _supplier_ids(voucher_store, engine, term):
+    with Session(engine) as db:
+        matches = voucher_store.supplier_filter(engine, term)
+        rows = db.execute(select(voucher_store.VoucherRecord.voucher_id).where(matches))
+        return sorted(voucher_id for (voucher_id,) in rows)
+
+
+def test_supplier_index_follows_inserts_updates_and_deletes(admin_engine, voucher_store):
+    VoucherRecord = voucher_store.VoucherRecord
+    with Session(admin_engine) as db:
+        db.add_all([
+            VoucherRecord(voucher_id="V-1", supplier_name="Acme Steel GmbH"),
+            VoucherRecord(voucher_id="V-2", supplier_name="Acme Aluminium"),
+            VoucherRecord(voucher_id="V-3", supplier_name="Nordic Cement"),
+        ])
+        db.commit()
+
+    assert _supplier_ids(voucher_store, admin_engine, "acme") == ["V-1", "V-2"]
+    assert _supplier_ids(voucher_store, admin_engine, "acme ste") == ["V-1"]
+    assert _supplier_ids(voucher_store, admin_engine, 'cement" OR "acme') == []
+
+    with Session(admin_engine) as db:
+        renamed = update(VoucherRecord).where(VoucherRecord.voucher_id == "V-2").values(supplier_name="Baltic Metals")
+        db.execute(renamed)
+        db.execute(delete(VoucherRecord).where(VoucherRecord.voucher_id == "V-3"))
+        db.commit()
+
+    assert _supplier_ids(voucher_store, admin_engine, "acme") == ["V-1"]
+    assert _supplier_ids(voucher_store, admin_engine, "baltic") == ["V-2"]
+    assert _supplier_ids(voucher_store, admin_engine, "cement") == []
+
+
+def test_supplier_index_backfills_existing_rows(engine, voucher_store):
+    with Session(engine) as db:
+        db.add(voucher_store.VoucherRecord(voucher_id="V-1", supplier_name="Acme Steel"))
+        db.commit()
+
+    voucher_store.ensure_supplier_search(engine)
+    voucher_store.ensure_supplier_search(engine)  # idempotent: no duplicate index entries
+
+    assert _supplier_ids(voucher_store, engine, "acme") == ["V-1"]
+
+
+def _stats_rows(voucher_store, db):
+    return {
+        row.compliance_status: (row.voucher_count, round(row.completeness_sum, 6), row.completeness_count)
+        for row in db.query(voucher_store.VoucherSummaryStats).all()
+        if row.voucher_count
+    }
+
+
+def test_incremental_stats_match_a_full_recount(admin_engine, voucher_store):
+    VoucherRecord = voucher_store.VoucherRecord
+    entries = [("compliant", 100.0), ("partial", 62.5), ("non_compliant", None), (None, 40.0), ("partial", 75.0)]
+    with Session(admin_engine) as db:
+        for n, (status_value, completeness) in enumerate(entries):
+            db.add(VoucherRecord(voucher_id=f"V-{n}", compliance_status=status_value, completeness_score=completeness))
+            voucher_store.record_stats_change(db, added=(status_value, completeness))
+        db.commit()
+
+        # Revalidate two vouchers: old contribution out, new one in
+        for voucher_id, new in (("V-1", ("compliant", 100.0)), ("V-2", ("partial", 50.0))):
+            voucher = db.query(VoucherRecord).filter_by(voucher_id=voucher_id).one()
+            removed = (voucher.compliance_status, voucher.completeness_score)
+            voucher_store.record_stats_change(db, added=new, removed=removed)
+            voucher.compliance_status, voucher.completeness_score = new
+        # And a bulk delta, as the import job sends it
+        db.add(VoucherRecord(voucher_id="V-9", compliance_status="pending", completeness_score=10.0))
+        voucher_store.apply_stats_deltas(db, {"pending": [1, 10.0, 1], "compliant": [0, 0.0, 0]})
+        db.commit()
+
+        incremental = _stats_rows(voucher_store, db)
+        stats = voucher_store.dashboard_stats(db)
+        voucher_store.refresh_summary_stats(db)
+        db.commit()
+        assert incremental == _stats_rows(voucher_store, db)
+        assert stats == voucher_store.dashboard_stats(db)
+
+    assert stats["total_vouchers"] == 6
+    assert stats["compliant"] == 2
+    assert stats["by_status"] == {"compliant": 2, "partial": 2, "pending": 2}
+
+
+def _seed_ties(VoucherRecord, engine):
+    base = datetime(2024, 1, 1)
+    statuses = ["compliant", "partial", None]
+    with Session(engine) as db:
+        for n in range(23):
+            db.add(VoucherRecord(
+                voucher_id=f"V-{n:02d}",
+                supplier_name=None if n % 7 == 0 else f"Supplier {n % 3}",
+                compliance_status=statuses[n % 3],
+                completeness_score=None if n % 5 == 0 else float(n % 4) * 25,
+                submission_timestamp=None if n % 6 == 0 else base + timedelta(days=n % 4),
+            ))
+        db.commit()
+
+
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+def test_keyset_pages_cover_every_row_once(admin_engine, voucher_store, sort_order):
+    VoucherRecord = voucher_store.VoucherRecord
+    _seed_ties(VoucherRecord, admin_engine)
+    for sort_by in voucher_store.SORT_COLUMNS:
+        order = voucher_store.keyset_order(sort_by, sort_order)
+        with Session(admin_engine) as db:
+            expected = list(db.execute(select(VoucherRecord.id).order_by(*order)).scalars())
+
+            seen, cursor = [], None
+            while True:
+                query = select(VoucherRecord).order_by(*order).limit(4)
+                if cursor is not None:
+                    after = voucher_store.decode_cursor(cursor, sort_by)
+                    query = query.where(voucher_store.keyset_after(sort_by, sort_order, *after))
+                page = db.execute(query).scalars().all()
+                seen += [row.id for row in page]
+                if len(page) < 4:
+                    break
+                cursor = voucher_store.encode_cursor(getattr(page[-1], sort_by), page[-1].id)
+
+        assert seen == expected, sort_by
+        assert len(set(seen)) == 23
+
+
+def test_cursor_round_trip_and_rejects_garbage(voucher_store):
+    stamp = datetime(2024, 3, 1, 12, 30)
+    assert voucher_store.decode_cursor(voucher_store.encode_cursor(stamp, 7), "submission_timestamp") == (stamp, 7)
+    assert voucher_store.decode_cursor(voucher_store.encode_cursor(None, 3), "submission_timestamp") == (None, 3)
+    assert voucher_store.decode_cursor(voucher_store.encode_cursor(62.5, 9), "completeness_score") == (62.5, 9)
+    with pytest.raises(ValueError):
+        voucher_store.decode_cursor("not-a-cursor", "supplier_name")
+
+
+def _seed_export(VoucherRecord, engine, n):
+    with Session(engine) as db:
+        db.add_all([
+            VoucherRecord(
+                voucher_id=f"V-{i}", supplier_id=f"SUP-{i % 3}", supplier_name=f"Supplier, {i} \"Ltd\"",
+                reporting_period_start="2024-01-01", reporting_period_end="2024-12-31",
+                total_emissions_tco2e=i * 1.5, compliance_status=["compliant", "partial"][i % 2],
+                completeness_score=None if i == 3 else 90.0, submission_timestamp=datetime(2024, 6, 1, 12),
+            )
+            for i in range(n)
+        ])
+        db.commit()
+
+
+@pytest.mark.parametrize("rows", [0, 7])
+def test_export_chunks_and_text_streams(engine, session_factory, voucher_store, rows):
+    _seed_export(voucher_store.VoucherRecord, engine, rows)
+
+    chunks = list(voucher_store.iter_export_chunks(session_factory, chunk_size=3))
+    assert [len(chunk) for chunk in chunks] == ([3, 3, 1] if rows else [])
+    flat = [row for chunk in chunks for row in chunk]
+    assert [row[0] for row in flat] == [f"V-{i}" for i in range(rows)]
+
+    table = list(csv.reader(io.StringIO("".join(voucher_store.stream_csv(iter(chunks))))))
+    assert table[0] == list(voucher_store.EXPORT_COLUMNS)
+    assert len(table) == rows + 1
+
+    records = json.loads("".join(voucher_store.stream_json_array(iter(chunks))))
+    assert [record["voucher_id"] for record in records] == [row[0] for row in flat]
+
+    lines = "".join(voucher_store.stream_ndjson(iter(chunks))).splitlines()
+    assert [json.loads(line) for line in lines] == records
+
+    if rows:
+        assert table[4][voucher_store.EXPORT_COLUMNS.index("supplier_name")] == 'Supplier, 3 "Ltd"'
+        assert records[3]["completeness_score"] is None
+        assert records[1]["reporting_period"] == "2024-01-01 to 2024-12-31"
+        assert records[0]["submission_timestamp"] == "2024-06-01T12:00:00"
+
+
+@pytest.mark.parametrize("rows", [0, 7])
+def test_xlsx_report_writes_header_and_every_row(engine, session_factory, voucher_store, tmp_path, rows):
+    _seed_export(voucher_store.VoucherRecord, engine, rows)
+    path = tmp_path / "report.xlsx"
+
+    count = voucher_store.write_xlsx_report(str(path), voucher_store.iter_export_chunks(session_factory, chunk_size=3))
+
+    assert count == rows
+    with zipfile.ZipFile(path) as workbook:
+        sheet = etree.fromstring(workbook.read("xl/worksheets/sheet1.xml"))
+    ns = {"s": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+    sheet_rows = sheet.findall(".//s:sheetData/s:row", ns)
+    assert len(sheet_rows) == rows + 1
+    assert [cell.findtext(".//s:t", namespaces=ns) for cell in sheet_rows[0]] == list(voucher_store.EXPORT_COLUMNS)
+    assert bool(sheet.findall(".//s:conditionalFormatting", ns)) == bool(rows)
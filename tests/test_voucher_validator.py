@@ -0,0 +1,46 @@
+def test_prefix_trie_matches_prefixes_only(validator):
+    trie = validator.PrefixTrie(["72", "7601", "25"])
+    assert trie.matches("7208")
+    assert trie.matches("76011000")
+    assert trie.matches("25")
+    assert not trie.matches("7602")
+    assert not trie.matches("7")
+    assert not trie.matches("")
+
+
+def test_only_failing_flags_by_default(validator, complete_voucher):
+    result = validator.VoucherValidator().validate_voucher(complete_voucher)
+    assert result["compliance_status"] == validator.ComplianceStatus.COMPLIANT
+    assert result["validation_flags"] == []
+    assert result["missing_fields"] == []
+
+    verbose = validator.VoucherValidator(include_passing=True).validate_voucher(complete_voucher)
+    assert len(verbose["validation_flags"]) == len(validator.VoucherValidator.ESRS_E1_MANDATORY)
+    assert all(flag["status"] and flag["severity"] == "info" for flag in verbose["validation_flags"])
+    assert verbose["completeness_score"] == result["completeness_score"]
+
+
+def test_cbam_product_and_errors(validator, complete_voucher):
+    data = dict(complete_voucher, product_cn_code="72081000", data_quality_rating=9)
+    data.pop("calculation_methodology")
+    result = validator.VoucherValidator().validate_voucher(data)
+
+    fields = [flag["field"] for flag in result["validation_flags"]]
+    assert "installation_id" in fields and "calculation_methodology" in fields
+    assert "product_cn_code" not in result["missing_fields"]
+    assert result["compliance_status"] == validator.ComplianceStatus.NON_COMPLIANT
+    assert set(result["validation_flags"][0]) == set(validator.ValidationFlag.model_fields)
+
+
+def test_validate_many_and_changed_columns(validator, complete_voucher):
+    v = validator.VoucherValidator()
+    results = list(v.validate_many([complete_voucher, {}]))
+    assert [r["compliance_status"] for r in results] == [
+        validator.ComplianceStatus.COMPLIANT, validator.ComplianceStatus.NON_COMPLIANT,
+    ]
+
+    stored = {column: results[0][column] for column in v.RESULT_COLUMNS}
+    stored["compliance_status"] = "compliant"
+    assert v.changed_columns(results[0], stored) == {}
+    stored["completeness_score"] = 50.0
+    assert v.changed_columns(results[0], stored) == {"completeness_score": results[0]["completeness_score"]}
@@ -0,0 +1,166 @@
+import sys
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "generator"))
+
+from voucher_warehouse import (  # noqa: E402
+    CUBE_DIMENSIONS,
+    VoucherWarehouse,
+    emission_vouchers,
+    emissions_cube,
+    partition_ddl,
+    warehouse_row,
+)
+
+
+def _voucher(n, scope="scope_3", category="1_purchased_goods_services", cn="2523", start="2024-01-01",
+             total=10.5, rating=3, price=None):
+    return {
+        "voucher_id": f"0190c0de-0000-7000-8000-{n:012d}",
+        "schema_version": "2.0.0",
+        "submission_timestamp": "2024-06-01T12:00:00+00:00",
+        "reporting_undertaking_id": "LEI-XYZ-123456",
+        "legal_entity_identifier": "5493001KJTIIGC8Y1R12",
+        "supplier_id": f"SUP-{n % 3}",
+        "emission_scope": scope,
+        "scope3_category": category,
+        "product_cn_code": cn,
+        "quantity": 100.0,
+        "quantity_unit": "tonnes",
+        "total_emissions_tco2e": total,
+        "data_quality_rating": rating,
+        "data_quality_tier": "tier_2",
+        "fallback_factor_used": cn == "2523",
+        "carbon_price_paid": price,
+        "reporting_period_start": start,
+        "reporting_period_end": "2024-12-31",
+        "emissions_breakdown": {"CO2": total},
+        "calculation_hash": "ab" * 32,
+    }
+
+
+def _warehouse():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    warehouse = VoucherWarehouse(engine, chunk_size=4)
+    warehouse.create_schema()
+    return warehouse
+
+
+def test_row_mapping_denormalizes_voucher():
+    row = warehouse_row(_voucher(1, cn="8501", price=12.345))
+    assert row["reporting_lei"] == "5493001KJTIIGC8Y1R12"
+    assert row["reporting_period_start"] == date(2024, 1, 1)
+    assert row["total_co2e"] == Decimal("10.500")
+    assert row["carbon_price_paid"] == Decimal("12.35")
+    assert row["cbam_product_code"] is None  # not an Annex I good
+    assert row["calculation_details"]["emissions_breakdown"] == {"CO2": 10.5}
+
+
+def test_bulk_write_is_idempotent_and_queries_aggregate():
+    warehouse = _warehouse()
+    vouchers = [
+        _voucher(i, start=f"2024-{1 + i % 3:02d}-01", scope="scope_3" if i % 2 else "scope_1",
+                 category="1_purchased_goods_services" if i % 2 else None, price=5.0)
+        for i in range(10)
+    ]
+    assert warehouse.write(vouchers) == 10
+    assert warehouse.write(vouchers[:6]) == 0
+
+    with warehouse.engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(emission_vouchers)).scalar() == 10
+
+    totals = warehouse.period_scope_totals(date(2024, 1, 1), date(2025, 1, 1))
+    assert [(t.emission_scope, t.voucher_count) for t in totals] == [("scope_1", 5), ("scope_3", 5)]
+    assert sum(t.total_co2e for t in totals) == Decimal("105.000")
+
+    # The window only covers January and February
+    months = warehouse.monthly_totals(date(2024, 1, 1), date(2024, 3, 1))
+    assert [m for m, _ in months] == ["2024-01", "2024-02"]
+
+    cbam = warehouse.cbam_totals(date(2024, 1, 1), date(2025, 1, 1))
+    assert cbam["2523"]["voucher_count"] == 10
+    assert cbam["2523"]["fallback_count"] == 10
+    assert cbam["2523"]["carbon_price_paid"] == Decimal("50.00")
+    assert warehouse.quality_distribution(date(2024, 1, 1), date(2025, 1, 1)) == {("tier_2", 3): 10}
+    assert warehouse.supplier_totals(date(2024, 1, 1), date(2025, 1, 1), limit=1)[0][0] == "SUP-0"
+
+
+def test_postgres_ddl_is_partitioned_by_month():
+    ddl = str(CreateTable(emission_vouchers).compile(dialect=postgresql.dialect()))
+    assert "PARTITION BY RANGE (reporting_period_start)" in ddl
+    assert "JSONB" in ddl
+    assert partition_ddl(date(2024, 12, 15)) == (
+        "CREATE TABLE IF NOT EXISTS emission_vouchers_2024_12 PARTITION OF emission_vouchers "
+        "FOR VALUES FROM ('2024-12-01') TO ('2025-01-01')"
+    )
+
+
+def _cube(warehouse):
+    with warehouse.engine.connect() as conn:
+        return [tuple(row) for row in conn.execute(select(emissions_cube).order_by(*CUBE_DIMENSIONS))]
+
+
+def test_cube_tracks_writes_and_revisions():
+    warehouse = _warehouse()
+    vouchers = [_voucher(i, start=f"2024-0{1 + i % 2}-15", cn="7208" if i % 3 else None) for i in range(8)]
+    warehouse.write(vouchers)
+    warehouse.write(vouchers)  # re-delivery must not double count
+
+    jan_feb = warehouse.rollup(date(2024, 1, 1), date(2024, 3, 1), by=("period_month", "cn_code"))
+    assert [(r["period_month"], r["cn_code"], r["voucher_count"]) for r in jan_feb] == [
+        (date(2024, 1, 1), None, 2), (date(2024, 1, 1), "7208", 2),
+        (date(2024, 2, 1), None, 1), (date(2024, 2, 1), "7208", 3),
+    ]
+
+    # Revalidated vouchers move between cells: new scope, corrected total
+    revised = [dict(vouchers[0], emission_scope="scope_1", total_emissions_tco2e=1.25), _voucher(99)]
+    assert warehouse.revise(revised) == 1
+    totals = warehouse.period_scope_totals(date(2024, 1, 1), date(2025, 1, 1))
+    assert [(t.emission_scope, t.voucher_count, t.total_co2e) for t in totals] == [
+        ("scope_1", 1, Decimal("1.250")), ("scope_3", 8, Decimal("84.000")),
+    ]
+    assert warehouse.entity_totals(["5493001KJTIIGC8Y1R12", "UNKNOWN"], date(2024, 1, 1), date(2025, 1, 1)) == {
+        "5493001KJTIIGC8Y1R12": {"scope_1": Decimal("1.250"), "scope_3": Decimal("84.000")},
+    }
+
+    incremental = _cube(warehouse)
+    warehouse.rebuild_cube()
+    assert _cube(warehouse) == incremental
+
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_skipped_duplicates_stay_out_of_count_and_cube(monkeypatch, returning):
+    warehouse = _warehouse()
+    monkeypatch.setattr(warehouse.engine.dialect, "insert_executemany_returning", returning)
+    vouchers = [_voucher(i, cn="7208") for i in range(3)]
+
+    # Repeated within one chunk, then re-delivered alongside a new voucher
+    assert warehouse.write([vouchers[0], vouchers[0], vouchers[1]]) == 2
+    assert warehouse.write(vouchers + [vouchers[2]]) == 1
+    assert warehouse.write(vouchers) == 0
+
+    rollup = warehouse.rollup(date(2024, 1, 1), date(2024, 2, 1))
+    assert [(r["emission_scope"], r["voucher_count"]) for r in rollup] == [("scope_3", 3)]
+    incremental = _cube(warehouse)
+    warehouse.rebuild_cube()
+    assert _cube(warehouse) == incremental
+
+
+def test_cube_rollups_need_whole_months():
+    warehouse = _warehouse()
+    warehouse.write([_voucher(1, start="2024-03-20"), _voucher(2, start="2024-03-02")])
+    with pytest.raises(ValueError):
+        warehouse.rollup(date(2024, 3, 10), date(2024, 4, 1))
+    with pytest.raises(ValueError):
+        warehouse.rollup(date(2024, 3, 1), date(2024, 4, 1), by=("installation_id",))
+    # Partial months fall back to the raw table
+    assert warehouse.monthly_totals(date(2024, 3, 10), date(2024, 4, 1)) == [("2024-03", Decimal("10.500"))]
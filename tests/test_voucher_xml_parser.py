@@ -0,0 +1,115 @@
+import importlib.util
+import io
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from export.voucher_plans import SCOPE3_FIELD_ORDER, esrs_v1_plan, esrs_v2_plan, scope3_plan
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "generator"))
+
+from voucher_xml_stream import write_voucher_batch  # noqa: E402
+
+# Loaded by path: importing factortrace.services pulls in the whole app
+_spec = importlib.util.spec_from_file_location(
+    "voucher_xml_parser",
+    Path(__file__).resolve().parents[1] / "src" / "factortrace" / "services" / "voucher_xml_parser.py",
+)
+parser = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(parser)
+
+
+def _voucher(n):
+    return {
+        "voucher_id": f"V-{n}",
+        "submission_timestamp": "2024-06-01T12:00:00+00:00",
+        "reporting_undertaking_id": "5493001KJTIIGC8Y1R12",
+        "supplier_id": "SUP-1",
+        "supplier_name": "Acme & Co",
+        "emission_scope": "scope_3",
+        "scope3_category": "1_purchased_goods_services",
+        "product_cn_code": "72081000",
+        "product_category": "steel",
+        "activity_description": "Hot-rolled coil",
+        "quantity": 100.5,
+        "quantity_unit": "tonnes",
+        "installation_country": "DE",
+        "emission_factor_id": "EF-1",
+        "emission_factor_source": "DEFRA",
+        "emission_factor_value": 1.85,
+        "fallback_factor_used": True,
+        "data_quality_rating": 2,
+        "calculation_methodology": "GHG Protocol",
+        "total_emissions_tco2e": 185.9 + n,
+        "emissions_breakdown": {"CO2": {"amount": 180.0, "gwp_factor": 1, "co2e": 180.0}},
+        "reporting_period_start": "2024-01-01",
+        "reporting_period_end": "2024-12-31",
+        "calculation_hash": "ab" * 32,
+    }
+
+
+def test_esrs_v2_round_trip():
+    record = parser.parse_voucher(io.BytesIO(esrs_v2_plan().render(_voucher(1), pretty=True)))
+
+    assert record["voucher_id"] == "V-1"
+    assert record["reporting_undertaking_lei"] == "5493001KJTIIGC8Y1R12"
+    assert record["scope"] == "scope_3"
+    assert record["quantity"] == 100.5
+    assert record["data_quality_rating"] == 2
+    assert record["fallback_factor_used"] is True
+    assert record["installation_country"] == "DE"
+    assert record["ghg_breakdown"] == {"CO2": 180.0}
+    assert record["emissions_breakdown"]["CO2"]["gwp_factor"] == 1.0
+
+
+def test_esrs_v1_and_scope3_map_onto_validator_fields():
+    model = SimpleNamespace(
+        voucher_id="V-2", reporting_entity_lei="5493001KJTIIGC8Y1R12", supplier_id="S-1",
+        activity_quantity=10, activity_quantity_unit="t", monetary_value=None, installation=None,
+        ghg_breakdown=SimpleNamespace(co2=4.0, ch4=0.5, n2o=None, hfcs=None, pfcs=None, sf6=None, nf3=None, total=4.5),
+    )
+    record = parser.parse_voucher(io.BytesIO(esrs_v1_plan().render(model, pretty=True)))
+    assert record["voucher_id"] == "V-2"
+    assert record["reporting_undertaking_lei"] == "5493001KJTIIGC8Y1R12"
+    assert record["quantity"] == 10.0
+    assert record["total_emissions_tco2e"] == 4.5
+    assert record["ghg_breakdown"] == {"CO2": 4.0, "CH4": 0.5}
+
+    flat = dict.fromkeys(SCOPE3_FIELD_ORDER, "x")
+    flat.update(voucher_uuid="V-3", supplier_id="S-1", cost=12, fallback_factor_used=True, total_co2e=2.5, hash="h")
+    record = parser.parse_voucher(io.BytesIO(scope3_plan().render(flat)))
+    assert record["voucher_id"] == "V-3"
+    assert record["cost"] == 12.0
+    assert record["fallback_factor_used"] is True
+    assert record["total_emissions_tco2e"] == 2.5
+    assert record["calculation_hash"] == "h"
+
+
+@pytest.mark.parametrize("count", [3, 5000])
+def test_batch_file_yields_every_voucher(tmp_path, count):
+    # 5000 vouchers are over WHOLE_DOCUMENT_BYTES, so that batch goes through iterparse
+    path = tmp_path / "batch.xml"
+    write_voucher_batch((_voucher(n) for n in range(count)), path, flush_every=100)
+
+    records = list(parser.iter_vouchers(path))
+    assert [r["voucher_id"] for r in records] == [f"V-{n}" for n in range(count)]
+    assert records[-1]["total_emissions_tco2e"] == pytest.approx(185.9 + count - 1)
+
+
+def test_unknown_root_falls_back_to_leaf_names():
+    xml = b"<root><a:x xmlns:a='urn:a'><voucher_id>V</voucher_id><total_emissions_tco2e>3</total_emissions_tco2e></a:x></root>"
+    assert parser.parse_voucher(io.BytesIO(xml)) == {"voucher_id": "V", "total_emissions_tco2e": 3.0}
+
+
+@pytest.mark.parametrize("whole_document", [True, False])
+def test_unknown_root_batch_is_rejected(tmp_path, whole_document):
+    item = "<item><voucher_id>V-{0}</voucher_id><total_emissions_tco2e>{0}</total_emissions_tco2e></item>"
+    xml = ("<export>" + "".join(item.format(n) for n in range(3)) + "</export>").encode()
+    path = tmp_path / "export.xml"
+    path.write_bytes(xml)
+    source = path if whole_document else io.BytesIO(xml)  # streams go through iterparse
+
+    with pytest.raises(ValueError, match="<export> repeats <item>"):
+        list(parser.iter_vouchers(source))
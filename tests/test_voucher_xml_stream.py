@@ -0,0 +1,79 @@
+import io
+import sys
+from pathlib import Path
+
+from lxml import etree
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "generator"))
+
+from voucher_xml_stream import (  # noqa: E402
+    C,
+    NAMESPACE,
+    T,
+    serialize_voucher_bytes,
+    write_voucher_batch,
+    write_voucher_files,
+)
+
+
+def _voucher(n, **overrides):
+    voucher = {
+        "voucher_id": f"0190c0de-0000-7000-8000-{n:012d}",
+        "submission_timestamp": "2024-06-01T12:00:00+00:00",
+        "reporting_undertaking_id": "5493001KJTIIGC8Y1R12",
+        "supplier_id": "SUP-1",
+        "supplier_name": "Acme & Co",
+        "emission_scope": "scope_3",
+        "scope3_category": "1_purchased_goods_services",
+        "product_cn_code": "72081000",
+        "product_category": "steel",
+        "activity_description": "Hot-rolled coil",
+        "quantity": 100.5,
+        "quantity_unit": "tonnes",
+        "installation_country": "DE",
+        "embedded_emissions_direct": 1.2,
+        "emission_factor_id": "EF-1",
+        "emission_factor_source": "DEFRA",
+        "emission_factor_value": 1.85,
+        "fallback_factor_used": True,
+        "data_quality_rating": 2,
+        "calculation_methodology": "GHG Protocol",
+        "total_emissions_tco2e": 185.9,
+        "emissions_breakdown": {"CO2": {"gwp_factor": 1, "amount": 180, "co2e": 180}},
+        "reporting_period_start": "2024-01-01",
+        "reporting_period_end": "2024-12-31",
+        "calculation_hash": "ab" * 32,
+    }
+    voucher.update(overrides)
+    return voucher
+
+
+def test_single_voucher_document():
+    root = etree.fromstring(serialize_voucher_bytes(_voucher(1)))
+    assert root.tag == T["EmissionVoucher"]
+    assert root.findtext(f"{T['Supplier']}/{T['Name']}") == "Acme & Co"
+    assert root.find(f"{T['Product']}/{T['Quantity']}").get("unit") == "tonnes"
+    assert root.find(f"{C['Installation']}/{C['EmbeddedEmissions']}/{C['Direct']}").text == "1.2"
+    assert root.find(f"{T['EmissionCalculation']}/{T['EmissionFactor']}").get("fallbackUsed") == "true"
+
+    esrs_only = etree.fromstring(serialize_voucher_bytes(_voucher(1, scope3_category=None), include_cbam_namespace=False))
+    assert esrs_only.find(C["Installation"]) is None
+    assert esrs_only.find(f"{T['EmissionScope']}/{T['Scope3Category']}") is None
+
+
+def test_batch_envelope_declares_namespaces_once():
+    buffer = io.BytesIO()
+    assert write_voucher_batch((_voucher(i) for i in range(25)), buffer, flush_every=10) == 25
+
+    data = buffer.getvalue()
+    assert data.count(f'xmlns="{NAMESPACE}"'.encode()) == 1
+    root = etree.fromstring(data)
+    assert root.tag == T["VoucherBatch"] and len(root) == 25
+    assert [v.findtext(f"{T['Header']}/{T['MessageId']}") for v in root][-1] == _voucher(24)["voucher_id"]
+
+
+def test_one_file_per_voucher(tmp_path):
+    assert write_voucher_files([_voucher(1), _voucher(2)], tmp_path / "out") == 2
+    files = sorted((tmp_path / "out").glob("*.xml"))
+    assert [f.stem for f in files] == [_voucher(1)["voucher_id"], _voucher(2)["voucher_id"]]
+    assert etree.parse(str(files[0])).getroot().tag == T["EmissionVoucher"]
@@ -0,0 +1,69 @@
+import sys
+from pathlib import Path
+
+from lxml import etree
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "generator"))
+
+from xhtml_generator import build_xhtml_document, generate_ixbrl  # noqa: E402
+
+NS = {
+    "xbrli": "http://www.xbrl.org/2003/instance",
+    "ix": "http://www.xbrl.org/2013/inlineXBRL",
+}
+
+SAMPLE = {
+    "lei": "5493001KJTIIGC8Y1R12",
+    "total_emissions": "65800.7",
+    "scope1_emissions": "12500.5",
+}
+
+
+def test_streamed_report_is_well_formed(tmp_path):
+    out = tmp_path / "nested" / "report.xhtml"
+    generate_ixbrl(SAMPLE, str(out))
+
+    doc = etree.parse(str(out))
+    facts = doc.findall(".//ix:nonFraction", NS)
+    assert any(f.text == "12500.5" for f in facts)
+
+
+def test_contexts_and_units_emitted_once_when_referenced():
+    doc = etree.fromstring(build_xhtml_document(SAMPLE["lei"], "100", SAMPLE).encode())
+
+    context_ids = [c.get("id") for c in doc.findall(".//xbrli:context", NS)]
+    unit_ids = [u.get("id") for u in doc.findall(".//xbrli:unit", NS)]
+
+    assert context_ids == ["c_2024"]
+    assert len(unit_ids) == len(set(unit_ids))
+    assert "u_EUR" not in unit_ids  # never referenced by a fact
+
+    refs = {f.get("unitRef") for f in doc.findall(".//ix:nonFraction", NS)} - {None}
+    assert refs == set(unit_ids)
+
+
+def test_subsidiary_facts_use_deduplicated_dimensional_contexts():
+    data = dict(SAMPLE, subsidiaries=[
+        {"lei": "SUB1", "name": "Alpha", "scope1_emissions": "10", "water_consumption": "7"},
+        {"lei": "SUB2", "name": "Beta", "scope1_emissions": "20"},
+    ])
+    doc = etree.fromstring(build_xhtml_document(SAMPLE["lei"], "100", data).encode())
+
+    contexts = doc.findall(".//xbrli:context", NS)
+    context_ids = [c.get("id") for c in contexts]
+    assert len(context_ids) == len(set(context_ids)) == 3  # c_2024 + one per subsidiary
+
+    members = [m.text for m in doc.iterfind(".//{http://xbrl.org/2006/xbrldi}explicitMember")]
+    assert sorted(members) == ["esrs:LegalEntity_SUB1", "esrs:LegalEntity_SUB2"]
+
+    alpha_ctx = {f.get("contextRef") for f in doc.findall(".//ix:nonFraction", NS) if f.text in ("10", "7")}
+    assert len(alpha_ctx) == 1
+
+
+def test_optional_facts_skipped_without_value():
+    doc = etree.fromstring(build_xhtml_document(SAMPLE["lei"], "100", dict(SAMPLE, scope3_cat6="1200.5")).encode())
+    names = [f.get("name") for f in doc.findall(".//ix:nonFraction", NS)]
+
+    assert "esrs-e1:GHGEmissionsScope3Category6" in names
+    assert "esrs-e1:GHGEmissionsScope3Category1" not in names
+    assert names.count("esrs-e1:TotalGHGEmissions") == 1
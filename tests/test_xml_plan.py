@@ -0,0 +1,101 @@
+from datetime import date
+from decimal import Decimal
+from enum import Enum
+from types import SimpleNamespace
+
+import pytest
+from lxml import etree
+
+from export.voucher_plans import ESRS_V1_NAMESPACE, ESRS_V2_NAMESPACE, esrs_v1_plan, esrs_v2_plan
+from export.xml_plan import ATTRIBUTE, compile_plan, const, elem, flat_spec, leaf
+
+NS = "urn:test"
+OTHER = "urn:other"
+
+
+class Unit(str, Enum):
+    TONNE = "t"
+
+
+SPEC = elem(
+    "Doc",
+    leaf("Name", "name", ns=NS, required=True),
+    leaf("Qty", "qty", ns=NS, attrs={"unit": "unit", "fixed": const("x")}),
+    elem("Extra", leaf("Note", "note", ns=OTHER), ns=NS),
+    elem(
+        "Lines",
+        elem("Line", leaf("Amount", lambda item: item[1], ns=NS), ns=NS,
+             attrs={"gas": lambda item: item[0]}, each=lambda d: d["lines"].items()),
+        ns=NS, when="lines",
+    ),
+    ns=NS,
+    attrs={"version": const("1.0")},
+)
+NSMAP = {None: NS, "o": OTHER}
+
+
+def _lxml(data):
+    """The same document built with lxml, as the reference output"""
+    root = etree.Element(f"{{{NS}}}Doc", nsmap=NSMAP)
+    root.set("version", "1.0")
+    etree.SubElement(root, f"{{{NS}}}Name").text = data["name"]
+    if data.get("qty") is not None:
+        qty = etree.SubElement(root, f"{{{NS}}}Qty")
+        qty.set("unit", data["unit"].value)
+        qty.set("fixed", "x")
+        qty.text = str(data["qty"])
+    extra = etree.SubElement(root, f"{{{NS}}}Extra")
+    if data.get("note") is not None:
+        etree.SubElement(extra, f"{{{OTHER}}}Note").text = data["note"]
+    if data.get("lines"):
+        lines = etree.SubElement(root, f"{{{NS}}}Lines")
+        for gas, amount in data["lines"].items():
+            line = etree.SubElement(lines, f"{{{NS}}}Line")
+            line.set("gas", gas)
+            etree.SubElement(line, f"{{{NS}}}Amount").text = str(amount)
+    return root
+
+
+@pytest.mark.parametrize("data", [
+    {"name": "A & <B>", "qty": Decimal("1.50"), "unit": Unit.TONNE, "note": 'say "hi"', "lines": {"CO2": 1.5, "CH4": 2}},
+    {"name": "plain", "qty": None, "unit": None, "note": None, "lines": {}},
+])
+def test_output_matches_lxml(data):
+    plan = compile_plan(SPEC, NSMAP)
+    reference = _lxml(data)
+    assert plan.render(data) == etree.tostring(reference, xml_declaration=True, encoding="UTF-8")
+    assert plan.render(data, pretty=True, standalone=False) == etree.tostring(
+        reference, pretty_print=True, xml_declaration=True, encoding="UTF-8", standalone=False
+    )
+
+
+def test_missing_required_field_and_invalid_text():
+    plan = compile_plan(flat_spec("voucher", NS, ["supplier_id", "cost"]), {None: NS})
+    with pytest.raises(KeyError, match="voucher missing 'cost'"):
+        plan.render({"supplier_id": "S1"})
+    with pytest.raises(ValueError):
+        plan.render({"supplier_id": "bad\x00", "cost": 1})
+
+    assert plan.render_text({"supplier_id": True, "cost": date(2024, 1, 31)}, xml_declaration=False) == (
+        '<voucher xmlns="urn:test"><supplier_id>true</supplier_id><cost>2024-01-31</cost></voucher>'
+    )
+
+
+def test_voucher_plans_render_models_and_dicts():
+    model = SimpleNamespace(
+        voucher_id="V-1", supplier_id="S-1", activity_quantity=Decimal("10"), activity_quantity_unit="t",
+        installation=SimpleNamespace(installation_id="I-1", coordinates=None), ghg_breakdown=None,
+    )
+    root = etree.fromstring(esrs_v1_plan().render(model, pretty=True))
+    assert root.get("version") == "1.0.0"
+    assert root.findtext(f"{{{ESRS_V1_NAMESPACE}}}Header/{{{ESRS_V1_NAMESPACE}}}MessageType") == "ORIGINAL"
+    assert root.find(f"{{{ESRS_V1_NAMESPACE}}}Installation/{{{ESRS_V1_NAMESPACE}}}Coordinates") is None
+    assert root.find(f"{{{ESRS_V1_NAMESPACE}}}ActivityData/{{{ESRS_V1_NAMESPACE}}}Quantity").get("unit") == "t"
+
+    batch_member = esrs_v2_plan(include_cbam_namespace=False, standalone=False)
+    with pytest.raises(KeyError, match="voucher missing 'voucher_id'"):
+        batch_member.render_str({}, declare_namespaces=False)
+    assert compile_plan(elem("R", leaf("A", "a.b")), accessor=ATTRIBUTE).render_text(
+        SimpleNamespace(a=None), xml_declaration=False
+    ) == "<R/>"
+    assert esrs_v2_plan().nsmap[None] == ESRS_V2_NAMESPACE